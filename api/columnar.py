@@ -0,0 +1,193 @@
+"""
+Columnar snapshot files for scraper output.
+
+The JSON files stay the public format; next to them the scraper writes the
+same table as one fixed-schema binary file that local readers memory-map
+instead of re-parsing:
+
+    offset  size  field
+    0       8     magic b"DSCOL\\x00\\x00\\x00"
+    8       4     format version (uint32, little endian)
+    12      4     schema length in bytes (uint32)
+    16      8     sequence number (uint64), +1 on every write
+    24      8     row count (uint64)
+    32      n     schema: JSON list of {"name", "dtype", "offset"}
+    ...           one contiguous array per column, 64-byte aligned
+
+Numbers are float64 / int64, flags are bool and text is fixed-width UTF-32
+(numpy "<U"), so every column is a zero-copy numpy view into the mapping.
+Files are written to a temp path and renamed over the old one, so a reader
+never sees a half-written snapshot and an open mapping stays valid after the
+next write. The sequence in the fixed-size header is enough to tell whether a
+snapshot changed without mapping it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"DSCOL\x00\x00\x00"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQ")
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _column_array(series: pd.Series):
+    """Fixed-width numpy array for one column, or None if it holds non-scalars."""
+    if pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype="?")
+    if pd.api.types.is_integer_dtype(series):
+        return series.to_numpy(dtype="<i8")
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype="<f8", na_value=np.nan)
+    values = series.tolist()
+    if any(isinstance(value, (list, tuple, dict, set)) for value in values):
+        return None
+    if all(isinstance(value, (bool, np.bool_)) or pd.isna(value) for value in values):
+        # Signal columns with gaps: missing reads back as False
+        return np.array([bool(value) and not pd.isna(value) for value in values], dtype="?")
+    # Missing text reads back as ""
+    return np.array(["" if pd.isna(value) else str(value) for value in values], dtype=np.str_)
+
+
+def read_sequence(path) -> int | None:
+    """Sequence number of the snapshot at path, reading only the fixed header."""
+    try:
+        with open(path, "rb") as f:
+            raw = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(raw) < HEADER.size:
+        return None
+    magic, version, _, sequence, _ = HEADER.unpack(raw)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return sequence
+
+
+def write_columnar(dataframe: pd.DataFrame, path, sequence: int | None = None) -> int:
+    """
+    Atomically write dataframe to path and return the sequence number used
+    (previous file's sequence + 1 unless given). Columns holding lists or
+    dicts are left out.
+    """
+    path = os.fspath(path)
+    if sequence is None:
+        sequence = (read_sequence(path) or 0) + 1
+
+    arrays = {}
+    for name in dataframe.columns:
+        array = _column_array(dataframe[name])
+        if array is None:
+            log.warning(f"Column {name!r} holds non-scalar values, not written to {path}")
+            continue
+        arrays[str(name)] = np.ascontiguousarray(array)
+
+    # Column offsets depend on the schema length, which depends on the offsets:
+    # size the schema with placeholder offsets wide enough for the real ones
+    placeholder = [{"name": n, "dtype": a.dtype.str, "offset": 10 ** 15} for n, a in arrays.items()]
+    data_start = _align(HEADER.size + len(json.dumps(placeholder).encode()))
+    schema, offset = [], data_start
+    for name, array in arrays.items():
+        schema.append({"name": name, "dtype": array.dtype.str, "offset": offset})
+        offset = _align(offset + array.nbytes)
+    schema_bytes = json.dumps(schema).encode()
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(schema_bytes), sequence, len(dataframe)))
+        f.write(schema_bytes)
+        for column, array in zip(schema, arrays.values()):
+            f.seek(column["offset"])
+            f.write(array.tobytes())
+        f.truncate(max(offset, data_start))
+    os.replace(temp_path, path)
+    return sequence
+
+
+class ColumnarReader:
+    """
+    Memory-mapped view of one snapshot file.
+
+    refresh() only re-maps when the sequence number changed; column() returns
+    numpy views into the mapping, so reading a few columns never touches the
+    rest of the file.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.sequence = None
+        self.rows = 0
+        self.schema = {}
+        self._buffer = None
+        self._columns = {}
+        self._indexes = {}
+
+    def refresh(self) -> bool:
+        """Map the current snapshot if it changed since the last call. True when it did."""
+        sequence = read_sequence(self.path)
+        if sequence is None or sequence == self.sequence:
+            return False
+        with open(self.path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, schema_length, sequence, rows = HEADER.unpack_from(buffer)
+        schema = json.loads(buffer[HEADER.size:HEADER.size + schema_length])
+        self._buffer = buffer  # the previous mapping is released once no view references it
+        self.schema = {column["name"]: column for column in schema}
+        self.rows = rows
+        self.sequence = sequence
+        self._columns = {}
+        self._indexes = {}
+        return True
+
+    @property
+    def columns(self) -> list:
+        return list(self.schema)
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only numpy view of one column."""
+        array = self._columns.get(name)
+        if array is None:
+            column = self.schema[name]
+            array = np.frombuffer(self._buffer, dtype=np.dtype(column["dtype"]), count=self.rows, offset=column["offset"])
+            self._columns[name] = array
+        return array
+
+    def index(self, key: str = "Asset") -> dict:
+        """{value of key column: row} for row lookups."""
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = {value: row for row, value in enumerate(self.column(key).tolist())}
+        return index
+
+    def row(self, value, columns: list | None = None, key: str = "Asset") -> dict | None:
+        row = self.index(key).get(value)
+        if row is None:
+            return None
+        return {name: self.column(name)[row].item() for name in (columns or self.schema)}
+
+    def to_frame(self, columns: list | None = None) -> pd.DataFrame:
+        return pd.DataFrame({name: self.column(name) for name in (columns or self.schema)})
+
+    def records(self, columns: list | None = None) -> list:
+        """Rows as dicts, the shape the JSON file has (missing text comes back as None)."""
+        names = list(columns or self.schema)
+        values = [
+            [None if v == "" else v for v in self.column(name).tolist()]
+            if self.column(name).dtype.kind == "U" else self.column(name).tolist()
+            for name in names
+        ]
+        return [dict(zip(names, row)) for row in zip(*values)]
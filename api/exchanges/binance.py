@@ -18,6 +18,7 @@ class Binance(Exchange):
     exchange = "binance"
     futures_api_url = "https://fapi.binance.com"
     max_weight = 1000
+    kline_max_limit = 1500
 
     def get_futures_symbols(self) -> dict:
         self.check_weight()
@@ -228,6 +229,60 @@ class Binance(Exchange):
             ]
         return []
 
+    def kline_request(self, symbol: str, interval: Intervals, limit: int, end: int | None = None) -> tuple:
+        params = {"symbol": symbol, "limit": limit, "interval": interval}
+        if end is not None:
+            params["endTime"] = end
+        return "/fapi/v1/klines", params
+
+    def parse_klines(self, raw_json) -> list:
+        if not isinstance(raw_json, list):
+            return []
+        return [
+            {
+                "timestamp": int(candle[0]),
+                "open": float(candle[1]),
+                "high": float(candle[2]),
+                "low": float(candle[3]),
+                "close": float(candle[4]),
+                "volume": float(candle[5]),
+            }
+            for candle in raw_json
+        ]
+
+    def request_weight(self, url_path: str, params: dict) -> int:
+        if url_path == "/fapi/v1/klines":
+            limit = int(params.get("limit", 500))
+            return 1 if limit < 100 else 2 if limit < 500 else 5 if limit <= 1000 else 10
+        return 1
+
+    def used_weight(self, headers) -> int | None:
+        used = (headers or {}).get("X-MBX-USED-WEIGHT-1M")
+        return int(used) if used is not None else None
+
+    def get_futures_tickers(self) -> dict:
+        """Last price, 24h volume and last funding rate of every symbol in two requests."""
+        self.check_weight()
+        header, raw_json = send_public_request(
+            url=self.futures_api_url,
+            url_path="/fapi/v1/ticker/24hr",
+            payload={},
+        )
+        header, premium_json = send_public_request(
+            url=self.futures_api_url,
+            url_path="/fapi/v1/premiumIndex",
+            payload={},
+        )
+        funding = {item["symbol"]: float(item.get("lastFundingRate") or 0.0) for item in premium_json or []}
+        tickers = {}
+        for pair in raw_json or []:
+            tickers[pair["symbol"]] = {
+                "price": float(pair["lastPrice"]),
+                "volume": float(pair["volume"]),
+                "funding": funding.get(pair["symbol"], 0.0),
+            }
+        return tickers
+
     def get_funding_rate(self, symbol: str) -> float:
         self.check_weight()
         params = {"symbol": symbol}
@@ -20,6 +20,21 @@ class Bybit(Exchange):
     exchange = "bybit"
     futures_api_url = "https://api.bybit.com"
     max_weight = 1200
+    kline_includes_forming = False  # get_futures_kline drops the candle still in progress
+    kline_max_limit = 1000
+    # 1200 per 20s is 60/s, half of the 600 per 5s public IP limit, in bursts of at most 300
+    weight_window = 20.0
+    weight_burst = 300
+    kline_intervals = {
+        "1m": 1,
+        "5m": 5,
+        "15m": 15,
+        "30m": 30,
+        "1h": 60,
+        "4h": 240,
+        "1d": "D",
+        "1w": "W",
+    }
 
     def get_futures_symbols(self) -> dict:
         self.check_weight()
@@ -94,22 +109,11 @@ class Bybit(Exchange):
         limit: int = 200,
     ) -> list:
         self.check_weight()
-        custom_intervals = {
-            "1m": 1,
-            "5m": 5,
-            "15m": 15,
-            "30m": 30,
-            "1h": 60,
-            "4h": 240,
-            "1d": "D",
-            "1w": "W",
-        }
-
         params = {
             "category": "linear",
             "symbol": symbol,
             "limit": limit + 1,
-            "interval": custom_intervals[interval],
+            "interval": self.kline_intervals[interval],
         }
         header, raw_json = send_public_request(
             url=self.futures_api_url, url_path="/v5/market/kline", payload=params
@@ -133,6 +137,47 @@ class Bybit(Exchange):
                     return reversed_data
         return []
 
+    def kline_request(self, symbol: str, interval: Intervals, limit: int, end: int | None = None) -> tuple:
+        params = {
+            "category": "linear",
+            "symbol": symbol,
+            "limit": limit,
+            "interval": self.kline_intervals[interval],
+        }
+        if end is not None:
+            params["end"] = end
+        return "/v5/market/kline", params
+
+    def parse_klines(self, raw_json) -> list:
+        candles = ((raw_json or {}).get("result") or {}).get("list") or []
+        return [
+            {
+                "timestamp": int(candle[0]),
+                "open": float(candle[1]),
+                "high": float(candle[2]),
+                "low": float(candle[3]),
+                "close": float(candle[4]),
+                "volume": float(candle[5]),
+            }
+            for candle in reversed(candles)  # Bybit lists newest first
+        ]
+
+    def get_futures_tickers(self) -> dict:
+        """Last price, 24h volume and funding rate of every linear symbol in one request."""
+        self.check_weight()
+        params = {"category": "linear"}
+        header, raw_json = send_public_request(
+            url=self.futures_api_url, url_path="/v5/market/tickers", payload=params
+        )
+        tickers = {}
+        for pair in ((raw_json or {}).get("result") or {}).get("list") or []:
+            tickers[pair["symbol"]] = {
+                "price": float(pair["lastPrice"]),
+                "volume": float(pair["volume24h"]),
+                "funding": float(pair.get("fundingRate") or 0.0),
+            }
+        return tickers
+
     def get_funding_rate(self, symbol: str) -> float:
         # Get current timestamp
         current_time = datetime.now()
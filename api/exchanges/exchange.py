@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 from multiprocessing import Lock
 
 from directionalscalper.api.exchanges.utils import Intervals
+from directionalscalper.core.utils import send_public_request
 
 log = logging.getLogger(__name__)
 
@@ -14,6 +16,10 @@ class Exchange:
     futures_api_url: str | None = None
     weight: int = 0
     max_weight: int = 100
+    weight_window: float = 60.0  # max_weight applies per this many seconds
+    weight_burst: int | None = None  # most weight spent at once; max_weight when unset
+    kline_includes_forming: bool = True  # last kline returned is the one still in progress
+    kline_max_limit: int = 500
 
     def __init__(self):
         # If there was any other initialization logic, it would go here.
@@ -32,6 +38,20 @@ class Exchange:
     def update_weight(self, weight: int) -> None:
         self.weight = weight
 
+    async def check_weight_async(self) -> None:
+        if self.weight >= self.max_weight:
+            log.info(
+                f"Weight {self.weight} is greater than {self.max_weight}, sleeping for 60 seconds"
+            )
+            await asyncio.sleep(60)
+
+    def request_weight(self, url_path: str, params: dict) -> int:
+        return 1
+
+    def used_weight(self, headers) -> int | None:
+        """Weight already used in the current window, if the exchange reports it in response headers."""
+        return None
+
 
     # def check_weight(self) -> None:
     #     if self.weight >= self.max_weight:
@@ -63,6 +83,65 @@ class Exchange:
     ) -> list:
         return []
 
+    def kline_request(self, symbol: str, interval: Intervals, limit: int, end: int | None = None) -> tuple:
+        """(url_path, params) of one kline page ending at `end` (ms, inclusive) or now."""
+        raise NotImplementedError
+
+    def parse_klines(self, raw_json) -> list:
+        """Kline page -> candle dicts, oldest first."""
+        return []
+
+    def kline_history_steps(self, symbol: str, interval: Intervals, bars: int):
+        """
+        Paging logic for get_futures_kline_history, shared by the sync and
+        async fetchers: yields (url_path, params), expects each response's
+        JSON to be sent back, and returns the last `bars` candles oldest
+        first (closed candles only where kline_includes_forming is False).
+        """
+        data: list = []
+        end = None
+        while len(data) < bars:
+            drop_forming = end is None and not self.kline_includes_forming
+            limit = min(bars - len(data) + int(drop_forming), self.kline_max_limit)
+            raw_json = yield self.kline_request(symbol, interval, limit, end)
+            page = self.parse_klines(raw_json)
+            if drop_forming:
+                page = page[:-1]
+            if not page:
+                break
+            data = page + data
+            end = page[0]["timestamp"] - 1
+        return data[-bars:]
+
+    def get_futures_kline_history(
+        self,
+        symbol: str,
+        interval: Intervals = Intervals.ONE_MINUTE,
+        bars: int = 500,
+    ) -> list:
+        steps = self.kline_history_steps(symbol, interval, bars)
+        try:
+            url_path, params = next(steps)
+            while True:
+                self.check_weight()
+                header, raw_json = send_public_request(
+                    url=self.futures_api_url, url_path=url_path, payload=params
+                )
+                used = self.used_weight(header)
+                if used is not None:
+                    self.update_weight(used)
+                url_path, params = steps.send(raw_json)
+        except StopIteration as done:
+            return done.value
+
+    def get_futures_tickers(self) -> dict:
+        prices = self.get_futures_prices()
+        volumes = self.get_futures_volumes()
+        return {
+            symbol: {"price": price, "volume": volumes.get(symbol, 0.0), "funding": self.get_funding_rate(symbol)}
+            for symbol, price in prices.items()
+        }
+
     def get_funding_rate(self, symbol) -> float:
         return 0.0
 
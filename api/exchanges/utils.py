@@ -4,6 +4,8 @@ from enum import Enum
 
 import requests  # type: ignore
 
+from directionalscalper.core.http_client import get_http_client
+
 log = logging.getLogger(__name__)
 
 
@@ -25,7 +27,7 @@ class Intervals(str, Enum):
 def get_api_data(url: str, endpoint: str):
     response_json = {}
     try:
-        response = requests.get(f"{url}{endpoint}")
+        response = get_http_client().get(f"{url}{endpoint}")
         response.raise_for_status()  # Raise an exception if an HTTP error occurs
         response_json = response.json()
     except (requests.exceptions.HTTPError, json.JSONDecodeError) as e:
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+
+import aiohttp
+
+from rate_limit import TokenBucket
+
+log = logging.getLogger(__name__)
+
+RETRY_STATUS = {403, 418, 429, 500, 502, 503, 504}
+# Bybit answers a breach of its IP limit with 403 rather than 429
+RATE_LIMIT_STATUS = {403, 418, 429}
+
+
+class AsyncKlineFetcher:
+    """
+    Kline histories for many symbols fetched concurrently on one event loop
+    over one keep-alive connection pool.
+
+    At most `concurrency` requests are in flight. Each request first takes
+    its weight (`exchange.request_weight`) from a bucket holding
+    `exchange.max_weight` per `exchange.weight_window` (at most
+    `exchange.weight_burst` at once), and goes through
+    `exchange.check_weight_async`, which the used-weight response headers
+    keep up to date. Paging is the exchange's own `kline_history_steps`, so
+    results are identical to `get_futures_kline_history`.
+    """
+
+    def __init__(self, exchange, concurrency: int = 32, timeout: float = 10.0, max_retries: int = 3):
+        self.exchange = exchange
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(
+            exchange.max_weight / exchange.weight_window,
+            capacity=exchange.weight_burst or exchange.max_weight,
+            name=f"{exchange.exchange}-weight",
+        )
+        self.requests = 0
+        self.failures = 0
+        self.semaphore = None
+
+    async def fetch_json(self, session: aiohttp.ClientSession, url_path: str, params: dict):
+        url = f"{self.exchange.futures_api_url}{url_path}"
+        query = {key: str(value) for key, value in params.items()}
+        weight = self.exchange.request_weight(url_path, params)
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(random.uniform(0, min(5.0, 0.25 * 2 ** attempt)))
+            await self.exchange.check_weight_async()
+            await self.bucket.acquire_async(weight)
+            async with self.semaphore:
+                try:
+                    async with session.get(url, params=query) as response:
+                        self.requests += 1
+                        used = self.exchange.used_weight(response.headers)
+                        if used is not None:
+                            self.exchange.update_weight(used)
+                        if response.status in RETRY_STATUS:
+                            retry_after = response.headers.get("Retry-After", "")
+                            if response.status in RATE_LIMIT_STATUS:
+                                self.bucket.penalize(float(retry_after) if retry_after.isdigit() else 1.0)
+                            error = f"HTTP {response.status}"
+                            continue
+                        return await response.json(content_type=None)
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    error = e
+        self.failures += 1
+        log.warning(f"Giving up on {url} {params} after {self.max_retries + 1} attempts: {error}")
+        return None
+
+    async def history(self, session: aiohttp.ClientSession, symbol: str, interval: str, bars: int):
+        steps = self.exchange.kline_history_steps(symbol, interval, bars)
+        try:
+            url_path, params = next(steps)
+            while True:
+                raw_json = await self.fetch_json(session, url_path, params)
+                if raw_json is None:
+                    return None
+                url_path, params = steps.send(raw_json)
+        except StopIteration as done:
+            return done.value
+
+    async def fetch_histories(self, symbols: list, interval: str, bars: int) -> dict:
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            results = await asyncio.gather(
+                *(self.history(session, symbol, interval, bars) for symbol in symbols),
+                return_exceptions=True,
+            )
+        histories = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                log.warning(f"Kline history for {symbol} failed: {result}")
+            elif result:
+                histories[symbol] = result
+        return histories
+
+    def run(self, symbols: list, interval: str = "1m", bars: int = 1000) -> dict:
+        """{symbol: candles oldest first} for every symbol that could be fetched."""
+        started = time.time()
+        histories = asyncio.run(self.fetch_histories(list(symbols), interval, bars))
+        log.info(
+            f"Fetched {len(histories)}/{len(symbols)} {interval} histories in {time.time() - started:.2f}s "
+            f"({self.requests} requests, {self.failures} failed, weight wait {self.bucket.stats()['avg_wait']:.3f}s avg)"
+        )
+        return histories
@@ -4,6 +4,7 @@ from threading import Thread, Lock
 import fnmatch
 import time
 import json
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 import pandas as pd
@@ -11,7 +12,10 @@ import pandas as pd
 import requests  # type: ignore
 
 from directionalscalper.core.utils import send_public_request
+from directionalscalper.core.http_client import get_http_client
+from api.columnar import ColumnarReader
 from directionalscalper.core.strategies.logger import Logger
+from directionalscalper.core.tracing import traced
 
 logging = Logger(logger_name="Manager", filename="Manager.log", stream=True) 
 
@@ -24,6 +28,85 @@ class InvalidAPI(Exception):
         self.message = message
         super().__init__(self.message)
 
+# get_api_data key -> quantdatav2 field(s), first present one wins
+API_FIELDS = {
+    '1mVol': ("1m 1x Volume (USDT)",),
+    '5mVol': ("5m 1x Volume (USDT)",),
+    '1hVol': ("1h 1x Volume (USDT)",),
+    '1mSpread': ("1m Spread",),
+    '5mSpread': ("5m Spread",),
+    '30mSpread': ("30m Spread",),
+    '1hSpread': ("1h Spread",),
+    '4hSpread': ("4h Spread",),
+    'MA Trend': ("MA Trend",),
+    'HMA Trend': ("HMA Trend",),
+    'MFI': ("MFI",),
+    'ERI Trend': ("ERI Trend",),
+    'Top Signal 5m': ("Top Signal 5m",),
+    'Bottom Signal 5m': ("Bottom Signal 5m", "Bottom signal 5m"),
+    'Top Signal 1m': ("Top Signal 1m",),
+    'Bottom Signal 1m': ("Bottom Signal 1m", "Bottom signal 1m"),
+    'EMA Trend': ("EMA Trend",),
+}
+
+
+@dataclass(frozen=True)
+class AssetRecord:
+    """Every get_api_data metric of one symbol, parsed once per snapshot."""
+    values: tuple  # aligned with API_FIELDS
+    funding: float | None = None
+
+    @classmethod
+    def from_documents(cls, asset: dict | None, funding_asset: dict | None):
+        values = tuple(
+            next((asset[field] for field in fields if field in asset), None) if asset else None
+            for fields in API_FIELDS.values()
+        )
+        funding = funding_asset.get("Funding", 0) if funding_asset is not None else None
+        return cls(values, funding)
+
+    def to_api_data(self, symbols: list) -> dict:
+        api_data = dict(zip(API_FIELDS, self.values))
+        api_data['Funding'] = self.funding
+        api_data['Symbols'] = symbols
+        return api_data
+
+
+EMPTY_RECORD = AssetRecord(tuple(None for _ in API_FIELDS))
+
+
+@dataclass(frozen=True)
+class ApiSnapshot:
+    """One parse of the quantdatav2 + funding documents, indexed by symbol. Replaced whole, never mutated."""
+    assets: list
+    funding: list
+    records: dict
+    symbols: list
+    expires_at: float
+
+    @classmethod
+    def build(cls, assets, funding, expires_at: float):
+        assets = assets if isinstance(assets, list) else []
+        funding = funding if isinstance(funding, list) else []
+        by_symbol = {a.get("Asset"): a for a in assets if isinstance(a, dict)}
+        funding_by_symbol = {}
+        for f in funding:
+            if isinstance(f, dict):
+                funding_by_symbol.setdefault(f.get("Asset"), f)
+        records = {
+            symbol: AssetRecord.from_documents(by_symbol.get(symbol), funding_by_symbol.get(symbol))
+            for symbol in by_symbol.keys() | funding_by_symbol.keys()
+        }
+        symbols = [a.get("Asset", "") for a in assets if isinstance(a, dict) and "Asset" in a]
+        return cls(assets, funding, records, symbols, expires_at)
+
+    def renewed(self, expires_at: float):
+        return ApiSnapshot(self.assets, self.funding, self.records, self.symbols, expires_at)
+
+
+NOT_MODIFIED = object()
+
+
 class Manager:
     def __init__(
         self,
@@ -67,6 +150,14 @@ class Manager:
         self.api_data_cache = None
         self.api_data_cache_expiry = datetime.now() - timedelta(seconds=self.cache_life_seconds)
 
+        # Indexed quantdatav2 + funding snapshot served by get_api_data
+        self.api_snapshot = None
+        self.api_snapshot_lock = Lock()
+        self.document_validators = {}  # url -> (ETag, Last-Modified)
+
+        # Memory-mapped scraper snapshot when the local path is a .dscol file
+        self.columnar = None
+
         # Attributes for 'everything' data cache
         self.everything_cache = None
         self.everything_cache_expiry = datetime.now() - timedelta(seconds=1)  # Initialize to an old timestamp to force first fetch
@@ -88,6 +179,8 @@ class Manager:
             if len(str(self.path)) < 6:
                 self.path = Path("volumedata", f"quantdatav2_{self.exchange_name.replace('_', '')}.json")
             logging.info(f"Local API directory: {self.path}")
+            if self.path.suffix == ".dscol":
+                self.columnar = ColumnarReader(self.path)
             self.data = self.get_local_data()
 
         else:
@@ -279,6 +372,8 @@ class Manager:
             return self.get_local_data()
 
     def get_local_data(self):
+        if self.columnar is not None:
+            return self.get_columnar_data()
         if not self.check_timestamp():
             return self.data
         if not self.path.is_file():
@@ -293,6 +388,15 @@ class Manager:
         self.update_last_checked()
         return self.data
 
+    def get_columnar_data(self):
+        # Checking for a new snapshot only reads the file header, so it is done on every call
+        if self.columnar.refresh():
+            self.data = self.columnar.records()
+        elif self.columnar.sequence is None:
+            raise InvalidAPI(message=f"{self.path} is not a columnar snapshot")
+        self.update_last_checked()
+        return self.data
+
     def is_cache_expired(self):
         """Checks if the cache has expired based on cache_life_seconds."""
         return datetime.now() > self.rotator_symbols_cache_expiry
@@ -640,39 +744,88 @@ class Manager:
     def is_api_data_cache_expired(self):
         return datetime.now() > self.api_data_cache_expiry
 
+    def fetch_document(self, url):
+        """
+        Conditional GET for one API document. Returns the parsed JSON,
+        NOT_MODIFIED when the server answered 304, or None on failure.
+        """
+        etag, last_modified = self.document_validators.get(url, (None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            response = get_http_client().get(url, headers=headers)
+            if response.status_code == 304:
+                return NOT_MODIFIED
+            if response.status_code != 200:
+                logging.error(f"Request to {url} failed with status {response.status_code}")
+                return None
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Request failed: {e}")
+            return None
+        except ValueError as e:
+            logging.error(f"Failed to parse JSON: {e}")
+            return None
+        self.document_validators[url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return data
+
+    def refresh_api_snapshot(self, snapshot):
+        if self.columnar is not None:
+            return self.refresh_columnar_snapshot(snapshot)
+        source = self.data_source_exchange.replace('_', '')
+        assets = self.fetch_document(f"https://api.quantumvoid.org/volumedata/quantdatav2_{source}.json")
+        funding = self.fetch_document(f"https://api.quantumvoid.org/volumedata/funding_{source}.json")
+        expires_at = time.monotonic() + self.cache_life_seconds
+
+        if assets is None or funding is None:
+            # Keep serving the last good snapshot and try again shortly
+            expires_at = time.monotonic() + min(self.cache_life_seconds, 10)
+            if snapshot is not None:
+                return snapshot.renewed(expires_at)
+        if snapshot is not None and assets is NOT_MODIFIED and funding is NOT_MODIFIED:
+            return snapshot.renewed(expires_at)
+
+        previous_assets = snapshot.assets if snapshot is not None else []
+        previous_funding = snapshot.funding if snapshot is not None else []
+        return ApiSnapshot.build(
+            previous_assets if assets in (None, NOT_MODIFIED) else assets,
+            previous_funding if funding in (None, NOT_MODIFIED) else funding,
+            expires_at
+        )
+
+    def refresh_columnar_snapshot(self, snapshot):
+        # The scraper rows carry their own Funding column, so they are both documents
+        expires_at = time.monotonic() + self.cache_life_seconds
+        if not self.columnar.refresh() and snapshot is not None:
+            return snapshot.renewed(expires_at)
+        records = self.columnar.records() if self.columnar.sequence is not None else []
+        return ApiSnapshot.build(records, records, expires_at)
+
+    def get_api_snapshot(self) -> ApiSnapshot:
+        """
+        Current snapshot. Readers never take a lock while it is fresh; once it
+        expires one thread refreshes it and the others keep reading the old one.
+        """
+        snapshot = self.api_snapshot
+        if snapshot is not None and time.monotonic() < snapshot.expires_at:
+            return snapshot
+        if not self.api_snapshot_lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            snapshot = self.api_snapshot
+            if snapshot is None or time.monotonic() >= snapshot.expires_at:
+                snapshot = self.api_snapshot = self.refresh_api_snapshot(snapshot)
+        finally:
+            self.api_snapshot_lock.release()
+        return snapshot
+
+    @traced()
     def get_api_data(self, symbol):
-        api_data_url = f"https://api.quantumvoid.org/volumedata/quantdatav2_{self.data_source_exchange.replace('_', '')}.json"
-        data = self.fetch_data_from_url(api_data_url)
-        symbols = [asset.get("Asset", "") for asset in data if "Asset" in asset]
-
-        # Fetch funding rate data from the new URL
-        funding_data_url = f"https://api.quantumvoid.org/volumedata/funding_{self.data_source_exchange.replace('_', '')}.json"
-        funding_data = self.fetch_data_from_url(funding_data_url)
-
-        #logging.info(f"Funding data: {funding_data}")
-
-        api_data = {
-            '1mVol': self.get_asset_value(symbol, data, "1mVol"),
-            '5mVol': self.get_asset_value(symbol, data, "5mVol"),
-            '1hVol': self.get_asset_value(symbol, data, "1hVol"),
-            '1mSpread': self.get_asset_value(symbol, data, "1mSpread"),
-            '5mSpread': self.get_asset_value(symbol, data, "5mSpread"),
-            '30mSpread': self.get_asset_value(symbol, data, "30mSpread"),
-            '1hSpread': self.get_asset_value(symbol, data, "1hSpread"),
-            '4hSpread': self.get_asset_value(symbol, data, "4hSpread"),
-            'MA Trend': self.get_asset_value(symbol, data, "MA Trend"),
-            'HMA Trend': self.get_asset_value(symbol, data, "HMA Trend"),
-            'MFI': self.get_asset_value(symbol, data, "MFI"),
-            'ERI Trend': self.get_asset_value(symbol, data, "ERI Trend"),
-            'Funding': self.get_asset_value(symbol, funding_data, "Funding"),  # Use funding_data instead of data
-            'Symbols': symbols,
-            'Top Signal 5m': self.get_asset_value(symbol, data, "Top Signal 5m"),
-            'Bottom Signal 5m': self.get_asset_value(symbol, data, "Bottom Signal 5m"),
-            'Top Signal 1m': self.get_asset_value(symbol, data, "Top Signal 1m"),
-            'Bottom Signal 1m': self.get_asset_value(symbol, data, "Bottom Signal 1m"),
-            'EMA Trend': self.get_asset_value(symbol, data, "EMA Trend")
-        }
-        return api_data
+        snapshot = self.get_api_snapshot()
+        return snapshot.records.get(symbol, EMPTY_RECORD).to_api_data(snapshot.symbols)
 
     def extract_metrics(self, api_data, symbol):
         try:
@@ -19,13 +19,21 @@ from datetime import datetime
 sys.path.append(".")
 from directionalscalper.api.exchanges.binance import Binance
 from directionalscalper.api.exchanges.bybit import Bybit
+from directionalscalper.api.kline_fetcher import AsyncKlineFetcher
+from directionalscalper.api.columnar import write_columnar
 from directionalscalper.core.utils import send_public_request
 from directionalscalper.core.logger import Logger
 log = Logger(filename="combined_scraper.log", stream=True)
 
 funding_cache = {}  # We will handle cache differently in multiprocessing if needed
 
+KLINE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+TIMEFRAME_MINUTES = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "1h": 60, "4h": 240}
+
 class CombinedScraper:
+    # 1m bars fetched per symbol: enough for 128 x 15m bars (ERI) plus a partial bucket at each end
+    HISTORY_BARS_1M = 128 * 15 + 30
+
     def __init__(self, exchange_name, filters: dict):
         self.funding_cache = {}  # Local cache for each process
         self.exchange_name = exchange_name
@@ -40,22 +48,35 @@ class CombinedScraper:
         
         log.info("Scraper initializing for " + exchange_name)
         self.filters = filters
-        self.symbols = self.exchange.get_futures_symbols()
-        self.prices = self.exchange.get_futures_prices()
+        # Instruments and tickers are fetched in bulk once per run, not per symbol
+        self.symbols_info = self.exchange.get_futures_symbols()
+        self.symbols = self.symbols_info
+        self.tickers = self.exchange.get_futures_tickers()
+        self.prices = {symbol: ticker["price"] for symbol, ticker in self.tickers.items()}
+        self.volumes = {symbol: ticker["volume"] for symbol, ticker in self.tickers.items()}
+        self.funding_rates = {symbol: ticker["funding"] for symbol, ticker in self.tickers.items()}
+        self.historical_volume = {}
         log.info(f"{len(self.symbols)} symbols found for " + exchange_name)
         
         if "quote_symbols" in self.filters:
             self.symbols = self.filter_quote(symbols=self.symbols, quotes=self.filters["quote_symbols"])
         
         if "top_volume" in self.filters:
-            self.volumes = self.exchange.get_futures_volumes()
             self.symbols = self.filter_volume(symbols=self.symbols, volumes=self.volumes, limit=self.filters["top_volume"])
 
     def get_all_historical_volume(self, exchange_name: str, interval: str, limit: int) -> dict:
         all_volume = {}
 
+        # Hourly volumes already derived from the 1m history in analyse_symbol
+        if interval == "1h":
+            for symbol in self.symbols:
+                if symbol in self.historical_volume and len(self.historical_volume[symbol]) >= limit:
+                    all_volume[symbol] = (symbol, self.historical_volume[symbol][-limit:])
+
         if exchange_name == "bybit":
             for symbol in self.symbols:
+                if symbol in all_volume:
+                    continue
                 try:
                     volume = self.get_historical_volume_bybit(symbol, interval, limit)
                     all_volume[symbol] = volume
@@ -63,6 +84,8 @@ class CombinedScraper:
                     log.error(f"Error getting historical volume for {symbol} on Bybit: {e}")
         elif exchange_name == "binance":
             for symbol in self.symbols:
+                if symbol in all_volume:
+                    continue
                 try:
                     volume = self.get_historical_volume_binance(symbol, interval, limit)
                     all_volume[symbol] = volume
@@ -95,6 +118,10 @@ class CombinedScraper:
         return symbol, volumes
 
     def get_cached_funding(self, symbol):
+        # Funding rates of every symbol come with the bulk tickers
+        if symbol in self.funding_rates:
+            return self.funding_rates[symbol] * 100
+
         now = datetime.now()
 
         # Check if data is in cache and still valid
@@ -121,6 +148,8 @@ class CombinedScraper:
             dataframe.to_parquet(path)
         elif to == "dict":
             dataframe.to_dict(path, orient="records")
+        elif to == "columnar":
+            write_columnar(dataframe, path)
         else:
             log.error(f"Output to {to} not implemented")
 
@@ -194,10 +223,50 @@ class CombinedScraper:
 
         return df
 
-    def get_candle_data(self, symbol: str, interval: str, limit: int):
-        bars = self.exchange.get_futures_kline(
-            symbol=symbol, interval=interval, limit=limit
-        )
+    def get_kline_history(self, symbol: str, bars: list | None = None) -> pd.DataFrame:
+        """The 1m history every metric of analyse_symbol is derived from (one fetch per symbol)."""
+        if bars is None:
+            bars = self.exchange.get_futures_kline_history(symbol=symbol, interval="1m", bars=self.HISTORY_BARS_1M)
+        df = pd.DataFrame(bars, columns=KLINE_COLUMNS)
+        df[KLINE_COLUMNS[1:]] = df[KLINE_COLUMNS[1:]].apply(pd.to_numeric)
+        return df
+
+    def resample_klines(self, df_1m: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+        """
+        Aggregate 1m klines into `timeframe` buckets aligned to the epoch like
+        the exchange's own candles. A partial bucket at the start is dropped;
+        one at the end is kept only if this exchange's klines include the
+        candle still forming.
+        """
+        minutes = TIMEFRAME_MINUTES[timeframe]
+        if minutes == 1 or df_1m.empty:
+            return df_1m
+        step = minutes * 60_000
+        bucket = df_1m["timestamp"].values // step * step
+        grouped = df_1m.groupby(bucket, sort=True)
+        df = pd.DataFrame({
+            "timestamp": grouped["timestamp"].first().index.values,
+            "open": grouped["open"].first().values,
+            "high": grouped["high"].max().values,
+            "low": grouped["low"].min().values,
+            "close": grouped["close"].last().values,
+            "volume": grouped["volume"].sum().values,
+        })
+        keep = df["timestamp"].values >= df_1m["timestamp"].iat[0]
+        if not self.exchange.kline_includes_forming:
+            keep &= df["timestamp"].values + step <= df_1m["timestamp"].iat[-1] + 60_000
+        return df[keep].reset_index(drop=True)
+
+    @staticmethod
+    def last_bars(df: pd.DataFrame, limit: int) -> pd.DataFrame:
+        return df.tail(limit).reset_index(drop=True)
+
+    def get_candle_data(self, symbol: str, interval: str, limit: int, data: pd.DataFrame | None = None):
+        bars = data
+        if bars is None:
+            bars = self.exchange.get_futures_kline(
+                symbol=symbol, interval=interval, limit=limit
+            )
         df = pd.DataFrame(
             bars, columns=["timestamp", "open", "high", "low", "close", "volume"]
         )
@@ -214,10 +283,12 @@ class CombinedScraper:
             "low_6": df["MA_6_Low"].iat[-1],
         }
 
-    def get_hma(self, symbol: str, interval: str, limit: int, column: str, window: int):
-        bars = self.exchange.get_futures_kline(
-            symbol=symbol, interval=interval, limit=limit
-        )
+    def get_hma(self, symbol: str, interval: str, limit: int, column: str, window: int, data: pd.DataFrame | None = None):
+        bars = data
+        if bars is None:
+            bars = self.exchange.get_futures_kline(
+                symbol=symbol, interval=interval, limit=limit
+            )
         df = pd.DataFrame(
             bars, columns=["timestamp", "open", "high", "low", "close", "volume"]
         )
@@ -255,18 +326,20 @@ class CombinedScraper:
             self.symbols["price_scale"],
         )
 
-    def get_sma(self, symbol: str, interval: str, limit: int, column: str, window: int):
-        bars = self.exchange.get_futures_kline(
-            symbol=symbol, interval=interval, limit=limit
-        )
+    def get_sma(self, symbol: str, interval: str, limit: int, column: str, window: int, data: pd.DataFrame | None = None):
+        bars = data
+        if bars is None:
+            bars = self.exchange.get_futures_kline(
+                symbol=symbol, interval=interval, limit=limit
+            )
         df = pd.DataFrame(
             bars, columns=["timestamp", "open", "high", "low", "close", "volume"]
         )
         sma = ta.trend.SMAIndicator(df[column], window=window).sma_indicator()
 
-        current_sma = float(sma[limit - 1])
+        current_sma = float(sma.iat[-1])
 
-        last_close_price = bars[limit - 1]["close"]
+        last_close_price = df["close"].iat[-1]
 
         return round((last_close_price - current_sma) / last_close_price * 100, 4)
 
@@ -286,7 +359,7 @@ class CombinedScraper:
         tr = data[["high-low", "high-pc", "low-pc"]].max(axis=1)
         return tr
 
-    def calculate_advanced_eri(self, symbol, timeframe, len_slow_ma=64, len_power_ema=13, limit=128):
+    def calculate_advanced_eri(self, symbol, timeframe, len_slow_ma=64, len_power_ema=13, limit=128, data=None):
         """
         Calculate an Elder-ray Index (ERI) similar to RustyC's approach, using VWMA followed by EMA.
 
@@ -295,10 +368,12 @@ class CombinedScraper:
         :param len_slow_ma: Length for slow moving average (VWMA followed by EMA).
         :param len_power_ema: Length for EMA of bull and bear power.
         :param limit: Number of candlesticks to fetch.
+        :param data: Already fetched candlesticks; skips the fetch.
         :return: A dictionary containing ERI trend, bull power, and bear power.
         """
         # Fetching data
-        data = self.exchange.get_futures_kline(symbol=symbol, interval=timeframe, limit=limit)
+        if data is None:
+            data = self.exchange.get_futures_kline(symbol=symbol, interval=timeframe, limit=limit)
 
         # Create a DataFrame from the data
         df = pd.DataFrame(data, columns=["timestamp", "open", "high", "low", "close", "volume"])
@@ -445,8 +520,10 @@ class CombinedScraper:
         return eri_trend, bull_power_smoothed.values[-1], bear_power_smoothed.values[-1]
 
     # Get MFIRSI
-    def get_mfi(self, symbol: str, interval: str, limit: int, lookback: int = 30) -> str:
-        bars = self.exchange.get_futures_kline(symbol=symbol, interval=interval, limit=limit)
+    def get_mfi(self, symbol: str, interval: str, limit: int, lookback: int = 30, data: pd.DataFrame | None = None) -> str:
+        bars = data
+        if bars is None:
+            bars = self.exchange.get_futures_kline(symbol=symbol, interval=interval, limit=limit)
         df = pd.DataFrame(bars, columns=["timestamp", "open", "high", "low", "close", "volume"])
 
         # Calculate MFI, RSI, MA and whether open < close
@@ -529,9 +606,11 @@ class CombinedScraper:
         # Return the latest signals
         return df_1m['top_signal'].iloc[-1], df_1m['bottom_signal'].iloc[-1]
     
-    def detect_top_bottom_signals_5m(self, symbol: str):
+    def detect_top_bottom_signals_5m(self, symbol: str, data: pd.DataFrame | None = None):
         # Fetching 1-minute kline data
-        data_1m = self.exchange.get_futures_kline(symbol=symbol, interval="5m", limit=240)
+        data_1m = data
+        if data_1m is None:
+            data_1m = self.exchange.get_futures_kline(symbol=symbol, interval="5m", limit=240)
         df_1m = pd.DataFrame(data_1m, columns=["timestamp", "open", "high", "low", "close", "volume"])
         df_1m[['open', 'high', 'low', 'close', 'volume']] = df_1m[['open', 'high', 'low', 'close', 'volume']].apply(pd.to_numeric)
 
@@ -555,9 +634,11 @@ class CombinedScraper:
         # Return the latest signals
         return df_1m['top_signal'].iloc[-1], df_1m['bottom_signal'].iloc[-1]
 
-    def detect_top_bottom_signals_1m(self, symbol: str):
+    def detect_top_bottom_signals_1m(self, symbol: str, data: pd.DataFrame | None = None):
         # Fetching 1-minute kline data for the last 240 minutes
-        data_1m = self.exchange.get_futures_kline(symbol=symbol, interval="1m", limit=240)
+        data_1m = data
+        if data_1m is None:
+            data_1m = self.exchange.get_futures_kline(symbol=symbol, interval="1m", limit=240)
         df_1m = pd.DataFrame(data_1m, columns=["timestamp", "open", "high", "low", "close", "volume"])
         df_1m[['open', 'high', 'low', 'close', 'volume']] = df_1m[['open', 'high', 'low', 'close', 'volume']].apply(pd.to_numeric)
 
@@ -620,36 +701,28 @@ class CombinedScraper:
         return df
 
 
-    def analyse_symbol(self, symbol: str) -> dict:
+    def analyse_symbol(self, symbol: str, history: list | None = None) -> dict:
 
         len_slow_ma = 64
         len_power_ema = 13
         log.info(f"Analysing: {symbol}")
         values = {"Asset": symbol}
 
-        values["Min qty"] = self.exchange.get_symbol_info(
-            symbol=symbol, info="min_order_qty"
-        )
+        values["Min qty"] = self.symbols_info[symbol]["min_order_qty"]
 
         values["Price"] = self.prices[symbol]
 
-        candles_1h = self.exchange.get_futures_kline(
-            symbol=symbol, interval="1h", limit=5
-        )
+        # One 1m history per symbol; every higher timeframe is resampled from it
+        df_1m = self.get_kline_history(symbol, history)
+        frames = {timeframe: self.resample_klines(df_1m, timeframe) for timeframe in ("5m", "15m", "30m", "1h")}
+        frames["1m"] = df_1m
 
-        candles_30m = self.exchange.get_futures_kline(
-            symbol=symbol, interval="30m", limit=5
-        )
-        candles_5m = self.exchange.get_futures_kline(
-            symbol=symbol, interval="5m", limit=5
-        )
-        candles_1m = self.exchange.get_futures_kline(
-            symbol=symbol, interval="1m", limit=5
-        )
+        candles_1h = frames["1h"]["volume"].values[-5:]
+        candles_30m = frames["30m"]["volume"].values[-5:]
+        candles_5m = frames["5m"]["volume"].values[-5:]
+        candles_1m = df_1m["volume"].values[-5:]
 
-        data = self.exchange.get_futures_kline(symbol=symbol, interval="1m", limit=240)
-        df = pd.DataFrame(data, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].apply(pd.to_numeric)
+        data = self.last_bars(df_1m, 240)
 
         values["1m Spread"] = self.get_spread(symbol=symbol, limit=1, data=data[-1:])
         values["5m Spread"] = self.get_spread(symbol=symbol, limit=5, data=data[-5:])
@@ -658,34 +731,33 @@ class CombinedScraper:
         values["4h Spread"] = self.get_spread(symbol=symbol, limit=240, data=data)
 
         # Define 1x 5m candle volume
-        onexcandlevol = candles_5m[-1]["volume"]
+        onexcandlevol = candles_5m[-1]
         volume_1x_5m = values["Price"] * onexcandlevol
         values["5m 1x Volume (USDT)"] = round(volume_1x_5m)
 
         # Define 1x 1m candle volume
-        onex1mcandlevol = candles_1m[-1]["volume"]
+        onex1mcandlevol = candles_1m[-1]
         volume_1x = values["Price"] * onex1mcandlevol
         values["1m 1x Volume (USDT)"] = round(volume_1x)
 
         # Define 1x 30m candle volume
-        onex30mcandlevol = candles_30m[-1]["volume"]
+        onex30mcandlevol = candles_30m[-1]
         volume_1x_30m = values["Price"] * onex30mcandlevol
         values["30m 1x Volume (USDT)"] = round(volume_1x_30m)
 
-        onex1hcandlevol = candles_1h[-1]["volume"]
+        onex1hcandlevol = candles_1h[-1]
         volume_1x_1h = values["Price"] * onex1hcandlevol
         values["1h 1x Volume (USDT)"] = round(volume_1x_1h)
 
         # Define MA data
-        values["5m MA6 high"] = self.get_candle_data(
-            symbol=symbol, interval="5m", limit=20
-        )["high_6"]
-        values["5m MA6 low"] = self.get_candle_data(
-            symbol=symbol, interval="5m", limit=20
-        )["low_6"]
+        candle_data_5m = self.get_candle_data(
+            symbol=symbol, interval="5m", limit=20, data=self.last_bars(frames["5m"], 20)
+        )
+        values["5m MA6 high"] = candle_data_5m["high_6"]
+        values["5m MA6 low"] = candle_data_5m["low_6"]
 
         ma_order_pct = self.get_sma(
-            symbol=symbol, interval="1m", limit=30, column="close", window=14
+            symbol=symbol, interval="1m", limit=30, column="close", window=14, data=self.last_bars(df_1m, 30)
         )
         values["trend%"] = ma_order_pct
 
@@ -708,7 +780,7 @@ class CombinedScraper:
         # Most recent: 
         #mfi = self.get_mfi(symbol=symbol, interval="5m", limit=200, lookback=100)
 
-        mfi = self.get_mfi(symbol=symbol, interval="1m", limit=200, lookback=30)
+        mfi = self.get_mfi(symbol=symbol, interval="1m", limit=200, lookback=30, data=self.last_bars(df_1m, 200))
 
 
         # mfi = self.get_mfi(symbol=symbol, interval="1m", limit=200, lookback=100)
@@ -722,14 +794,14 @@ class CombinedScraper:
         eri_timeframe = "15m"  # 60 minutes for 1 hour
 
         # Calculating ERI
-        eri_result = self.calculate_advanced_eri(symbol, eri_timeframe)
+        eri_result = self.calculate_advanced_eri(symbol, eri_timeframe, data=self.last_bars(frames[eri_timeframe], 128))
         # eri_result = self.calculate_original_eri(symbol, eri_timeframe)
 
         # Adding ERI values to the dictionary
         values.update(eri_result)
 
         # Calculate HMA trend
-        hma_order_pct = self.get_hma(symbol=symbol, interval="1m", limit=30, column="close", window=14)
+        hma_order_pct = self.get_hma(symbol=symbol, interval="1m", limit=30, column="close", window=14, data=self.last_bars(df_1m, 30))
         values["hma_trend%"] = hma_order_pct
 
         #print(f"HMA ORDER PCT {hma_order_pct}")
@@ -747,21 +819,24 @@ class CombinedScraper:
         # values["Top Signal 1m"] = top_signal_1m
         # values["Bottom Signal 1m"] = bottom_signal_1m
 
-        top_signal_5m, bottom_signal_5m = self.detect_top_bottom_signals_5m(symbol)
+        top_signal_5m, bottom_signal_5m = self.detect_top_bottom_signals_5m(symbol, data=self.last_bars(frames["5m"], 240))
 
         values["Top Signal 5m"] = top_signal_5m
         values["Bottom Signal 5m"] = bottom_signal_5m
 
-        top_signal_1m, bottom_signal_1m = self.detect_top_bottom_signals_1m(symbol)
+        top_signal_1m, bottom_signal_1m = self.detect_top_bottom_signals_1m(symbol, data=self.last_bars(df_1m, 240))
 
         values["Top Signal 1m"] = top_signal_1m
         values["Bottom Signal 1m"] = bottom_signal_1m
 
-        significant_levels = self.lin_peaks_troughs_highlow_algo(symbol, '4h')
+        # Levels from the hourly bars of the same history (was a separate 4h fetch)
+        significant_levels = self.lin_peaks_troughs_highlow_algo(symbol, '1h', data=frames["1h"])
 
         #print(f"Significant levels for {symbol} : {significant_levels}")
         log.info(f"Significant levels for {symbol} : {significant_levels}")
 
+        # Reused by get_all_historical_volume instead of another 1h fetch per symbol
+        values["1h Volumes"] = frames["1h"]["volume"].tolist()
 
         return values
 
@@ -789,11 +864,12 @@ class CombinedScraper:
         # values["ERI Bear Power"] = bear_power_smoothed.values[-1]
         # values["ERI Trend"] = eri_trend
 
-    def retry_analyse_symbol(self, symbol: str, retry_limit: int):
+    def retry_analyse_symbol(self, symbol: str, retry_limit: int, history: list | None = None):
         retry_count = 0
         while retry_count < retry_limit:
             try:
-                return self.analyse_symbol(symbol)
+                # Retries refetch in case the prefetched history was the problem
+                return self.analyse_symbol(symbol, history if retry_count == 0 else None)
             except Exception as e:
                 retry_count += 1
                 log.error(f"Exception while analysing {symbol}. Retry attempt {retry_count}. Exception: {e}")
@@ -823,8 +899,11 @@ class CombinedScraper:
         line_price = (slope * index) + intercept
         return abs(line_price - price)
 
-    def lin_peaks_troughs_highlow_algo(self, symbol, interval, threshold_percentage=0.05):
-        data = self.exchange.get_futures_kline(symbol, interval)
+    def lin_peaks_troughs_highlow_algo(self, symbol, interval, threshold_percentage=0.05, data=None):
+        if data is None:
+            data = self.exchange.get_futures_kline(symbol, interval)
+        if isinstance(data, pd.DataFrame):
+            data = data.to_dict("records")
         close_prices = [candle['close'] for candle in data]
 
         peaks, troughs = self.detect_peaks_and_troughs(close_prices)
@@ -851,14 +930,26 @@ class CombinedScraper:
         # This wrapper will be used to pass multiple arguments to the function used with Pool
         return self.retry_analyse_symbol(*args)
 
-    def analyse_all_symbols(self, retry_limit: int = 5):
-        # Create a pool of 14 worker processes
-        with Pool(processes=14) as pool:
-            # Map the analyse_symbol_wrapper function to all symbols with the retry_limit
-            data = pool.map(self.analyse_symbol_wrapper, [(symbol, retry_limit) for symbol in self.symbols])
+    def analyse_all_symbols(self, retry_limit: int = 5, concurrency: int = 32, cpu_workers: int | None = None):
+        # Network stage: every 1m history concurrently on one event loop
+        started = time.time()
+        fetcher = AsyncKlineFetcher(self.exchange, concurrency=concurrency)
+        histories = fetcher.run(list(self.symbols), "1m", self.HISTORY_BARS_1M)
+        fetched = time.time()
+
+        # CPU stage: indicator math only; symbols whose fetch failed fetch again inside retry_analyse_symbol
+        tasks = [(symbol, retry_limit, histories.get(symbol)) for symbol in self.symbols]
+        workers = cpu_workers or min(4, os.cpu_count() or 1)
+        if workers > 1:
+            with Pool(processes=workers) as pool:
+                data = pool.map(self.analyse_symbol_wrapper, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+        else:
+            data = [self.analyse_symbol_wrapper(task) for task in tasks]
+        analysed = time.time()
 
         # Filter out None results if any failed analyses returned None
         data = [result for result in data if result is not None]
+        self.historical_volume = {result["Asset"]: result.pop("1h Volumes", []) for result in data}
 
         # Create the DataFrame with the collected data
         df = pd.DataFrame(
@@ -895,6 +986,10 @@ class CombinedScraper:
         )
         # Sort the DataFrame as required
         df.sort_values(by=["1m 1x Volume (USDT)", "5m Spread"], inplace=True, ascending=[False, False])
+        log.info(
+            f"Scrape stages for {len(tasks)} symbols: fetch {fetched - started:.2f}s ({fetcher.requests} requests), "
+            f"analyse {analysed - fetched:.2f}s on {workers} worker(s), total {time.time() - started:.2f}s"
+        )
         return df
 
 def run_scraper_for_exchange(exchange_name: str):
@@ -929,6 +1024,9 @@ def run_scraper_for_exchange(exchange_name: str):
                 # Rename the temporary file to the main file (atomic operation)
                 os.rename(temp_path_quant, main_path_quant)
 
+                # Memory-mappable copy for local readers (written atomically, sequence numbered)
+                scraper.output_df(dataframe=df, path=f"/var/www/api/data/quantdatav2_{exchange_name}.dscol", to="columnar")
+
                 # If the exchange is bybit, save to the old path as well
                 if exchange_name == "bybit":
                     old_path = "/var/www/api/data/quantdatav2.json"
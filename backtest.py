@@ -0,0 +1,70 @@
+"""
+Replay stored market data through the linear grid strategy offline.
+
+    python backtest.py --config configs/config.json --symbol DOGEUSDT --ohlcv data/DOGEUSDT_1m.csv \
+        [--orderbooks books.jsonl] [--trades trades.csv] [--balance 10000] [--hourly out.csv]
+"""
+
+import argparse
+import json
+
+import pandas as pd
+
+from config import Bot
+from directionalscalper.core.backtest import EXCHANGE_RATE_LIMITS, BacktestEngine, load_ohlcv, load_order_books, load_trades
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DirectionalScalper backtest')
+    parser.add_argument('--config', type=str, default='configs/config.json', help='Path to the configuration file')
+    parser.add_argument('--symbol', type=str, required=True, help='Market id, e.g. DOGEUSDT')
+    parser.add_argument('--ohlcv', type=str, required=True, help='1m OHLCV CSV or Parquet file')
+    parser.add_argument('--orderbooks', type=str, help='Order book snapshots (JSON lines)')
+    parser.add_argument('--trades', type=str, help='Public trades CSV')
+    parser.add_argument('--balance', type=float, default=10_000.0, help='Starting USDT balance')
+    parser.add_argument('--tick_size', type=float, default=0.0001, help='Price tick of the market')
+    parser.add_argument('--qty_step', type=float, default=1.0, help='Quantity step of the market')
+    parser.add_argument('--min_qty', type=float, default=1.0, help='Minimum order quantity')
+    parser.add_argument('--maker_fee', type=float, default=0.0002)
+    parser.add_argument('--taker_fee', type=float, default=0.00055)
+    parser.add_argument('--funding_rate', type=float, default=0.0001, help='Funding rate per 8h')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated seconds per API call')
+    parser.add_argument('--error_rate', type=float, default=0.0, help='Share of API calls that fail with a rate limit error')
+    parser.add_argument('--rate_limits', action='store_true', help="Enforce Bybit's per-endpoint request limits")
+    parser.add_argument('--hourly', type=str, help='Write the hourly report to this CSV')
+    parser.add_argument('--poll', action='store_true', help='Wake the strategy loops after every pause, not only on new data')
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        bot_config = Bot(**json.load(f)['bot'])
+
+    engine = BacktestEngine(
+        bot_config,
+        args.symbol,
+        load_ohlcv(args.ohlcv),
+        order_books=load_order_books(args.orderbooks) if args.orderbooks else None,
+        trades=load_trades(args.trades) if args.trades else None,
+        balance=args.balance,
+        tick_size=args.tick_size,
+        qty_step=args.qty_step,
+        min_qty=args.min_qty,
+        maker_fee=args.maker_fee,
+        taker_fee=args.taker_fee,
+        funding_rate=args.funding_rate,
+        latency=args.latency,
+        rate_limits=EXCHANGE_RATE_LIMITS if args.rate_limits else None,
+        error_rate=args.error_rate,
+        event_wakeups=not args.poll,
+    )
+    report = engine.run()
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(report.hourly)
+    print(report)
+    print("API calls:", report.calls)
+    if args.hourly:
+        report.hourly.to_csv(args.hourly)
+
+
+if __name__ == '__main__':
+    main()
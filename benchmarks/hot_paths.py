@@ -0,0 +1,362 @@
+"""
+Wall time and allocations of the grid, signal and indicator hot paths on
+fixed fixtures, compared against a stored baseline.
+
+Every case runs once per symbol per sample (a "sweep", 40 symbols by
+default) on seeded synthetic data: 3000 one-minute candles and 200-level
+order books per symbol. The signal generators run through BybitExchange on
+a SimulatedExchange with one new bar per sweep, as they do in the live
+loop. Allocations are the tracemalloc peak of one extra sweep (not timed).
+
+    python benchmarks/hot_paths.py                     # compare with benchmarks/baseline.json if it exists
+    python benchmarks/hot_paths.py --save              # store this run as the baseline
+    python benchmarks/hot_paths.py --only zigzag,zigzag_incremental,dbscan --repeat 50
+    python benchmarks/hot_paths.py --ohlcv data/BTCUSDT_1m.csv --orderbooks data/books.jsonl
+
+The exit status is 1 when a case got slower than the baseline by more than
+--threshold, so the command can gate a change.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from directionalscalper.core.backtest import MarketFeed, SimulatedClock, SimulatedExchange, linear_market, load_ohlcv, load_order_books
+from directionalscalper.core.exchanges.bybit import BybitExchange
+from directionalscalper.core.exchanges.exchange import Exchange
+from directionalscalper.core.pivots import ZigZagEngine
+from directionalscalper.core.regime import RegimeFilter
+from directionalscalper.core.strategies.bybit.bybit_strategy import BybitStrategy
+from directionalscalper.core.strategies.bybit.sticky_size_calculator import StickySizeCalculator
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def synthetic_bars(n, seed, price=100.0):
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.0015, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.random(n) * 0.001)
+    low = np.minimum(open_, close) * (1 - rng.random(n) * 0.001)
+    volume = rng.random(n) * 1000
+    timestamp = 1_700_000_000_000 + np.arange(n, dtype="int64") * 60_000
+    return pd.DataFrame({"timestamp": timestamp, "open": open_, "high": high, "low": low, "close": close, "volume": volume})
+
+
+class Fixtures:
+    """Per-symbol candles, books and grid inputs shared by all cases."""
+
+    def __init__(self, symbols, bars, book_levels, grid_levels, rounds, ohlcv=None, books=None):
+        self.bars = bars
+        self.grid_levels = grid_levels
+        self.symbols = [f"SYM{i}USDT" for i in range(symbols)]
+        total = bars + rounds
+        frames = {}
+        for i, symbol in enumerate(self.symbols):
+            if ohlcv is not None:
+                # Recorded candles, shifted in price per symbol so the symbols differ
+                df = ohlcv.tail(total).reset_index(drop=True).copy()
+                df[["open", "high", "low", "close"]] *= 1 + 0.01 * i
+            else:
+                df = synthetic_bars(total, seed=i, price=100.0 * (1 + 0.5 * i))
+            frames[symbol] = df
+        tick = 0.0001
+        self.feeds = {symbol: MarketFeed(df, tick_size=tick, book_depth=book_levels) for symbol, df in frames.items()}
+        self.start = frames[self.symbols[0]]["timestamp"].iloc[bars - 1] / 1000 + 60
+        self.ohlcv = {symbol: df.iloc[:bars][["timestamp", "open", "high", "low", "close", "volume"]].values.tolist()
+                      for symbol, df in frames.items()}
+        self.price = {symbol: float(df["close"].iloc[bars - 1]) for symbol, df in frames.items()}
+        if books:
+            self.books = {symbol: books[i % len(books)] for i, symbol in enumerate(self.symbols)}
+            for symbol, book in self.books.items():
+                self.price[symbol] = (float(book["bids"][0][0]) + float(book["asks"][0][0])) / 2
+        else:
+            self.books = {symbol: feed.order_book(self.start, book_levels) for symbol, feed in self.feeds.items()}
+
+    def grid_inputs(self, symbol):
+        price = self.price[symbol]
+        return dict(
+            long_pos_qty=1.0, short_pos_qty=1.0, levels=self.grid_levels,
+            initial_entry_long=price * 0.998, initial_entry_short=price * 1.002,
+            current_price=price, buffer_distance_long=price * 0.002, buffer_distance_short=price * 0.002,
+            max_outer_price_distance_long=0.03, max_outer_price_distance_short=0.03,
+        )
+
+
+def case_histograms(fx, strategy):
+    def run():
+        for symbol in fx.symbols:
+            strategy.calculate_price_range_and_volume_histograms(fx.books[symbol], fx.price[symbol], 0.03, 0.03)
+    return run
+
+
+def case_grid_levels(fx, strategy):
+    def run():
+        for symbol in fx.symbols:
+            strategy.calculate_grid_levels(**fx.grid_inputs(symbol))
+    return run
+
+
+def case_adjust_grid_levels(fx, strategy):
+    prepared = {}
+    for symbol in fx.symbols:
+        price = fx.price[symbol]
+        hist = strategy.calculate_price_range_and_volume_histograms(fx.books[symbol], price, 0.03, 0.03)
+        _, significant_long = strategy.calculate_volume_thresholds_and_significant_levels(hist[3], hist[2])
+        _, significant_short = strategy.calculate_volume_thresholds_and_significant_levels(hist[7], hist[6])
+        long_levels, short_levels = strategy.calculate_grid_levels(**fx.grid_inputs(symbol))
+        prepared[symbol] = (price, long_levels, significant_long, short_levels, significant_short)
+
+    def run():
+        for price, long_levels, significant_long, short_levels, significant_short in prepared.values():
+            strategy.adjust_grid_levels(long_levels, significant_long, 0.01, 0.001, 0.001, 0.03, 0.03, price, fx.grid_levels)
+            strategy.adjust_grid_levels(short_levels, significant_short, 0.01, 0.001, 0.001, 0.03, 0.03, price, fx.grid_levels)
+    return run
+
+
+def case_sticky_sizes(fx, strategy):
+    calculator = StickySizeCalculator({"sticky_size_enabled": True, "sticky_size_use_orderbook": True})
+    prepared = {}
+    for symbol in fx.symbols:
+        long_levels, short_levels = strategy.calculate_grid_levels(**fx.grid_inputs(symbol))
+        prepared[symbol] = (fx.price[symbol], long_levels, short_levels)
+
+    def run():
+        for symbol, (price, long_levels, short_levels) in prepared.items():
+            sizes = [10.0] * len(long_levels)
+            calculator.calculate_grid_with_sticky_sizes(symbol, "long", long_levels, sizes, price, 50.0, price * 1.01, fx.books[symbol])
+            calculator.calculate_grid_with_sticky_sizes(symbol, "short", short_levels, sizes, price, 50.0, price * 0.99, fx.books[symbol])
+    return run
+
+
+def case_zigzag(fx, exchange):
+    def run():
+        for symbol in fx.symbols:
+            exchange.calculate_zigzag(fx.ohlcv[symbol])
+    return run
+
+
+def case_zigzag_incremental(fx, exchange):
+    # The same window again with only the forming bar moved, as between two closes in the live loop
+    exchange.zigzags = ZigZagEngine()
+    windows = {symbol: [list(bar) for bar in ohlcv] for symbol, ohlcv in fx.ohlcv.items()}
+
+    def run():
+        for symbol, window in windows.items():
+            window[-1][2] *= 1.0001
+            exchange.calculate_zigzag(window, symbol=symbol)
+    return run
+
+
+def case_dbscan(fx, exchange):
+    zigzags = {symbol: exchange.calculate_zigzag(fx.ohlcv[symbol]) for symbol in fx.symbols}
+
+    def run():
+        for symbol in fx.symbols:
+            exchange.get_significant_levels_dbscan(zigzags[symbol], fx.ohlcv[symbol])
+    return run
+
+
+def case_regime_filter(fx, exchange):
+    frames = {symbol: pd.DataFrame(ohlcv[-1500:], columns=["timestamp", "open", "high", "low", "close", "volume"])
+              for symbol, ohlcv in fx.ohlcv.items()}
+
+    def run():
+        for df in frames.values():
+            exchange.regime_filter(df["close"], df["high"], df["low"], True, -0.1)
+    return run
+
+
+def case_regime_filter_incremental(fx, exchange):
+    # Per symbol, with only the forming bar moved between calls
+    exchange.regime_filters = RegimeFilter()
+    frames = {symbol: pd.DataFrame(ohlcv[-1500:], columns=["timestamp", "open", "high", "low", "close", "volume"])
+              for symbol, ohlcv in fx.ohlcv.items()}
+
+    def run():
+        for symbol, df in frames.items():
+            df.iloc[-1, df.columns.get_loc("close")] *= 1.0001
+            exchange.regime_filter(df["close"], df["high"], df["low"], True, -0.1, symbol=symbol)
+    return run
+
+
+def signal_case(method):
+    def case(fx, live):
+        exchange, clock = live
+        generate = getattr(exchange, method)
+        for symbol in fx.symbols:
+            generate(symbol)  # backfill the candle store; the samples see one new bar each
+
+        def run():
+            clock.advance(60)
+            for symbol in fx.symbols:
+                generate(symbol)
+        return run
+    return case
+
+
+CASES = {
+    "histograms": ("calculate_price_range_and_volume_histograms", case_histograms, "strategy"),
+    "grid_levels": ("calculate_grid_levels", case_grid_levels, "strategy"),
+    "adjust_grid_levels": ("adjust_grid_levels (long + short)", case_adjust_grid_levels, "strategy"),
+    "sticky_sizes": ("StickySizeCalculator.calculate_grid_with_sticky_sizes", case_sticky_sizes, "strategy"),
+    "zigzag": ("calculate_zigzag", case_zigzag, "helpers"),
+    "zigzag_incremental": ("calculate_zigzag (per symbol, forming bar)", case_zigzag_incremental, "helpers"),
+    "dbscan": ("get_significant_levels_dbscan", case_dbscan, "helpers"),
+    "regime_filter": ("regime_filter (1500 bars)", case_regime_filter, "helpers"),
+    "regime_filter_incremental": ("regime_filter (per symbol, forming bar)", case_regime_filter_incremental, "helpers"),
+    "xgridt_signal": ("generate_xgridt_signal (new bar)", signal_case("generate_xgridt_signal"), "live"),
+    "l_signals": ("generate_l_signals (new bar)", signal_case("generate_l_signals"), "live"),
+}
+
+
+def timed(fn, repeat, budget):
+    """Median and best of up to `repeat` samples (at least 3), stopping once `budget` seconds are spent."""
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < repeat and (len(samples) < 3 or time.perf_counter() - started < budget):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return np.median(samples) * 1000, min(samples) * 1000, len(samples)
+
+
+def allocations(fn):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        fn()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024, current / 1024
+
+
+def compare(results, baseline, threshold):
+    rows, regressed = [], []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if "error" in result:
+            rows.append(f"{name:<20} failed: {result['error']}")
+            continue
+        line = (f"{name:<20} {result['median_ms']:10.3f} ms  (best {result['min_ms']:9.3f})  "
+                f"peak {result['peak_kib']:9.1f} KiB")
+        if before and "median_ms" in before:
+            change = result["median_ms"] / before["median_ms"] - 1
+            memory = result["peak_kib"] / before["peak_kib"] - 1 if before.get("peak_kib") else 0.0
+            flag = ""
+            if change > threshold:
+                flag = "  SLOWER"
+                regressed.append(name)
+            elif change < -threshold:
+                flag = "  faster"
+            line += f"  | baseline {before['median_ms']:10.3f} ms  {change:+7.1%} time  {memory:+7.1%} memory{flag}"
+        elif before and "error" in before:
+            line += "  | baseline failed"
+        rows.append(line)
+    return rows, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=40)
+    parser.add_argument("--bars", type=int, default=3000, help="1m candles per symbol")
+    parser.add_argument("--book_levels", type=int, default=200, help="Order book levels per side")
+    parser.add_argument("--grid_levels", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20, help="Samples per case")
+    parser.add_argument("--budget", type=float, default=10.0, help="Seconds per case before sampling stops (min 3 samples)")
+    parser.add_argument("--only", type=str, help=f"Comma separated cases: {','.join(CASES)}")
+    parser.add_argument("--ohlcv", type=str, help="Recorded 1m OHLCV (CSV/Parquet) instead of synthetic candles")
+    parser.add_argument("--orderbooks", type=str, help="Recorded order book snapshots (JSON lines) instead of synthetic books")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    selected = args.only.split(",") if args.only else list(CASES)
+    unknown = [name for name in selected if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    logging.disable(logging.CRITICAL)  # the signal generators log every call
+    fx = Fixtures(
+        args.symbols, args.bars, args.book_levels, args.grid_levels, rounds=args.repeat + 8,
+        ohlcv=load_ohlcv(args.ohlcv) if args.ohlcv else None,
+        books=load_order_books(args.orderbooks) if args.orderbooks else None,
+    )
+    clock = SimulatedClock(fx.start)
+    targets = {
+        "strategy": BybitStrategy.__new__(BybitStrategy),  # pure helpers only, no connection
+        "helpers": Exchange.__new__(Exchange),
+    }
+
+    results = {}
+    with clock.installed():
+        if any(CASES[name][2] == "live" for name in selected):
+            markets = {symbol: linear_market(symbol, 0.0001, 0.001, 0.001, 50, 0.0002, 0.00055) for symbol in fx.symbols}
+            sim = SimulatedExchange(fx.feeds, markets, clock, latency=0.0)
+            targets["live"] = (BybitExchange("benchmark", "benchmark", client=sim), clock)
+        for name in selected:
+            label, case, target = CASES[name]
+            print(f"{label} ...", end=" ", flush=True)
+            try:
+                fn = case(fx, targets[target])
+                fn()  # warm-up
+                median_ms, min_ms, samples = timed(fn, args.repeat, args.budget)
+                peak_kib, retained_kib = allocations(fn)
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+                print("failed")
+                continue
+            results[name] = {"median_ms": median_ms, "min_ms": min_ms, "samples": samples,
+                             "per_call_us": median_ms * 1000 / args.symbols,
+                             "peak_kib": peak_kib, "retained_kib": retained_kib}
+            print(f"{median_ms:.3f} ms")
+
+    meta = {
+        "symbols": args.symbols, "bars": args.bars, "book_levels": args.book_levels, "grid_levels": args.grid_levels,
+        "fixtures": "recorded" if args.ohlcv or args.orderbooks else "synthetic",
+        "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+        "machine": platform.machine(), "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    print(f"\nsymbols={args.symbols} bars={args.bars} book_levels={args.book_levels} "
+          f"grid_levels={args.grid_levels} (times per sweep over all symbols)")
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if {k: baseline.get("meta", {}).get(k) for k in ("symbols", "bars", "book_levels", "grid_levels")} != \
+                {k: meta[k] for k in ("symbols", "bars", "book_levels", "grid_levels")}:
+            print(f"WARNING: baseline {args.baseline} was recorded with different fixture sizes: {baseline.get('meta')}")
+        else:
+            print(f"baseline {args.baseline} from {baseline.get('meta', {}).get('created')}")
+    rows, regressed = compare(results, baseline, args.threshold)
+    print("\n".join(rows))
+
+    if args.save:
+        stored = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                stored = json.load(f).get("results", {})
+        stored.update(results)  # a partial run (--only) refreshes just its cases
+        with open(args.baseline, "w") as f:
+            json.dump({"meta": meta, "results": stored}, f, indent=2)
+        print(f"\nSaved baseline to {args.baseline}")
+    elif regressed:
+        print(f"\n{len(regressed)} case(s) slower than the baseline by more than {args.threshold:.0%}: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
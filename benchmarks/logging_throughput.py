@@ -0,0 +1,102 @@
+"""
+Loop throughput of many symbol threads with logging off, written from the
+calling thread (the old behaviour), through the writer thread, and through
+the writer thread with a per call site limit.
+
+Each thread runs iterations shaped like the linear grid loop: a little
+numpy work and --lines INFO lines per iteration, half of them eager
+f-strings and half lazy %-style with a list or dict argument. Log files go
+to a temporary directory.
+
+    python benchmarks/logging_throughput.py
+    python benchmarks/logging_throughput.py --threads 60 --seconds 5 --lines 40
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from directionalscalper.core.strategies.logger import Logger, configure_logging, flush_logs, set_log_limit
+
+
+def iteration(log, symbol, lines, rng):
+    book = rng.random((50, 2))
+    levels = np.sort(book[:, 0])
+    position = {"qty": float(book[0, 1]), "price": float(levels[0])}
+    for i in range(lines // 2):
+        log.info(f"[{symbol}] stage {i}: best bid {levels[-1]:.6f}, position {position}")
+        log.info("[%s] stage %s: levels %s", symbol, i, list(levels[:5]))
+    return levels.sum()
+
+
+def run(mode, threads, seconds, lines, limit):
+    name = f"Bench{mode.title().replace('-', '')}"
+    log = Logger(logger_name=name, filename=f"{name}.log", stream=False)
+    if mode == "off":
+        log.setLevel(logging.WARNING)
+    if mode == "limited":
+        set_log_limit(name, max_per_interval=limit, interval=1.0)
+    configure_logging(asynchronous=mode != "sync")
+
+    counts = [0] * threads
+    deadline = time.perf_counter() + seconds
+    start = threading.Barrier(threads + 1)
+
+    def worker(index):
+        rng = np.random.default_rng(index)
+        symbol = f"SYM{index}USDT"
+        start.wait()
+        while time.perf_counter() < deadline:
+            iteration(log, symbol, lines, rng)
+            counts[index] += 1
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    flush_logs()
+    drained = time.perf_counter() - began
+    return sum(counts) / elapsed, drained - elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=40)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--lines", type=int, default=30, help="INFO lines per iteration")
+    parser.add_argument("--limit", type=int, default=5, help="lines per call site per second in the limited run")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="logbench-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        print(f"threads={args.threads} seconds={args.seconds} lines/iteration={args.lines}")
+        results = {}
+        for mode in ("off", "sync", "async", "limited"):
+            throughput, backlog = run(mode, args.threads, args.seconds, args.lines, args.limit)
+            results[mode] = throughput
+            print(f"{mode:8s} {throughput:10.1f} iterations/s  {throughput * args.lines:12.0f} lines/s  writer backlog {backlog:6.2f}s")
+        print(f"async vs sync  {results['async'] / results['sync']:6.2f}x")
+        print(f"async vs off   {results['async'] / results['off']:6.2f}x")
+    finally:
+        configure_logging(asynchronous=True)
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
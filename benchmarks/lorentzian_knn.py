@@ -0,0 +1,116 @@
+"""
+Per-symbol latency of the Lorentzian kNN signal at 3000 one-minute bars:
+the original per-row Python loop vs. the vectorized engine (cold, warm with
+one new bar, and batched across symbols).
+
+    python benchmarks/lorentzian_knn.py [--bars 3000] [--symbols 20] [--repeat 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from directionalscalper.core.exchanges.exchange import Exchange
+from directionalscalper.core.lorentzian import LorentzianEngine
+
+
+def synthetic_bars(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.2, n))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.random(n) * 0.1
+    low = np.minimum(open_, close) - rng.random(n) * 0.1
+    volume = rng.random(n) * 1000
+    index = pd.to_datetime(1_700_000_000_000 + np.arange(n) * 60_000, unit="ms")
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume}, index=index)
+
+
+def legacy_prediction(exchange, df, neighbors_count=8):
+    """The loop generate_l_signals used before the engine."""
+    df = df.copy()
+    df['rsi'] = exchange.n_rsi(df['close'], 14, 1)
+    df['adx'] = exchange.n_adx(df['high'], df['low'], df['close'], 14)
+    df['cci'] = exchange.n_cci(df['high'], df['low'], df['close'], 20, 1)
+    df['wt'] = exchange.n_wt((df['high'] + df['low'] + df['close']) / 3, 10, 11)
+    features = df[['rsi', 'adx', 'cci', 'wt']].values
+    feature_series = features[-1]
+    feature_arrays = features[:-1]
+    y_train_series = np.where(df['close'].shift(-4) > df['close'], 1, -1)[:-1]
+    predictions, distances, last_distance = [], [], -1
+    for i in range(len(feature_arrays)):
+        if i % 4 == 0:
+            d = np.log(1 + np.abs(feature_series - feature_arrays[i])).sum()
+            if d >= last_distance:
+                last_distance = d
+                distances.append(d)
+                predictions.append(y_train_series[i])
+                if len(predictions) > neighbors_count:
+                    last_distance = distances[int(neighbors_count * 3 / 4)]
+                    distances.pop(0)
+                    predictions.pop(0)
+    return int(np.sum(predictions))
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, np.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, default=3000)
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    exchange = Exchange.__new__(Exchange)  # only the feature helpers are used, no connection
+    steps = args.repeat + 1
+    full = {f"SYM{i}": synthetic_bars(args.bars + steps, i) for i in range(args.symbols)}
+    frames = {s: df.iloc[:args.bars] for s, df in full.items()}
+    symbol, df = next(iter(frames.items()))
+
+    legacy, legacy_ms = timed(lambda: legacy_prediction(exchange, df), args.repeat)
+    cold, cold_ms = timed(lambda: LorentzianEngine().predict(symbol, df), args.repeat)
+
+    # Incremental: every round the window advances by one new bar
+    engine = LorentzianEngine()
+    engine.predict(symbol, df)
+    step = iter(range(1, steps))
+
+    def warm():
+        k = next(step)
+        return engine.predict(symbol, full[symbol].iloc[k:k + args.bars])
+    warm_result, warm_ms = timed(warm, args.repeat)
+
+    batch_engine = LorentzianEngine()
+    batch_engine.predict_batch(frames)
+    batch_step = iter(range(1, steps))
+
+    def batch():
+        k = next(batch_step)
+        return batch_engine.predict_batch({s: d.iloc[k:k + args.bars] for s, d in full.items()})
+    _, batch_ms = timed(batch, args.repeat)
+
+    print(f"bars={args.bars} symbols={args.symbols} repeat={args.repeat}")
+    print(f"legacy loop             {legacy_ms:8.2f} ms/symbol  prediction={legacy}")
+    print(f"engine (cold)           {cold_ms:8.2f} ms/symbol  prediction={cold}")
+    print(f"engine (new bar)        {warm_ms:8.2f} ms/symbol  prediction={warm_result}")
+    print(f"engine (batch, new bar) {batch_ms / args.symbols:8.2f} ms/symbol")
+    print(f"speedup (new bar)       {legacy_ms / warm_ms:8.1f}x")
+    if legacy != cold:
+        print("WARNING: cold engine prediction differs from the legacy loop")
+
+
+if __name__ == "__main__":
+    main()
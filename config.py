@@ -66,6 +66,21 @@ class Bot(BaseModel):
     shared_data_path: Optional[str] = None
     hedge_positions_db_path: Optional[str] = "hedge_positions.json"
     linear_grid: Optional[dict] = None
+    market_data_stream: bool = False
+    market_data_max_age: float = 2.0
+    account_stream: bool = False
+    async_runtime: bool = False
+    async_max_concurrency: int = 16
+    instrument_cache_path: Optional[str] = None
+    instrument_refresh_interval: int = 3600
+    http_pool_size: int = 32
+    http_max_retries: int = 5
+    exchange_record_path: Optional[str] = None
+    latency_tracing: bool = True
+    profile_trigger_path: Optional[str] = None
+    profile_duration: float = 30.0
+    log_async: bool = True
+    log_limits: Optional[dict] = None
     hotkeys: Hotkeys
 
     @validator('hotkeys')
@@ -104,6 +119,24 @@ class Bot(BaseModel):
             raise ValueError("min_distance must be greater than 0")
         return v
 
+    @validator("market_data_max_age")
+    def minimum_market_data_max_age(cls, v):
+        if v <= 0.0:
+            raise ValueError("market_data_max_age must be greater than 0")
+        return v
+
+    @validator("async_max_concurrency")
+    def minimum_async_max_concurrency(cls, v):
+        if v < 1:
+            raise ValueError("async_max_concurrency must be at least 1")
+        return v
+
+    @validator("instrument_refresh_interval")
+    def minimum_instrument_refresh_interval(cls, v):
+        if v < 60:
+            raise ValueError("instrument_refresh_interval must be at least 60 seconds")
+        return v
+
     @validator('test_orders_enabled')
     def check_test_orders_enabled_is_bool(cls, v):
         if not isinstance(v, bool):
@@ -0,0 +1,161 @@
+"""
+Strategies expose their main loop as a generator of steps. Each `next()`
+runs one blocking pass (ccxt calls, order placement) and then yields what the
+loop wants to wait for:
+
+  - a number:              sleep that many seconds
+  - an object with `wait`: e.g. a SymbolTrigger, block until it fires; the
+                           result is sent back into the generator
+  - a FutureWait:          the result of work running on another thread
+
+`run_steps_blocking` drives a generator on the calling thread (the classic
+thread-per-symbol mode). `AsyncStrategyRuntime` drives many of them as tasks
+on one event loop: passes run on a bounded worker pool and all waiting happens
+on the loop, so an idle symbol does not hold a thread.
+"""
+
+import time
+import asyncio
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="AsyncRuntime", filename="AsyncRuntime.log", stream=True)
+
+
+class FutureWait:
+    """
+    Step request for a concurrent.futures.Future completed elsewhere, e.g. by
+    a strategy running on its own thread. The runtime awaits it on the loop,
+    so it holds no worker while it waits.
+    """
+
+    def __init__(self, future):
+        self.future = future
+
+    def wait(self):
+        return self.future.result()
+
+    async def wait_async(self, executor=None):
+        return await asyncio.wrap_future(self.future)
+
+
+def run_steps_blocking(steps):
+    """Drive a strategy step generator on the current thread."""
+    value = None
+    while True:
+        try:
+            request = steps.send(value)
+        except StopIteration as stop:
+            return stop.value
+        value = None
+        if isinstance(request, (int, float)):
+            time.sleep(request)
+        elif request is not None:
+            value = request.wait()
+
+
+class StrategyTask:
+    """
+    Thread-like handle for a strategy task (`start`/`is_alive`/`join`), so it
+    can sit in long_threads/short_threads in place of a threading.Thread.
+    """
+
+    def __init__(self, runtime, name, steps):
+        self.runtime = runtime
+        self.name = name
+        self.steps = steps
+        self.future = None
+
+    def start(self):
+        self.future = self.runtime.submit(self)
+
+    def is_alive(self):
+        return self.future is not None and not self.future.done()
+
+    def join(self, timeout=None):
+        if self.future is None:
+            return
+        try:
+            self.future.result(timeout)
+        except Exception:
+            pass
+
+
+class AsyncStrategyRuntime:
+    def __init__(self, max_concurrency: int = 16, poll_interval: float = 0.05):
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="strategy")
+        self.loop = asyncio.new_event_loop()
+        self.semaphore = None
+        self.tasks = {}
+        self.thread = threading.Thread(target=self._run_loop, name="AsyncStrategyRuntime", daemon=True)
+        self.ready = threading.Event()
+        self.thread.start()
+        self.ready.wait()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.loop.call_soon(self.ready.set)
+        self.loop.run_forever()
+
+    def create_task(self, name, steps) -> StrategyTask:
+        """Wrap a step generator in an unstarted task handle."""
+        return StrategyTask(self, name, steps)
+
+    def submit(self, task: StrategyTask):
+        """Schedule a task on the runtime loop; returns a concurrent.futures.Future."""
+        future = asyncio.run_coroutine_threadsafe(self._drive(task.name, task.steps), self.loop)
+        self.tasks[task.name] = task
+        future.add_done_callback(lambda _: self.tasks.pop(task.name, None) if self.tasks.get(task.name) is task else None)
+        return future
+
+    def active_count(self):
+        return sum(1 for task in list(self.tasks.values()) if task.is_alive())
+
+    @staticmethod
+    def _step(steps, value):
+        # StopIteration cannot cross a Future boundary, so report completion explicitly
+        try:
+            return False, steps.send(value)
+        except StopIteration as stop:
+            return True, stop.value
+
+    async def _drive(self, name, steps):
+        value = None
+        try:
+            while True:
+                async with self.semaphore:
+                    done, request = await self.loop.run_in_executor(self.executor, self._step, steps, value)
+                if done:
+                    return request
+                value = None
+                if isinstance(request, (int, float)):
+                    await asyncio.sleep(request)
+                elif request is not None:
+                    value = await self._wait(request)
+        except asyncio.CancelledError:
+            await self.loop.run_in_executor(self.executor, steps.close)
+            raise
+        except Exception as e:
+            logging.info(f"[{name}] Strategy task failed: {e}")
+            logging.info(traceback.format_exc())
+            raise
+        finally:
+            logging.info(f"[{name}] Strategy task finished")
+
+    async def _wait(self, waiter):
+        if hasattr(waiter, 'wait_async'):
+            return await waiter.wait_async(self.executor)
+        return await self.loop.run_in_executor(self.executor, waiter.wait)
+
+    def stop(self):
+        for task in list(self.tasks.values()):
+            if task.future is not None:
+                task.future.cancel()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,5 @@
+from directionalscalper.core.backtest.clock import SimulatedClock
+from directionalscalper.core.backtest.data import MarketFeed, load_ohlcv, load_order_books, load_trades
+from directionalscalper.core.backtest.matching import OrderBook
+from directionalscalper.core.backtest.sim_exchange import EXCHANGE_RATE_LIMITS, SimulatedExchange, leverage_tiers, linear_market
+from directionalscalper.core.backtest.engine import BacktestEngine, BacktestManager, BacktestReport
@@ -0,0 +1,120 @@
+"""
+Virtual clock for offline runs.
+
+The bot reads the time through `time.time()` / `time.monotonic()` /
+`datetime.now()` and waits with `time.sleep()` all over the strategy and
+exchange code. `SimulatedClock.installed()` swaps the `time` module and the
+`datetime` class seen by those modules for clock-backed stand-ins, so the
+unchanged code runs against simulated time and every sleep returns
+immediately after moving the clock forward.
+"""
+
+import sys
+import time as _time
+import datetime as _datetime
+from contextlib import contextmanager
+
+
+class ClockTime:
+    """Drop-in for the `time` module; everything not overridden is the real one."""
+
+    def __init__(self, clock):
+        self._clock = clock
+
+    def time(self):
+        return self._clock.now
+
+    def time_ns(self):
+        return int(self._clock.now * 1e9)
+
+    def monotonic(self):
+        return self._clock.now
+
+    def perf_counter(self):
+        return self._clock.now
+
+    def sleep(self, seconds):
+        self._clock.sleep(seconds)
+
+    def localtime(self, seconds=None):
+        return _time.localtime(self._clock.now if seconds is None else seconds)
+
+    def gmtime(self, seconds=None):
+        return _time.gmtime(self._clock.now if seconds is None else seconds)
+
+    def __getattr__(self, name):
+        return getattr(_time, name)
+
+
+def clock_datetime(clock):
+    """A `datetime` subclass whose now()/utcnow()/today() read the clock."""
+
+    class ClockDatetime(_datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls.fromtimestamp(clock.now, tz)
+
+        @classmethod
+        def utcnow(cls):
+            return cls.fromtimestamp(clock.now, _datetime.timezone.utc).replace(tzinfo=None)
+
+        @classmethod
+        def today(cls):
+            return cls.fromtimestamp(clock.now)
+
+    return ClockDatetime
+
+
+class SimulatedClock:
+    """
+    Simulated wall clock in epoch seconds. Only moves when something sleeps
+    or calls advance()/set(); it never goes backwards.
+    """
+
+    def __init__(self, start: float):
+        self.now = float(start)
+        self.sleeps = 0
+        self.slept = 0.0
+        self.time_module = ClockTime(self)
+        self.datetime_class = clock_datetime(self)
+
+    def sleep(self, seconds):
+        seconds = max(0.0, float(seconds or 0))
+        self.sleeps += 1
+        self.slept += seconds
+        self.now += seconds
+
+    def advance(self, seconds):
+        self.now += max(0.0, float(seconds))
+
+    def set(self, timestamp):
+        self.now = max(self.now, float(timestamp))
+
+    def milliseconds(self) -> int:
+        return int(self.now * 1000)
+
+    @contextmanager
+    def installed(self, prefixes=("directionalscalper.", "rate_limit", "live_table_manager")):
+        """
+        Point every loaded module under `prefixes` at this clock for the
+        duration of the block: module-level `time` (the time module) and
+        `datetime` (the datetime class) globals are replaced and restored on
+        exit. The clock is process-wide while installed, so nothing else
+        should be running live in the same process.
+        """
+        patched = []
+        for name, module in list(sys.modules.items()):
+            if module is None or not name.startswith(prefixes) or name.startswith(__package__):
+                continue
+            namespace = vars(module)
+            if namespace.get("time") is _time:
+                patched.append((namespace, "time", _time))
+                namespace["time"] = self.time_module
+            if namespace.get("datetime") is _datetime.datetime:
+                patched.append((namespace, "datetime", _datetime.datetime))
+                namespace["datetime"] = self.datetime_class
+        try:
+            yield self
+        finally:
+            for namespace, attribute, original in patched:
+                namespace[attribute] = original
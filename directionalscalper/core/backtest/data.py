@@ -0,0 +1,288 @@
+"""
+Stored market data for offline runs.
+
+`MarketFeed` holds one symbol's 1m OHLCV history (plus optional order book
+snapshots and trades) and answers "what did the market look like at time t"
+queries for the simulated exchange. Inside a bar the price is assumed to
+move open -> low -> high -> close for an up bar and open -> high -> low ->
+close for a down bar, at evenly spaced points, so fills and the current
+price are deterministic.
+"""
+
+import bisect
+import json
+import math
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+BAR_MS = 60_000
+
+TIMEFRAME_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "6h": 21_600_000,
+    "12h": 43_200_000, "1d": 86_400_000,
+}
+
+
+def load_ohlcv(path) -> pd.DataFrame:
+    """
+    1m bars from a CSV or Parquet file with timestamp (ms or ISO), open,
+    high, low, close and volume columns, sorted by time.
+    """
+    path = str(path)
+    df = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+    df.columns = [str(c).lower() for c in df.columns]
+    if not pd.api.types.is_numeric_dtype(df["timestamp"]):
+        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True).dt.as_unit("ms").astype("int64")
+    df = df[["timestamp", "open", "high", "low", "close", "volume"]].astype(float)
+    df["timestamp"] = df["timestamp"].astype("int64")
+    return df.sort_values("timestamp").drop_duplicates("timestamp").reset_index(drop=True)
+
+
+def load_order_books(path) -> list:
+    """Order book snapshots from a JSON-lines file: {"timestamp", "bids", "asks"} per line."""
+    books = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                book = json.loads(line)
+                books.append({"timestamp": int(book["timestamp"]), "bids": book["bids"], "asks": book["asks"]})
+    books.sort(key=lambda b: b["timestamp"])
+    return books
+
+
+def load_trades(path) -> pd.DataFrame:
+    """Public trades from a CSV with timestamp (ms), price, amount and side columns."""
+    df = pd.read_csv(path)
+    df.columns = [str(c).lower() for c in df.columns]
+    return df.sort_values("timestamp").reset_index(drop=True)
+
+
+class MarketFeed:
+    def __init__(self, ohlcv: pd.DataFrame, order_books: Optional[list] = None,
+                 trades: Optional[pd.DataFrame] = None, tick_size: float = 0.01, book_depth: int = 50):
+        self.timestamps = ohlcv["timestamp"].to_numpy(dtype="int64")
+        self.open = ohlcv["open"].to_numpy(dtype=float)
+        self.high = ohlcv["high"].to_numpy(dtype=float)
+        self.low = ohlcv["low"].to_numpy(dtype=float)
+        self.close = ohlcv["close"].to_numpy(dtype=float)
+        self.volume = ohlcv["volume"].to_numpy(dtype=float)
+        # Plain-float copies for the per-call lookups, which NumPy scalars would slow down
+        self._times = self.timestamps.tolist()
+        self._bars_ohlc = list(zip(self.open.tolist(), self.high.tolist(), self.low.tolist(), self.close.tolist()))
+        self._last_price = (None, None)  # (t, price) of the last price_at
+        self.tick_size = tick_size
+        self.book_depth = book_depth
+        self.order_books = order_books or []
+        self.book_times = np.array([b["timestamp"] for b in self.order_books], dtype="int64")
+        self.trades = trades
+        if trades is not None and not trades.empty:
+            self.trade_times = trades["timestamp"].to_numpy(dtype="int64")
+            self.trade_prices = trades["price"].to_numpy(dtype=float)
+            self.trade_amounts = trades["amount"].to_numpy(dtype=float)
+        else:
+            self.trade_times = None
+        self._resampled = {}
+
+    @property
+    def start(self) -> float:
+        return self.timestamps[0] / 1000
+
+    @property
+    def end(self) -> float:
+        return self.timestamps[-1] / 1000 + 60
+
+    def bar_index(self, t: float) -> int:
+        """Index of the 1m bar containing t (clamped to the data)."""
+        i = bisect.bisect_right(self._times, int(t * 1000)) - 1
+        return min(max(i, 0), len(self._times) - 1)
+
+    def path(self, i: int):
+        """(times, prices) of the four intrabar points of bar i."""
+        t0 = self._times[i] / 1000
+        open_, high, low, close = self._bars_ohlc[i]
+        if close >= open_:
+            prices = (open_, low, high, close)
+        else:
+            prices = (open_, high, low, close)
+        return (t0, t0 + 20, t0 + 40, t0 + 60), prices
+
+    def next_point(self, t: float) -> float:
+        """Time of the first intrabar path point after t."""
+        times, _ = self.path(self.bar_index(t))
+        return next((when for when in times if when > t), t + 20)
+
+    def price_at(self, t: float) -> float:
+        if t == self._last_price[0]:
+            return self._last_price[1]  # margin and equity checks ask many times per instant
+        times, prices = self.path(self.bar_index(t))
+        if t <= times[0]:
+            price = prices[0]
+        elif t >= times[-1]:
+            price = prices[-1]
+        else:
+            j = bisect.bisect_right(times, t) - 1
+            # np.interp's formula, so prices stay bit for bit what they were
+            slope = (prices[j + 1] - prices[j]) / (times[j + 1] - times[j])
+            price = slope * (t - times[j]) + prices[j]
+        self._last_price = (t, price)
+        return price
+
+    def price_range(self, t0: float, t1: float):
+        """(low, high) the price travelled through between t0 and t1."""
+        lo = hi = self.price_at(t0)
+        end = self.price_at(t1)
+        lo, hi = min(lo, end), max(hi, end)
+        for i in range(self.bar_index(t0), self.bar_index(t1) + 1):
+            times, prices = self.path(i)
+            for when, price in zip(times, prices):
+                if t0 < when < t1:
+                    lo, hi = min(lo, price), max(hi, price)
+        return lo, hi
+
+    def first_touch(self, t0: float, t1: float, low: Optional[float] = None, high: Optional[float] = None):
+        """First time in [t0, t1] the price is at or below low or at or above high, None if it stays between."""
+        def touched(price):
+            return (low is not None and price <= low) or (high is not None and price >= high)
+
+        when, price = t0, self.price_at(t0)
+        if touched(price):
+            return t0
+        points = [
+            (t, p) for i in range(self.bar_index(t0), self.bar_index(t1) + 1)
+            for t, p in zip(*self.path(i)) if t0 < t < t1
+        ]
+        for t, p in points + [(t1, self.price_at(t1))]:
+            if touched(p):
+                # Linear between the path points: where the segment reaches the level
+                level = low if low is not None and p <= low else high
+                return when + (t - when) * (level - price) / (p - price)
+            when, price = t, p
+        return None
+
+    def traded_volume(self, t0: float, t1: float) -> float:
+        """Base volume traded between t0 and t1, prorating the 1m bars at the edges."""
+        volume = 0.0
+        for i in range(self.bar_index(t0), self.bar_index(t1) + 1):
+            start = self.timestamps[i] / 1000
+            overlap = min(t1, start + 60) - max(t0, start)
+            if overlap > 0:
+                volume += self.volume[i] * overlap / 60
+        return volume
+
+    def trades_between(self, t0: float, t1: float):
+        """(times ms, prices, amounts) of the recorded trades in (t0, t1], or None without trade data."""
+        if self.trade_times is None:
+            return None
+        window = slice(
+            int(np.searchsorted(self.trade_times, int(t0 * 1000), side="right")),
+            int(np.searchsorted(self.trade_times, int(t1 * 1000), side="right")),
+        )
+        return self.trade_times[window], self.trade_prices[window], self.trade_amounts[window]
+
+    def forming_bar(self, t: float):
+        """[ts, open, high, low, close, volume] of the 1m bar in progress at t."""
+        i = self.bar_index(t)
+        times, prices = self.path(i)
+        seen = [p for when, p in zip(times, prices) if when <= t] + [self.price_at(t)]
+        fraction = min(1.0, max(0.0, (t - times[0]) / 60))
+        return [int(self.timestamps[i]), prices[0], max(seen), min(seen), seen[-1], self.volume[i] * fraction]
+
+    def _bars(self, timeframe: str) -> np.ndarray:
+        bars = self._resampled.get(timeframe)
+        if bars is None:
+            frame_ms = TIMEFRAME_MS[timeframe]
+            if frame_ms == BAR_MS:
+                bars = np.column_stack([self.timestamps, self.open, self.high, self.low, self.close, self.volume])
+            else:
+                df = pd.DataFrame({"bucket": self.timestamps // frame_ms * frame_ms, "open": self.open, "high": self.high,
+                                   "low": self.low, "close": self.close, "volume": self.volume})
+                grouped = df.groupby("bucket", sort=True).agg(
+                    open=("open", "first"), high=("high", "max"), low=("low", "min"), close=("close", "last"), volume=("volume", "sum"))
+                bars = np.column_stack([grouped.index.to_numpy(dtype=float), grouped.to_numpy(dtype=float)])
+            self._resampled[timeframe] = bars
+        return bars
+
+    def ohlcv(self, timeframe: str, t: float, since: Optional[int] = None, limit: Optional[int] = None) -> list:
+        """ccxt-style candles up to time t, the last one still forming (as the exchange returns them)."""
+        frame_ms = TIMEFRAME_MS.get(timeframe, BAR_MS)
+        now_ms = int(t * 1000)
+        bucket = now_ms // frame_ms * frame_ms
+        bars = self._bars(timeframe if timeframe in TIMEFRAME_MS else "1m")
+        closed = bars[:int(np.searchsorted(bars[:, 0], bucket, side="left"))]
+
+        first_1m = int(np.searchsorted(self.timestamps, bucket, side="left"))
+        current = self.forming_bar(t)
+        inside = slice(first_1m, self.bar_index(t))
+        high, low = current[2], current[3]
+        if inside.start < inside.stop:
+            high = max(high, float(self.high[inside].max()))
+            low = min(low, float(self.low[inside].min()))
+        forming = [
+            bucket,
+            self.open[first_1m] if inside.start < inside.stop else current[1],
+            high,
+            low,
+            current[4],
+            float(self.volume[inside].sum()) + current[5],
+        ]
+
+        if since is not None:
+            closed = closed[int(np.searchsorted(closed[:, 0], since, side="left")):]
+        if limit:
+            closed = closed[-(limit - 1):] if limit > 1 else closed[:0]
+        candles = closed.tolist()
+        candles.append(forming)
+        for candle in candles:
+            candle[0] = int(candle[0])
+        return candles
+
+    def volume_usd(self, t: float, minutes: int) -> float:
+        """Quote volume of the last `minutes` closed 1m bars before t."""
+        i = self.bar_index(t)
+        window = slice(max(0, i - minutes), i)
+        return float((self.volume[window] * self.close[window]).sum())
+
+    def spread_pct(self, t: float, minutes: int) -> float:
+        """Largest high/low range (in %) of the last `minutes` closed 1m bars, as the scraper reports it."""
+        i = self.bar_index(t)
+        window = slice(max(0, i - minutes), i)
+        if window.start >= window.stop:
+            return 0.0
+        return float(((self.high[window] - self.low[window]) / self.low[window]).max() * 100)
+
+    def order_book(self, t: float, limit: Optional[int] = None) -> dict:
+        """The latest stored snapshot before t, or a synthetic book around the current price."""
+        limit = limit or self.book_depth
+        if len(self.book_times):
+            k = int(np.searchsorted(self.book_times, int(t * 1000), side="right")) - 1
+            if k >= 0:
+                book = self.order_books[k]
+                return {"bids": book["bids"][:limit], "asks": book["asks"][:limit], "timestamp": book["timestamp"]}
+
+        price = self.price_at(t)
+        i = self.bar_index(t)
+        tick = self.tick_size
+        best_bid = math.floor(price / tick) * tick
+        best_ask = best_bid + tick
+        # Depth scales with the bar's volume; the deterministic ripple gives the book some walls
+        base = max(self.volume[max(0, i - 5):i + 1].mean(), 1e-9) / limit
+        step = max(tick, round(price * 0.0002 / tick) * tick)
+        levels = np.arange(limit)
+        sizes = base * (1.0 + 0.8 * np.abs(np.sin(levels * 1.7 + i)))
+        bids = np.column_stack([np.round(best_bid - levels * step, 12), sizes]).tolist()
+        asks = np.column_stack([np.round(best_ask + levels * step, 12), sizes * (1.0 + 0.1 * np.cos(levels + i))]).tolist()
+        return {"bids": bids, "asks": asks, "timestamp": int(t * 1000)}
+
+    def recent_trades(self, t: float, since: Optional[int] = None, limit: Optional[int] = None) -> list:
+        if self.trades is None or self.trades.empty:
+            return []
+        now_ms = int(t * 1000)
+        trades = self.trades[self.trades["timestamp"] <= now_ms]
+        if since is not None:
+            trades = trades[trades["timestamp"] >= since]
+        if limit:
+            trades = trades.tail(limit)
+        return trades.to_dict("records")
@@ -0,0 +1,322 @@
+"""
+Offline backtests of the Bybit linear grid strategy.
+
+BacktestEngine runs the unchanged LinearGridBaseFutures loop (and with it
+handle_grid_trades and the BybitExchange wrappers) against a
+SimulatedExchange fed from stored market data. The strategy's main loop is a
+step generator, so instead of threads the engine keeps one generator per
+side and always advances whichever wants to wake up first, moving the
+simulated clock to that moment, with no real waiting in between.
+
+A loop that slept without anything changing would only repeat its last
+pass on the same data, so by default its wake-up is pushed on to the next
+event: the next point of the intrabar price path (every 20 s), the moment
+the price reaches one of the resting orders, or an order or position
+change made by the other loop.
+"""
+
+import logging as _logging
+import os
+import tempfile
+import time
+from typing import Optional
+
+import pandas as pd
+
+from api.manager import Manager
+from directionalscalper.core.backtest.clock import SimulatedClock
+from directionalscalper.core.backtest.data import MarketFeed
+from directionalscalper.core.backtest.sim_exchange import SimulatedExchange, linear_market
+from directionalscalper.core.exchanges.bybit import BybitExchange
+from directionalscalper.core.exchanges.exchange import Exchange
+from directionalscalper.core.strategies.bybit.gridbased.lineargrid_base import LinearGridBaseFutures
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="Backtest", filename="Backtest.log", stream=True)
+
+HOUR = 3600
+
+
+class BacktestManager:
+    """
+    Stands in for api.manager.Manager: the scraper metrics the strategy
+    reads (volume, spread, funding) are computed from the feed at the
+    current simulated time. Trend and signal fields are left neutral.
+    """
+
+    # Pure helpers are shared with the live Manager
+    extract_metrics = Manager.extract_metrics
+    get_asset_data = Manager.get_asset_data
+    get_asset_value = Manager.get_asset_value
+    get_1m_moving_averages = Manager.get_1m_moving_averages
+    get_5m_moving_averages = Manager.get_5m_moving_averages
+
+    def __init__(self, exchange, sim: SimulatedExchange, clock: SimulatedClock):
+        self.exchange = exchange
+        self.sim = sim
+        self.clock = clock
+
+    def asset(self, market_id: str) -> dict:
+        feed = self.sim.feeds[market_id]
+        now = self.clock.now
+        return {
+            "Asset": market_id,
+            "Price": feed.price_at(now),
+            "1m 1x Volume (USDT)": feed.volume_usd(now, 1),
+            "5m 1x Volume (USDT)": feed.volume_usd(now, 5),
+            "1h 1x Volume (USDT)": feed.volume_usd(now, 60),
+            "1m Spread": feed.spread_pct(now, 1),
+            "5m Spread": feed.spread_pct(now, 5),
+            "30m Spread": feed.spread_pct(now, 30),
+            "1h Spread": feed.spread_pct(now, 60),
+            "4h Spread": feed.spread_pct(now, 240),
+            "MA Trend": "neutral",
+            "HMA Trend": "neutral",
+            "ERI Trend": "undefined",
+            "EMA Trend": "undefined",
+            "MFI": "neutral",
+            "Funding": self.sim.current_funding_rate(now),
+        }
+
+    def get_data(self) -> list:
+        return [self.asset(market_id) for market_id in self.sim.feeds]
+
+    def get_api_data(self, symbol):
+        market_id = symbol.replace("/", "").split(":")[0]
+        if market_id not in self.sim.feeds:
+            return {}
+        asset = self.asset(market_id)
+        return {
+            "1mVol": asset["1m 1x Volume (USDT)"], "5mVol": asset["5m 1x Volume (USDT)"],
+            "1hVol": asset["1h 1x Volume (USDT)"], "1mSpread": asset["1m Spread"], "5mSpread": asset["5m Spread"],
+            "30mSpread": asset["30m Spread"], "1hSpread": asset["1h Spread"], "4hSpread": asset["4h Spread"],
+            "MA Trend": "neutral", "HMA Trend": "neutral", "MFI": "neutral", "ERI Trend": "undefined",
+            "EMA Trend": "undefined", "Top Signal 5m": False, "Bottom Signal 5m": False,
+            "Top Signal 1m": False, "Bottom Signal 1m": False, "Funding": asset["Funding"],
+            "Symbols": list(self.sim.feeds),
+        }
+
+    def get_symbols(self) -> list:
+        return self.get_data()
+
+    def get_auto_rotate_symbols(self, *args, **kwargs) -> list:
+        return list(self.sim.feeds)
+
+
+class BacktestReport:
+    """Hourly statistics of one run and the totals over it."""
+
+    def __init__(self, hourly: pd.DataFrame, summary: dict, fills: list, calls: dict):
+        self.hourly = hourly
+        self.summary = summary
+        self.fills = pd.DataFrame(fills)
+        self.calls = calls  # API calls by ccxt method
+
+    def __repr__(self):
+        return "\n".join(f"{key:>22}: {value}" for key, value in self.summary.items())
+
+
+class BacktestEngine:
+    """
+    :param config: the `bot` section of a config (config.Bot)
+    :param symbol: market id, e.g. "BTCUSDT"
+    :param ohlcv: 1m bars (see data.load_ohlcv)
+    :param warmup_bars: bars kept as history before trading starts, so the
+        indicators have something to work with
+    :param respawn_delay: simulated seconds before a strategy loop that
+        returned is started again (as the bot's rotator would)
+    :param tiers, rate_limits, error_rate, seed: passed to SimulatedExchange
+    :param event_wakeups: skip a loop's idle wake-ups until the next price
+        path point, fill or order change; False wakes it after every pause
+    """
+
+    def __init__(self, config, symbol: str, ohlcv: pd.DataFrame, order_books: Optional[list] = None,
+                 trades: Optional[pd.DataFrame] = None, balance: float = 10_000.0, tick_size: float = 0.01,
+                 qty_step: float = 0.001, min_qty: float = 0.001, max_leverage: float = 50.0,
+                 maker_fee: float = 0.0002, taker_fee: float = 0.00055, funding_rate=0.0001,
+                 latency: float = 0.05, warmup_bars: int = 300, actions=("long", "short"),
+                 respawn_delay: float = 60.0, tiers: Optional[list] = None, rate_limits: Optional[dict] = None,
+                 error_rate: float = 0.0, seed: int = 0, quiet: bool = True, event_wakeups: bool = True):
+        self.config = config
+        self.symbol = symbol.upper()
+        self.feed = MarketFeed(ohlcv, order_books, trades, tick_size=tick_size)
+        self.market = linear_market(self.symbol, tick_size, qty_step, min_qty, max_leverage, maker_fee, taker_fee)
+        self.balance = balance
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.funding_rate = funding_rate
+        self.latency = latency
+        self.warmup_bars = warmup_bars
+        self.actions = tuple(actions)
+        self.respawn_delay = respawn_delay
+        self.tiers = tiers
+        self.rate_limits = rate_limits
+        self.error_rate = error_rate
+        self.seed = seed
+        self.quiet = quiet
+        self.event_wakeups = event_wakeups
+
+    def _strategy(self, exchange, manager, config):
+        strategy = LinearGridBaseFutures(exchange, manager, config, symbols_allowed=1)
+        strategy.update_shared_data = lambda *args, **kwargs: None  # no dashboard files from a backtest
+        return strategy
+
+    def _signal(self, exchange, config):
+        """The entry signal the bot's runner hands to a freshly started loop."""
+        signal_type = config.linear_grid.get('entry_signal_type', 'lorentzian')
+        if signal_type == 'mfirsi_signal':
+            return exchange.get_mfirsi_ema_secondary_ema(self.symbol, limit=100, lookback=1, ema_period=5, secondary_ema_period=3)
+        if signal_type == 'xgrid':
+            return exchange.generate_xgridt_signal(self.symbol) or "neutral"
+        return exchange.generate_l_signals(self.symbol)
+
+    def _steps(self, strategy, action, signal):
+        return strategy.run_steps(self.symbol, rotator_symbols_standardized=[self.symbol], mfirsi_signal=signal, action=action)
+
+    def run(self, start: Optional[float] = None, end: Optional[float] = None) -> BacktestReport:
+        """Replay [start, end) (epoch seconds; defaults to all data after the warmup)."""
+        start = start if start is not None else self.feed.start + self.warmup_bars * 60
+        end = min(end if end is not None else self.feed.end, self.feed.end)
+        if start >= end:
+            raise ValueError(
+                f"Nothing to replay: start {pd.Timestamp(start, unit='s', tz='UTC')} is not before end "
+                f"{pd.Timestamp(end, unit='s', tz='UTC')} ({len(self.feed.timestamps)} bars, {self.warmup_bars} of warmup)"
+            )
+        clock = SimulatedClock(start)
+        sim = SimulatedExchange(
+            {self.symbol: self.feed}, {self.symbol: self.market}, clock, balance=self.balance,
+            maker_fee=self.maker_fee, taker_fee=self.taker_fee, funding_rate=self.funding_rate, latency=self.latency,
+            tiers={self.symbol: self.tiers} if self.tiers else None, rate_limits=self.rate_limits,
+            error_rate=self.error_rate, seed=self.seed,
+        )
+
+        wall_started = time.perf_counter()
+        hourly = []
+        generators = {}
+        with tempfile.TemporaryDirectory() as workdir, clock.installed():
+            config = self.config.model_copy(update={
+                "hedge_positions_db_path": os.path.join(workdir, "hedge_positions.json"),
+                "shared_data_path": workdir,
+                "dashboard_enabled": False,  # no dashboard files from a backtest
+                # The symbol under test is traded even if the live config blacklists it
+                "blacklist": [s for s in (self.config.blacklist or []) if s.upper() != self.symbol],
+            })
+            previous_disable = _logging.root.manager.disable
+            if self.quiet:
+                _logging.disable(_logging.INFO)
+            Exchange.symbols_cache = None
+            Exchange.open_positions_shared_cache = None
+            try:
+                exchange = BybitExchange("backtest", "backtest", client=sim)
+                manager = BacktestManager(exchange, sim, clock)
+                strategies = {action: self._strategy(exchange, manager, config) for action in self.actions}
+                wake = {action: clock.now for action in self.actions}
+                generators = dict.fromkeys(self.actions)  # None: (re)start the loop when it is due
+                seen = dict.fromkeys(self.actions)  # sim.revision() after the loop's last step
+                next_point = dict.fromkeys(self.actions, start)  # first path point after the loop's last step
+
+                row_start, baseline = start, self._totals(sim)
+                peak = sim.equity()
+                max_drawdown = 0.0
+                while True:
+                    due_at = {action: self._due(sim, wake[action], seen[action], next_point[action]) for action in self.actions}
+                    action = min(due_at, key=due_at.get)
+                    due = due_at[action]
+                    while row_start + HOUR <= min(due, end):
+                        clock.set(row_start + HOUR)
+                        sim.sync()
+                        baseline = self._record(hourly, sim, row_start, baseline)
+                        row_start += HOUR
+                    if due >= end:
+                        break
+
+                    clock.set(due)
+                    sim.sync()
+                    try:
+                        if generators[action] is None:
+                            # Like the bot's runner: a side is only started on its signal or an open position
+                            signal = self._signal(strategies[action].exchange, strategies[action].config)
+                            if str(signal).lower() == action or sim.positions[(self.symbol, action)]["qty"] > 0:
+                                generators[action] = self._steps(strategies[action], action, signal)
+                        if generators[action] is None:
+                            pause = self.feed.next_point(clock.now) - clock.now if self.event_wakeups else self.respawn_delay
+                        else:
+                            pause = next(generators[action])
+                    except StopIteration:
+                        generators[action] = None
+                        pause = self.respawn_delay
+                    except Exception as e:
+                        logging.error(f"[{self.symbol}] {action} loop raised at {clock.now:.0f}: {e}", exc_info=True)
+                        generators[action] = None
+                        pause = self.respawn_delay
+                    if not isinstance(pause, (int, float)):
+                        pause = 1.0  # event-driven triggers wait on live streams; poll instead
+                    wake[action] = clock.now + max(float(pause), 0.01)
+                    idle = self.event_wakeups and generators[action] is not None
+                    seen[action] = sim.revision() if idle else None
+                    next_point[action] = self.feed.next_point(clock.now)
+
+                    equity = sim.equity()
+                    peak = max(peak, equity)
+                    max_drawdown = max(max_drawdown, (peak - equity) / peak if peak > 0 else 0.0)
+
+                clock.set(end)
+                sim.sync()
+                if row_start < end:
+                    self._record(hourly, sim, row_start, baseline)
+            finally:
+                for generator in generators.values():
+                    if generator is not None:
+                        generator.close()  # releases the strategy's symbol lock
+                Exchange.symbols_cache = None
+                Exchange.open_positions_shared_cache = None
+                _logging.disable(previous_disable)
+
+        hourly = pd.DataFrame(hourly).set_index("hour") if hourly else pd.DataFrame()
+        totals = self._totals(sim)
+        summary = {
+            "symbol": self.symbol,
+            "start": pd.Timestamp(start, unit="s", tz="UTC"),
+            "end": pd.Timestamp(end, unit="s", tz="UTC"),
+            "start_balance": self.balance,
+            "end_equity": round(sim.equity(), 4),
+            "pnl": round(sim.equity() - self.balance, 4),
+            "realised_pnl": round(totals["realised"], 4),
+            "fees": round(totals["fees"], 4),
+            "funding": round(totals["funding"], 4),
+            "max_drawdown_pct": round(max_drawdown * 100, 4),
+            "orders_placed": totals["placed"],
+            "orders_filled": totals["filled"],
+            "orders_cancelled": totals["cancelled"],
+            "orders_rejected": totals["rejected"],
+            "liquidations": totals["liquidations"],
+            "rate_limited": totals["rate_limited"],
+            "api_calls": totals["api_calls"],
+            "wall_seconds": round(time.perf_counter() - wall_started, 3),
+        }
+        return BacktestReport(hourly, summary, sim.fills, dict(sim.calls.most_common()))
+
+    @staticmethod
+    def _due(sim: SimulatedExchange, wake: float, seen: Optional[int], next_point: float) -> float:
+        """When a loop that asked to wake at `wake` next has something new to see."""
+        if seen is None or seen != sim.revision() or wake >= next_point:
+            return wake
+        fill = sim.next_fill_time(next_point)
+        return max(wake, fill if fill is not None else next_point)
+
+    @staticmethod
+    def _totals(sim: SimulatedExchange) -> dict:
+        totals = {key: sim.stats[key] for key in (
+            "placed", "filled", "cancelled", "rejected", "amended", "liquidations", "rate_limited", "fees", "funding", "realised",
+        )}
+        totals["api_calls"] = sum(sim.calls.values())
+        return totals
+
+    def _record(self, rows: list, sim: SimulatedExchange, hour_start: float, baseline: dict) -> dict:
+        totals = self._totals(sim)
+        row = {"hour": pd.Timestamp(hour_start, unit="s", tz="UTC"), "equity": sim.equity(), "wallet": sim.wallet}
+        row.update({key: totals[key] - baseline[key] for key in totals})
+        for side in ("long", "short"):
+            row[f"{side}_qty"] = sim.positions[(self.symbol, side)]["qty"]
+        rows.append(row)
+        return totals
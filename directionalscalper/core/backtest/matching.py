@@ -0,0 +1,86 @@
+"""
+Price-time priority book of the simulated account's resting orders.
+
+One OrderBook per market holds the open limit orders as FIFO queues per
+price level. Levels are kept in sorted price lists (bisect), so the best
+price, the orders a market move crossed and the orders an incoming order can
+take are all walked in priority order: best price first, then earliest
+arrival (the order's `seq`, which an amend resets).
+"""
+
+import bisect
+from collections import deque
+
+
+class OrderBook:
+    def __init__(self):
+        self.levels = {"buy": {}, "sell": {}}
+        self.prices = {"buy": [], "sell": []}  # ascending
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for side in ("buy", "sell"):
+            yield from self.orders(side)
+
+    def add(self, order: dict):
+        side, price = order["side"], order["price"]
+        level = self.levels[side].get(price)
+        if level is None:
+            level = self.levels[side][price] = deque()
+            bisect.insort(self.prices[side], price)
+        level.append(order)
+        self.count += 1
+
+    def remove(self, order: dict) -> bool:
+        side, price = order["side"], order["price"]
+        level = self.levels[side].get(price)
+        if level is None:
+            return False
+        try:
+            level.remove(order)
+        except ValueError:
+            return False
+        self.count -= 1
+        if not level:
+            del self.levels[side][price]
+            prices = self.prices[side]
+            del prices[bisect.bisect_left(prices, price)]
+        return True
+
+    def best(self, side: str):
+        prices = self.prices[side]
+        if not prices:
+            return None
+        return prices[-1] if side == "buy" else prices[0]
+
+    def orders(self, side: str):
+        """Orders of one side in priority order."""
+        prices = self.prices[side]
+        for price in (reversed(prices) if side == "buy" else prices):
+            yield from list(self.levels[side][price])
+
+    def crossed(self, low: float, high: float):
+        """
+        Resting orders a market that traded between low and high reached, in
+        priority order: bids at or above low, asks at or below high.
+        """
+        bids = self.prices["buy"]
+        for price in reversed(bids[bisect.bisect_left(bids, low):]):
+            yield from list(self.levels["buy"][price])
+        asks = self.prices["sell"]
+        for price in asks[:bisect.bisect_right(asks, high)]:
+            yield from list(self.levels["sell"][price])
+
+    def takeable(self, side: str, limit_price=None):
+        """Resting orders an incoming `side` order with `limit_price` (None: market) can trade with."""
+        opposite = "sell" if side == "buy" else "buy"
+        for order in self.orders(opposite):
+            if limit_price is not None:
+                if side == "buy" and order["price"] > limit_price:
+                    return
+                if side == "sell" and order["price"] < limit_price:
+                    return
+            yield order
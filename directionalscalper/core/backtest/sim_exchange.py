@@ -0,0 +1,998 @@
+"""
+ccxt-compatible stand-in for the Bybit linear swap client, driven by stored
+market data and a SimulatedClock.
+
+It answers the subset of ccxt (plus the raw v5 batch endpoints) that
+BybitExchange uses. Orders go through a matching engine: the account's
+resting limit orders sit in a price-time priority OrderBook, incoming orders
+take from them and from the recorded order book, and resting orders fill as
+recorded trades (or, without trade data, the intrabar price path and bar
+volume) reach them, after whatever was queued ahead of them at that price.
+Hedge-mode positions are margined cross with tiered maintenance margin and
+liquidated when equity falls below it. Every call is counted, costs
+`latency` seconds of simulated time and can be rejected by per-endpoint
+rate limits or randomly injected rate-limit errors.
+"""
+
+import functools
+import itertools
+import math
+import random
+from collections import Counter
+from typing import Callable, Dict, Optional, Union
+
+import ccxt
+
+from directionalscalper.core.backtest.matching import OrderBook
+from directionalscalper.core.exchanges.market_data import normalize_symbol
+from rate_limit import bybit_endpoint_group
+
+FUNDING_INTERVAL = 8 * 3600
+
+EPSILON = 1e-9
+
+# Bybit v5 endpoint behind each simulated call, for rate limit grouping
+ENDPOINTS = {
+    "create_order": "v5/order/create",
+    "privatePostV5OrderCreateBatch": "v5/order/create-batch",
+    "edit_order": "v5/order/amend",
+    "privatePostV5OrderAmendBatch": "v5/order/amend-batch",
+    "cancel_order": "v5/order/cancel",
+    "cancel_all_orders": "v5/order/cancel-all",
+    "privatePostV5OrderCancelBatch": "v5/order/cancel-batch",
+    "fetch_order": "v5/order/realtime",
+    "fetch_open_orders": "v5/order/realtime",
+    "fetch_closed_orders": "v5/order/history",
+    "fetch_my_trades": "v5/execution/list",
+    "fetch_positions": "v5/position/list",
+    "set_leverage": "v5/position/set-leverage",
+    "set_position_mode": "v5/position/switch-mode",
+    "set_margin_mode": "v5/account/set-margin-mode",
+    "fetch_balance": "v5/account/wallet-balance",
+}
+
+# Requests per second an account may make per endpoint group before Bybit
+# answers "Too many visits" (per UID; public endpoints are per IP)
+EXCHANGE_RATE_LIMITS = {
+    "public": 120,
+    "order_create": 10,
+    "order_amend": 10,
+    "order_cancel": 10,
+    "order_query": 50,
+    "position": 50,
+    "account": 50,
+    "general": 50,
+}
+
+_instances = itertools.count(1)
+
+
+def linear_market(market_id: str, tick_size: float, qty_step: float, min_qty: float,
+                  max_leverage: float = 50.0, maker: float = 0.0002, taker: float = 0.00055) -> dict:
+    """ccxt market structure of a USDT linear perpetual."""
+    quote = "USDT"
+    base = market_id[:-len(quote)] if market_id.endswith(quote) else market_id
+    return {
+        "id": market_id,
+        "symbol": f"{base}/{quote}:{quote}",
+        "base": base, "quote": quote, "settle": quote,
+        "baseId": base, "quoteId": quote, "settleId": quote,
+        "type": "swap", "spot": False, "swap": True, "future": False, "option": False,
+        "contract": True, "linear": True, "inverse": False, "active": True,
+        "contractSize": 1.0, "maker": maker, "taker": taker,
+        "precision": {"price": tick_size, "amount": qty_step},
+        "limits": {
+            "amount": {"min": min_qty, "max": None},
+            "price": {"min": tick_size, "max": None},
+            "cost": {"min": 5.0, "max": None},
+            "leverage": {"min": 1.0, "max": max_leverage},
+        },
+        "info": {
+            "symbol": market_id, "status": "Trading", "contractType": "LinearPerpetual",
+            "leverageFilter": {"minLeverage": "1", "maxLeverage": str(max_leverage), "leverageStep": "0.01"},
+            "priceFilter": {"tickSize": str(tick_size)},
+            "lotSizeFilter": {"qtyStep": str(qty_step), "minOrderQty": str(min_qty)},
+        },
+    }
+
+
+def leverage_tiers(max_leverage: float, first_tier: float = 200_000.0, count: int = 5) -> list:
+    """
+    Risk limit ladder in ccxt's leverage tier format: every tier doubles the
+    notional cap, halves the leverage and adds 0.5% maintenance margin.
+    """
+    tiers, floor = [], 0.0
+    for tier in range(count):
+        cap = first_tier * 2 ** tier
+        tiers.append({
+            "tier": tier + 1, "currency": "USDT", "minNotional": floor, "maxNotional": cap,
+            "maintenanceMarginRate": 0.005 * (tier + 1), "maxLeverage": max(1.0, max_leverage / 2 ** tier),
+            "info": {"id": str(tier + 1), "riskLimitValue": str(cap), "maintenanceMargin": str(0.005 * (tier + 1))},
+        })
+        floor = cap
+    return tiers
+
+
+class SimulatedExchange:
+    """
+    :param feeds: {market id: MarketFeed}
+    :param markets: {market id: ccxt market}, see linear_market()
+    :param clock: SimulatedClock shared with the code under test
+    :param funding_rate: constant rate per 8h, or a callable(timestamp) -> rate
+    :param latency: simulated seconds every API call takes
+    :param tiers: {market id: leverage tiers}, default leverage_tiers(max leverage)
+    :param rate_limits: {endpoint group: requests per second} enforced like the
+        exchange does (see EXCHANGE_RATE_LIMITS), None to not limit
+    :param error_rate: probability that any call fails with RateLimitExceeded
+    :param seed: seed of the error injection, so runs stay reproducible
+    """
+
+    def __init__(self, feeds: Dict, markets: Dict, clock, balance: float = 10_000.0,
+                 maker_fee: float = 0.0002, taker_fee: float = 0.00055,
+                 funding_rate: Union[float, Callable[[float], float]] = 0.0001, latency: float = 0.05,
+                 tiers: Optional[Dict] = None, rate_limits: Optional[Dict] = None,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.id = f"bybit-sim-{next(_instances)}"  # own instrument/candle caches per instance
+        self.options = {"defaultType": "swap"}
+        self.has = {
+            "fetchBalance": True, "fetchPositions": True, "fetchOpenOrders": True, "fetchOrderBook": True,
+            "fetchTicker": True, "fetchOHLCV": True, "createOrder": True, "cancelOrder": True,
+            "cancelAllOrders": True, "fetchLeverageTiers": True, "setLeverage": True,
+        }
+        self.enableRateLimit = False
+        self.rateLimit = 0
+        self.clock = clock
+        self.feeds = feeds
+        self.markets = {}
+        self.markets_by_id = {}
+        self.set_markets(list(markets.values()))
+
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.funding_rate = funding_rate
+        self.latency = latency
+        self.tiers = {
+            market_id: (tiers or {}).get(market_id) or leverage_tiers(markets[market_id]["limits"]["leverage"]["max"])
+            for market_id in markets
+        }
+        self.rate_limits = rate_limits
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.windows = {}  # endpoint group -> [window start, weight used]
+
+        self.wallet = float(balance)
+        self.leverage = {market_id: markets[market_id]["limits"]["leverage"]["max"] for market_id in markets}
+        self.hedged = set()
+        self.positions = {(market_id, side): self._empty_position() for market_id in markets for side in ("long", "short")}
+        self.books = {market_id: OrderBook() for market_id in markets}
+        self.orders = {}
+        self.link_ids = {}
+        self.fills = []
+        self.order_seq = itertools.count(1)
+
+        self.calls = Counter()
+        self.stats = Counter()  # placed / filled / cancelled / rejected / amended orders, fees, funding, realised, ...
+        self.matched_to = clock.now
+
+    # ── plumbing ─────────────────────────────────────────────────────────
+    @staticmethod
+    def _empty_position():
+        return {"qty": 0.0, "entry": 0.0, "cum_realised": 0.0, "updated": 0}
+
+    def _call(self, name: str, params: Optional[dict] = None):
+        self.calls[name] += 1
+        self.clock.advance(self.latency)
+        self.sync()
+        self._throttle(name, params)
+
+    def _throttle(self, name: str, params: Optional[dict]):
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats["rate_limited"] += 1
+            raise ccxt.RateLimitExceeded("bybit {\"retCode\":10006,\"retMsg\":\"Too many visits!\"}")
+        if not self.rate_limits:
+            return
+        path = ENDPOINTS.get(name, "v5/market/" + name)
+        group, weight = bybit_endpoint_group(path, "public" if path.startswith("v5/market/") else "private", params)
+        limit = self.rate_limits.get(group)
+        if limit is None:
+            return
+        window = self.windows.setdefault(group, [self.clock.now, 0])
+        if self.clock.now - window[0] >= 1.0:
+            window[0], window[1] = self.clock.now, 0
+        if window[1] + weight > limit:
+            self.stats["rate_limited"] += 1
+            raise ccxt.RateLimitExceeded("bybit {\"retCode\":10006,\"retMsg\":\"Too many visits!\"}")
+        window[1] += weight
+
+    def set_markets(self, markets):
+        for market in markets:
+            self.markets[market["symbol"]] = market
+            self.markets_by_id[market["id"]] = [market]
+        self.symbols = list(self.markets)
+        return self.markets
+
+    def resolve(self, symbol) -> dict:
+        if isinstance(symbol, (list, tuple)):
+            symbol = symbol[0]
+        market = self.markets.get(symbol)
+        if market is None:
+            entries = self.markets_by_id.get(normalize_symbol(symbol))
+            if not entries:
+                raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+            market = entries[0]
+        return market
+
+    def milliseconds(self) -> int:
+        return self.clock.milliseconds()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def iso8601(timestamp):
+        # Open orders and positions are reported again on every fetch with the same timestamps
+        return ccxt.Exchange.iso8601(timestamp)
+
+    def __getattr__(self, name):
+        raise AttributeError(f"SimulatedExchange does not implement {name}")
+
+    @property
+    def open_orders(self):
+        for book in self.books.values():
+            yield from book
+
+    # ── market state ─────────────────────────────────────────────────────
+    def price(self, market_id: str) -> float:
+        return self.feeds[market_id].price_at(self.clock.now)
+
+    def best_prices(self, market_id: str):
+        tick = self.markets_by_id[market_id][0]["precision"]["price"]
+        price = self.price(market_id)
+        bid = math.floor(price / tick) * tick
+        return round(bid, 12), round(bid + tick, 12)
+
+    def current_funding_rate(self, t: float) -> float:
+        return self.funding_rate(t) if callable(self.funding_rate) else float(self.funding_rate)
+
+    def sync(self):
+        """Bring fills, funding and liquidations up to the clock."""
+        now = self.clock.now
+        if now <= self.matched_to:
+            return
+        start = self.matched_to
+        next_funding = (math.floor(start / FUNDING_INTERVAL) + 1) * FUNDING_INTERVAL
+        while next_funding <= now:
+            self._match(start, next_funding)
+            self._settle_funding(next_funding)
+            start = next_funding
+            next_funding += FUNDING_INTERVAL
+        self._match(start, now)
+        self.matched_to = now
+        self._check_liquidation()
+
+    def revision(self) -> int:
+        """Changes whenever an order or a position did: placed, amended, cancelled or filled."""
+        return len(self.fills) + self.stats["placed"] + self.stats["amended"] + self.stats["cancelled"]
+
+    def next_fill_time(self, until: float) -> Optional[float]:
+        """Earliest time up to `until` at which the market reaches a resting order, None if it does not."""
+        now = self.clock.now
+        first = None
+        for market_id, book in self.books.items():
+            if not len(book):
+                continue
+            bid, ask = book.best("buy"), book.best("sell")
+            feed = self.feeds[market_id]
+            trades = feed.trades_between(now, until)
+            if trades is not None:
+                times, prices, _ = trades
+                when = next((
+                    when / 1000 for when, price in zip(times.tolist(), prices.tolist())
+                    if (bid is not None and price <= bid) or (ask is not None and price >= ask)
+                ), None)
+            else:
+                when = feed.first_touch(now, until, bid, ask)
+            if when is not None and (first is None or when < first):
+                first = when
+        return first
+
+    def _match(self, t0: float, t1: float):
+        if t1 <= t0:
+            return
+        for market_id, book in self.books.items():
+            if not len(book):
+                continue
+            trades = self.feeds[market_id].trades_between(t0, t1)
+            if trades is not None:
+                for when, price, amount in zip(*trades):
+                    self._match_trade(book, float(price), float(amount), when / 1000)
+            else:
+                self._match_path(market_id, book, t0, t1)
+
+    def _match_trade(self, book: OrderBook, price: float, amount: float, t: float):
+        """One recorded trade: it sweeps through better-priced resting orders, at its own price the queue goes first."""
+        left = amount
+        for order in book.crossed(price, price):
+            if left <= EPSILON:
+                break
+            if abs(order["price"] - price) <= EPSILON:
+                consumed = min(order["queue_ahead"], left)
+                order["queue_ahead"] -= consumed
+                left -= consumed
+                if left <= EPSILON:
+                    break
+            left -= self._fill(order, order["price"], min(left, order["qty"] - order["filled"]), maker=True, t=t)
+
+    def _match_path(self, market_id: str, book: OrderBook, t0: float, t1: float):
+        """
+        No trade data: orders the price moved through fill completely; at the
+        exact extreme the bar volume of the window first works off the queue
+        ahead of each order and then fills it.
+        """
+        feed = self.feeds[market_id]
+        low, high = feed.price_range(t0, t1)
+        touch_volume = {}
+        for order in book.crossed(low, high):
+            extreme = low if order["side"] == "buy" else high
+            remaining = order["qty"] - order["filled"]
+            if abs(order["price"] - extreme) > EPSILON:
+                self._fill(order, order["price"], remaining, maker=True, t=t1)
+                continue
+            key = (order["side"], order["price"])
+            left = touch_volume.setdefault(key, feed.traded_volume(t0, t1))
+            consumed = min(order["queue_ahead"], left)
+            order["queue_ahead"] -= consumed
+            left -= consumed
+            if left > EPSILON and order["queue_ahead"] <= EPSILON:
+                left -= self._fill(order, order["price"], min(left, remaining), maker=True, t=t1)
+            touch_volume[key] = left
+
+    def _settle_funding(self, t: float):
+        for (market_id, side), position in self.positions.items():
+            if position["qty"] <= 0:
+                continue
+            rate = self.current_funding_rate(t)
+            payment = position["qty"] * self.feeds[market_id].price_at(t) * rate
+            paid = payment if side == "long" else -payment
+            self.wallet -= paid
+            position["cum_realised"] -= paid
+            self.stats["funding"] += paid
+
+    # ── accounting ───────────────────────────────────────────────────────
+    @staticmethod
+    def _position_side(side: str, position_idx: int, reduce_only: bool) -> str:
+        if position_idx == 1:
+            return "long"
+        if position_idx == 2:
+            return "short"
+        if side == "buy":
+            return "short" if reduce_only else "long"
+        return "long" if reduce_only else "short"
+
+    def _fill(self, order: dict, price: float, qty: float, maker: bool, t: float) -> float:
+        """Execute qty of order at price; returns the quantity actually filled."""
+        position = self.positions[(order["market_id"], order["position_side"])]
+        closing = order["reduces"]
+        if closing:
+            qty = min(qty, position["qty"])
+            if qty <= EPSILON:
+                # Nothing left to reduce: the exchange cancels the rest
+                self._close_order(order, "canceled")
+                self.stats["cancelled"] += 1
+                return 0.0
+        if qty <= EPSILON:
+            return 0.0
+        fee_rate = self.maker_fee if maker else self.taker_fee
+        fee = price * qty * fee_rate
+        realised = 0.0
+        if closing:
+            direction = 1 if order["position_side"] == "long" else -1
+            realised = (price - position["entry"]) * qty * direction
+            position["qty"] -= qty
+            if position["qty"] <= EPSILON:
+                position["qty"], position["entry"] = 0.0, 0.0
+        else:
+            total = position["qty"] + qty
+            position["entry"] = (position["entry"] * position["qty"] + price * qty) / total
+            position["qty"] = total
+        position["cum_realised"] += realised - fee
+        position["updated"] = int(t * 1000)
+        self.wallet += realised - fee
+        self.stats["fees"] += fee
+        self.stats["realised"] += realised
+
+        order["filled"] += qty
+        order["cost"] += price * qty
+        order["fee"] += fee
+        order["updated"] = int(t * 1000)
+        self.fills.append({
+            "timestamp": int(t * 1000), "order_id": order["id"], "symbol": order["market_id"], "side": order["side"],
+            "position_side": order["position_side"], "qty": qty, "price": price, "fee": fee, "realised": realised,
+            "maker": maker,
+        })
+        if order["qty"] - order["filled"] <= EPSILON:
+            if order["status"] == "open":  # not a liquidation
+                self.stats["filled"] += 1
+            self._close_order(order, "closed")
+        return qty
+
+    def _close_order(self, order: dict, status: str):
+        if order["status"] == "open":
+            self.books[order["market_id"]].remove(order)
+        order["status"] = status
+        order["updated"] = self.clock.milliseconds()
+
+    def unrealised(self, market_id: str, side: str) -> float:
+        position = self.positions[(market_id, side)]
+        if position["qty"] <= 0:
+            return 0.0
+        direction = 1 if side == "long" else -1
+        return (self.price(market_id) - position["entry"]) * position["qty"] * direction
+
+    def equity(self) -> float:
+        return self.wallet + sum(self.unrealised(market_id, side) for market_id, side in self.positions)
+
+    def tier(self, market_id: str, notional: float) -> dict:
+        for tier in self.tiers[market_id]:
+            if notional <= tier["maxNotional"]:
+                return tier
+        return self.tiers[market_id][-1]
+
+    def risk_limit(self, market_id: str) -> float:
+        """Largest position notional the current leverage allows."""
+        allowed = [tier["maxNotional"] for tier in self.tiers[market_id] if tier["maxLeverage"] >= self.leverage[market_id]]
+        return max(allowed) if allowed else self.tiers[market_id][0]["maxNotional"]
+
+    def maintenance_margin(self) -> float:
+        margin = 0.0
+        for (market_id, side), position in self.positions.items():
+            if position["qty"] > 0:
+                notional = position["qty"] * self.price(market_id)
+                margin += notional * self.tier(market_id, notional)["maintenanceMarginRate"]
+        return margin
+
+    def used_margin(self) -> float:
+        margin = 0.0
+        for (market_id, side), position in self.positions.items():
+            if position["qty"] > 0:
+                margin += position["qty"] * self.price(market_id) / self.leverage[market_id]
+        for order in self.open_orders:
+            if not order["reduces"]:
+                margin += (order["qty"] - order["filled"]) * order["price"] / self.leverage[order["market_id"]]
+        return margin
+
+    def available(self) -> float:
+        return self.equity() - self.used_margin()
+
+    def liquidation_price(self, market_id: str, side: str) -> Optional[float]:
+        """Mark price at which cross-margin equity would drop to maintenance margin, other positions held still."""
+        position = self.positions[(market_id, side)]
+        qty = position["qty"]
+        if qty <= 0:
+            return None
+        notional = qty * self.price(market_id)
+        mmr = self.tier(market_id, notional)["maintenanceMarginRate"]
+        other_margin = self.maintenance_margin() - notional * mmr
+        buffer = self.equity() - self.unrealised(market_id, side) - other_margin
+        if side == "long":
+            price = (qty * position["entry"] - buffer) / (qty * (1 - mmr))
+        else:
+            price = (qty * position["entry"] + buffer) / (qty * (1 + mmr))
+        return max(price, 0.0)
+
+    def _check_liquidation(self):
+        if not any(position["qty"] > 0 for position in self.positions.values()):
+            return
+        if self.equity() > self.maintenance_margin():
+            return
+        # Cross margin: resting orders are cancelled and every position is taken over at its
+        # liquidation price (a gap past it is the insurance fund's loss, not the account's)
+        prices = {
+            key: self.liquidation_price(*key) for key, position in self.positions.items() if position["qty"] > 0
+        }
+        for order in list(self.open_orders):
+            self._close_order(order, "canceled")
+            self.stats["cancelled"] += 1
+        for (market_id, side), liquidation_price in prices.items():
+            position = self.positions[(market_id, side)]
+            mark = self.price(market_id)
+            price = max(mark, liquidation_price) if side == "long" else min(mark, liquidation_price)
+            liquidation = {
+                "id": f"liq-{next(self.order_seq)}", "market_id": market_id, "side": "sell" if side == "long" else "buy",
+                "position_side": side, "reduces": True, "qty": position["qty"], "filled": 0.0, "cost": 0.0, "fee": 0.0,
+                "status": "liquidation",
+            }
+            self._fill(liquidation, price, position["qty"], maker=False, t=self.clock.now)
+        self.stats["liquidations"] += 1
+
+    # ── orders ───────────────────────────────────────────────────────────
+    @staticmethod
+    def _reject(error_class, code: int, message: str):
+        return error_class(f"bybit {{\"retCode\":{code},\"retMsg\":\"{message}\"}}")
+
+    def _submit(self, market: dict, order_type: str, side: str, amount, price=None, params=None) -> dict:
+        params = params or {}
+        side = side.lower()
+        market_id = market["id"]
+        step = market["precision"]["amount"]
+        tick = market["precision"]["price"]
+        qty = round(math.floor(float(amount) / step + EPSILON) * step, 12)
+        if qty < market["limits"]["amount"]["min"]:
+            self.stats["rejected"] += 1
+            raise self._reject(ccxt.InvalidOrder, 10001, f"Order quantity {amount} below the lower limit")
+        link_id = params.get("orderLinkId") or params.get("clientOrderId")
+        if link_id and link_id in self.link_ids:
+            self.stats["rejected"] += 1
+            raise self._reject(ccxt.InvalidOrder, 110072, "OrderLinkedID is duplicate")
+
+        position_idx = int(params.get("positionIdx", 0) or 0)
+        reduce_only = bool(params.get("reduceOnly", False))
+        post_only = bool(params.get("postOnly", False)) or str(params.get("timeInForce", "")).lower() in ("postonly", "po")
+        position_side = self._position_side(side, position_idx, reduce_only)
+        reduces = (side == "sell") == (position_side == "long")
+        bid, ask = self.best_prices(market_id)
+        price = round(round(float(price) / tick) * tick, 12) if price is not None else (ask if side == "buy" else bid)
+
+        if reduce_only and not reduces:
+            self.stats["rejected"] += 1
+            raise self._reject(ccxt.InvalidOrder, 110017, "Reduce-only order has same side with current position")
+        if reduces and self.positions[(market_id, position_side)]["qty"] <= 0:
+            self.stats["rejected"] += 1
+            raise self._reject(ccxt.InvalidOrder, 110017, "current position is zero, cannot fix reduce-only order qty")
+        if not reduces:
+            exposure = self.positions[(market_id, position_side)]["qty"] * price + qty * price + sum(
+                (o["qty"] - o["filled"]) * o["price"] for o in self.books[market_id]
+                if not o["reduces"] and o["position_side"] == position_side
+            )
+            if exposure > self.risk_limit(market_id):
+                self.stats["rejected"] += 1
+                raise self._reject(ccxt.InvalidOrder, 110090, "Order would exceed the risk limit of the current leverage")
+            if qty * price / self.leverage[market_id] + qty * price * self.taker_fee > self.available():
+                self.stats["rejected"] += 1
+                raise self._reject(ccxt.InsufficientFunds, 110007, "ab not enough for new order")
+
+        now_ms = self.clock.milliseconds()
+        order = {
+            "id": str(next(self.order_seq)), "link_id": link_id or "", "seq": next(self.order_seq),
+            "market_id": market_id, "symbol": market["symbol"], "type": order_type, "side": side,
+            "price": price, "qty": qty, "filled": 0.0, "cost": 0.0, "fee": 0.0, "queue_ahead": 0.0,
+            "reduce_only": reduce_only, "reduces": reduces, "post_only": post_only,
+            "position_idx": position_idx, "position_side": position_side,
+            "status": "open", "created": now_ms, "updated": now_ms,
+        }
+        self.orders[order["id"]] = order
+        if link_id:
+            self.link_ids[link_id] = order["id"]
+        self.stats["placed"] += 1
+
+        if order_type == "market" or self._crosses(order):
+            if post_only:
+                # Bybit accepts the order and cancels it instead of letting it take
+                self.stats["rejected"] += 1
+                order["status"] = "canceled"
+                return order
+            self._take(order)
+            if order["status"] != "open":
+                return order
+            if order_type == "market":
+                # Whatever the visible book could not absorb is cancelled (IOC)
+                order["status"] = "canceled"
+                return order
+        order["queue_ahead"] = self._displayed_size(market_id, side, price)
+        self.books[market_id].add(order)
+        return order
+
+    def _crosses(self, order: dict) -> bool:
+        bid, ask = self.best_prices(order["market_id"])
+        book = self.books[order["market_id"]]
+        if order["side"] == "buy":
+            best = min(ask, book.best("sell") or math.inf)
+            return order["price"] >= best
+        best = max(bid, book.best("buy") or -math.inf)
+        return order["price"] <= best
+
+    def _displayed_size(self, market_id: str, side: str, price: float) -> float:
+        """Size the recorded book shows at price on our side: what is queued ahead of a new order there."""
+        book = self.feeds[market_id].order_book(self.clock.now)
+        tolerance = self.markets_by_id[market_id][0]["precision"]["price"] / 2
+        for level_price, size in book["bids" if side == "buy" else "asks"]:
+            if abs(level_price - price) <= tolerance:
+                return float(size)
+        return 0.0
+
+    def _take(self, order: dict):
+        """
+        Execute an aggressive order against the account's own resting orders
+        and the recorded book's opposite side, best price first; at equal
+        prices the recorded liquidity was there first.
+        """
+        market_id = order["market_id"]
+        side = order["side"]
+        limit = order["price"] if order["type"] == "limit" else None
+        book = self.feeds[market_id].order_book(self.clock.now)
+        levels = book["asks"] if side == "buy" else book["bids"]
+        candidates = [(float(p), 0, 0, None, float(size)) for p, size in levels]
+        candidates += [(o["price"], 1, o["seq"], o, None) for o in self.books[market_id].takeable(side, limit)]
+        direction = 1 if side == "buy" else -1
+        candidates.sort(key=lambda c: (direction * c[0], c[1], c[2]))
+        now = self.clock.now
+        for price, _, _, resting, size in candidates:
+            remaining = order["qty"] - order["filled"]
+            if remaining <= EPSILON or order["status"] != "open":
+                return
+            if limit is not None and direction * (price - limit) > EPSILON:
+                return
+            if resting is None:
+                self._fill(order, price, min(remaining, size), maker=False, t=now)
+            else:
+                # Both sides are this account (hedge mode): the resting order is the maker
+                qty = min(remaining, resting["qty"] - resting["filled"])
+                if resting["reduces"]:
+                    qty = min(qty, self.positions[(market_id, resting["position_side"])]["qty"])
+                if order["reduces"]:
+                    qty = min(qty, self.positions[(market_id, order["position_side"])]["qty"])
+                filled = self._fill(resting, price, qty, maker=True, t=now)
+                if filled > 0:
+                    self._fill(order, price, filled, maker=False, t=now)
+
+    def _order_structure(self, order: dict) -> dict:
+        remaining = order["qty"] - order["filled"] if order["status"] == "open" else 0.0
+        average = order["cost"] / order["filled"] if order["filled"] else None
+        bybit_status = {"open": "New", "closed": "Filled", "canceled": "Cancelled"}[order["status"]]
+        if order["filled"] and order["status"] != "closed":
+            bybit_status = "PartiallyFilled" if order["status"] == "open" else "PartiallyFilledCanceled"
+        return {
+            "id": order["id"], "clientOrderId": order["link_id"] or None,
+            "timestamp": order["created"], "datetime": self.iso8601(order["created"]),
+            "lastTradeTimestamp": order["updated"] if order["filled"] else None,
+            "symbol": order["symbol"], "type": order["type"], "side": order["side"],
+            "price": order["price"], "amount": order["qty"], "filled": order["filled"], "remaining": remaining,
+            "cost": order["cost"], "average": average, "status": order["status"],
+            "timeInForce": "PO" if order["post_only"] else "GTC", "postOnly": order["post_only"],
+            "reduceOnly": order["reduce_only"], "fee": {"cost": order["fee"], "currency": "USDT"}, "trades": [],
+            "info": {
+                "orderId": order["id"], "orderLinkId": order["link_id"], "symbol": order["market_id"],
+                "side": order["side"].capitalize(), "orderType": order["type"].capitalize(),
+                "price": str(order["price"]), "qty": str(order["qty"]), "cumExecQty": str(order["filled"]),
+                "leavesQty": str(remaining), "orderStatus": bybit_status, "reduceOnly": order["reduce_only"],
+                "positionIdx": order["position_idx"], "timeInForce": "PostOnly" if order["post_only"] else "GTC",
+                "createdTime": str(order["created"]), "updatedTime": str(order["updated"]),
+            },
+        }
+
+    def _find(self, order_id=None, link_id=None) -> Optional[dict]:
+        if order_id is None and link_id is not None:
+            order_id = self.link_ids.get(link_id)
+        return self.orders.get(str(order_id)) if order_id is not None else None
+
+    def create_order(self, symbol, type, side, amount, price=None, params={}):
+        self._call("create_order")
+        return self._order_structure(self._submit(self.resolve(symbol), type.lower(), side, amount, price, params))
+
+    def create_limit_order(self, symbol, side, amount, price, params={}):
+        return self.create_order(symbol, "limit", side, amount, price, params)
+
+    def create_market_order(self, symbol, side, amount, price=None, params={}):
+        return self.create_order(symbol, "market", side, amount, None, params)
+
+    def cancel_order(self, id, symbol=None, params={}):
+        self._call("cancel_order")
+        order = self._find(id, params.get("orderLinkId"))
+        if order is None or order["status"] != "open":
+            raise ccxt.OrderNotFound("bybit {\"retCode\":110001,\"retMsg\":\"Order does not exist\"}")
+        self._close_order(order, "canceled")
+        self.stats["cancelled"] += 1
+        return self._order_structure(order)
+
+    def cancel_all_orders(self, symbol=None, params={}):
+        self._call("cancel_all_orders")
+        market_id = self.resolve(symbol)["id"] if symbol else None
+        cancelled = []
+        for order in list(self.open_orders):
+            if market_id is None or order["market_id"] == market_id:
+                self._close_order(order, "canceled")
+                self.stats["cancelled"] += 1
+                cancelled.append(self._order_structure(order))
+        return cancelled
+
+    def edit_order(self, id, symbol, type, side, amount=None, price=None, params={}):
+        self._call("edit_order")
+        order = self._find(id)
+        if order is None or order["status"] != "open":
+            raise ccxt.OrderNotFound("bybit {\"retCode\":110001,\"retMsg\":\"Order does not exist\"}")
+        self._amend(order, price, amount)
+        return self._order_structure(order)
+
+    def _amend(self, order: dict, price=None, qty=None):
+        market = self.markets_by_id[order["market_id"]][0]
+        book = self.books[order["market_id"]]
+        new_price, new_qty = order["price"], order["qty"]
+        if price is not None:
+            tick = market["precision"]["price"]
+            new_price = round(round(float(price) / tick) * tick, 12)
+        if qty is not None:
+            step = market["precision"]["amount"]
+            new_qty = round(math.floor(float(qty) / step + EPSILON) * step, 12)
+            if new_qty <= order["filled"]:
+                raise self._reject(ccxt.InvalidOrder, 10001, "Amended qty must exceed the filled qty")
+        if new_price == order["price"] and new_qty == order["qty"]:
+            raise self._reject(ccxt.InvalidOrder, 10001, "The order remains unchanged as the parameters entered match the existing ones")
+
+        book.remove(order)
+        order["price"], order["qty"] = new_price, new_qty
+        order["seq"] = next(self.order_seq)  # an amended order loses its queue position
+        order["updated"] = self.clock.milliseconds()
+        self.stats["amended"] += 1
+        if self._crosses(order):
+            if order["post_only"]:
+                self._close_order(order, "canceled")
+                self.stats["rejected"] += 1
+                return
+            self._take(order)
+            if order["status"] != "open":
+                return
+        order["queue_ahead"] = self._displayed_size(order["market_id"], order["side"], new_price)
+        book.add(order)
+
+    def fetch_order(self, id, symbol=None, params={}):
+        self._call("fetch_order")
+        order = self._find(id, params.get("orderLinkId"))
+        if order is None:
+            raise ccxt.OrderNotFound("bybit {\"retCode\":110001,\"retMsg\":\"Order does not exist\"}")
+        return self._order_structure(order)
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params={}):
+        self._call("fetch_open_orders")
+        market_id = self.resolve(symbol)["id"] if symbol else None
+        books = [self.books[market_id]] if market_id else self.books.values()
+        return sorted((self._order_structure(order) for book in books for order in book), key=lambda o: o["timestamp"])
+
+    def fetch_closed_orders(self, symbol=None, since=None, limit=None, params={}):
+        self._call("fetch_closed_orders")
+        market_id = self.resolve(symbol)["id"] if symbol else None
+        closed = [
+            self._order_structure(o) for o in self.orders.values()
+            if o["status"] != "open" and (market_id is None or o["market_id"] == market_id)
+            and (since is None or o["updated"] >= since)
+        ]
+        return closed[-limit:] if limit else closed
+
+    def fetch_my_trades(self, symbol=None, since=None, limit=None, params={}):
+        self._call("fetch_my_trades")
+        market_id = self.resolve(symbol)["id"] if symbol else None
+        trades = [
+            {"id": f"{f['order_id']}-{n}", "order": f["order_id"], "timestamp": f["timestamp"],
+             "datetime": self.iso8601(f["timestamp"]), "symbol": self.markets_by_id[f["symbol"]][0]["symbol"],
+             "side": f["side"], "price": f["price"], "amount": f["qty"], "cost": f["price"] * f["qty"],
+             "takerOrMaker": "maker" if f["maker"] else "taker", "fee": {"cost": f["fee"], "currency": "USDT"}}
+            for n, f in enumerate(self.fills)
+            if (market_id is None or f["symbol"] == market_id) and (since is None or f["timestamp"] >= since)
+        ]
+        return trades[-limit:] if limit else trades
+
+    # Bybit v5 batch endpoints, as BybitExchange calls them through ccxt's implicit API
+    @staticmethod
+    def _batch_response(rows, codes):
+        return {
+            "retCode": 0, "retMsg": "OK",
+            "result": {"list": rows},
+            "retExtInfo": {"list": [{"code": code, "msg": msg} for code, msg in codes]},
+        }
+
+    @staticmethod
+    def _error_code(error: Exception):
+        text = str(error)
+        for code in ("110001", "110007", "110021", "110072"):
+            if code in text:
+                return int(code), text
+        return 10001, text
+
+    def privatePostV5OrderCreateBatch(self, params):
+        self._call("privatePostV5OrderCreateBatch", params)
+        rows, codes = [], []
+        for request in params.get("request", []):
+            try:
+                order = self._submit(
+                    self.resolve(request["symbol"]), request.get("orderType", "Limit").lower(), request["side"],
+                    request["qty"], request.get("price"),
+                    {"positionIdx": request.get("positionIdx", 0), "reduceOnly": request.get("reduceOnly", False),
+                     "timeInForce": request.get("timeInForce", "GTC"), "orderLinkId": request.get("orderLinkId")},
+                )
+                rows.append({"category": params.get("category"), "symbol": request["symbol"],
+                             "orderId": order["id"], "orderLinkId": order["link_id"], "createAt": str(order["created"])})
+                codes.append((0, "OK"))
+            except ccxt.BaseError as e:
+                rows.append({"category": params.get("category"), "symbol": request["symbol"], "orderId": "",
+                             "orderLinkId": request.get("orderLinkId", ""), "createAt": ""})
+                codes.append(self._error_code(e))
+        return self._batch_response(rows, codes)
+
+    def privatePostV5OrderCancelBatch(self, params):
+        self._call("privatePostV5OrderCancelBatch", params)
+        rows, codes = [], []
+        for request in params.get("request", []):
+            order = self._find(request.get("orderId"), request.get("orderLinkId"))
+            if order is None or order["status"] != "open":
+                rows.append({"category": params.get("category"), "symbol": request["symbol"],
+                             "orderId": request.get("orderId", ""), "orderLinkId": request.get("orderLinkId", "")})
+                codes.append((110001, "Order does not exist"))
+                continue
+            self._close_order(order, "canceled")
+            self.stats["cancelled"] += 1
+            rows.append({"category": params.get("category"), "symbol": request["symbol"],
+                         "orderId": order["id"], "orderLinkId": order["link_id"]})
+            codes.append((0, "OK"))
+        return self._batch_response(rows, codes)
+
+    def privatePostV5OrderAmendBatch(self, params):
+        self._call("privatePostV5OrderAmendBatch", params)
+        rows, codes = [], []
+        for request in params.get("request", []):
+            order = self._find(request.get("orderId"), request.get("orderLinkId"))
+            row = {"category": params.get("category"), "symbol": request["symbol"],
+                   "orderId": request.get("orderId", ""), "orderLinkId": request.get("orderLinkId", "")}
+            rows.append(row)
+            if order is None or order["status"] != "open":
+                codes.append((110001, "Order does not exist"))
+                continue
+            try:
+                self._amend(order, request.get("price"), request.get("qty"))
+                row["orderId"], row["orderLinkId"] = order["id"], order["link_id"]
+                codes.append((0, "OK"))
+            except ccxt.BaseError as e:
+                codes.append(self._error_code(e))
+        return self._batch_response(rows, codes)
+
+    # ── account ──────────────────────────────────────────────────────────
+    def _position_structure(self, market_id: str, side: str) -> dict:
+        position = self.positions[(market_id, side)]
+        market = self.markets_by_id[market_id][0]
+        qty = position["qty"]
+        mark = self.price(market_id)
+        upnl = self.unrealised(market_id, side)
+        leverage = self.leverage[market_id]
+        margin = qty * mark / leverage if qty else 0.0
+        liquidation = self.liquidation_price(market_id, side)
+        mmr = self.tier(market_id, qty * mark)["maintenanceMarginRate"]
+        return {
+            "symbol": market["symbol"], "side": side, "contracts": qty, "contractSize": 1.0,
+            "entryPrice": position["entry"] or None, "markPrice": mark, "notional": qty * mark,
+            "leverage": leverage, "unrealizedPnl": upnl, "percentage": upnl / margin * 100 if margin else 0.0,
+            "initialMargin": margin, "maintenanceMargin": qty * mark * mmr,
+            "maintenanceMarginPercentage": mmr, "liquidationPrice": liquidation, "marginMode": "cross", "hedged": True,
+            "timestamp": position["updated"], "datetime": self.iso8601(position["updated"]) if position["updated"] else None,
+            "info": {
+                "symbol": market_id, "side": ("Buy" if side == "long" else "Sell") if qty else "",
+                "size": str(qty), "avgPrice": str(position["entry"]), "liqPrice": str(liquidation) if liquidation is not None else "", "markPrice": str(mark),
+                "positionValue": str(qty * position["entry"]), "unrealisedPnl": str(upnl),
+                "cumRealisedPnl": str(position["cum_realised"]), "leverage": str(leverage),
+                "positionIdx": 1 if side == "long" else 2, "tradeMode": 0,
+                "updatedTime": str(position["updated"]),
+            },
+        }
+
+    def fetch_positions(self, symbols=None, params={}):
+        self._call("fetch_positions")
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        if symbols:
+            # Asked for by symbol, Bybit lists both hedge-mode sides, empty or not
+            market_ids = [self.resolve(s)["id"] for s in symbols]
+            return [self._position_structure(market_id, side) for market_id in market_ids for side in ("long", "short")]
+        return [
+            self._position_structure(market_id, side)
+            for (market_id, side), position in self.positions.items() if position["qty"] > 0
+        ]
+
+    def fetch_balance(self, params={}):
+        self._call("fetch_balance")
+        equity = self.equity()
+        free = self.available()
+        upnl = equity - self.wallet
+        return {
+            "info": {"retCode": 0, "result": {"list": [{
+                "accountType": "UNIFIED", "totalEquity": str(equity), "totalWalletBalance": str(self.wallet),
+                "totalAvailableBalance": str(free), "totalPerpUPL": str(upnl),
+                "coin": [{"coin": "USDT", "equity": str(equity), "walletBalance": str(self.wallet),
+                          "availableToWithdraw": str(free), "unrealisedPnl": str(upnl)}],
+            }]}},
+            "USDT": {"free": free, "used": equity - free, "total": equity},
+            "free": {"USDT": free}, "used": {"USDT": equity - free}, "total": {"USDT": equity},
+        }
+
+    def set_leverage(self, leverage, symbol=None, params={}):
+        self._call("set_leverage")
+        market = self.resolve(symbol)
+        leverage = float(leverage)
+        if not 1 <= leverage <= market["limits"]["leverage"]["max"]:
+            raise self._reject(ccxt.BadRequest, 10001, f"leverage {leverage:g} out of range")
+        if leverage == self.leverage[market["id"]]:
+            raise self._reject(ccxt.BadRequest, 110043, "Set leverage not modified")
+        self.leverage[market["id"]] = leverage
+        return {"retCode": 0, "retMsg": "OK"}
+
+    def set_margin_mode(self, marginMode, symbol=None, params={}):
+        self._call("set_margin_mode")
+        return {"retCode": 110026, "retMsg": "Cross/isolated margin mode is not modified"}
+
+    def set_position_mode(self, hedged, symbol=None, params={}):
+        self._call("set_position_mode")
+        if not hedged:
+            raise ccxt.NotSupported("SimulatedExchange only models hedge mode (both sides)")
+        market_ids = [self.resolve(symbol)["id"]] if symbol else list(self.markets_by_id)
+        if all(market_id in self.hedged for market_id in market_ids):
+            raise self._reject(ccxt.BadRequest, 110025, "Position mode is not modified")
+        self.hedged.update(market_ids)
+        return {"retCode": 0, "retMsg": "OK"}
+
+    # ── market data ──────────────────────────────────────────────────────
+    def load_markets(self, reload=False, params={}):
+        return self.markets
+
+    def fetch_markets(self, params={}):
+        self._call("fetch_markets")
+        return list(self.markets.values())
+
+    def market(self, symbol):
+        return self.resolve(symbol)
+
+    def price_to_precision(self, symbol, price):
+        tick = self.resolve(symbol)["precision"]["price"]
+        decimals = max(0, -int(math.floor(math.log10(tick))))
+        return f"{round(float(price) / tick) * tick:.{decimals}f}"
+
+    def amount_to_precision(self, symbol, amount):
+        step = self.resolve(symbol)["precision"]["amount"]
+        decimals = max(0, -int(math.floor(math.log10(step))))
+        return f"{math.floor(float(amount) / step + 1e-9) * step:.{decimals}f}"
+
+    def fetch_ticker(self, symbol, params={}):
+        self._call("fetch_ticker")
+        market = self.resolve(symbol)
+        feed = self.feeds[market["id"]]
+        now = self.clock.now
+        bid, ask = self.best_prices(market["id"])
+        day = feed.ohlcv("1d", now, limit=1)[-1]
+        last = self.price(market["id"])
+        return {
+            "symbol": market["symbol"], "timestamp": self.clock.milliseconds(), "datetime": self.iso8601(self.clock.milliseconds()),
+            "bid": bid, "ask": ask, "last": last, "close": last, "open": day[1], "high": day[2], "low": day[3],
+            "baseVolume": day[5], "quoteVolume": day[5] * last,
+            "info": {"symbol": market["id"], "bid1Price": str(bid), "ask1Price": str(ask), "lastPrice": str(last),
+                     "markPrice": str(last), "fundingRate": str(self.current_funding_rate(now))},
+        }
+
+    def fetch_tickers(self, symbols=None, params={}):
+        return {m["symbol"]: self.fetch_ticker(m["symbol"]) for m in (self.resolve(s) for s in (symbols or self.symbols))}
+
+    def fetch_order_book(self, symbol, limit=None, params={}):
+        self._call("fetch_order_book")
+        market = self.resolve(symbol)
+        book = self.feeds[market["id"]].order_book(self.clock.now, limit)
+        return {"symbol": market["symbol"], "bids": book["bids"], "asks": book["asks"],
+                "timestamp": book["timestamp"], "datetime": self.iso8601(book["timestamp"]), "nonce": None}
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params={}):
+        self._call("fetch_ohlcv")
+        market = self.resolve(symbol)
+        return self.feeds[market["id"]].ohlcv(timeframe, self.clock.now, since, limit)
+
+    def fetch_trades(self, symbol, since=None, limit=None, params={}):
+        self._call("fetch_trades")
+        return self.feeds[self.resolve(symbol)["id"]].recent_trades(self.clock.now, since, limit)
+
+    def fetch_funding_rate(self, symbol, params={}):
+        self._call("fetch_funding_rate")
+        market = self.resolve(symbol)
+        now = self.clock.now
+        next_funding = (math.floor(now / FUNDING_INTERVAL) + 1) * FUNDING_INTERVAL
+        return {"symbol": market["symbol"], "fundingRate": self.current_funding_rate(now),
+                "fundingTimestamp": int(next_funding * 1000), "nextFundingTimestamp": int(next_funding * 1000)}
+
+    def fetch_derivatives_market_leverage_tiers(self, symbol, params={}):
+        self._call("fetch_derivatives_market_leverage_tiers")
+        return [dict(tier) for tier in self.tiers[self.resolve(symbol)["id"]]]
+
+    def fetch_market_leverage_tiers(self, symbol, params={}):
+        return self.fetch_derivatives_market_leverage_tiers(symbol, params)
+
+    def fetch_leverage_tiers(self, symbols=None, params={}):
+        return {self.resolve(s)["symbol"]: self.fetch_derivatives_market_leverage_tiers(s) for s in (symbols or self.symbols)}
@@ -73,6 +73,11 @@ class ConfigInitializer:
             strategy_instance.sticky_size_use_orderbook = config.linear_grid.get('sticky_size_use_orderbook', True)
             strategy_instance.sticky_size_min_volume_ratio = config.linear_grid.get('sticky_size_min_volume_ratio', 0.2)
 
+            # Grid reconciliation (amend in place instead of cancel-all-then-replace)
+            strategy_instance.grid_reconcile = config.linear_grid.get('grid_reconcile', True)
+            strategy_instance.grid_reconcile_price_tolerance = config.linear_grid.get('grid_reconcile_price_tolerance', 0.0005)
+            strategy_instance.grid_reconcile_qty_tolerance = config.linear_grid.get('grid_reconcile_qty_tolerance', 0.1)
+
             
             # Non-linear-grid config
             strategy_instance.upnl_threshold_pct = config.upnl_threshold_pct
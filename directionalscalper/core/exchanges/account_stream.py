@@ -0,0 +1,244 @@
+import hmac
+import time
+import queue
+import hashlib
+import threading
+import traceback
+from typing import Optional, List
+
+from rate_limit import get_rate_limiter
+from directionalscalper.core.exchanges.market_data import normalize_symbol
+from directionalscalper.core.exchanges.ws_stream import WebSocketStream
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="AccountStream", filename="AccountStream.log", stream=True)
+
+BYBIT_PRIVATE_WS_URL = "wss://stream.bybit.com/v5/private"
+
+TERMINAL_ORDER_STATUSES = {"Filled", "Cancelled", "Rejected", "Deactivated", "PartiallyFilledCanceled"}
+
+
+class AccountState:
+    """
+    Authoritative in-memory view of positions, open orders and wallet balance,
+    seeded from REST and kept current by the private stream.
+
+    Positions and orders are stored already parsed through ccxt so readers get
+    the same shapes the REST getters return. Strategy threads can register a
+    listener queue to be woken on fills/position changes instead of polling.
+    """
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.lock = threading.Lock()
+        self.positions = {}
+        self.orders = {}
+        self.wallet = None
+        self.live = False
+        self.seeded_at = 0.0
+        self.last_update_at = 0.0
+        self.listeners = []
+
+    # ── listeners ────────────────────────────────────────────────────────
+    def register_listener(self, symbol: Optional[str] = None) -> queue.Queue:
+        """Return a queue receiving `{"kind", "symbol", "data"}` events, optionally for one symbol."""
+        events = queue.Queue()
+        with self.lock:
+            self.listeners.append((normalize_symbol(symbol) if symbol else None, events))
+        return events
+
+    def unregister_listener(self, events: queue.Queue):
+        with self.lock:
+            self.listeners = [(s, q) for s, q in self.listeners if q is not events]
+
+    def _notify(self, kind: str, market_id: Optional[str], data):
+        with self.lock:
+            listeners = list(self.listeners)
+        event = {"kind": kind, "symbol": market_id, "data": data}
+        for symbol, events in listeners:
+            if symbol is None or market_id is None or symbol == market_id:
+                events.put(event)
+
+    # ── seeding ──────────────────────────────────────────────────────────
+    def seed_from_rest(self):
+        """Replace the in-memory view with a fresh REST snapshot."""
+        try:
+            self._rest("public", self.exchange.load_markets)
+            positions = self._rest("position", self.exchange.fetch_positions, params={'limit': 200})
+            orders = self._rest("order_query", self.exchange.fetch_open_orders)
+            balance = self._rest("account", self.exchange.fetch_balance, {'type': 'swap'})
+        except Exception as e:
+            logging.info(f"Error seeding account state from REST: {e}")
+            logging.debug(traceback.format_exc())
+            return False
+
+        account_list = balance.get('info', {}).get('result', {}).get('list', [])
+        with self.lock:
+            self.positions = {}
+            for position in positions:
+                if float(position.get('contracts') or 0) != 0:
+                    self.positions[self._position_key(position)] = position
+            self.orders = {order['id']: order for order in orders}
+            self.wallet = account_list[0] if account_list else None
+            self.seeded_at = self.last_update_at = time.time()
+        logging.info(f"Account state seeded: {len(self.positions)} positions, {len(self.orders)} open orders")
+        return True
+
+    def _rest(self, group: str, call, *args, **kwargs):
+        # A client hooked by install_rate_limits is already charged per request
+        if not getattr(self.exchange, "_shared_rate_limits", False):
+            get_rate_limiter(group).acquire()
+        return call(*args, **kwargs)
+
+    def set_live(self, live: bool):
+        self.live = live
+
+    def is_live(self) -> bool:
+        return self.live and self.seeded_at > 0
+
+    # ── ingestion ────────────────────────────────────────────────────────
+    def handle_message(self, message: dict):
+        """Apply a single decoded Bybit v5 private stream frame."""
+        topic = message.get("topic")
+        if not topic:
+            return
+        data = message.get("data") or []
+        if topic == "position":
+            for raw in data:
+                self._apply_position(raw)
+        elif topic == "order":
+            for raw in data:
+                self._apply_order(raw)
+        elif topic == "execution":
+            for raw in data:
+                self._notify("execution", raw.get("symbol"), raw)
+        elif topic == "wallet":
+            for raw in data:
+                with self.lock:
+                    self.wallet = raw
+                    self.last_update_at = time.time()
+                self._notify("wallet", None, raw)
+
+    @staticmethod
+    def _position_key(position: dict):
+        info = position.get('info', {})
+        return normalize_symbol(info.get('symbol') or position['symbol']), int(info.get('positionIdx', 0))
+
+    def _apply_position(self, raw: dict):
+        if raw.get('category') not in (None, 'linear'):
+            return
+        raw = dict(raw)
+        # The stream reports entryPrice where the REST payload has avgPrice
+        if not raw.get('avgPrice'):
+            raw['avgPrice'] = raw.get('entryPrice')
+        position = self.exchange.parse_position(raw)
+        key = normalize_symbol(raw['symbol']), int(raw.get('positionIdx', 0))
+        with self.lock:
+            if float(raw.get('size') or 0) == 0:
+                self.positions.pop(key, None)
+            else:
+                self.positions[key] = position
+            self.last_update_at = time.time()
+        self._notify("position", key[0], position)
+
+    def _apply_order(self, raw: dict):
+        if raw.get('category') not in (None, 'linear'):
+            return
+        order = self.exchange.parse_order(raw)
+        with self.lock:
+            if raw.get('orderStatus') in TERMINAL_ORDER_STATUSES:
+                self.orders.pop(raw['orderId'], None)
+            else:
+                self.orders[raw['orderId']] = order
+            self.last_update_at = time.time()
+        self._notify("order", normalize_symbol(raw['symbol']), order)
+
+    # ── reads (same shapes as the REST getters) ──────────────────────────
+    def get_open_positions(self) -> List[dict]:
+        with self.lock:
+            return list(self.positions.values())
+
+    def get_open_orders(self, symbol: str) -> List[dict]:
+        market_id = normalize_symbol(symbol)
+        with self.lock:
+            return [order for order in self.orders.values() if normalize_symbol(order['symbol']) == market_id]
+
+    def get_total_balance(self, currency: str):
+        with self.lock:
+            wallet = self.wallet
+        if wallet is None:
+            return None
+        if currency == 'all':
+            return wallet.get('totalWalletBalance')
+        coin = self._coin(wallet, currency)
+        return float(coin['walletBalance']) if coin and coin.get('walletBalance') else None
+
+    def get_available_balance(self, currency: str) -> Optional[float]:
+        with self.lock:
+            wallet = self.wallet
+        if wallet is None:
+            return None
+        if currency == 'all':
+            value = wallet.get('totalAvailableBalance')
+            return float(value) if value not in (None, '') else None
+        coin = self._coin(wallet, currency)
+        if not coin:
+            return None
+        # Same order as the REST getter: ccxt's parsed `free`, then walletBalance
+        free = self.exchange.parse_balance({'result': {'list': [wallet]}}).get('free') or {}
+        value = free.get(currency)
+        if value is None:
+            value = coin.get('walletBalance')
+        return float(value) if value not in (None, '') else None
+
+    @staticmethod
+    def _coin(wallet: dict, currency: str) -> Optional[dict]:
+        for coin in wallet.get('coin', []):
+            if coin.get('coin') == currency:
+                return coin
+        return None
+
+
+class BybitPrivateFeed(WebSocketStream):
+    """
+    Authenticated Bybit v5 private stream (position/order/execution/wallet)
+    feeding an AccountState. Each (re)connect re-seeds the state from REST so
+    nothing missed while disconnected is lost.
+    """
+
+    name = "BybitPrivateFeed"
+    topics = ["position", "order", "execution", "wallet"]
+
+    def __init__(self, state: AccountState, api_key: str, secret_key: str, url: str = BYBIT_PRIVATE_WS_URL,
+                 ping_interval: int = 20, reconnect_delay: int = 5):
+        super().__init__(url, ping_interval, reconnect_delay)
+        self.state = state
+        self.api_key = api_key
+        self.secret_key = secret_key
+
+    def auth_payload(self) -> dict:
+        expires = int((time.time() + 10) * 1000)
+        signature = hmac.new(
+            self.secret_key.encode("utf-8"),
+            f"GET/realtime{expires}".encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+        return {"op": "auth", "args": [self.api_key, expires, signature]}
+
+    async def on_open(self, ws):
+        await ws.send_json(self.auth_payload())
+        await ws.send_json({"op": "subscribe", "args": self.topics})
+        # Seed after subscribing so updates racing the snapshot are not lost
+        loop = self.loop
+        seeded = await loop.run_in_executor(None, self.state.seed_from_rest)
+        self.state.set_live(seeded)
+
+    def on_message(self, message: dict):
+        if message.get("op") == "auth" and not message.get("success", False):
+            logging.info(f"[{self.name}] Authentication failed: {message.get('ret_msg')}")
+            self.state.set_live(False)
+            return
+        self.state.handle_message(message)
+
+    def on_disconnect(self):
+        self.state.set_live(False)
@@ -9,13 +9,16 @@ from ccxt.base.errors import RateLimitExceeded, NetworkError
 import ccxt
 import traceback
 from directionalscalper.core.strategies.logger import Logger
+from directionalscalper.core.exchanges.account_stream import AccountState, BybitPrivateFeed
+from directionalscalper.core.exchanges.instrument_cache import get_instrument_cache
 
-from rate_limit import RateLimit
+from rate_limit import get_rate_limiter
+from directionalscalper.core.tracing import traced
 
 logging = Logger(logger_name="BybitExchange", filename="BybitExchange.log", stream=True)
 
 class BybitExchange(Exchange):
-    def __init__(self, api_key, secret_key, passphrase=None, market_type='swap', collateral_currency='USDT'):
+    def __init__(self, api_key, secret_key, passphrase=None, market_type='swap', collateral_currency='USDT', client=None):
         """
         Initialize the BybitExchange class.
 
@@ -24,22 +27,47 @@ class BybitExchange(Exchange):
         :param passphrase
         :param market_type: Type of market ('swap' or 'spot'). Default is 'swap'.
         :param collateral_currency: Currency used as collateral for trading. Default is 'USDT'. If set to 'all', it will use the total available balance.
+        :param client: Optional ccxt-compatible client to use instead of creating a live one.
         """
 
         if market_type == 'spot':
-            super().__init__('bybit', api_key, secret_key, passphrase, market_type)
+            super().__init__('bybit', api_key, secret_key, passphrase, market_type, client=client)
         else:
-            super().__init__('bybit', api_key, secret_key, passphrase, market_type)
+            super().__init__('bybit', api_key, secret_key, passphrase, market_type, client=client)
 
         self.max_retries = 100  # Maximum retries for rate-limited requests
         self.retry_wait = 5  # Seconds to wait between retries
         self.last_active_long_order_time = {}
         self.last_active_short_order_time = {}
         self.last_active_time = {}
-        self.rate_limiter = RateLimit(10, 1)
-        self.general_rate_limiter = RateLimit(50, 1)
-        self.order_rate_limiter = RateLimit(5, 1) 
+        self.rate_limiter = get_rate_limiter("order_query")
+        self.general_rate_limiter = get_rate_limiter("general")
+        self.order_rate_limiter = get_rate_limiter("order_create")
         self.collateral_currency = collateral_currency
+        self.account_state = None
+        self.account_feed = None
+        self.instruments = get_instrument_cache(self.exchange)
+
+    def configure_instrument_cache(self, refresh_interval=None, persist_path=None):
+        """Set the refresh schedule / on-disk location of the shared instrument cache."""
+        self.instruments = get_instrument_cache(self.exchange, refresh_interval, persist_path)
+        return self.instruments
+
+    def start_account_stream(self):
+        """
+        Start the private position/order/execution/wallet stream. While it is
+        live the position, order and balance getters read from memory instead
+        of REST; they fall back to REST whenever the stream is down.
+        """
+        if self.account_state is not None:
+            return self.account_state
+        self.account_state = AccountState(self.exchange)
+        self.account_feed = BybitPrivateFeed(self.account_state, self.api_key, self.secret_key)
+        self.account_feed.start()
+        return self.account_state
+
+    def account_stream_live(self) -> bool:
+        return self.account_state is not None and self.account_state.is_live()
 
     def log_order_active_times(self):
         try:
@@ -96,21 +124,18 @@ class BybitExchange(Exchange):
     def get_market_data_bybit(self, symbol: str) -> dict:
         values = {"precision": 0.0, "leverage": 0.0, "min_qty": 0.0}
         try:
-            time.sleep(1)  # Adding a fixed delay of 1 second to avoid hitting the rate limit
-            with self.general_rate_limiter:
-                self.exchange.load_markets()
-                symbol_data = self.exchange.market(symbol)
-                
-                if "info" in symbol_data:
-                    values["precision"] = symbol_data["precision"]["price"]
-                    values["min_qty"] = symbol_data["limits"]["amount"]["min"]
-
-                # Fetch positions
-                positions = self.exchange.fetch_positions()
-
-                for position in positions:
-                    if position['symbol'] == symbol:
-                        values["leverage"] = float(position['leverage'])
+            symbol_data = self.instruments.market(symbol)
+
+            if symbol_data and "info" in symbol_data:
+                values["precision"] = symbol_data["precision"]["price"]
+                values["min_qty"] = symbol_data["limits"]["amount"]["min"]
+
+            # Open positions come from the shared cache / account stream
+            positions = self.get_all_open_positions_bybit()
+
+            for position in positions:
+                if position['symbol'] == symbol or position.get('info', {}).get('symbol') == symbol:
+                    values["leverage"] = float(position['leverage'])
 
         except Exception as e:
             logging.info(f"An unknown error occurred in get_market_data_bybit(): {e}")
@@ -145,7 +170,12 @@ class BybitExchange(Exchange):
     #     return values
 
     def get_best_bid_ask_bybit(self, symbol):
-        orderbook = self.exchange.get_orderbook(symbol)
+        if self.market_data is not None:
+            best_bid_price, best_ask_price = self.market_data.get_best_bid_ask(symbol)
+            if best_bid_price is not None and best_ask_price is not None:
+                return best_bid_price, best_ask_price
+
+        orderbook = self.get_orderbook(symbol)
         try:
             best_ask_price = orderbook['asks'][0][0]
         except IndexError:
@@ -237,6 +267,7 @@ class BybitExchange(Exchange):
 
     #     return None
 
+    @traced()
     def get_available_balance_bybit(self):
         """
         Fetch the available balance for either:
@@ -247,6 +278,11 @@ class BybitExchange(Exchange):
         may be None or missing for unified margin accounts, requiring us
         to parse 'coin' array from the raw 'info' section.
         """
+        if self.account_stream_live():
+            available_balance = self.account_state.get_available_balance(self.collateral_currency)
+            if available_balance is not None:
+                return available_balance
+
         if not self.exchange.has.get('fetchBalance', False):
             logging.warning("Exchange does not support fetchBalance")
             return None
@@ -328,6 +364,7 @@ class BybitExchange(Exchange):
 
         return None
     
+    @traced()
     def create_limit_order_bybit(self, symbol: str, side: str, qty: float, price: float, positionIdx=0, params={}):
         try:
             if side == "buy" or side == "sell":
@@ -374,6 +411,7 @@ class BybitExchange(Exchange):
             logging.info(f"An error occurred while creating limit order on Bybit: {e}")
             return None
         
+    @traced()
     def create_tagged_limit_order_bybit(self, symbol: str, side: str, qty: float, price: float, positionIdx=0, isLeverage=False, orderLinkId=None, postOnly=True, params={}):
         try:
             # Directly prepare the parameters required by the `create_order` method
@@ -417,7 +455,178 @@ class BybitExchange(Exchange):
             logging.info(f"An error occurred in create_tagged_limit_order_bybit() for {symbol}: {e}")
             return {"error": str(e)}
 
-        
+
+    def _batch_size_bybit(self, symbol):
+        # Bybit v5 takes up to 20 orders per batch request for linear/inverse, 10 otherwise
+        market = self.instruments.market(symbol)
+        return 20 if market and market.get('contract') else 10
+
+    def _batch_category_bybit(self, symbol):
+        market = self.instruments.market(symbol) or self.exchange.market(symbol)
+        if market.get('spot'):
+            return 'spot'
+        return 'inverse' if market.get('inverse') else 'linear'
+
+    @staticmethod
+    def _batch_results(requests_chunk, response):
+        """Pair every request of a batch with its own result / error code."""
+        result_list = (response.get('result') or {}).get('list') or []
+        codes = (response.get('retExtInfo') or {}).get('list') or []
+        results = []
+        for i, request in enumerate(requests_chunk):
+            row = result_list[i] if i < len(result_list) else {}
+            code = codes[i] if i < len(codes) else {"code": response.get('retCode', 0), "msg": response.get('retMsg', '')}
+            ret_code = int(code.get('code', 0) or 0)
+            results.append({
+                "ok": ret_code == 0,
+                "id": row.get('orderId') or None,
+                "orderLinkId": row.get('orderLinkId') or request.get('orderLinkId'),
+                "code": ret_code,
+                "msg": code.get('msg', ''),
+                "request": request,
+            })
+        return results
+
+    @traced()
+    def create_limit_orders_batch_bybit(self, symbol: str, orders: list, postOnly=True):
+        """
+        Place several limit orders for one symbol through Bybit's batch endpoint.
+
+        :param orders: dicts with side, qty, price and optional positionIdx,
+                       orderLinkId, reduceOnly.
+        :return: one result per input order, in order: {"ok", "id",
+                 "orderLinkId", "code", "msg", "request"}. A rejected order
+                 does not affect the others in the batch.
+        """
+        if not orders:
+            return []
+        market = self.instruments.market(symbol) or self.exchange.market(symbol)
+        category = self._batch_category_bybit(symbol)
+        batch_size = self._batch_size_bybit(symbol)
+        requests_list = []
+        for order in orders:
+            request = {
+                "symbol": market['id'],
+                "side": order['side'].capitalize(),
+                "orderType": "Limit",
+                "qty": self.exchange.amount_to_precision(market['symbol'], order['qty']),
+                "price": self.exchange.price_to_precision(market['symbol'], order['price']),
+                "timeInForce": "PostOnly" if postOnly else "GTC",
+            }
+            if category != 'spot':
+                request["positionIdx"] = order.get('positionIdx', 0)
+            if order.get('orderLinkId'):
+                request["orderLinkId"] = order['orderLinkId']
+            if order.get('reduceOnly'):
+                request["reduceOnly"] = True
+            requests_list.append(request)
+
+        results = []
+        for start in range(0, len(requests_list), batch_size):
+            chunk = requests_list[start:start + batch_size]
+            try:
+                response = self.exchange.privatePostV5OrderCreateBatch({"category": category, "request": chunk})
+                results.extend(self._batch_results(chunk, response))
+            except Exception as e:
+                logging.info(f"Batch order placement failed for {symbol} ({len(chunk)} orders): {e}")
+                results.extend({"ok": False, "id": None, "orderLinkId": r.get('orderLinkId'), "code": None, "msg": str(e), "request": r} for r in chunk)
+
+        placed_sides = {r['request']['side'].lower() for r in results if r['ok']}
+        current_time = time.time()
+        if 'buy' in placed_sides:
+            self.last_active_long_order_time[symbol] = current_time
+        if 'sell' in placed_sides:
+            self.last_active_short_order_time[symbol] = current_time
+
+        failed = [r for r in results if not r['ok']]
+        logging.info(f"Batch placed {len(results) - len(failed)}/{len(results)} orders for {symbol}")
+        for r in failed:
+            logging.info(f"Batch order rejected for {symbol} at {r['request']['price']}: {r['code']} {r['msg']}")
+        return results
+
+    @traced()
+    def cancel_orders_batch_bybit(self, symbol: str, order_ids=None, order_link_ids=None):
+        """
+        Cancel several orders of one symbol through Bybit's batch endpoint.
+        Orders that no longer exist (already filled/cancelled) count as cancelled.
+
+        :return: one result per id, in order: {"ok", "id", "orderLinkId", "code", "msg", "request"}.
+        """
+        market = self.instruments.market(symbol) or self.exchange.market(symbol)
+        category = self._batch_category_bybit(symbol)
+        batch_size = self._batch_size_bybit(symbol)
+        requests_list = [{"symbol": market['id'], "orderId": str(i)} for i in (order_ids or [])]
+        requests_list += [{"symbol": market['id'], "orderLinkId": str(i)} for i in (order_link_ids or [])]
+
+        results = []
+        for start in range(0, len(requests_list), batch_size):
+            chunk = requests_list[start:start + batch_size]
+            try:
+                response = self.exchange.privatePostV5OrderCancelBatch({"category": category, "request": chunk})
+                chunk_results = self._batch_results(chunk, response)
+            except Exception as e:
+                logging.info(f"Batch cancel failed for {symbol} ({len(chunk)} orders): {e}")
+                chunk_results = [{"ok": False, "id": r.get('orderId'), "orderLinkId": r.get('orderLinkId'), "code": None, "msg": str(e), "request": r} for r in chunk]
+            for r in chunk_results:
+                r['id'] = r['id'] or r['request'].get('orderId')
+                # 110001: order does not exist / already finished
+                if r['code'] == 110001:
+                    r['ok'] = True
+            results.extend(chunk_results)
+
+        failed = [r for r in results if not r['ok']]
+        if results:
+            logging.info(f"Batch cancelled {len(results) - len(failed)}/{len(results)} orders for {symbol}")
+        for r in failed:
+            logging.info(f"Batch cancel failed for {symbol} order {r['id'] or r['orderLinkId']}: {r['code']} {r['msg']}")
+        return results
+
+    def amend_orders_batch_bybit(self, symbol: str, amendments: list):
+        """
+        Amend price and/or qty of several open orders of one symbol in place
+        through Bybit's batch endpoint (keeps the order id, one request per chunk).
+
+        :param amendments: dicts with id or orderLinkId, plus price and/or qty
+                           (None / missing means unchanged; qty is the new total order qty).
+        :return: one result per amendment, in order: {"ok", "id", "orderLinkId", "code", "msg", "request"}.
+        """
+        if not amendments:
+            return []
+        market = self.instruments.market(symbol) or self.exchange.market(symbol)
+        category = self._batch_category_bybit(symbol)
+        batch_size = self._batch_size_bybit(symbol)
+        requests_list = []
+        for amendment in amendments:
+            request = {"symbol": market['id']}
+            if amendment.get('id'):
+                request["orderId"] = str(amendment['id'])
+            else:
+                request["orderLinkId"] = str(amendment['orderLinkId'])
+            if amendment.get('price') is not None:
+                request["price"] = self.exchange.price_to_precision(market['symbol'], amendment['price'])
+            if amendment.get('qty') is not None:
+                request["qty"] = self.exchange.amount_to_precision(market['symbol'], amendment['qty'])
+            requests_list.append(request)
+
+        results = []
+        for start in range(0, len(requests_list), batch_size):
+            chunk = requests_list[start:start + batch_size]
+            try:
+                response = self.exchange.privatePostV5OrderAmendBatch({"category": category, "request": chunk})
+                chunk_results = self._batch_results(chunk, response)
+            except Exception as e:
+                logging.info(f"Batch amend failed for {symbol} ({len(chunk)} orders): {e}")
+                chunk_results = [{"ok": False, "id": r.get('orderId'), "orderLinkId": r.get('orderLinkId'), "code": None, "msg": str(e), "request": r} for r in chunk]
+            for r in chunk_results:
+                r['id'] = r['id'] or r['request'].get('orderId')
+            results.extend(chunk_results)
+
+        failed = [r for r in results if not r['ok']]
+        logging.info(f"Batch amended {len(results) - len(failed)}/{len(results)} orders for {symbol}")
+        for r in failed:
+            logging.info(f"Batch amend rejected for {symbol} order {r['id'] or r['orderLinkId']}: {r['code']} {r['msg']}")
+        return results
+
     def create_limit_order_bybit_unified(self, symbol: str, side: str, qty: float, price: float, positionIdx=0, params={}):
         try:
             if side == "buy" or side == "sell":
@@ -435,6 +644,7 @@ class BybitExchange(Exchange):
         except Exception as e:
             logging.info(f"An unknown error occurred in create_limit_order(): {e}")
 
+    @traced()
     def create_market_order_bybit(self, symbol: str, side: str, qty: float, positionIdx=0, params={}):
         try:
             if side == "buy" or side == "sell":
@@ -476,6 +686,7 @@ class BybitExchange(Exchange):
         except Exception as e:
             logging.info(f"Error cancelling orders: {e}")
             
+    @traced()
     def cancel_order_bybit(self, order_id, symbol):
         """
         Wrapper function to cancel an order on the exchange using the CCXT instance.
@@ -495,33 +706,15 @@ class BybitExchange(Exchange):
             return None
         
     def get_precision_and_limits_bybit(self, symbol):
-        # Fetch the market data
-        markets = self.exchange.fetch_markets()
-
-        # Filter for the specific symbol
-        for market in markets:
-            if market['symbol'] == symbol:
-                precision_amount = market['precision']['amount']
-                precision_price = market['precision']['price']
-                min_amount = market['limits']['amount']['min']
-
-                return precision_amount, precision_price, min_amount
+        market = self.instruments.market(symbol)
+        if market:
+            return market['precision']['amount'], market['precision']['price'], market['limits']['amount']['min']
 
         return None, None, None
 
     def get_market_precision_data_bybit(self, symbol):
-        # Fetch the market data
-        markets = self.exchange.fetch_markets()
-        
-        # Print the first market from the list
-        logging.info(markets[0])
-
-        # Filter for the specific symbol
-        for market in markets:
-            if market['symbol'] == symbol:
-                return market['precision']
-        
-        return None
+        market = self.instruments.market(symbol)
+        return market['precision'] if market else None
     
     def transfer_funds_bybit(self, code: str, amount: float, from_account: str, to_account: str, params={}):
         """
@@ -596,7 +789,13 @@ class BybitExchange(Exchange):
             logging.info(f"Error occurred while fetching Bybit wallet balance: {e}")
             return None
 
+    @traced()
     def get_futures_balance_bybit(self):
+        if self.account_stream_live():
+            total_balance = self.account_state.get_total_balance(self.collateral_currency)
+            if total_balance is not None:
+                return total_balance
+
         if self.exchange.has['fetchBalance']:
             try:
                 # Fetch the balance with params to specify the account type if needed
@@ -643,14 +842,12 @@ class BybitExchange(Exchange):
     #         logging.info("Traceback: %s", traceback.format_exc())
     #         return None, None
 
+    @traced()
     def get_symbol_precision_bybit(self, symbol, max_retries=1000, retry_delay=5):
         for attempt in range(max_retries):
             try:
-                # Use fetch_markets to retrieve data for all markets
-                all_markets = self.exchange.fetch_markets()
-
-                # Find the market data for the specific symbol
-                market_data = next((market for market in all_markets if market['id'] == symbol), None)
+                # O(1) lookup in the shared instrument cache (bulk-loaded, refreshed on a miss)
+                market_data = self.instruments.market(symbol)
 
                 if market_data:
                     # Extract precision data
@@ -673,6 +870,7 @@ class BybitExchange(Exchange):
                     logging.info(f"All retry attempts failed for get_symbol_precision_bybit({symbol}).")
                     return None, None
 
+    @traced()
     def get_positions_bybit(self, symbol, max_retries=100, retry_delay=5) -> dict:
         values = {
             "long": {
@@ -736,7 +934,7 @@ class BybitExchange(Exchange):
     def get_current_max_leverage_bybit(self, symbol):
         try:
             # Fetch leverage tiers for the symbol
-            leverage_tiers = self.exchange.fetch_market_leverage_tiers(symbol)
+            leverage_tiers = self.instruments.get_leverage_tiers(symbol)
 
             # Process leverage tiers to find the maximum leverage
             max_leverage = max([tier['maxLeverage'] for tier in leverage_tiers if 'maxLeverage' in tier])
@@ -744,6 +942,10 @@ class BybitExchange(Exchange):
 
             return max_leverage
 
+        except ccxt.BadSymbol as e:
+            logging.info(f"Bad symbol {symbol} while retrieving leverage tiers: {e}")
+            self.instruments.invalidate()
+            return None
         except Exception as e:
             logging.info(f"Error retrieving leverage tiers for {symbol}: {e}")
             return None
@@ -820,7 +1022,11 @@ class BybitExchange(Exchange):
                         logging.info(f"Error fetching open positions: {e}")
                         return []
                     
+    @traced()
     def get_all_open_positions_bybit(self, retries=10, delay_factor=10, max_delay=60) -> List[dict]:
+        if self.account_stream_live():
+            return self.account_state.get_open_positions()
+
         now = datetime.now()
 
         # Check if the shared cache is still valid
@@ -893,6 +1099,7 @@ class BybitExchange(Exchange):
                         logging.info(f"Error fetching open positions: {e}")
                         return []
                     
+    @traced()
     def fetch_leverage_tiers(self, symbol: str) -> dict:
         """
         Fetch leverage tiers for a given symbol using CCXT's fetch_market_leverage_tiers method.
@@ -902,8 +1109,12 @@ class BybitExchange(Exchange):
         """
         try:
             params = {'category': 'linear'}  # Adjust parameters based on the specific needs and API documentation
-            leverage_tiers = self.exchange.fetch_derivatives_market_leverage_tiers(symbol, params)
+            leverage_tiers = self.instruments.get_leverage_tiers(symbol, params)
             return leverage_tiers
+        except ccxt.BadSymbol as e:
+            logging.info(f"Bad symbol {symbol} while fetching leverage tiers: {e}")
+            self.instruments.invalidate()
+            return None
         except Exception as e:
             logging.info(f"Error fetching leverage tiers for {symbol}: {e}")
             return None
@@ -958,8 +1169,8 @@ class BybitExchange(Exchange):
         """Fetches open orders for all symbols."""
         for _ in range(self.max_retries):
             try:
-                with self.rate_limiter:
-                    open_orders = self.exchange.fetch_open_orders()
+                # Throttled per endpoint group inside the ccxt request path
+                open_orders = self.exchange.fetch_open_orders()
                 return open_orders
             except RateLimitExceeded:
                 logging.info(f"Rate limit exceeded when fetching open orders. Retrying in {self.retry_wait} seconds...")
@@ -970,13 +1181,17 @@ class BybitExchange(Exchange):
         logging.info(f"Failed to fetch open orders after {self.max_retries} retries.")
         return []
 
+    @traced()
     def get_open_orders(self, symbol, max_retries=100, retry_wait=1):
         """Fetches open orders for the given symbol with exponential backoff."""
+        if self.account_stream_live():
+            return self.account_state.get_open_orders(symbol)
+
         backoff = retry_wait
         for attempt in range(max_retries):
             try:
-                with self.rate_limiter:
-                    open_orders = self.exchange.fetch_open_orders(symbol)
+                # Throttled per endpoint group inside the ccxt request path
+                open_orders = self.exchange.fetch_open_orders(symbol)
                 return open_orders
             except RateLimitExceeded:
                 logging.info(f"Rate limit exceeded when fetching open orders for {symbol}. Retrying in {retry_wait} seconds...")
@@ -1188,6 +1403,7 @@ class BybitExchange(Exchange):
             logging.info(f"An error occurred while creating market order on Bybit: {e}")
             return None
         
+    @traced()
     def cancel_order_by_id(self, order_id, symbol):
         try:
             # Call the updated cancel_order method
@@ -1253,6 +1469,9 @@ class BybitExchange(Exchange):
         raise Exception(f"Failed to execute the API function after {max_retries} retries.")
 
     def get_contract_size_bybit(self, symbol):
+        contract_size = self.instruments.contract_size(symbol)
+        if contract_size is not None:
+            return contract_size
         positions = self.exchange.fetch_derivatives_positions([symbol])
         return positions[0]['contractSize']
 
@@ -1260,7 +1479,7 @@ class BybitExchange(Exchange):
         #logging.info(f"Called get_max_leverage_bybit with symbol: {symbol}")
         for retry in range(max_retries):
             try:
-                tiers = self.exchange.fetch_derivatives_market_leverage_tiers(symbol)
+                tiers = self.instruments.get_leverage_tiers(symbol)
                 for tier in tiers:
                     info = tier.get('info', {})
                     if info.get('symbol') == symbol:
@@ -1310,16 +1529,7 @@ class BybitExchange(Exchange):
             logging.info(f"Exception in bybit_fetch_precision: {e}")
 
     def get_market_tick_size_bybit(self, symbol):
-        # Fetch the market data
-        markets = self.exchange.fetch_markets()
-
-        # Filter for the specific symbol
-        for market in markets:
-            if market['symbol'] == symbol:
-                tick_size = market['info']['priceFilter']['tickSize']
-                return tick_size
-        
-        return None
+        return self.instruments.tick_size(symbol)
 
     def fetch_recent_trades(self, symbol, since=None, limit=100):
         """
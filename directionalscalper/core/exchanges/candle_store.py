@@ -0,0 +1,607 @@
+import time
+import threading
+import traceback
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from directionalscalper.core.strategies.logger import Logger
+from directionalscalper.core.exchanges.market_data import normalize_symbol, BYBIT_KLINE_INTERVALS
+
+logging = Logger(logger_name="CandleStore", filename="CandleStore.log", stream=True)
+
+BYBIT_INTERVAL_TIMEFRAMES = {interval: timeframe for timeframe, interval in BYBIT_KLINE_INTERVALS.items()}
+
+FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    units = {"m": 60, "h": 3600, "d": 86400, "w": 604800, "M": 2592000}
+    return int(timeframe[:-1]) * units[timeframe[-1]] * 1000
+
+
+class RingBuffer:
+    """
+    Fixed-capacity float64 ring. Every value is written twice (at i and
+    i + capacity) so the newest `n` values are always one contiguous slice,
+    which keeps reads copy-free and appends O(1).
+    """
+
+    def __init__(self, capacity: int, width: int = 1):
+        self.capacity = capacity
+        shape = (2 * capacity,) if width == 1 else (2 * capacity, width)
+        self.data = np.full(shape, np.nan)
+        self.head = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, value):
+        self.data[self.head] = value
+        self.data[self.head + self.capacity] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def last(self, n: Optional[int] = None) -> np.ndarray:
+        n = self.size if n is None else min(n, self.size)
+        end = self.head + self.capacity
+        return self.data[end - n:end]
+
+    def latest(self):
+        return self.data[self.head + self.capacity - 1] if self.size else np.nan
+
+    def get(self, back: int):
+        """Value `back` bars ago (0 = newest)."""
+        if back >= self.size:
+            return np.nan
+        return self.data[self.head + self.capacity - 1 - back]
+
+
+def _source(source, bar, prev_close):
+    _, o, h, l, c, v = bar
+    if source == "close":
+        return c
+    if source == "high":
+        return h
+    if source == "low":
+        return l
+    if source == "open":
+        return o
+    if source == "volume":
+        return v
+    if source == "range":
+        return h - l
+    if source == "hlc3":
+        return (h + l + c) / 3
+    if source == "tr":
+        if np.isnan(prev_close):
+            return h - l
+        return max(h - l, abs(h - prev_close), abs(l - prev_close))
+    raise ValueError(f"Unknown indicator source {source}")
+
+
+class Indicator:
+    """
+    Incremental indicator over closed bars.
+
+    `update(bar, prev_close)` commits a closed bar and returns the new value;
+    `peek(bar, prev_close)` returns what the value would be if `bar` closed
+    now, without changing state (used for the still-forming candle).
+    """
+
+    width = 1
+
+    def __init__(self, capacity: int):
+        self.history = RingBuffer(capacity, self.width)
+
+    def update(self, bar, prev_close):
+        value = self._step(bar, prev_close, commit=True)
+        self.history.append(value)
+        return value
+
+    def peek(self, bar, prev_close):
+        return self._step(bar, prev_close, commit=False)
+
+    def _step(self, bar, prev_close, commit):
+        raise NotImplementedError
+
+
+class EMA(Indicator):
+    """Matches pandas `ewm(span=period, adjust=False)`: seeded with the first value."""
+
+    def __init__(self, capacity, period, source="close"):
+        super().__init__(capacity)
+        self.alpha = 2.0 / (period + 1)
+        self.source = source
+        self.value = np.nan
+
+    def _step(self, bar, prev_close, commit):
+        x = _source(self.source, bar, prev_close)
+        value = x if np.isnan(self.value) else self.alpha * x + (1 - self.alpha) * self.value
+        if commit:
+            self.value = value
+        return value
+
+
+class SMA(Indicator):
+    """Rolling mean over `period` bars (NaN until the window is full)."""
+
+    def __init__(self, capacity, period, source="close"):
+        super().__init__(capacity)
+        self.period = period
+        self.source = source
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.updates = 0
+
+    def _step(self, bar, prev_close, commit):
+        x = _source(self.source, bar, prev_close)
+        full = len(self.window) == self.period
+        total = self.total + x - (self.window[0] if full else 0.0)
+        count = len(self.window) + (0 if full else 1)
+        if commit:
+            self.window.append(x)
+            self.total = total
+            self.updates += 1
+            # Re-sum now and then so float drift cannot accumulate
+            if self.updates % 1000 == 0:
+                self.total = float(sum(self.window))
+                total = self.total
+        return total / self.period if count == self.period else np.nan
+
+
+class RMA(Indicator):
+    """Wilder smoothing (`ewm(alpha=1/period, adjust=False)`), NaN for the first `period - 1` bars."""
+
+    def __init__(self, capacity, period, source="tr"):
+        super().__init__(capacity)
+        self.period = period
+        self.alpha = 1.0 / period
+        self.source = source
+        self.value = np.nan
+        self.count = 0
+
+    def _step(self, bar, prev_close, commit):
+        x = _source(self.source, bar, prev_close)
+        value = x if np.isnan(self.value) else self.alpha * x + (1 - self.alpha) * self.value
+        count = self.count + 1
+        if commit:
+            self.value = value
+            self.count = count
+        return value if count >= self.period else np.nan
+
+
+class ATR(Indicator):
+    """Average true range; Wilder smoothing by default, `wilder=False` for a plain rolling mean."""
+
+    def __init__(self, capacity, period=14, wilder=True):
+        super().__init__(capacity)
+        self.inner = RMA(capacity, period, "tr") if wilder else SMA(capacity, period, "tr")
+
+    def _step(self, bar, prev_close, commit):
+        return self.inner._step(bar, prev_close, commit)
+
+
+class NATR(ATR):
+    """ATR as a percentage of the close."""
+
+    def _step(self, bar, prev_close, commit):
+        atr = self.inner._step(bar, prev_close, commit)
+        return atr / bar[4] * 100
+
+
+class RSI(Indicator):
+    """Wilder RSI, same smoothing as `ta.momentum.RSIIndicator`."""
+
+    def __init__(self, capacity, period=14):
+        super().__init__(capacity)
+        self.period = period
+        self.alpha = 1.0 / period
+        self.avg_gain = np.nan
+        self.avg_loss = np.nan
+        self.count = 0
+
+    def _step(self, bar, prev_close, commit):
+        if np.isnan(prev_close):
+            return np.nan
+        change = bar[4] - prev_close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        if np.isnan(self.avg_gain):
+            avg_gain, avg_loss = gain, loss
+        else:
+            avg_gain = self.alpha * gain + (1 - self.alpha) * self.avg_gain
+            avg_loss = self.alpha * loss + (1 - self.alpha) * self.avg_loss
+        count = self.count + 1
+        if commit:
+            self.avg_gain, self.avg_loss, self.count = avg_gain, avg_loss, count
+        if count < self.period:
+            return np.nan
+        if avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+class MFI(Indicator):
+    """Money flow index over `period` bars."""
+
+    def __init__(self, capacity, period=14):
+        super().__init__(capacity)
+        self.period = period
+        self.flows = deque(maxlen=period)
+        self.prev_typical = np.nan
+
+    def _step(self, bar, prev_close, commit):
+        typical = (bar[2] + bar[3] + bar[4]) / 3
+        flow = typical * bar[5]
+        if np.isnan(self.prev_typical):
+            signed = (0.0, 0.0)
+        elif typical > self.prev_typical:
+            signed = (flow, 0.0)
+        elif typical < self.prev_typical:
+            signed = (0.0, flow)
+        else:
+            signed = (0.0, 0.0)
+        flows = list(self.flows)[1 if len(self.flows) == self.period else 0:] + [signed]
+        if commit:
+            self.flows.append(signed)
+            self.prev_typical = typical
+        if len(flows) < self.period:
+            return np.nan
+        positive = sum(f[0] for f in flows)
+        negative = sum(f[1] for f in flows)
+        if negative == 0:
+            return 100.0
+        return 100 - 100 / (1 + positive / negative)
+
+
+class Donchian(Indicator):
+    """Highest high / lowest low over `period` bars via monotonic deques; values are (upper, lower)."""
+
+    width = 2
+
+    def __init__(self, capacity, period=20):
+        super().__init__(capacity)
+        self.period = period
+        self.index = 0
+        self.highs = deque()  # (index, high), highs decreasing
+        self.lows = deque()   # (index, low), lows increasing
+
+    @staticmethod
+    def _best(window, oldest, x, better):
+        for i, value in window:
+            if i >= oldest:
+                return x if better(x, value) else value
+        return x
+
+    def _step(self, bar, prev_close, commit):
+        high, low = bar[2], bar[3]
+        oldest = self.index - self.period + 1
+        upper = self._best(self.highs, oldest, high, lambda a, b: a >= b)
+        lower = self._best(self.lows, oldest, low, lambda a, b: a <= b)
+        full = self.index + 1 >= self.period
+        if commit:
+            while self.highs and self.highs[-1][1] <= high:
+                self.highs.pop()
+            self.highs.append((self.index, high))
+            while self.lows and self.lows[-1][1] >= low:
+                self.lows.pop()
+            self.lows.append((self.index, low))
+            while self.highs[0][0] < oldest:
+                self.highs.popleft()
+            while self.lows[0][0] < oldest:
+                self.lows.popleft()
+            self.index += 1
+        return (upper, lower) if full else (np.nan, np.nan)
+
+
+INDICATORS = {
+    "ema": EMA,
+    "sma": SMA,
+    "rma": RMA,
+    "atr": ATR,
+    "natr": NATR,
+    "rsi": RSI,
+    "mfi": MFI,
+    "donchian": Donchian,
+}
+
+
+class CandleSeries:
+    """
+    Closed bars of one (symbol, timeframe) in ring buffers plus the forming bar.
+    Indicators are registered on first use, primed once over the stored
+    history and then advanced by one step per closed bar.
+    """
+
+    def __init__(self, symbol: str, timeframe: str, capacity: int):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.timeframe_ms = timeframe_to_ms(timeframe)
+        self.capacity = capacity
+        self.lock = threading.RLock()
+        self.fetch_lock = threading.Lock()
+        self.columns = {field: RingBuffer(capacity) for field in FIELDS}
+        self.forming = None
+        self.indicators = {}
+        self.backfilled = 0
+        self.last_rest_update = 0.0
+        self.last_stream_update = 0.0
+        self.gap = False
+        self.pending = {}  # ts -> (bar, closed): stream bars held back until the bars before them arrive
+
+    def __len__(self):
+        return len(self.columns["timestamp"]) + (1 if self.forming is not None else 0)
+
+    @property
+    def last_closed_ts(self):
+        ts = self.columns["timestamp"].latest()
+        return None if np.isnan(ts) else int(ts)
+
+    def _commit(self, bar):
+        prev_close = self.columns["close"].latest()
+        for field, value in zip(FIELDS, bar):
+            self.columns[field].append(value)
+        for indicator in self.indicators.values():
+            indicator.update(bar, prev_close)
+
+    def _next_ts(self):
+        """Timestamp of the bar that continues the series without a hole (None when empty)."""
+        if self.forming is not None:
+            return int(self.forming[0]) + self.timeframe_ms
+        last_ts = self.last_closed_ts
+        return None if last_ts is None else last_ts + self.timeframe_ms
+
+    def add_bar(self, bar, closed: bool, hold_gaps: bool = False):
+        """
+        Apply one bar (ts, o, h, l, c, v); bars at or before the last closed
+        one are ignored. With hold_gaps (stream bars) a bar past a hole is
+        not committed but held, and `gap` stays set until REST has filled
+        the hole; REST bars are taken as they come.
+        """
+        bar = tuple(float(x) for x in bar[:6])
+        ts = int(bar[0])
+        with self.lock:
+            last_ts = self.last_closed_ts
+            if last_ts is not None and ts <= last_ts:
+                return
+            next_ts = self._next_ts()
+            if hold_gaps and next_ts is not None and ts > next_ts:
+                self.pending[ts] = (bar, closed)
+                self.gap = True
+                return
+            self._apply_bar(bar, ts, closed)
+            self._drain_pending()
+
+    def _apply_bar(self, bar, ts, closed):
+        # A newer bar means the one we held as forming has closed
+        if self.forming is not None and int(self.forming[0]) < ts:
+            self._commit(self.forming)
+            self.forming = None
+        if closed:
+            self._commit(bar)
+            self.forming = None
+        else:
+            self.forming = bar
+
+    def _drain_pending(self):
+        """Apply the held stream bars that no longer follow a hole; gap is cleared once none are left."""
+        for ts in sorted(self.pending):
+            last_ts = self.last_closed_ts
+            if last_ts is not None and ts <= last_ts:
+                del self.pending[ts]
+                continue
+            if ts > self._next_ts():
+                break
+            bar, closed = self.pending.pop(ts)
+            self._apply_bar(bar, ts, closed)
+        self.gap = bool(self.pending)
+
+    def reset(self):
+        with self.lock:
+            self.columns = {field: RingBuffer(self.capacity) for field in FIELDS}
+            self.forming = None
+            self.indicators = {}
+            self.backfilled = 0
+            self.gap = False
+            self.pending = {}
+
+    def resize(self, capacity: int):
+        """Drop the history and hold up to `capacity` bars from the next backfill on."""
+        with self.lock:
+            self.capacity = capacity
+            self.reset()
+
+    # ── reads ────────────────────────────────────────────────────────────
+    def arrays(self, limit: Optional[int] = None) -> dict:
+        """Newest `limit` bars (closed + forming) as column arrays."""
+        with self.lock:
+            closed_limit = None if limit is None else max(0, limit - (1 if self.forming is not None else 0))
+            out = {}
+            for i, field in enumerate(FIELDS):
+                column = self.columns[field].last(closed_limit)
+                if self.forming is not None:
+                    column = np.append(column, self.forming[i])
+                else:
+                    column = column.copy()
+                out[field] = column
+            return out
+
+    def ohlcv(self, limit: Optional[int] = None) -> list:
+        """Same shape as ccxt `fetch_ohlcv`: a list of [ts, o, h, l, c, v]."""
+        columns = self.arrays(limit)
+        rows = np.column_stack([columns[field] for field in FIELDS]).tolist()
+        for row in rows:
+            row[0] = int(row[0])
+        return rows
+
+    def dataframe(self, limit: Optional[int] = None) -> pd.DataFrame:
+        """DataFrame indexed by datetime, like `Exchange.fetch_ohlcv`."""
+        columns = self.arrays(limit)
+        df = pd.DataFrame({field: columns[field] for field in FIELDS[1:]},
+                          index=pd.to_datetime(columns["timestamp"].astype("int64"), unit="ms"))
+        df.index.name = "timestamp"
+        return df
+
+    def indicator(self, kind: str, *params, **kwargs) -> Indicator:
+        key = (kind, params, tuple(sorted(kwargs.items())))
+        with self.lock:
+            indicator = self.indicators.get(key)
+            if indicator is None:
+                indicator = INDICATORS[kind](self.capacity, *params, **kwargs)
+                # Prime once over the stored history; from here on it moves one bar at a time
+                closes = self.columns["close"].last()
+                history = np.column_stack([self.columns[field].last() for field in FIELDS])
+                prev_close = np.nan
+                for bar, close in zip(history, closes):
+                    indicator.update(tuple(bar), prev_close)
+                    prev_close = close
+                self.indicators[key] = indicator
+            return indicator
+
+    def values(self, kind: str, *params, limit: Optional[int] = None, **kwargs) -> np.ndarray:
+        """Indicator values aligned with `arrays(limit)`; the forming bar is peeked, not committed."""
+        with self.lock:
+            indicator = self.indicator(kind, *params, **kwargs)
+            closed_limit = None if limit is None else max(0, limit - (1 if self.forming is not None else 0))
+            history = indicator.history.last(closed_limit)
+            if self.forming is None:
+                return history.copy()
+            current = indicator.peek(self.forming, self.columns["close"].latest())
+            return np.concatenate([history, np.asarray(current, dtype=float).reshape((1,) + history.shape[1:])])
+
+    def value(self, kind: str, *params, **kwargs):
+        """Latest value of an indicator, including the forming bar."""
+        with self.lock:
+            indicator = self.indicator(kind, *params, **kwargs)
+            if self.forming is None:
+                return indicator.history.latest()
+            return indicator.peek(self.forming, self.columns["close"].latest())
+
+
+class CandleStore:
+    """
+    Process-wide OHLCV store keyed by (market id, timeframe).
+
+    The first read of a series backfills `limit` bars over REST. After that a
+    read only asks the exchange for bars since the last one held (at most once
+    per `refresh_interval`), and not at all while the kline stream for that
+    series is live. Indicators read from the series update per closed bar
+    instead of being recomputed over the whole history.
+    """
+
+    def __init__(self, exchange, capacity: int = 5000, refresh_interval: float = 2.0,
+                 stream_max_age: float = 10.0, page_size: int = 1000):
+        self.exchange = exchange
+        self.capacity = capacity
+        self.refresh_interval = refresh_interval
+        self.stream_max_age = stream_max_age
+        self.page_size = page_size
+        self.lock = threading.Lock()
+        self.series = {}
+        self.hub = None
+
+    def attach_stream(self, hub):
+        """Receive kline updates from a MarketDataHub; existing series are subscribed right away."""
+        self.hub = hub
+        for market_id, timeframe in list(self.series):
+            hub.subscribe_klines(market_id, timeframe)
+
+    def _series(self, symbol: str, timeframe: str, limit: int) -> CandleSeries:
+        key = (normalize_symbol(symbol), timeframe)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = CandleSeries(key[0], timeframe, max(self.capacity, limit))
+                if self.hub is not None and timeframe in BYBIT_KLINE_INTERVALS:
+                    self.hub.subscribe_klines(key[0], timeframe)
+            return series
+
+    def _fetch(self, symbol, timeframe, since, limit, until=None):
+        params = {'until': until} if until is not None else {}
+        return self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit, params=params)
+
+    def _apply(self, series, bars):
+        now_ms = self.exchange.milliseconds()
+        for bar in bars:
+            series.add_bar(bar, closed=bar[0] + series.timeframe_ms <= now_ms)
+
+    def _backfill(self, symbol, series, limit):
+        series.reset()
+        now_ms = self.exchange.milliseconds()
+        since = now_ms - (now_ms % series.timeframe_ms) - (limit - 1) * series.timeframe_ms
+        # Bybit returns the newest `limit` bars of a range, so page with an explicit end
+        while since <= now_ms:
+            until = since + self.page_size * series.timeframe_ms - 1
+            bars = self._fetch(symbol, series.timeframe, since, self.page_size, until)
+            if bars:
+                self._apply(series, bars)
+            since = until + 1
+        series.backfilled = limit
+        series.last_rest_update = time.time()
+        logging.info(f"[{series.symbol}] Backfilled {len(series)} {series.timeframe} candles")
+
+    def _catch_up(self, symbol, series):
+        last_ts = series.forming[0] if series.forming is not None else series.last_closed_ts
+        missing = (self.exchange.milliseconds() - last_ts) // series.timeframe_ms + 1
+        if missing > self.page_size:
+            # Too far behind to patch up; start over
+            self._backfill(symbol, series, series.backfilled)
+            return
+        # Held stream bars past a hole are applied by add_bar once REST has filled it
+        self._apply(series, self._fetch(symbol, series.timeframe, int(last_ts), int(missing) + 1))
+        series.last_rest_update = time.time()
+
+    def get(self, symbol: str, timeframe: str = "1m", limit: int = 1000) -> CandleSeries:
+        """Return the up-to-date series for symbol/timeframe holding at least `limit` bars of history."""
+        series = self._series(symbol, timeframe, limit)
+        with series.fetch_lock:
+            if series.capacity < limit:
+                # Created for a smaller limit; the ring buffers cannot hold this many bars
+                series.resize(limit)
+            if series.backfilled < limit or series.last_closed_ts is None:
+                self._backfill(symbol, series, limit)
+                return series
+            now = time.time()
+            stream_live = now - series.last_stream_update < self.stream_max_age and not series.gap
+            if not stream_live and now - series.last_rest_update >= self.refresh_interval:
+                self._catch_up(symbol, series)
+        return series
+
+    def ohlcv(self, symbol: str, timeframe: str = "1m", limit: int = 1000) -> list:
+        return self.get(symbol, timeframe, limit).ohlcv(limit)
+
+    def dataframe(self, symbol: str, timeframe: str = "1m", limit: int = 1000) -> pd.DataFrame:
+        return self.get(symbol, timeframe, limit).dataframe(limit)
+
+    # ── stream ───────────────────────────────────────────────────────────
+    def handle_kline(self, market_id: str, interval: str, entries):
+        """Apply Bybit v5 `kline.{interval}.{symbol}` entries to an already backfilled series."""
+        timeframe = BYBIT_INTERVAL_TIMEFRAMES.get(interval)
+        series = self.series.get((market_id, timeframe))
+        if series is None or series.last_closed_ts is None:
+            return
+        try:
+            for entry in entries:
+                bar = (int(entry["start"]), entry["open"], entry["high"], entry["low"], entry["close"], entry["volume"])
+                series.add_bar(bar, closed=bool(entry.get("confirm")), hold_gaps=True)
+            series.last_stream_update = time.time()
+        except Exception as e:
+            logging.info(f"[{market_id}] Error applying kline update: {e}")
+            logging.info(traceback.format_exc())
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_candle_store(exchange) -> CandleStore:
+    """Return the shared store for this exchange id/market type, creating it on first use."""
+    key = (exchange.id, exchange.options.get('defaultType'))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = CandleStore(exchange)
+        return store
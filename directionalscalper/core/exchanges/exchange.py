@@ -27,7 +27,13 @@ from scipy.signal import find_peaks
 
 logging = Logger(logger_name="Exchange", filename="Exchange.log", stream=True)
 
-from rate_limit import RateLimit
+from rate_limit import get_rate_limiter, install_rate_limits
+from .candle_store import get_candle_store
+from .session_capture import install_session_capture
+from ..tracing import traced
+from ..lorentzian import LorentzianEngine
+from ..pivots import ZigZagEngine, bar_arrays, zigzag
+from ..regime import FilterState, RegimeFilter, advance, regime
 
 class Exchange:
     # Shared class-level cache variables
@@ -39,7 +45,7 @@ class Exchange:
     last_open_positions_time_shared = None
     open_positions_semaphore = threading.Semaphore()
 
-    def __init__(self, exchange_id, api_key, secret_key, passphrase=None, market_type='swap'):
+    def __init__(self, exchange_id, api_key, secret_key, passphrase=None, market_type='swap', client=None):
         self.order_timestamps = None
         self.exchange_id = exchange_id
         self.api_key = api_key
@@ -47,6 +53,7 @@ class Exchange:
         self.passphrase = passphrase
         self.market_type = market_type  # Store the market type
         self.name = exchange_id
+        self.client = client  # ccxt-compatible object to use instead of a live one (backtests, replays)
         self.initialise()
         self.symbols = self._get_symbols()
         self.market_precisions = {}
@@ -55,13 +62,35 @@ class Exchange:
 
         self.entry_order_ids = {}  # Initialize order history
         self.entry_order_ids_lock = threading.Lock()  # For thread safety
-        self.rate_limiter = RateLimit(10, 1)
+        self.rate_limiter = get_rate_limiter("public")
+        self.instruments = None  # InstrumentCache of exchanges that keep one (see instrument_cache.py)
 
         self.last_signal = {}
         self.last_signal_time = {}
         self.signal_duration = 60  # Duration in seconds (1 minute)
-        
+
+        # Optional streamed market data (see market_data.MarketDataHub)
+        self.market_data = None
+
+        # Shared incremental OHLCV store used by the signal generators
+        self.candles = get_candle_store(self.exchange)
+        self.lorentzian = LorentzianEngine()
+        self.zigzags = ZigZagEngine()
+        self.regime_filters = RegimeFilter()
+
+    def attach_market_data(self, hub):
+        """
+        Serve order books and prices from a streaming MarketDataHub, falling
+        back to REST whenever the stream for a symbol is stale.
+        """
+        self.market_data = hub
+        hub.attach_candles(self.candles)
+
     def initialise(self):
+        if self.client is not None:
+            self.exchange = self.client
+            return
+
         exchange_class = getattr(ccxt, self.exchange_id)
         exchange_params = {
             "apiKey": self.api_key,
@@ -117,6 +146,13 @@ class Exchange:
             
         # Initializing the exchange object
         self.exchange = exchange_class(exchange_params)
+
+        # Recorded or replayed sessions (see session_capture.py); a replay never reaches the network
+        replaying = install_session_capture(self.exchange)
+
+        # Bybit requests go through the process-wide endpoint-group buckets
+        if self.exchange_id.lower().startswith('bybit') and not replaying:
+            install_rate_limits(self.exchange)
         # Checks if load_markets() have already been ran once.
         if not self.exchange.markets == None: return
         print(f"Loading exchange {self.exchange} for API data")
@@ -124,13 +160,13 @@ class Exchange:
         print(f'Loaded exchange {self.exchange} for API data')
 
     def get_mfirsi_ema_secondary_ema(self, symbol: str, limit: int = 100, lookback: int = 1, ema_period: int = 5, secondary_ema_period: int = 3) -> str:
-        # Fetch OHLCV data
-        ohlcv_data = self.exchange.fetch_ohlcv(symbol=symbol, timeframe='1m', limit=limit)
-        df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
+        # OHLCV and MFI/RSI come from the shared candle store
+        series = self.candles.get(symbol, '1m', limit)
+        df = series.dataframe(limit)
 
         # Calculate MFI and RSI
-        df['mfi'] = ta.volume.MFIIndicator(high=df['high'], low=df['low'], close=df['close'], volume=df['volume'], window=14, fillna=False).money_flow_index()
-        df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
+        df['mfi'] = series.values('mfi', 14, limit=limit)
+        df['rsi'] = series.values('rsi', 14, limit=limit)
 
         # Calculate EMAs for MFI and RSI
         df['mfi_ema'] = df['mfi'].ewm(span=ema_period, adjust=False).mean()
@@ -173,9 +209,8 @@ class Exchange:
         
         for retries in range(max_retries):
             try:
-                # Add rate limiting delay
-                time.sleep(0.1)  # 100ms delay between OHLCV requests
-                return self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+                # Backfilled once, then only new bars are fetched (or streamed)
+                return self.candles.ohlcv(symbol, timeframe, limit)
             except ccxt.RateLimitExceeded as e:
                 delay = min(base_delay * (2 ** retries) + random.uniform(0, 0.1 * (2 ** retries)), max_delay)
                 logging.info(f"[{symbol}] Rate limit exceeded: {e}. Retrying in {delay:.2f} seconds...")
@@ -190,46 +225,16 @@ class Exchange:
                 time.sleep(base_delay)
 
     # Calculate ZigZag indicator
-    def calculate_zigzag(self, ohlcv, length=4):
-        highs = [candle[2] for candle in ohlcv]
-        lows = [candle[3] for candle in ohlcv]
-
-        def highest_high(index):
-            return max(highs[max(0, index-length):index+length+1])
-
-        def lowest_low(index):
-            return min(lows[max(0, index-length):index+length+1])
-
-        direction_up = False
-        last_low = max(highs) * 100
-        last_high = 0.0
-        peaks_and_troughs = []
-
-        for i in range(length, len(ohlcv) - length):
-            h = highest_high(i)
-            l = lowest_low(i)
-
-            is_min = l == lows[i]
-            is_max = h == highs[i]
-
-            if direction_up:
-                if is_min and lows[i] < last_low:
-                    last_low = lows[i]
-                    peaks_and_troughs.append(last_low)
-                if is_max and highs[i] > last_low:
-                    last_high = highs[i]
-                    direction_up = False
-                    peaks_and_troughs.append(last_high)
-            else:
-                if is_max and highs[i] > last_high:
-                    last_high = highs[i]
-                    peaks_and_troughs.append(last_high)
-                if is_min and lows[i] < last_high:
-                    last_low = lows[i]
-                    direction_up = True
-                    peaks_and_troughs.append(last_low)
-
-        return peaks_and_troughs
+    def calculate_zigzag(self, ohlcv, length=4, symbol=None):
+        """
+        Turning prices of the ZigZag over ohlcv (see core/pivots.py). With a
+        symbol, the closed bars stay committed between calls and only bars
+        added since the last call are stepped over.
+        """
+        if symbol is not None:
+            return self.zigzags.zigzag(symbol, ohlcv, length)
+        highs, lows = bar_arrays(ohlcv)
+        return zigzag(highs, lows, length)
 
     # Normalize prices for clustering
     def normalize_prices(self, prices):
@@ -319,28 +324,23 @@ class Exchange:
         adx = ADXIndicator(high, low, close, window=n1).adx()
         return self.rescale(adx)
 
-    def regime_filter(self, series, high, low, use_regime_filter, threshold):
+    def regime_filter(self, series, high, low, use_regime_filter, threshold, symbol=None):
+        """
+        Bars where the KLMF slope is at least threshold above its 200-bar EMA
+        (see core/regime.py). With a symbol the filter state is kept between
+        calls and only new bars are stepped over.
+        """
         if not use_regime_filter:
             return pd.Series([True] * len(series))
 
-        def klmf(series, high, low):
-            value1 = pd.Series(0, index=series.index)
-            value2 = pd.Series(0, index=series.index)
-            klmf = pd.Series(0, index=series.index)
-            for i in range(1, len(series)):
-                value1[i] = 0.2 * (series[i] - series[i - 1]) + 0.8 * value1[i - 1]
-                value2[i] = 0.1 * (high[i] - low[i]) + 0.8 * value2[i - 1]
-            omega = abs(value1 / value2)
-            alpha = (-omega ** 2 + np.sqrt(omega ** 4 + 16 * omega ** 2)) / 8
-            for i in range(1, len(series)):
-                klmf[i] = alpha[i] * series[i] + (1 - alpha[i]) * klmf[i - 1]
-            return klmf
-
-        klmf_values = klmf(series, high, low)
-        abs_curve_slope = abs(klmf_values.diff())
-        exponential_average_abs_curve_slope = EMAIndicator(abs_curve_slope, window=200).ema_indicator()
-        normalized_slope_decline = (abs_curve_slope - exponential_average_abs_curve_slope) / exponential_average_abs_curve_slope
-        return normalized_slope_decline >= threshold
+        close = np.asarray(series, dtype=float)
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        if symbol is not None:
+            slope, ema = self.regime_filters.slope(symbol, close, high, low)
+        else:
+            _, slope, ema = advance(FilterState(), close, high, low)
+        return pd.Series(regime(slope, ema, threshold), index=series.index)
 
     def filter_adx(self, close, high, low, adx_threshold, use_adx_filter=False, length=14):
         if not use_adx_filter:
@@ -355,53 +355,33 @@ class Exchange:
         historical_atr = AverageTrueRange(high, low, close, window=max_length).average_true_range()
         return recent_atr > historical_atr
 
+    def generate_l_predictions(self, symbols, limit=3000, neighbors_count=8):
+        """Raw Lorentzian kNN predictions for several symbols in one batch (e.g. for screening)."""
+        frames = {}
+        for symbol in symbols:
+            try:
+                frames[symbol] = self.candles.dataframe(symbol, '1m', limit)
+            except Exception as e:
+                logging.info(f"[{symbol}] Skipping Lorentzian prediction: {e}")
+        return self.lorentzian.predict_batch(frames, neighbors_count)
+
     def lorentzian_distance(self, feature_series, feature_arrays):
         distances = np.log(1 + np.abs(feature_series - feature_arrays))
         return distances.sum(axis=1)
 
     def generate_l_signals(self, symbol, limit=3000, neighbors_count=8, use_adx_filter=False, adx_threshold=20):
         try:
-            # Fetch OHLCV data
-            ohlcv_data = self.fetch_ohlcv(symbol=symbol, timeframe='1m', limit=limit)
-            df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
-            df.set_index('timestamp', inplace=True)
-
-            # Calculate technical indicators
-            df['rsi'] = self.n_rsi(df['close'], 14, 1)
-            df['adx'] = self.n_adx(df['high'], df['low'], df['close'], 14)  # ADX is always calculated
-            df['cci'] = self.n_cci(df['high'], df['low'], df['close'], 20, 1)
-            df['wt'] = self.n_wt((df['high'] + df['low'] + df['close']) / 3, 10, 11)
-
-            # Feature engineering
-            features = df[['rsi', 'adx', 'cci', 'wt']].values  # ADX included in feature set
-            feature_series = features[-1]
-            feature_arrays = features[:-1]
-
-            # Calculate Lorentzian distances and predictions
-            y_train_series = np.where(df['close'].shift(-4) > df['close'], 1, -1)
-            y_train_series = y_train_series[:-1]
-
-            predictions = []
-            distances = []
-            lastDistance = -1
-
-            for i in range(len(feature_arrays)):
-                if i % 4 == 0:
-                    d = np.log(1 + np.abs(feature_series - feature_arrays[i])).sum()
-                    if d >= lastDistance:
-                        lastDistance = d
-                        distances.append(d)
-                        predictions.append(y_train_series[i])
-                        if len(predictions) > neighbors_count:
-                            lastDistance = distances[int(neighbors_count * 3 / 4)]
-                            distances.pop(0)
-                            predictions.pop(0)
-
-            prediction = np.sum(predictions)
-
-            # Calculate EMA and SMA
-            df['ema'] = EMAIndicator(df['close'], window=200).ema_indicator()
-            df['sma'] = SMAIndicator(df['close'], window=200).sma_indicator()
+            # OHLCV from the shared candle store
+            series = self.candles.get(symbol, '1m', limit)
+            df = series.dataframe(limit)
+
+            # RSI/ADX/CCI/WaveTrend features and Lorentzian kNN in one vectorized pass;
+            # features of bars seen on earlier calls are reused
+            prediction = self.lorentzian.predict(symbol, df, neighbors_count)
+
+            # EMA and SMA are maintained incrementally by the candle store
+            df['ema'] = series.values('ema', 200, limit=limit)
+            df['sma'] = series.values('sma', 200, limit=limit)
 
             # Determine trends
             is_ema_uptrend = df['close'] > df['ema']
@@ -1398,20 +1378,19 @@ class Exchange:
 
         while retries < max_retries:
             try:
-                with self.rate_limiter:
-                    # Fetch the OHLCV data from the exchange
-                    ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+                # Fetch the OHLCV data from the exchange
+                ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
 
-                    # Create a DataFrame from the OHLCV data
-                    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+                # Create a DataFrame from the OHLCV data
+                df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
 
-                    # Convert the timestamp to datetime
-                    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+                # Convert the timestamp to datetime
+                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
 
-                    # Set the timestamp as the index
-                    df.set_index('timestamp', inplace=True)
+                # Set the timestamp as the index
+                df.set_index('timestamp', inplace=True)
 
-                    return df
+                return df
 
             except ccxt.RateLimitExceeded as e:
                 # Exponential backoff for rate limits
@@ -1422,6 +1401,9 @@ class Exchange:
 
             except ccxt.BadSymbol as e:
                 logging.info(f"Bad symbol: {symbol}. Error: {e}")
+                # The symbol may have been renamed or delisted; reload the markets on the next lookup
+                if self.instruments is not None:
+                    self.instruments.invalidate()
                 break  # Symbol is invalid; no point retrying
 
             except ccxt.BaseError as e:
@@ -1571,23 +1553,18 @@ class Exchange:
         Returns "long", "short" or "".
         """
         try:
-            # ── 0) Data
-            candles = self.fetch_ohlcv_data(symbol, timeframe=timeframe, limit=1500)
-            if not candles or len(candles) < max(natr_len, 120):
+            # ── 0) Data (shared candle store; indicators advance once per closed bar)
+            series = self.candles.get(symbol, timeframe, 1500)
+            if len(series) < max(natr_len, 120):
                 logging.info(f"[{symbol}] xgridt-signal: not enough candles → no signal")
                 return ""
 
-            df = (pd.DataFrame(candles,
-                            columns=["ts","open","high","low","close","volume"])
-                .astype({"high":"float64","low":"float64","close":"float64"}))
-            closes = df["close"]
-            high   = df["high"]
-            low    = df["low"]
+            closes = series.arrays(1500)["close"]
 
             # ── 1) Triple-EMA Trend Detection (11, 23, 37)
-            ema11 = closes.ewm(span=11, adjust=False).mean().iat[-1]
-            ema23 = closes.ewm(span=23, adjust=False).mean().iat[-1]
-            ema37 = closes.ewm(span=37, adjust=False).mean().iat[-1]
+            ema11 = series.value("ema", 11)
+            ema23 = series.value("ema", 23)
+            ema37 = series.value("ema", 37)
             if ema11 > ema23 > ema37:
                 trend = "long"
             elif ema11 < ema23 < ema37:
@@ -1600,9 +1577,8 @@ class Exchange:
                 return ""
 
             # ── 2) Donchian close breakout
-            donch_hi = high.rolling(donch_len).max().iat[-2]
-            donch_lo = low.rolling(donch_len).min().iat[-2]
-            last     = closes.iat[-1]
+            donch_hi, donch_lo = series.values("donchian", donch_len, limit=2)[-2]
+            last     = closes[-1]
 
             hi_band = donch_hi * (1 - breakout_tol_pct/100)
             lo_band = donch_lo * (1 + breakout_tol_pct/100)
@@ -1614,10 +1590,8 @@ class Exchange:
                 return ""
 
             # ── 3) Volatility filter (NATR)
-            pc  = closes.shift()
-            tr  = np.maximum(high - low, np.maximum((high - pc).abs(), (low - pc).abs()))
-            natr= (tr.rolling(natr_len, min_periods=natr_len).mean() / closes) * 100
-            cur, base = natr.iat[-1], natr[:-1].mean()
+            natr = series.values("natr", natr_len, wilder=False, limit=1500)
+            cur, base = natr[-1], np.nanmean(natr[:-1])
             if not (cur >= min_natr_abs or cur >= natr_mult * base):
                 logging.info(
                     f"[{symbol}] xgridt-signal: NATR {cur:.3f}% < "
@@ -1626,19 +1600,19 @@ class Exchange:
                 return ""
 
             # ── 4) Relaxed peak / trough confirmation
-            fast_atr = (high - low).rolling(14).mean().iat[-1]
+            fast_atr = series.value("sma", 14, source="range")
             prom     = max(prominence_pct * last, 0.8 * fast_atr)  # ← looser
 
-            peaks,  _ = find_peaks(closes.values,   prominence=prom, distance=peak_min_distance)
-            troughs,_ = find_peaks(-closes.values,  prominence=prom, distance=peak_min_distance)
+            peaks,  _ = find_peaks(closes,   prominence=prom, distance=peak_min_distance)
+            troughs,_ = find_peaks(-closes,  prominence=prom, distance=peak_min_distance)
 
             peak_ok = (
                 peaks.size == 0 or
-                last >= closes.iloc[peaks[-1]] * (1 - breakout_tol_pct/100)
+                last >= closes[peaks[-1]] * (1 - breakout_tol_pct/100)
             )
             trough_ok = (
                 troughs.size == 0 or
-                last <= closes.iloc[troughs[-1]] * (1 + breakout_tol_pct/100)
+                last <= closes[troughs[-1]] * (1 + breakout_tol_pct/100)
             )
 
             if trend == "long" and not peak_ok:
@@ -1764,11 +1738,20 @@ class Exchange:
     #         logging.error(f"[{symbol}] generate_xgridt_signal → {e}", exc_info=True)
     #         return ""
 
+    @traced()
     def get_orderbook(self, symbol, max_retries: int = 3, retry_delay: int = 5) -> dict:
         """
         Robust order‑book fetcher that ALSO filters‑out rows whose price
         is None or 0.  Emits detailed diagnostics when that happens.
+
+        When a market data hub is attached, a fresh streamed book is returned
+        without touching REST.
         """
+        if self.market_data is not None:
+            streamed = self.market_data.get_orderbook(symbol)
+            if streamed is not None:
+                return streamed
+
         values = {"bids": [], "asks": []}
 
         for attempt in range(max_retries):
@@ -1917,10 +1900,16 @@ class Exchange:
             logging.info(f"An unknown error occurred in get_positions(): {e}")
         return values
 
+    @traced()
     def get_current_price(self, symbol: str) -> float:
+        if self.market_data is not None:
+            streamed_price = self.market_data.get_current_price(symbol)
+            if streamed_price is not None:
+                return streamed_price
+
         try:
             ticker = self.exchange.fetch_ticker(symbol)
-            logging.info(f"Fetched ticker for {symbol}: {ticker}")
+            logging.info("Fetched ticker for %s: %s", symbol, ticker)
 
             if "bid" in ticker and "ask" in ticker:
                 bid = ticker["bid"]
@@ -1940,7 +1929,7 @@ class Exchange:
             else:
                 raise KeyError(f"Ticker does not contain 'bid' or 'ask': {ticker}")
         except Exception as e:
-            logging.info(f"An error occurred in get_current_price() for {symbol}: {e}")
+            logging.info("An error occurred in get_current_price() for %s: %s", symbol, e)
             logging.info(traceback.format_exc())
             return None
 
@@ -2022,23 +2011,16 @@ class Exchange:
         values = {"MA_3_H": 0.0, "MA_3_L": 0.0, "MA_6_H": 0.0, "MA_6_L": 0.0}
         for i in range(max_retries):
             try:
-                bars = self.exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, limit=num_bars)
-                if not bars:
+                series = self.candles.get(symbol, timeframe, num_bars)
+                if len(series) == 0:
                     logging.info(f"No data returned for {symbol} on {timeframe}. Retrying...")
                     time.sleep(retry_delay)
                     continue
-                
-                df = pd.DataFrame(bars, columns=["Time", "Open", "High", "Low", "Close", "Volume"])
-                df["Time"] = pd.to_datetime(df["Time"], unit="ms")
-                df["MA_3_High"] = df["High"].rolling(3).mean()
-                df["MA_3_Low"] = df["Low"].rolling(3).mean()
-                df["MA_6_High"] = df["High"].rolling(6).mean()
-                df["MA_6_Low"] = df["Low"].rolling(6).mean()
-                
-                values["MA_3_H"] = df["MA_3_High"].iat[-1] if len(df["MA_3_High"]) > 0 else None
-                values["MA_3_L"] = df["MA_3_Low"].iat[-1] if len(df["MA_3_Low"]) > 0 else None
-                values["MA_6_H"] = df["MA_6_High"].iat[-1] if len(df["MA_6_High"]) > 0 else None
-                values["MA_6_L"] = df["MA_6_Low"].iat[-1] if len(df["MA_6_Low"]) > 0 else None
+
+                values["MA_3_H"] = series.value("sma", 3, source="high")
+                values["MA_3_L"] = series.value("sma", 3, source="low")
+                values["MA_6_H"] = series.value("sma", 6, source="high")
+                values["MA_6_L"] = series.value("sma", 6, source="low")
 
                 if None not in values.values():
                     break
@@ -2066,6 +2048,7 @@ class Exchange:
             return None
 
 
+    @traced()
     def get_open_orders(self, symbol: str) -> list:
         open_orders_list = []
         try:
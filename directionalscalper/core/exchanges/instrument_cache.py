@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import threading
+import traceback
+from typing import Optional
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="InstrumentCache", filename="InstrumentCache.log", stream=True)
+
+
+class InstrumentCache:
+    """
+    Process-wide instrument metadata (precision, min qty, tick size, contract
+    size, max leverage, leverage tiers) loaded once in bulk and indexed by both
+    exchange market id ('BTCUSDT') and unified symbol ('BTC/USDT:USDT').
+
+    Markets are refreshed every `refresh_interval` seconds, or sooner when a
+    lookup misses (new listing / BadSymbol). Leverage tiers are fetched lazily
+    per symbol and params and share the same TTL. With `persist_path` set the market list
+    is written to disk so a restart inside the refresh window skips the
+    instruments endpoint entirely.
+    """
+
+    def __init__(self, exchange, refresh_interval: float = 3600, persist_path: Optional[str] = None,
+                 miss_refresh_interval: float = 60):
+        self.exchange = exchange
+        self.refresh_interval = refresh_interval
+        self.persist_path = persist_path
+        self.miss_refresh_interval = miss_refresh_interval
+        self.lock = threading.Lock()
+        self.by_key = {}
+        self.loaded_at = 0.0
+        self.last_miss_refresh = 0.0
+        self.leverage_tiers = {}
+        self.clients = [exchange]
+
+    def attach(self, exchange):
+        """Share the loaded markets with another ccxt instance of the same exchange."""
+        if exchange not in self.clients:
+            self.clients.append(exchange)
+            if self.by_key and not exchange.markets:
+                exchange.set_markets(list({id(m): m for m in self.by_key.values()}.values()))
+
+    # ── loading ──────────────────────────────────────────────────────────
+    def _index(self, markets):
+        # Spot and linear share market ids ('BTCUSDT'); the id resolves to the
+        # market type this bot trades, unified symbols stay unambiguous.
+        default_type = self.exchange.options.get('defaultType', 'swap')
+        by_key = {}
+        for market in markets:
+            by_key[market['symbol']] = market
+            current = by_key.get(market['id'])
+            if current is None or (current.get('type') != default_type and market.get('type') == default_type):
+                by_key[market['id']] = market
+        return by_key
+
+    def _load_from_disk(self):
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return None
+        try:
+            with open(self.persist_path, "r") as f:
+                payload = json.load(f)
+            if time.time() - payload.get("saved_at", 0) > self.refresh_interval:
+                return None
+            return payload["markets"], payload["saved_at"]
+        except Exception as e:
+            logging.info(f"Ignoring unreadable instrument cache {self.persist_path}: {e}")
+            return None
+
+    def _save_to_disk(self, markets):
+        if not self.persist_path:
+            return
+        try:
+            directory = os.path.dirname(self.persist_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.persist_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"saved_at": self.loaded_at, "markets": markets}, f)
+            os.replace(tmp_path, self.persist_path)
+        except Exception as e:
+            logging.info(f"Could not persist instrument cache to {self.persist_path}: {e}")
+
+    def load(self, force: bool = False):
+        """Bulk-load every market. Uses the disk copy or ccxt's already-loaded markets when fresh enough."""
+        with self.lock:
+            if not force and self.by_key and time.time() - self.loaded_at < self.refresh_interval:
+                return
+            markets = None
+            loaded_at = time.time()
+            if not force:
+                cached = self._load_from_disk()
+                if cached is not None:
+                    markets, loaded_at = cached
+                    logging.info(f"Loaded {len(markets)} instruments from {self.persist_path}")
+                elif self.exchange.markets and not self.by_key:
+                    markets = list(self.exchange.markets.values())
+            if markets is None:
+                try:
+                    markets = self.exchange.fetch_markets()
+                except Exception as e:
+                    logging.info(f"Error loading instruments: {e}")
+                    logging.debug(traceback.format_exc())
+                    return
+                logging.info(f"Fetched {len(markets)} instruments from the exchange")
+            self.by_key = self._index(markets)
+            self.loaded_at = loaded_at
+            self.leverage_tiers = {}
+            # Share the list with ccxt so its own load_markets() stays a no-op
+            for client in self.clients:
+                client.set_markets(markets)
+            self._save_to_disk(markets)
+
+    def market(self, symbol: str) -> Optional[dict]:
+        """O(1) lookup by market id or unified symbol; refreshes once on a miss."""
+        if not self.by_key or time.time() - self.loaded_at >= self.refresh_interval:
+            self.load(force=bool(self.by_key))
+        market = self.by_key.get(symbol)
+        if market is None and time.time() - self.last_miss_refresh >= self.miss_refresh_interval:
+            self.last_miss_refresh = time.time()
+            logging.info(f"Unknown symbol {symbol}, refreshing instruments")
+            self.load(force=True)
+            market = self.by_key.get(symbol)
+        return market
+
+    def invalidate(self):
+        """
+        Force the next lookup to reload, e.g. after a BadSymbol error. Like a
+        lookup miss, this reloads at most once per `miss_refresh_interval`.
+        """
+        now = time.time()
+        if now - self.last_miss_refresh >= self.miss_refresh_interval:
+            self.last_miss_refresh = now
+            self.loaded_at = 0.0
+
+    # ── accessors ────────────────────────────────────────────────────────
+    def precision(self, symbol: str):
+        market = self.market(symbol)
+        if market is None:
+            return None, None
+        return market['precision']['amount'], market['precision']['price']
+
+    def min_qty(self, symbol: str):
+        market = self.market(symbol)
+        return market['limits']['amount']['min'] if market else None
+
+    def tick_size(self, symbol: str):
+        market = self.market(symbol)
+        if market is None:
+            return None
+        return market.get('info', {}).get('priceFilter', {}).get('tickSize')
+
+    def contract_size(self, symbol: str):
+        market = self.market(symbol)
+        return market.get('contractSize') if market else None
+
+    def max_leverage(self, symbol: str):
+        market = self.market(symbol)
+        if market is None:
+            return None
+        leverage = market.get('limits', {}).get('leverage', {}).get('max')
+        if leverage is None:
+            leverage = market.get('info', {}).get('leverageFilter', {}).get('maxLeverage')
+        return float(leverage) if leverage is not None else None
+
+    def get_leverage_tiers(self, symbol: str, params=None):
+        """Leverage tiers for one symbol and set of params, fetched on first use and kept for `refresh_interval`."""
+        params = params or {}
+        key = (symbol, json.dumps(params, sort_keys=True, default=str))
+        cached = self.leverage_tiers.get(key)
+        if cached is not None and time.time() - cached[0] < self.refresh_interval:
+            return cached[1]
+        tiers = self.exchange.fetch_derivatives_market_leverage_tiers(symbol, params)
+        self.leverage_tiers[key] = (time.time(), tiers)
+        return tiers
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_instrument_cache(exchange, refresh_interval: Optional[float] = None, persist_path: Optional[str] = None) -> InstrumentCache:
+    """Return the shared cache for this exchange id/market type, creating it on first use."""
+    key = (exchange.id, exchange.options.get('defaultType'))
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = InstrumentCache(exchange, refresh_interval or 3600, persist_path)
+        else:
+            cache.attach(exchange)
+            if refresh_interval:
+                cache.refresh_interval = refresh_interval
+            if persist_path:
+                cache.persist_path = persist_path
+        return cache
@@ -0,0 +1,423 @@
+import json
+import time
+import threading
+from typing import Optional, Tuple, List, Iterable
+
+from directionalscalper.core.exchanges.ws_stream import WebSocketStream
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="MarketData", filename="MarketData.log", stream=True)
+
+BYBIT_PUBLIC_WS_URL = "wss://stream.bybit.com/v5/public/linear"
+
+# ccxt timeframe -> Bybit v5 kline interval
+BYBIT_KLINE_INTERVALS = {
+    "1m": "1", "3m": "3", "5m": "5", "15m": "15", "30m": "30",
+    "1h": "60", "2h": "120", "4h": "240", "6h": "360", "12h": "720",
+    "1d": "D", "1w": "W", "1M": "M",
+}
+
+
+def normalize_symbol(symbol: str) -> str:
+    """
+    Map any of the symbol spellings used around the bot ('BTCUSDT',
+    'BTC/USDT', 'BTC/USDT:USDT') onto the Bybit market id ('BTCUSDT').
+    """
+    symbol = symbol.upper()
+    if '/' in symbol:
+        base, rest = symbol.split('/', 1)
+        quote = rest.split(':', 1)[0]
+        return f"{base}{quote}"
+    return symbol
+
+
+class BookState:
+    """
+    In-memory L2 book, ticker and last trade for a single symbol.
+
+    The book follows Bybit's update ids: a snapshot sets `u`, and each delta
+    must carry the next one. A delta that does not is a gap, after which the
+    book is unknown until the next snapshot (update_id is None meanwhile).
+    `seq` only ever increases, so a frame at or below the last one is stale.
+    """
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = {}
+        self.asks = {}
+        self.update_id = None
+        self.seq = None
+        self.exchange_ts = None
+        self.book_received_at = 0.0
+        self.last_price = None
+        self.ticker_bid = None
+        self.ticker_ask = None
+        self.ticker_received_at = 0.0
+        self.last_trade = None
+        self.trade_received_at = 0.0
+
+    def apply_snapshot(self, bids, asks, update_id=None, exchange_ts=None, seq=None):
+        self.bids = {float(p): float(q) for p, q in bids if float(q) > 0}
+        self.asks = {float(p): float(q) for p, q in asks if float(q) > 0}
+        self.update_id = update_id
+        self.seq = seq
+        self.exchange_ts = exchange_ts
+        self.book_received_at = time.time()
+
+    def check_delta(self, update_id=None, seq=None) -> str:
+        """'apply', 'stale' (an old or repeated frame, to drop) or 'gap' (the book is out of sync)."""
+        if seq is not None and self.seq is not None and seq <= self.seq:
+            return "stale"
+        if update_id is None:
+            return "apply"
+        if self.update_id is None or update_id != self.update_id + 1:
+            return "gap"
+        return "apply"
+
+    def invalidate(self):
+        """Forget the book after a gap; reads fall back to REST until the next snapshot."""
+        self.bids = {}
+        self.asks = {}
+        self.update_id = None
+        self.book_received_at = 0.0
+
+    def apply_delta(self, bids, asks, update_id=None, exchange_ts=None, seq=None):
+        for side, rows in ((self.bids, bids), (self.asks, asks)):
+            for price, qty in rows:
+                price, qty = float(price), float(qty)
+                if qty == 0:
+                    side.pop(price, None)
+                else:
+                    side[price] = qty
+        self.update_id = update_id
+        if seq is not None:
+            self.seq = seq
+        self.exchange_ts = exchange_ts
+        self.book_received_at = time.time()
+
+    def sorted_bids(self, depth=None) -> List[List[float]]:
+        rows = sorted(self.bids.items(), key=lambda row: row[0], reverse=True)
+        return [[p, q] for p, q in rows[:depth]]
+
+    def sorted_asks(self, depth=None) -> List[List[float]]:
+        rows = sorted(self.asks.items(), key=lambda row: row[0])
+        return [[p, q] for p, q in rows[:depth]]
+
+    def best_bid(self) -> Optional[float]:
+        return max(self.bids) if self.bids else None
+
+    def best_ask(self) -> Optional[float]:
+        return min(self.asks) if self.asks else None
+
+
+class MarketDataHub:
+    """
+    Process-wide store of streamed public market data.
+
+    Feeds push Bybit v5 public frames into `handle_message`; strategy threads
+    read books/prices back out of memory. Every read takes a `max_age` and
+    returns None when the stream for that symbol is stale, so callers can fall
+    back to REST.
+    """
+
+    def __init__(self, max_age: float = 2.0, depth: int = 50):
+        self.max_age = max_age
+        self.depth = depth
+        self.lock = threading.Lock()
+        self.books = {}
+        self.subscribed = set()
+        self.resyncing = set()  # market ids whose book waits for a fresh snapshot
+        self.feed = None
+        self.candles = None
+
+    # ── subscriptions ────────────────────────────────────────────────────
+    def attach_feed(self, feed):
+        self.feed = feed
+        if self.subscribed:
+            feed.subscribe(sorted(self.subscribed))
+
+    def subscribe(self, symbol: str):
+        market_id = normalize_symbol(symbol)
+        with self.lock:
+            if market_id in self.subscribed:
+                return
+            self.subscribed.add(market_id)
+            self.books.setdefault(market_id, BookState(market_id))
+        logging.info(f"[{market_id}] Subscribing to public market data stream")
+        if self.feed is not None:
+            self.feed.subscribe([market_id])
+
+    def attach_candles(self, store):
+        """Route `kline.*` frames into a CandleStore."""
+        self.candles = store
+        store.attach_stream(self)
+
+    def subscribe_klines(self, symbol: str, timeframe: str):
+        interval = BYBIT_KLINE_INTERVALS.get(timeframe)
+        if interval is None or self.feed is None:
+            return
+        self.feed.subscribe_topics([f"kline.{interval}.{normalize_symbol(symbol)}"])
+
+    # ── ingestion ────────────────────────────────────────────────────────
+    def handle_message(self, message: dict):
+        """Apply a single decoded Bybit v5 public stream frame."""
+        topic = message.get("topic")
+        if not topic:
+            return
+        data = message.get("data")
+        if topic.startswith("orderbook."):
+            self._handle_orderbook(message.get("type"), data, message.get("ts"))
+        elif topic.startswith("tickers."):
+            self._handle_ticker(topic.split(".", 1)[1], data)
+        elif topic.startswith("publicTrade."):
+            self._handle_trades(topic.split(".", 1)[1], data)
+        elif topic.startswith("kline.") and self.candles is not None:
+            _, interval, market_id = topic.split(".", 2)
+            self.candles.handle_kline(market_id, interval, data)
+
+    def _state(self, market_id: str) -> BookState:
+        state = self.books.get(market_id)
+        if state is None:
+            state = self.books[market_id] = BookState(market_id)
+        return state
+
+    def _handle_orderbook(self, frame_type, data, ts):
+        market_id = data["s"]
+        update_id, seq = data.get("u"), data.get("seq")
+        resync = False
+        with self.lock:
+            state = self._state(market_id)
+            if frame_type == "snapshot":
+                state.apply_snapshot(data.get("b", []), data.get("a", []), update_id, ts, seq)
+                self.resyncing.discard(market_id)
+                return
+            check = state.check_delta(update_id, seq)
+            if check == "apply":
+                state.apply_delta(data.get("b", []), data.get("a", []), update_id, ts, seq)
+            elif check == "gap":
+                expected = state.update_id + 1 if state.update_id is not None else None
+                state.invalidate()
+                if market_id not in self.resyncing:
+                    self.resyncing.add(market_id)
+                    resync = True
+        if resync:
+            logging.info(f"[{market_id}] Order book update {update_id} out of sequence (expected {expected}), resubscribing for a snapshot")
+            if self.feed is not None:
+                self.feed.resync(market_id)
+
+    def _handle_ticker(self, market_id, data):
+        # Linear tickers arrive as a snapshot followed by partial deltas, so
+        # only overwrite the fields present in each frame.
+        with self.lock:
+            state = self._state(market_id)
+            if data.get("lastPrice"):
+                state.last_price = float(data["lastPrice"])
+            if data.get("bid1Price"):
+                state.ticker_bid = float(data["bid1Price"])
+            if data.get("ask1Price"):
+                state.ticker_ask = float(data["ask1Price"])
+            state.ticker_received_at = time.time()
+
+    def _handle_trades(self, market_id, data):
+        if not data:
+            return
+        trade = data[-1]
+        with self.lock:
+            state = self._state(market_id)
+            state.last_trade = {
+                "price": float(trade["p"]),
+                "qty": float(trade["v"]),
+                "side": trade["S"].lower(),
+                "timestamp": trade["T"],
+            }
+            state.last_price = state.last_trade["price"]
+            state.trade_received_at = time.time()
+
+    # ── reads ────────────────────────────────────────────────────────────
+    def staleness(self, symbol: str) -> Optional[float]:
+        """Seconds since the last book update for `symbol`, or None if never seen."""
+        state = self.books.get(normalize_symbol(symbol))
+        if state is None or not state.book_received_at:
+            return None
+        return time.time() - state.book_received_at
+
+    def _fresh(self, received_at: float, max_age: Optional[float]) -> bool:
+        max_age = self.max_age if max_age is None else max_age
+        return bool(received_at) and time.time() - received_at <= max_age
+
+    def get_orderbook(self, symbol: str, max_age: Optional[float] = None, depth: Optional[int] = None) -> Optional[dict]:
+        market_id = normalize_symbol(symbol)
+        self.subscribe(market_id)
+        with self.lock:
+            state = self.books.get(market_id)
+            if state is None or not self._fresh(state.book_received_at, max_age):
+                return None
+            bids = state.sorted_bids(depth)
+            asks = state.sorted_asks(depth)
+            received_at = state.book_received_at
+            exchange_ts = state.exchange_ts
+        if not bids or not asks:
+            return None
+        return {
+            "bids": bids,
+            "asks": asks,
+            "timestamp": exchange_ts,
+            "received_at": received_at,
+        }
+
+    def get_best_bid_ask(self, symbol: str, max_age: Optional[float] = None) -> Tuple[Optional[float], Optional[float]]:
+        market_id = normalize_symbol(symbol)
+        self.subscribe(market_id)
+        with self.lock:
+            state = self.books.get(market_id)
+            if state is None:
+                return None, None
+            if self._fresh(state.book_received_at, max_age):
+                return state.best_bid(), state.best_ask()
+            if self._fresh(state.ticker_received_at, max_age):
+                return state.ticker_bid, state.ticker_ask
+        return None, None
+
+    def get_current_price(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Mid price from the streamed book, matching Exchange.get_current_price."""
+        best_bid, best_ask = self.get_best_bid_ask(symbol, max_age)
+        if best_bid is None or best_ask is None:
+            return None
+        return (best_bid + best_ask) / 2
+
+    def get_last_trade(self, symbol: str, max_age: Optional[float] = None) -> Optional[dict]:
+        market_id = normalize_symbol(symbol)
+        self.subscribe(market_id)
+        with self.lock:
+            state = self.books.get(market_id)
+            if state is None or not self._fresh(state.trade_received_at, max_age):
+                return None
+            return dict(state.last_trade)
+
+
+class BybitPublicFeed(WebSocketStream):
+    """
+    Live Bybit v5 public stream feeding a MarketDataHub. Every subscribed
+    symbol is re-subscribed after a reconnect.
+    """
+
+    name = "BybitPublicFeed"
+
+    def __init__(self, hub: MarketDataHub, url: str = BYBIT_PUBLIC_WS_URL, ping_interval: int = 20, reconnect_delay: int = 5):
+        super().__init__(url, ping_interval, reconnect_delay)
+        self.hub = hub
+        self.symbols = set()
+        self.extra_topics = set()
+
+    def topics_for(self, market_id: str) -> List[str]:
+        return [f"orderbook.{self.hub.depth}.{market_id}", f"tickers.{market_id}", f"publicTrade.{market_id}"]
+
+    def subscribe(self, market_ids: Iterable[str]):
+        new_ids = [m for m in market_ids if m not in self.symbols]
+        if not new_ids:
+            return
+        self.symbols.update(new_ids)
+        for payload in self._subscribe_frames(new_ids):
+            self.send_threadsafe(payload)
+
+    def resync(self, market_id: str):
+        """Resubscribe to a symbol's order book; Bybit answers a subscribe with a snapshot."""
+        topic = f"orderbook.{self.hub.depth}.{market_id}"
+        self.send_threadsafe({"op": "unsubscribe", "args": [topic]})
+        self.send_threadsafe({"op": "subscribe", "args": [topic]})
+
+    def subscribe_topics(self, topics: Iterable[str]):
+        """Subscribe to topics outside the per-symbol set, e.g. klines."""
+        new_topics = [t for t in topics if t not in self.extra_topics]
+        if not new_topics:
+            return
+        self.extra_topics.update(new_topics)
+        for payload in self._topic_frames(new_topics):
+            self.send_threadsafe(payload)
+
+    @staticmethod
+    def _topic_frames(topics):
+        # Bybit caps a single subscribe request at 10 topics
+        return [{"op": "subscribe", "args": topics[i:i + 10]} for i in range(0, len(topics), 10)]
+
+    def _subscribe_frames(self, market_ids):
+        return self._topic_frames([topic for market_id in market_ids for topic in self.topics_for(market_id)])
+
+    async def on_open(self, ws):
+        for payload in self._subscribe_frames(sorted(self.symbols)) + self._topic_frames(sorted(self.extra_topics)):
+            await ws.send_json(payload)
+
+    def on_message(self, message: dict):
+        self.hub.handle_message(message)
+
+
+class ReplayFeed:
+    """
+    Offline feed that pushes recorded Bybit v5 public frames into a hub.
+
+    `frames` may be an iterable of dicts or a path to a JSON-lines capture.
+    With `realtime=True` the original spacing between frame timestamps is
+    preserved; otherwise frames are applied as fast as possible. A recording
+    cannot be asked for a snapshot, so resyncs are only counted in `resyncs`;
+    the book recovers at the next recorded snapshot.
+    """
+
+    def __init__(self, hub: MarketDataHub, frames, realtime: bool = False):
+        self.hub = hub
+        self.frames = frames
+        self.realtime = realtime
+        self.symbols = set()
+        self.resyncs = []
+
+    def subscribe(self, market_ids: Iterable[str]):
+        self.symbols.update(market_ids)
+
+    def resync(self, market_id: str):
+        self.resyncs.append(market_id)
+
+    def subscribe_topics(self, topics: Iterable[str]):
+        pass
+
+    def _iter_frames(self):
+        if isinstance(self.frames, str):
+            with open(self.frames, "r") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+        else:
+            yield from self.frames
+
+    def run(self) -> int:
+        applied = 0
+        previous_ts = None
+        for frame in self._iter_frames():
+            ts = frame.get("ts")
+            if self.realtime and previous_ts is not None and ts is not None:
+                time.sleep(max(0.0, (ts - previous_ts) / 1000))
+            previous_ts = ts
+            self.hub.handle_message(frame)
+            applied += 1
+        return applied
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name="ReplayFeed", daemon=True)
+        thread.start()
+        return thread
+
+
+_shared_hub = None
+_shared_hub_lock = threading.Lock()
+
+
+def get_market_data_hub(max_age: float = 2.0, start_stream: bool = True) -> MarketDataHub:
+    """Return the process-wide hub, creating it (and the live feed) on first use."""
+    global _shared_hub
+    with _shared_hub_lock:
+        if _shared_hub is None:
+            _shared_hub = MarketDataHub(max_age=max_age)
+            if start_stream:
+                feed = BybitPublicFeed(_shared_hub)
+                _shared_hub.attach_feed(feed)
+                feed.start()
+        return _shared_hub
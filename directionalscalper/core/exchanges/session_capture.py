@@ -0,0 +1,239 @@
+"""
+Record and replay the REST traffic of the bot's ccxt instances.
+
+Recording wraps `fetch2` of every ccxt instance Exchange creates (the same
+hook rate_limit.install_rate_limits uses), so each request the bot makes,
+through the unified methods or the implicit v5 endpoints, is captured with
+the raw decoded response or the error it raised. The calling thread only
+timestamps the call and queues a tuple; a writer thread turns the records
+into JSON lines and appends them to the capture file, so recording can stay
+on in production.
+
+Replay installs a `fetch2` that answers from a capture instead of the
+network. Responses are served in recorded order per endpoint, so the bot's
+threads can interleave differently than they did live and still get the
+answers meant for them, and ccxt parses them exactly as it did live. Given
+a SimulatedClock, each answer moves the clock to the moment the response
+arrived originally.
+
+Capture file, one JSON object per line:
+
+    {"t": start, "d": duration, "th": thread, "api": "private", "m": "POST",
+     "p": "v5/order/create-batch", "q": {params}, "r": {response}}
+
+with "e": [error class, message] instead of "r" for failed requests.
+"""
+
+import atexit
+import gzip
+import json
+import queue
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+import ccxt
+
+from ..strategies.logger import Logger
+
+logging = Logger(logger_name="SessionCapture", filename="SessionCapture.log", stream=True)
+
+
+class ReplayExhausted(BaseException):
+    """
+    The bot asked for more of an endpoint than the capture holds. Derived
+    from BaseException so the bot's `except Exception` retry loops let it
+    through and the replay ends instead of spinning.
+    """
+
+
+def _api_name(api) -> str:
+    return api if isinstance(api, str) else "/".join(api)
+
+
+def _open(path: str, mode: str):
+    return gzip.open(path, mode + "t", encoding="utf-8") if path.endswith(".gz") else open(path, mode, encoding="utf-8")
+
+
+class SessionRecorder:
+    """Append-only capture file fed from a queue by a writer thread."""
+
+    def __init__(self, path: str, flush_every: int = 256):
+        self.path = path
+        self.flush_every = flush_every
+        self.records = 0
+        self._queue = queue.SimpleQueue()
+        self._file = _open(path, "a")
+        self._writer = threading.Thread(target=self._write, name="SessionRecorder", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def record(self, started, duration, api, method, path, params, response=None, error=None):
+        self._queue.put((started, duration, threading.current_thread().name, api, method, path, params, response, error))
+
+    def _write(self):
+        pending = 0
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                item = False
+            if item is None:
+                break
+            if item is False:
+                if pending:
+                    self._file.flush()
+                    pending = 0
+                continue
+            started, duration, thread, api, method, path, params, response, error = item
+            record = {"t": started, "d": duration, "th": thread, "api": _api_name(api), "m": method, "p": path, "q": params}
+            if error is None:
+                record["r"] = response
+            else:
+                record["e"] = [type(error).__name__, str(error)]
+            try:
+                self._file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+            except Exception as e:
+                logging.error(f"Could not write capture record for {path}: {e}")
+                continue
+            self.records += 1
+            pending += 1
+            if pending >= self.flush_every or self._queue.empty():
+                self._file.flush()
+                pending = 0
+        self._file.flush()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=10)
+        if not self._file.closed:
+            self._file.close()
+
+
+class SessionReplay:
+    """
+    Serves a capture back, per (api, method, path) in recorded order.
+
+    :param clock: optional SimulatedClock moved to each response's original
+        arrival time (it never goes backwards)
+    """
+
+    def __init__(self, path: str, clock=None):
+        self.path = path
+        self.clock = clock
+        self.queues = defaultdict(deque)
+        self.start = None
+        self.end = None
+        self.served = 0
+        self.diverged = Counter()  # endpoint -> calls whose params differed from the recording
+        self._lock = threading.Lock()
+        with _open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                # Kept as text until served, so every answer is a fresh object
+                record = json.loads(line)
+                self.queues[(record["api"], record["m"], record["p"])].append((record["t"] + record["d"], line))
+                self.start = record["t"] if self.start is None else min(self.start, record["t"])
+                self.end = record["t"] + record["d"] if self.end is None else max(self.end, record["t"] + record["d"])
+        self.recorded = sum(len(q) for q in self.queues.values())
+
+    @property
+    def remaining(self) -> int:
+        return sum(len(q) for q in self.queues.values())
+
+    def fetch2(self, path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+        key = (_api_name(api), method, path)
+        with self._lock:
+            pending = self.queues.get(key)
+            if not pending:
+                raise ReplayExhausted(f"No recorded response left for {method} {path}")
+            arrived, line = pending.popleft()
+            self.served += 1
+            if self.clock is not None:
+                self.clock.set(arrived)
+        record = json.loads(line)
+        if json.dumps(params, sort_keys=True, default=str) != json.dumps(record["q"], sort_keys=True, default=str):
+            self.diverged[path] += 1
+        if "e" in record:
+            error_class, message = record["e"]
+            error = getattr(ccxt, error_class, None)
+            if not (isinstance(error, type) and issubclass(error, Exception)):
+                error = ccxt.ExchangeError
+            raise error(message)
+        return record["r"]
+
+
+def install_recorder(ccxt_exchange, recorder: SessionRecorder):
+    """Capture every REST request of a ccxt instance into recorder."""
+    if getattr(ccxt_exchange, "_session_recorder", None) is recorder:
+        return ccxt_exchange
+    original_fetch2 = ccxt_exchange.fetch2
+    clock = time.time
+
+    def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+        started = clock()
+        try:
+            response = original_fetch2(path, api, method, params, headers, body, config)
+        except Exception as e:
+            recorder.record(started, clock() - started, api, method, path, params, error=e)
+            raise
+        recorder.record(started, clock() - started, api, method, path, params, response=response)
+        return response
+
+    ccxt_exchange.fetch2 = fetch2
+    ccxt_exchange._session_recorder = recorder
+    return ccxt_exchange
+
+
+def install_replay(ccxt_exchange, replay: SessionReplay):
+    """Answer every REST request of a ccxt instance from a capture; nothing reaches the network."""
+    ccxt_exchange.fetch2 = replay.fetch2
+    ccxt_exchange.enableRateLimit = False
+    return ccxt_exchange
+
+
+_recorder = None
+_replay = None
+_session_lock = threading.Lock()
+
+
+def start_session_recording(path: str) -> SessionRecorder:
+    """Record the exchanges created from now on into path (process-wide)."""
+    global _recorder
+    with _session_lock:
+        if _recorder is None or _recorder.path != path:
+            _recorder = SessionRecorder(path)
+        return _recorder
+
+
+def start_session_replay(path: str, clock=None) -> SessionReplay:
+    """Serve the exchanges created from now on from the capture at path (process-wide)."""
+    global _replay
+    with _session_lock:
+        _replay = SessionReplay(path, clock)
+        return _replay
+
+
+def stop_session_capture():
+    global _recorder, _replay
+    with _session_lock:
+        if _recorder is not None:
+            _recorder.close()
+        _recorder = _replay = None
+
+
+def install_session_capture(ccxt_exchange) -> bool:
+    """
+    Hook a freshly created ccxt instance into the active recording or
+    replay. Returns True when it is being replayed (and must not be rate
+    limited or sent to the network).
+    """
+    if _replay is not None:
+        install_replay(ccxt_exchange, _replay)
+        return True
+    if _recorder is not None:
+        install_recorder(ccxt_exchange, _recorder)
+    return False
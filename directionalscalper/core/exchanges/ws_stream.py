@@ -0,0 +1,94 @@
+import json
+import asyncio
+import threading
+import traceback
+
+import aiohttp
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="WebSocketStream", filename="WebSocketStream.log", stream=True)
+
+
+class WebSocketStream:
+    """
+    Base class for the Bybit v5 streams. Runs its own asyncio loop on a
+    daemon thread, pings on an interval and reconnects whenever the socket
+    drops. Subclasses implement `on_open` (auth/subscribe) and `on_message`.
+    """
+
+    name = "WebSocketStream"
+
+    def __init__(self, url: str, ping_interval: int = 20, reconnect_delay: int = 5):
+        self.url = url
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self.loop = None
+        self.ws = None
+        self.thread = None
+        self.running = False
+        self.connected = threading.Event()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.loop is not None and self.ws is not None:
+            asyncio.run_coroutine_threadsafe(self.ws.close(), self.loop)
+
+    def send_threadsafe(self, payload: dict):
+        """Queue a JSON frame from any thread; dropped if not connected."""
+        if self.loop is not None and self.ws is not None:
+            asyncio.run_coroutine_threadsafe(self.ws.send_json(payload), self.loop)
+
+    async def on_open(self, ws):
+        pass
+
+    def on_message(self, message: dict):
+        raise NotImplementedError
+
+    def on_disconnect(self):
+        pass
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._run())
+
+    async def _run(self):
+        while self.running:
+            try:
+                async with aiohttp.ClientSession() as session:
+                    async with session.ws_connect(self.url, heartbeat=None) as ws:
+                        self.ws = ws
+                        logging.info(f"[{self.name}] Connected to {self.url}")
+                        await self.on_open(ws)
+                        self.connected.set()
+                        pinger = asyncio.ensure_future(self._ping(ws))
+                        try:
+                            async for msg in ws:
+                                if msg.type == aiohttp.WSMsgType.TEXT:
+                                    self.on_message(json.loads(msg.data))
+                                elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                    break
+                        finally:
+                            pinger.cancel()
+                            self.ws = None
+                            self.connected.clear()
+                            self.on_disconnect()
+            except Exception as e:
+                logging.info(f"[{self.name}] Stream error: {e}")
+                logging.debug(traceback.format_exc())
+            if self.running:
+                logging.info(f"[{self.name}] Disconnected, reconnecting in {self.reconnect_delay} seconds")
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _ping(self, ws):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            await ws.send_json({"op": "ping"})
@@ -0,0 +1,190 @@
+"""
+Shared HTTP client for plain REST calls (quantumvoid API data, public
+exchange endpoints). One keep-alive `requests.Session` is reused by every
+thread so repeated fetches skip the TCP/TLS handshake; urllib3 keeps a
+connection pool per host behind it.
+"""
+
+from __future__ import annotations
+
+import time
+import random
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="HTTPClient", filename="HTTPClient.log", stream=True)
+
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+RETRYABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class HostMetrics:
+    """Request count, errors, retries and recent latencies for one host."""
+
+    def __init__(self, window: int = 256):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.latencies = deque(maxlen=window)
+
+    def snapshot(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def pct(q):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 2)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else None,
+        }
+
+
+class HTTPClient:
+    """
+    Thread-safe pooled HTTP client with jittered exponential backoff.
+
+    Every request gets at most `max_retries` retries and never keeps retrying
+    past `max_elapsed` seconds in total. Only connection errors, timeouts and
+    transient statuses (429 / 5xx) are retried; other responses are returned
+    to the caller as-is. Responses are gzip-compressed whenever the server
+    supports it.
+    """
+
+    def __init__(self, pool_connections: int = 16, pool_maxsize: int = 32, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_cap: float = 30.0, timeout: float = 30.0,
+                 max_elapsed: float = 120.0):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = timeout
+        self.max_elapsed = max_elapsed
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.session = self._build_session()
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+        return session
+
+    def configure(self, **settings):
+        """Change pool/retry settings; a pool size change rebuilds the session."""
+        rebuild = False
+        for key, value in settings.items():
+            if value is None or not hasattr(self, key):
+                continue
+            rebuild |= key in ("pool_connections", "pool_maxsize") and getattr(self, key) != value
+            setattr(self, key, value)
+        if rebuild:
+            with self.lock:
+                old, self.session = self.session, self._build_session()
+            old.close()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential delay for the given retry number (1-based)."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def _host_metrics(self, host: str) -> HostMetrics:
+        metrics = self.metrics.get(host)
+        if metrics is None:
+            with self.lock:
+                metrics = self.metrics.setdefault(host, HostMetrics())
+        return metrics
+
+    def request(self, method: str, url: str, max_retries: int | None = None, timeout: float | None = None,
+                **kwargs) -> requests.Response:
+        """
+        Send a request through the shared pool. Returns the final response
+        (which may still be an error status) or raises the last
+        connection/timeout error once the retry budget is spent.
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        kwargs.setdefault("timeout", timeout or self.timeout)
+        metrics = self._host_metrics(urlsplit(url).netloc)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            error = None
+            response = None
+            sent = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                error = e
+            elapsed = time.monotonic() - sent
+            with self.lock:
+                metrics.requests += 1
+                metrics.latencies.append(elapsed)
+                if error is not None or response.status_code >= 400:
+                    metrics.errors += 1
+
+            retryable = error is not None or response.status_code in RETRY_STATUS
+            if not retryable:
+                return response
+
+            attempt += 1
+            delay = self.backoff(attempt)
+            if response is not None and response.headers.get("Retry-After", "").isdigit():
+                delay = max(delay, float(response.headers["Retry-After"]))
+            if attempt > max_retries or time.monotonic() - started + delay > self.max_elapsed:
+                if error is not None:
+                    raise error
+                return response
+
+            reason = error if error is not None else f"HTTP {response.status_code}"
+            logging.info(f"Retrying {method} {url} in {delay:.2f}s (attempt {attempt}/{max_retries}): {reason}")
+            with self.lock:
+                metrics.retries += 1
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def stats(self) -> dict:
+        """Per-host metrics: request/error/retry counts, error rate and latency percentiles."""
+        with self.lock:
+            return {host: metrics.snapshot() for host, metrics in self.metrics.items()}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HTTPClient()
+    return _client
+
+
+def configure_http_client(**settings) -> HTTPClient:
+    """Apply settings (pool_maxsize, max_retries, timeout, ...) to the shared client."""
+    client = get_http_client()
+    client.configure(**settings)
+    return client
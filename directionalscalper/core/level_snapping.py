@@ -0,0 +1,157 @@
+"""
+Snapping grid levels onto significant (high-volume) price levels.
+
+The grid builders move each grid level to a significant level within a
+relative tolerance of it, provided the significant level lies within the
+allowed price range of the level's side and, optionally, is more than a
+minimum spacing away from the previous grid level. Of the significant
+levels that qualify the lowest is taken, which is the first one for the
+ascending arrays calculate_volume_thresholds_and_significant_levels
+returns; a level nothing qualifies for stays where it is.
+
+The significant levels are sorted once, and the tolerance windows and
+range bounds of all grid levels come from one np.searchsorted each. Only
+the spacing rule, which depends on the previous snapped level, is applied
+level by level, by bisecting past the excluded band. Every predicate is
+evaluated with the same float expressions the per-level scans used, and
+the windows are corrected at their edges, so each snap matches the scan.
+"""
+
+from bisect import bisect_right
+
+import numpy as np
+
+VECTOR_CHECK_MIN = 48  # below this many grid levels the array checks cost more than they save
+
+
+def _tolerance_window(values, start, end, level, tolerance):
+    """Exact [start, end) of the sorted values with abs(level - s) / level < tolerance, from searchsorted guesses."""
+    size = len(values)
+    while start > 0 and abs(level - values[start - 1]) / level < tolerance:
+        start -= 1
+    while start < size and values[start] < level and not abs(level - values[start]) / level < tolerance:
+        start += 1
+    end = max(start, end)
+    while end < size and abs(level - values[end]) / level < tolerance:
+        end += 1
+    while end > start and values[end - 1] > level and not abs(level - values[end - 1]) / level < tolerance:
+        end -= 1
+    return start, end
+
+
+def _tolerance_windows(ordered, values, grid, tolerance):
+    """_tolerance_window for every grid level."""
+    reach = np.abs(grid) * tolerance
+    start = ordered.searchsorted(grid - reach, side="left")
+    end = np.maximum(start, ordered.searchsorted(grid + reach, side="right"))
+    levels = grid.tolist()
+    if len(levels) < VECTOR_CHECK_MIN:
+        windows = [_tolerance_window(values, s, e, level, tolerance) for s, e, level in zip(start.tolist(), end.tolist(), levels)]
+        return [w[0] for w in windows], [w[1] for w in windows]
+
+    # Check every guess at once; only the rare wrong ones go through the scalar loop
+    size = len(ordered)
+    padded = np.concatenate(([np.nan], ordered, [np.nan]))  # padded[i + 1] == ordered[i]; NaN is never within
+
+    def within(index):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.abs(grid - padded[index + 1]) / grid < tolerance
+
+    exact = (
+        ~within(start - 1)
+        & ((start == size) | (padded[np.minimum(start, size) + 1] >= grid) | within(np.minimum(start, size)))
+        & ~within(np.minimum(end, size))
+        & ((end == start) | (padded[end] <= grid) | within(end - 1))
+    )
+    start, end = start.tolist(), end.tolist()
+    for i in np.flatnonzero(~exact).tolist():
+        start[i], end[i] = _tolerance_window(values, start[i], end[i], levels[i], tolerance)
+    return start, end
+
+
+def _next_free(taken, k):
+    """First index from k on that no earlier level snapped to (taken maps a used index to the next one to try)."""
+    root = k
+    while root in taken:
+        root = taken[root]
+    while k in taken and taken[k] != root:
+        taken[k], k = root, taken[k]
+    return root
+
+
+def _per_level(value, count):
+    """A scalar or per-level argument as a float array of length count."""
+    value = np.asarray(value, dtype=float)
+    return np.full(count, value) if value.ndim == 0 else value
+
+
+def snap_levels(grid_levels, significant_levels, tolerance, lower, upper, spacing=None, keep=None, dedupe=True):
+    """
+    Snap grid_levels, in order, onto significant_levels.
+
+    :param tolerance: a significant level s qualifies for level when
+        abs(level - s) / level < tolerance
+    :param lower, upper: inclusive range s must lie in, one value for all
+        levels or one per grid level
+    :param spacing: when given (scalar or per level), s must also be more
+        than this away from the previous output level
+    :param keep: optional inclusive (low, high); adjusted levels outside it
+        are dropped and do not count as the previous level
+    :param dedupe: skip significant levels an earlier grid level already
+        snapped to, so two grid orders never land on the same price
+    :return: list of the adjusted levels; snapped ones are the elements of
+        significant_levels, the others the grid levels as passed
+    """
+    if len(grid_levels) == 0:
+        return []
+    grid = np.asarray(grid_levels, dtype=float)
+    count = len(grid)
+    if spacing is not None:
+        spacing = _per_level(spacing, count).tolist()
+
+    significant = np.asarray(significant_levels, dtype=float).ravel()
+    order = np.argsort(significant, kind="stable")
+    ordered = significant[order]
+    values = ordered.tolist()
+
+    # Range bounds are exact with searchsorted; the tolerance windows are
+    # guesses that are corrected at the edges
+    first = ordered.searchsorted(_per_level(lower, count), side="left").tolist()
+    last = ordered.searchsorted(_per_level(upper, count), side="right").tolist()
+    if values and tolerance > 0:
+        near_start, near_end = _tolerance_windows(ordered, values, grid, tolerance)
+
+    adjusted = []
+    taken = {}
+    previous = None
+    for i, level in enumerate(grid_levels):
+        start = end = 0
+        if values and tolerance > 0:
+            start = max(near_start[i], first[i])
+            end = min(near_end[i], last[i])
+
+        gap = None if spacing is None or previous is None else spacing[i]
+        k = start
+        while True:
+            if dedupe:
+                k = _next_free(taken, k)
+            if k >= end or gap is None or abs(values[k] - previous) > gap:
+                break
+            # Skip the band around the previous level in one step
+            excluded = k
+            k = max(k + 1, bisect_right(values, previous + gap, k, end))
+            while k - 1 > excluded and abs(values[k - 1] - previous) > gap:
+                k -= 1
+            while k < end and not abs(values[k] - previous) > gap:
+                k += 1
+
+        snapped = k < end
+        value = significant_levels[order[k]] if snapped else level
+
+        if keep is not None and not keep[0] <= value <= keep[1]:
+            continue
+        if snapped:
+            taken[k] = k + 1
+        adjusted.append(value)
+        previous = value
+    return adjusted
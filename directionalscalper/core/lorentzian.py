@@ -0,0 +1,245 @@
+"""
+Vectorized Lorentzian kNN used by `Exchange.generate_l_signals`.
+
+Features (RSI, ADX, CCI, WaveTrend) are kept per symbol as raw values
+between calls; only the bars that are new since the last call (plus a warm-up
+tail for the recursive indicators) are recomputed. Min/max normalization and
+all Lorentzian distances are then one NumPy pass over the window, and several
+symbols of equal length can be evaluated together as a (symbols, bars, 4)
+array.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+from numpy.lib.stride_tricks import sliding_window_view
+
+FEATURES = ("rsi", "adx", "cci", "wt")
+
+
+def _recurrence(seed, xs, decay):
+    """y[0] = seed, y[i] = decay * y[i-1] + xs[i-1], evaluated in C via lfilter."""
+    if len(xs) == 0:
+        return np.array([seed], dtype=float)
+    rest = lfilter([1.0], [1.0, -decay], xs, zi=[decay * seed])[0]
+    return np.concatenate([[seed], rest])
+
+
+def ewm(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    """pandas `ewm(alpha=..., min_periods=..., adjust=False).mean()` for a series with only leading NaNs."""
+    out = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if valid.size == 0:
+        return out
+    first = valid[0]
+    out[first:] = lfilter([alpha], [1.0, alpha - 1.0], values[first:], zi=[(1 - alpha) * values[first]])[0]
+    out[:first + min_periods - 1] = np.nan
+    return out
+
+
+def ema(values: np.ndarray, window: int) -> np.ndarray:
+    """`ta.trend.EMAIndicator(...).ema_indicator()`."""
+    return ewm(values, 2.0 / (window + 1), window)
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """`ta.trend.SMAIndicator(...).sma_indicator()`."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = sliding_window_view(values, window).mean(axis=1)
+    return out
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """`ta.momentum.RSIIndicator(...).rsi()`."""
+    diff = np.r_[np.nan, np.diff(close)]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        up = ewm(np.where(diff > 0, diff, 0.0), 1.0 / window, window)
+        down = ewm(np.where(diff < 0, -diff, 0.0), 1.0 / window, window)
+        return np.where(down == 0, 100, 100 - (100 / (1 + up / down)))
+
+
+def adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    Same values as `ta.trend.ADXIndicator(...).adx()` (including its zero
+    warm-up and its final-bar quirk) with the Python loops replaced by
+    linear recurrences.
+    """
+    n = len(close)
+    length = n - (window - 1)
+    if length <= window + 1:
+        return np.zeros(n)
+    close_shift = np.r_[np.nan, close[:-1]]
+    with np.errstate(invalid="ignore"):
+        true_range = np.amax([high, close_shift], axis=0) - np.amin([low, close_shift], axis=0)
+        diff_up = high - np.r_[np.nan, high[:-1]]
+        diff_down = np.r_[np.nan, low[:-1]] - low
+        pos = np.abs(((diff_up > diff_down) & (diff_up > 0)) * diff_up)
+        neg = np.abs(((diff_down > diff_up) & (diff_down > 0)) * diff_down)
+
+    def smoothed(values):
+        out = np.zeros(length)
+        seed = values[~np.isnan(values)][:window].sum()
+        decay = 1 - 1 / float(window)
+        # ta leaves the last slot at zero
+        out[:length - 1] = _recurrence(seed, values[window + 1:window + length - 1], decay)
+        return out
+
+    trs, dip, din = smoothed(true_range), smoothed(pos), smoothed(neg)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dip = np.where(trs != 0, 100 * dip / trs, 0.0)
+        din = np.where(trs != 0, 100 * din / trs, 0.0)
+        dx = np.where(dip + din != 0, 100 * np.abs((dip - din) / (dip + din)), 0.0)
+
+    adx_series = np.zeros(length)
+    adx_series[window:] = _recurrence(dx[:window].mean(), dx[window:length - 1] / window, (window - 1) / float(window))
+    return np.concatenate([np.zeros(window - 1), adx_series])
+
+
+def cci(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 20, constant: float = 0.015) -> np.ndarray:
+    """`ta.trend.CCIIndicator(...).cci()` with the rolling mean-absolute-deviation done on a window view."""
+    typical = (high + low + close) / 3.0
+    out = np.full(len(typical), np.nan)
+    if len(typical) < window:
+        return out
+    windows = sliding_window_view(typical, window)
+    means = windows.mean(axis=1)
+    mad = np.abs(windows - means[:, None]).mean(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[window - 1:] = (typical[window - 1:] - means) / (constant * mad)
+    return out
+
+
+def raw_features(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Un-normalized RSI / ADX / CCI / WaveTrend columns, one row per bar."""
+    hlc3 = (high + low + close) / 3
+    ema1 = ema(hlc3, 10)
+    ema2 = ema(np.abs(hlc3 - ema1), 10)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ci = (hlc3 - ema1) / (0.015 * ema2)
+    wt1 = ema(ci, 11)
+    wt2 = sma(wt1, 4)
+    return np.column_stack([rsi(close, 14), adx(high, low, close, 14), cci(high, low, close, 20), wt1 - wt2])
+
+
+def normalize_features(raw: np.ndarray) -> np.ndarray:
+    """Min/max scale every column to [0, 1] over the window (NaN-aware, like MinMaxScaler)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        low = np.nanmin(raw, axis=-2, keepdims=True)
+        high = np.nanmax(raw, axis=-2, keepdims=True)
+        return (raw - low) / (high - low)
+
+
+def lorentzian_distances(features: np.ndarray, stride: int = 4) -> np.ndarray:
+    """Distance from the newest row to every `stride`-th earlier row; works on (n, f) or (s, n, f)."""
+    current = features[..., -1:, :]
+    history = features[..., :-1:stride, :]
+    return np.log1p(np.abs(history - current)).sum(axis=-1)
+
+
+def select_neighbors(distances: np.ndarray, labels: np.ndarray, neighbors_count: int = 8) -> int:
+    """
+    Same neighbor rule as the original loop: walk candidates in time order,
+    accept any at least as far as the running threshold, and once more than
+    `neighbors_count` are held drop the oldest and reset the threshold to the
+    distance at the 3/4 mark. Each acceptance is found with one array search
+    instead of a Python step per row.
+    """
+    accepted_distances = []
+    accepted_labels = []
+    threshold = -1.0
+    position = 0
+    n = len(distances)
+    while position < n:
+        hits = np.flatnonzero(distances[position:] >= threshold)
+        if hits.size == 0:
+            break
+        i = position + hits[0]
+        threshold = distances[i]
+        accepted_distances.append(distances[i])
+        accepted_labels.append(labels[i])
+        if len(accepted_labels) > neighbors_count:
+            threshold = accepted_distances[int(neighbors_count * 3 / 4)]
+            accepted_distances.pop(0)
+            accepted_labels.pop(0)
+        position = i + 1
+    return int(np.sum(accepted_labels))
+
+
+def training_labels(close: np.ndarray, horizon: int = 4) -> np.ndarray:
+    """+1 where the close `horizon` bars later is higher, else -1 (newest bar excluded)."""
+    future = np.full(close.shape, np.nan)
+    future[:-horizon] = close[horizon:]
+    with np.errstate(invalid="ignore"):
+        return np.where(future > close, 1, -1)[:-1]
+
+
+class LorentzianEngine:
+    """
+    Per-symbol raw feature cache plus vectorized kNN prediction.
+
+    Each update recomputes the first `warmup` bars of the window and the new
+    bars plus `warmup` bars before them; the EMA/Wilder based features have
+    converged by then, so the result matches a full recomputation of the
+    window while the middle rows come from the cache.
+    """
+
+    def __init__(self, warmup: int = 500, stride: int = 4):
+        self.warmup = warmup
+        self.stride = stride
+        self.lock = threading.Lock()
+        self.cache = {}  # symbol -> (timestamps, raw features)
+
+    def features(self, symbol: str, df: pd.DataFrame) -> np.ndarray:
+        """Raw feature matrix aligned with `df`, reusing cached rows for bars seen before."""
+        ts = df.index.values.astype("int64")
+        high = df['high'].values.astype(float)
+        low = df['low'].values.astype(float)
+        close = df['close'].values.astype(float)
+        with self.lock:
+            cached = self.cache.get(symbol)
+        raw = None
+        if cached is not None:
+            cached_ts, cached_raw = cached
+            start = np.searchsorted(cached_ts, ts[0])
+            # Rows up to (not including) the previously newest bar are final; that bar may have been forming
+            reusable = len(cached_ts) - 1 - start
+            if (start < len(cached_ts) and cached_ts[start] == ts[0] and self.warmup < reusable <= len(ts)
+                    and np.array_equal(cached_ts[start:start + reusable], ts[:reusable])):
+                # The head is recomputed from the window start so its warm-up rows (which set the
+                # min/max used for normalization) are exactly what a fresh computation would give
+                head = raw_features(high[:self.warmup], low[:self.warmup], close[:self.warmup])
+                tail_start = reusable - self.warmup
+                tail = raw_features(high[tail_start:], low[tail_start:], close[tail_start:])
+                raw = np.concatenate([head, cached_raw[start + self.warmup:start + reusable], tail[self.warmup:]])
+        if raw is None:
+            raw = raw_features(high, low, close)
+        with self.lock:
+            self.cache[symbol] = (ts, raw)
+        return raw
+
+    def predict(self, symbol: str, df: pd.DataFrame, neighbors_count: int = 8) -> int:
+        features = normalize_features(self.features(symbol, df))
+        distances = lorentzian_distances(features, self.stride)
+        labels = training_labels(df['close'].values)[::self.stride]
+        return select_neighbors(distances, labels, neighbors_count)
+
+    def predict_batch(self, frames: dict, neighbors_count: int = 8) -> dict:
+        """Predictions for {symbol: df}; symbols with equal bar counts share one distance pass."""
+        by_length = {}
+        for symbol, df in frames.items():
+            by_length.setdefault(len(df), []).append(symbol)
+        predictions = {}
+        for symbols in by_length.values():
+            stacked = np.stack([normalize_features(self.features(s, frames[s])) for s in symbols])
+            distances = lorentzian_distances(stacked, self.stride)
+            for row, symbol in zip(distances, symbols):
+                labels = training_labels(frames[symbol]['close'].values)[::self.stride]
+                predictions[symbol] = select_neighbors(row, labels, neighbors_count)
+        return predictions
+
+    def forget(self, symbol: str):
+        with self.lock:
+            self.cache.pop(symbol, None)
@@ -0,0 +1,67 @@
+"""
+Order-book levels as NumPy arrays, for the volume histograms the grid uses.
+
+A ccxt-style book ({"bids": [[price, size, ...], ...], "asks": ...}) is
+converted once into price and size arrays per side. The histograms then
+bin the levels with one bincount instead of a Python loop. The bin index
+is computed with the same float operations the per-level loop used, and
+bincount adds the sizes in book order, so the histograms match the loop
+bit for bit.
+"""
+
+from itertools import chain
+
+import numpy as np
+
+HISTOGRAM_BINS = 100
+
+_EMPTY = np.empty(0, dtype=float)
+
+
+def side_arrays(levels):
+    """(prices, sizes) float arrays of one side of a book."""
+    if levels is None or len(levels) == 0:
+        return _EMPTY, _EMPTY
+    # Flattening the rows is about three times faster than np.asarray on a
+    # list of lists; it only lines up when every row is [price, size]
+    flat = np.fromiter(chain.from_iterable(levels), dtype=float)
+    if len(flat) == 2 * len(levels) and not np.isnan(flat).any():
+        rows = flat.reshape(-1, 2)
+    else:
+        # Rows with an order count, or None/NaN entries: float() raises on
+        # None here just as the per-level loops did
+        rows = np.array([(float(level[0]), float(level[1])) for level in levels], dtype=float)
+    return rows[:, 0], rows[:, 1]
+
+
+class BookArrays:
+    """Bid and ask prices and sizes of one book snapshot, in book order."""
+
+    __slots__ = ("bid_prices", "bid_sizes", "ask_prices", "ask_sizes")
+
+    def __init__(self, bid_prices, bid_sizes, ask_prices, ask_sizes):
+        self.bid_prices = bid_prices
+        self.bid_sizes = bid_sizes
+        self.ask_prices = ask_prices
+        self.ask_sizes = ask_sizes
+
+    @classmethod
+    def from_order_book(cls, order_book: dict) -> "BookArrays":
+        bid_prices, bid_sizes = side_arrays(order_book.get("bids"))
+        ask_prices, ask_sizes = side_arrays(order_book.get("asks"))
+        return cls(bid_prices, bid_sizes, ask_prices, ask_sizes)
+
+
+def volume_histogram(prices, sizes, lower, upper, range_min, range_max, bins):
+    """
+    Sum of sizes per bin of [range_min, range_max) split into HISTOGRAM_BINS
+    parts, over the levels priced within [lower, upper]. bins is the length
+    of the returned histogram. As with the loop this replaces, a level past
+    the last bin raises IndexError.
+    """
+    inside = (prices >= lower) & (prices <= upper)
+    index = ((prices[inside] - range_min) / (range_max - range_min) * HISTOGRAM_BINS).astype(np.intp)
+    histogram = np.bincount(index, weights=sizes[inside], minlength=bins)
+    if len(histogram) > bins:
+        raise IndexError(f"index {len(histogram) - 1} is out of bounds for axis 0 with size {bins}")
+    return histogram
@@ -0,0 +1,216 @@
+"""
+Pivot detection and the ZigZag used by `Exchange.calculate_zigzag`.
+
+Bar i is a pivot high when its high equals the highest high of the
+2 * length + 1 bars centred on it, and a pivot low likewise; bars without
+`length` bars on both sides are never pivots. Over a whole window the
+extremes come from sliding_window_view, and the ZigZag rule only has to be
+walked over the pivot bars instead of every bar.
+
+`ZigZag` keeps the same state incrementally: monotonic deques hold the
+window extremes, so a closed bar costs amortised O(1) whatever the length,
+and the still forming bar can be peeked without being committed, as with
+the candle store's indicators. `ZigZagEngine` keeps one per symbol and
+reuses it while the window still starts at the same bar; the rule depends
+on where the walk starts, so a window that slid forward is rebuilt.
+"""
+
+import threading
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def bar_arrays(ohlcv):
+    """(highs, lows) float arrays of ccxt-style [ts, o, h, l, c, v] rows."""
+    n = len(ohlcv)
+    highs = np.fromiter((bar[2] for bar in ohlcv), dtype=float, count=n)
+    lows = np.fromiter((bar[3] for bar in ohlcv), dtype=float, count=n)
+    return highs, lows
+
+
+def pivot_flags(highs: np.ndarray, lows: np.ndarray, length: int):
+    """(is_high, is_low) bool arrays, one entry per bar."""
+    n = len(highs)
+    is_high = np.zeros(n, dtype=bool)
+    is_low = np.zeros(n, dtype=bool)
+    window = 2 * length + 1
+    if n >= window:
+        centre = slice(length, n - length)
+        is_high[centre] = sliding_window_view(highs, window).max(axis=1) == highs[centre]
+        is_low[centre] = sliding_window_view(lows, window).min(axis=1) == lows[centre]
+    return is_high, is_low
+
+
+def _walk(state, high, low, is_high, is_low, out):
+    """One bar of the ZigZag rule; appends the new turning prices to out and returns the new state."""
+    direction_up, last_low, last_high = state
+    if direction_up:
+        if is_low and low < last_low:
+            last_low = low
+            out.append(low)
+        # Compared with last_low, as it always has been
+        if is_high and high > last_low:
+            last_high = high
+            direction_up = False
+            out.append(high)
+    else:
+        if is_high and high > last_high:
+            last_high = high
+            out.append(high)
+        if is_low and low < last_high:
+            last_low = low
+            direction_up = True
+            out.append(low)
+    return direction_up, last_low, last_high
+
+
+# last_low is only read once direction_up is set, which assigns it first
+_START = (False, float("inf"), 0.0)
+
+
+def _zigzag(highs: np.ndarray, lows: np.ndarray, length: int):
+    """(turning prices, state after the last bar) over whole arrays."""
+    is_high, is_low = pivot_flags(highs, lows, length)
+    pivots = []
+    state = _START
+    turning = np.flatnonzero(is_high | is_low)
+    bars = zip(highs[turning].tolist(), lows[turning].tolist(), is_high[turning].tolist(), is_low[turning].tolist())
+    for high, low, pivot_high, pivot_low in bars:
+        state = _walk(state, high, low, pivot_high, pivot_low, pivots)
+    return pivots, state
+
+
+def zigzag(highs, lows, length: int = 4) -> list:
+    """Turning prices of the ZigZag over the whole window."""
+    return _zigzag(np.asarray(highs, dtype=float), np.asarray(lows, dtype=float), length)[0]
+
+
+class ZigZag:
+    """
+    ZigZag over bars added one at a time. `update(high, low)` commits a
+    closed bar; `pivots_with(high, low)` returns the pivots as if one more
+    bar closed now, without changing state.
+    """
+
+    def __init__(self, length: int = 4):
+        self.length = length
+        self.window = 2 * length + 1
+        self.count = 0
+        self.state = _START
+        self.pivots = []
+        self.recent = deque(maxlen=self.window)  # (high, low) of the newest bars
+        self.highs = deque()  # (index, high), highs decreasing
+        self.lows = deque()   # (index, low), lows increasing
+
+    @classmethod
+    def from_bars(cls, highs, lows, length: int = 4) -> "ZigZag":
+        """A ZigZag with all of the given closed bars committed, computed in one pass."""
+        zz = cls(length)
+        highs = np.asarray(highs, dtype=float)
+        lows = np.asarray(lows, dtype=float)
+        zz.pivots, zz.state = _zigzag(highs, lows, length)
+        start = max(0, len(highs) - zz.window)
+        zz.count = start
+        for high, low in zip(highs[start:].tolist(), lows[start:].tolist()):
+            zz._push(high, low)
+        return zz
+
+    def _push(self, high, low):
+        index = self.count
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((index, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((index, low))
+        oldest = index - self.window + 1
+        while self.highs[0][0] < oldest:
+            self.highs.popleft()
+        while self.lows[0][0] < oldest:
+            self.lows.popleft()
+        self.recent.append((high, low))
+        self.count += 1
+
+    def update(self, high, low):
+        """Commit one closed bar; the bar `length` bars back is evaluated."""
+        self._push(high, low)
+        if self.count >= self.window:
+            centre_high, centre_low = self.recent[-1 - self.length]
+            self.state = _walk(
+                self.state, centre_high, centre_low,
+                centre_high == self.highs[0][1], centre_low == self.lows[0][1], self.pivots,
+            )
+        return self.pivots
+
+    @staticmethod
+    def _best(window, oldest, x, better):
+        for i, value in window:
+            if i >= oldest:
+                return x if better(x, value) else value
+        return x
+
+    def pivots_with(self, high, low) -> list:
+        """The pivots if a bar with this high and low were committed now."""
+        pivots = list(self.pivots)
+        if self.count + 1 < self.window:
+            return pivots
+        oldest = self.count - self.window + 1
+        highest = self._best(self.highs, oldest, high, lambda a, b: a >= b)
+        lowest = self._best(self.lows, oldest, low, lambda a, b: a <= b)
+        centre_high, centre_low = self.recent[-self.length] if self.length else (high, low)
+        _walk(self.state, centre_high, centre_low, centre_high == highest, centre_low == lowest, pivots)
+        return pivots
+
+
+class ZigZagEngine:
+    """
+    Per-symbol ZigZag over the OHLCV windows the strategies fetch. All but
+    the newest bar of a window are committed; the newest may still be
+    forming and is only peeked. While the window keeps its first bar, a
+    later call steps over the bars added since, otherwise it is rebuilt.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cache = {}  # (symbol, length) -> (ZigZag, first timestamp, newest committed timestamp)
+        self.key_locks = {}
+
+    def _key_lock(self, key):
+        with self.lock:
+            lock = self.key_locks.get(key)
+            if lock is None:
+                lock = self.key_locks[key] = threading.Lock()
+            return lock
+
+    def zigzag(self, symbol: str, ohlcv, length: int = 4) -> list:
+        n = len(ohlcv)
+        if n == 0:
+            return []
+        key = (symbol, length)
+        # The cached ZigZag is stepped in place, so the long and short threads
+        # of a symbol take turns from the catch-up through the peek
+        with self._key_lock(key):
+            with self.lock:
+                cached = self.cache.get(key)
+            zz = None
+            if cached is not None:
+                zz, first_ts, committed_ts = cached
+                count = zz.count
+                if 0 < count < n and ohlcv[0][0] == first_ts and ohlcv[count - 1][0] == committed_ts:
+                    for bar in ohlcv[count:n - 1]:
+                        zz.update(float(bar[2]), float(bar[3]))
+                else:
+                    zz = None
+            if zz is None:
+                highs, lows = bar_arrays(ohlcv)
+                zz = ZigZag.from_bars(highs[:-1], lows[:-1], length)
+            with self.lock:
+                self.cache[key] = (zz, ohlcv[0][0], ohlcv[n - 2][0] if n > 1 else None)
+            return zz.pivots_with(float(ohlcv[-1][2]), float(ohlcv[-1][3]))
+
+    def forget(self, symbol: str):
+        with self.lock:
+            for key in [key for key in self.cache if key[0] == symbol]:
+                del self.cache[key]
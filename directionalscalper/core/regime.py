@@ -0,0 +1,164 @@
+"""
+The Kalman-like moving filter (KLMF) and the regime filter of
+`Exchange.regime_filter`, on NumPy arrays.
+
+value1 (the smoothed bar-to-bar change) and value2 (the smoothed range)
+are recursions with constant coefficients and run in C through lfilter;
+omega and alpha are elementwise. Only the KLMF, whose gain alpha changes
+every bar, and the EMA of its slope are stepped in a loop, over plain
+floats. Each step uses the float operations of the old pandas loop (and
+of pandas' ewm for the EMA), in the same order.
+
+FilterState holds what the recursions carry from one bar to the next, so
+a later call only steps over the bars that are new. RegimeFilter keeps
+one per symbol together with the closed bars it covers: a window that
+starts with exactly those bars reuses them, any other window is computed
+from scratch. The newest bar may still be forming and is never committed.
+"""
+
+import math
+import threading
+
+import numpy as np
+from scipy.signal import lfilter
+
+SLOPE_EMA_WINDOW = 200  # EMAIndicator(abs_curve_slope, window=200)
+
+
+class FilterState:
+    """The recursions after the last bar stepped over (close is None before the first)."""
+
+    __slots__ = ("close", "value1", "value2", "klmf", "ema", "ema_weight", "observations")
+
+    def __init__(self):
+        self.close = None
+        self.value1 = 0.0
+        self.value2 = 0.0
+        self.klmf = 0.0
+        self.ema = math.nan
+        self.ema_weight = 1.0
+        self.observations = 0
+
+    def copy(self) -> "FilterState":
+        state = FilterState()
+        for name in self.__slots__:
+            setattr(state, name, getattr(self, name))
+        return state
+
+
+def _smooth(xs: np.ndarray, seed: float) -> np.ndarray:
+    """y[i] = xs[i] + 0.8 * y[i - 1], with y[-1] = seed."""
+    if len(xs) == 0:
+        return xs
+    return lfilter([1.0], [1.0, -0.8], xs, zi=[0.8 * seed])[0]
+
+
+def advance(state: FilterState, close: np.ndarray, high: np.ndarray, low: np.ndarray):
+    """
+    Step state over the bars close/high/low; returns (klmf, slope, slope
+    EMA) arrays for those bars. The first bar ever seeds the filter at 0.
+    """
+    n = len(close)
+    klmf = np.empty(n)
+    slope = np.empty(n)
+    ema = np.empty(n)
+    if n == 0:
+        return klmf, slope, ema
+    start = 0
+    if state.close is None:
+        # value1, value2 and the KLMF start at 0; diff() leaves the first slope NaN
+        klmf[0], slope[0] = 0.0, math.nan
+        state.close = float(close[0])
+        start = 1
+    previous_close = np.r_[state.close, close[start:-1]] if n > start else close[:0]
+    value1 = _smooth(0.2 * (close[start:] - previous_close), state.value1)
+    value2 = _smooth(0.1 * (high[start:] - low[start:]), state.value2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        omega = abs(value1 / value2)
+        alpha = (-omega ** 2 + np.sqrt(omega ** 4 + 16 * omega ** 2)) / 8
+
+    previous = state.klmf
+    values = klmf[start:]
+    slopes = slope[start:]
+    for i, (a, x) in enumerate(zip(alpha.tolist(), close[start:].tolist())):
+        current = a * x + (1 - a) * previous
+        values[i] = current
+        slopes[i] = abs(current - previous)
+        previous = current
+
+    # pandas ewm(span=..., adjust=False) with ignore_na=False, as EMAIndicator uses it
+    decay = 1 - 2.0 / (SLOPE_EMA_WINDOW + 1)
+    weight = 2.0 / (SLOPE_EMA_WINDOW + 1)
+    average, old_weight, observations = state.ema, state.ema_weight, state.observations
+    for i, x in enumerate(slope.tolist()):
+        if x == x:
+            if average == average:
+                old_weight *= decay
+                average = (old_weight * average + weight * x) / (old_weight + weight)
+                old_weight = 1.0
+            else:
+                average = x
+            observations += 1
+        elif average == average:
+            old_weight *= decay
+        ema[i] = average if observations >= SLOPE_EMA_WINDOW else math.nan
+
+    if n > start:
+        state.close = float(close[-1])
+        state.value1 = float(value1[-1])
+        state.value2 = float(value2[-1])
+        state.klmf = previous
+    state.ema, state.ema_weight, state.observations = average, old_weight, observations
+    return klmf, slope, ema
+
+
+def klmf(close, high, low) -> np.ndarray:
+    """The KLMF of a whole window."""
+    close, high, low = (np.asarray(values, dtype=float) for values in (close, high, low))
+    return advance(FilterState(), close, high, low)[0]
+
+
+def regime(slope: np.ndarray, ema: np.ndarray, threshold: float) -> np.ndarray:
+    """Bars whose KLMF slope is at least threshold above its EMA, relative to the EMA."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (slope - ema) / ema >= threshold
+
+
+class RegimeFilter:
+    """Per-symbol KLMF state over the windows the strategies pass in."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cache = {}  # symbol -> (FilterState, closes, highs, lows, slope, ema) of the closed bars
+
+    def slope(self, symbol, close: np.ndarray, high: np.ndarray, low: np.ndarray):
+        """(slope, slope EMA) arrays for the window, stepping only over bars not seen before."""
+        n = len(close)
+        with self.lock:
+            cached = self.cache.get(symbol)
+        state = None
+        if cached is not None:
+            state, closes, highs, lows, slope, ema = cached
+            k = len(closes)
+            if not (k < n and np.array_equal(close[:k], closes) and np.array_equal(high[:k], highs)
+                    and np.array_equal(low[:k], lows)):
+                state = None
+            else:
+                # Another thread may be stepping the cached state; advance a copy and publish that
+                state = state.copy()
+        if state is None:
+            state = FilterState()
+            k = 0
+            slope = ema = np.empty(0)
+        # Commit everything but the newest bar, then peek at that one
+        _, new_slope, new_ema = advance(state, close[k:n - 1], high[k:n - 1], low[k:n - 1])
+        slope = np.concatenate([slope, new_slope])
+        ema = np.concatenate([ema, new_ema])
+        with self.lock:
+            self.cache[symbol] = (state, close[:n - 1].copy(), high[:n - 1].copy(), low[:n - 1].copy(), slope, ema)
+        _, last_slope, last_ema = advance(state.copy(), close[n - 1:], high[n - 1:], low[n - 1:])
+        return np.concatenate([slope, last_slope]), np.concatenate([ema, last_ema])
+
+    def forget(self, symbol):
+        with self.lock:
+            self.cache.pop(symbol, None)
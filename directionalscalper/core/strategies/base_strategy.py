@@ -25,7 +25,7 @@ from threading import Thread, Lock
 
 from ..bot_metrics import BotDatabase
 
-from rate_limit import RateLimit
+from rate_limit import get_rate_limiter
 
 
 logging = Logger(logger_name="BaseStrategy", filename="BaseStrategy.log", stream=True)
@@ -165,20 +165,20 @@ class BaseStrategy:
         self.dynamic_amount_per_symbol = {}
         self.max_trade_qty_per_symbol = {}
         self.last_auto_reduce_time = {}
-        self.rate_limiter = RateLimit(10, 1)
-        self.general_rate_limiter = RateLimit(50, 1)
-        self.order_rate_limiter = RateLimit(5, 1) 
+        self.rate_limiter = get_rate_limiter("general")
+        self.general_rate_limiter = get_rate_limiter("general")
+        self.order_rate_limiter = get_rate_limiter("order_create")
         self.last_known_mas = {}
 
         # self.bybit = self.Bybit(self)
 
     def dbscan_classification(self, ohlcv_data, zigzag_length, epsilon_deviation, aggregate_range):
-        logging.info(f"Starting dbscan_classification with zigzag_length={zigzag_length}, epsilon_deviation={epsilon_deviation}, aggregate_range={aggregate_range}")
+        logging.info("Starting dbscan_classification with zigzag_length=%s, epsilon_deviation=%s, aggregate_range=%s", zigzag_length, epsilon_deviation, aggregate_range)
 
         # Extract highs and lows from the OHLCV data
         highs = np.array([candle['high'] for candle in ohlcv_data])
         lows = np.array([candle['low'] for candle in ohlcv_data])
-        logging.info(f"Extracted highs: {highs}, lows: {lows}")
+        logging.info("Extracted highs: %s, lows: %s", highs, lows)
 
         peaks_and_troughs = []
 
@@ -190,7 +190,7 @@ class BaseStrategy:
         for i in range(zigzag_length, len(ohlcv_data) - zigzag_length):
             h = np.max(highs[i - zigzag_length:i + zigzag_length + 1])
             l = np.min(lows[i - zigzag_length:i + zigzag_length + 1])
-            logging.info(f"Evaluating at index {i}: high={h}, low={l}, direction_up={direction_up}")
+            logging.info("Evaluating at index %s: high=%s, low=%s, direction_up=%s", i, h, l, direction_up)
 
             # Try a smaller zigzag_length
             zigzag_length = max(1, zigzag_length // 2)
@@ -215,7 +215,7 @@ class BaseStrategy:
 
         # Convert peaks_and_troughs to a numpy array
         zigzag = np.array(peaks_and_troughs)
-        logging.info(f"Generated zigzag array: {zigzag}")
+        logging.info("Generated zigzag array: %s", zigzag)
 
         # Check if zigzag array is empty
         if zigzag.size == 0:
@@ -225,28 +225,28 @@ class BaseStrategy:
         # Normalize the peaks and troughs
         min_price = np.min(zigzag)
         max_price = np.max(zigzag)
-        logging.info(f"Zigzag min_price: {min_price}, max_price: {max_price}")
+        logging.info("Zigzag min_price: %s, max_price: %s", min_price, max_price)
 
         normalized_zigzag = (zigzag - min_price) / (max_price - min_price)
-        logging.info(f"Normalized zigzag array: {normalized_zigzag}")
+        logging.info("Normalized zigzag array: %s", normalized_zigzag)
 
         # Calculate the mean deviation
         mean = np.mean(normalized_zigzag)
         deviation = np.mean(np.abs(normalized_zigzag - mean))
-        logging.info(f"Calculated mean: {mean}, deviation: {deviation}")
+        logging.info("Calculated mean: %s, deviation: %s", mean, deviation)
 
         # Define the epsilon value for DBSCAN
         epsilon = (deviation * epsilon_deviation) / 100.0
-        logging.info(f"Calculated epsilon for DBSCAN: {epsilon}")
+        logging.info("Calculated epsilon for DBSCAN: %s", epsilon)
 
         # Prepare data points for DBSCAN
         data_points = normalized_zigzag.reshape(-1, 1)
-        logging.info(f"Data points prepared for DBSCAN: {data_points}")
+        logging.info("Data points prepared for DBSCAN: %s", data_points)
 
         # Run DBSCAN clustering
         dbscan = DBSCAN(eps=epsilon, min_samples=1, metric='euclidean')
         dbscan.fit(data_points)
-        logging.info(f"DBSCAN labels: {dbscan.labels_}")
+        logging.info("DBSCAN labels: %s", dbscan.labels_)
 
         # Extract clusters and noise
         clusters = []
@@ -254,10 +254,10 @@ class BaseStrategy:
             if label != -1:  # -1 means noise
                 cluster = [i for i, l in enumerate(dbscan.labels_) if l == label]
                 clusters.append(cluster)
-                logging.info(f"Detected cluster with label {label}: {cluster}")
+                logging.info("Detected cluster with label %s: %s", label, cluster)
 
         noise = [i for i, l in enumerate(dbscan.labels_) if l == -1]
-        logging.info(f"Detected noise points: {noise}")
+        logging.info("Detected noise points: %s", noise)
 
         # Aggregate and filter clusters into significant levels
         support_resistance_levels = []
@@ -272,7 +272,7 @@ class BaseStrategy:
                 'strength': strength,
                 'average_volume': average_volume
             })
-            logging.info(f"Added support/resistance level: {median_price}, strength: {strength}, average volume: {average_volume}")
+            logging.info("Added support/resistance level: %s, strength: %s, average volume: %s", median_price, strength, average_volume)
 
         # Add significant noise levels
         max_level = np.max([level['level'] for level in support_resistance_levels])
@@ -287,18 +287,18 @@ class BaseStrategy:
                     'strength': 1,
                     'average_volume': noise_volume
                 })
-                logging.info(f"Added significant noise level above max level: {noise_level}")
+                logging.info("Added significant noise level above max level: %s", noise_level)
             elif noise_level < min_level and (min_level - noise_level) / min_level > aggregate_range / 100.0:
                 support_resistance_levels.append({
                     'level': noise_level,
                     'strength': 1,
                     'average_volume': noise_volume
                 })
-                logging.info(f"Added significant noise level below min level: {noise_level}")
+                logging.info("Added significant noise level below min level: %s", noise_level)
 
         # Sort the levels by price level in descending order
         support_resistance_levels.sort(key=lambda x: x['level'], reverse=True)
-        logging.info(f"Sorted support/resistance levels: {support_resistance_levels}")
+        logging.info("Sorted support/resistance levels: %s", support_resistance_levels)
 
         # Filter out closely grouped levels
         filtered_levels = []
@@ -315,7 +315,7 @@ class BaseStrategy:
             current_group.sort(key=lambda x: x['average_volume'], reverse=True)
             filtered_levels.append(current_group[0])
             i = j
-            logging.info(f"Filtered level added: {current_group[0]}")
+            logging.info("Filtered level added: %s", current_group[0])
 
         # Finalize the levels by removing close duplicates
         final_levels = []
@@ -323,18 +323,18 @@ class BaseStrategy:
             if len(final_levels) == 0 or \
                     abs(filtered_levels[k]['level'] - final_levels[-1]['level']) / final_levels[-1]['level'] > aggregate_range / 100.0:
                 final_levels.append(filtered_levels[k])
-                logging.info(f"Final level added: {filtered_levels[k]}")
+                logging.info("Final level added: %s", filtered_levels[k])
             else:
                 for m in range(k + 1, len(filtered_levels)):
                     if abs(filtered_levels[m]['level'] - final_levels[-1]['level']) / final_levels[-1]['level'] > aggregate_range / 100.0:
                         final_levels.append(filtered_levels[m])
                         k = m
-                        logging.info(f"Final level added after checking close duplicates: {filtered_levels[m]}")
+                        logging.info("Final level added after checking close duplicates: %s", filtered_levels[m])
                         break
 
         # Sort final levels in descending order
         final_levels.sort(key=lambda x: x['level'], reverse=True)
-        logging.info(f"Final sorted levels: {final_levels}")
+        logging.info("Final sorted levels: %s", final_levels)
 
         return final_levels
 
@@ -1492,8 +1492,7 @@ class BaseStrategy:
         retries = 0
         while retries < max_retries:
             try:
-                with self.rate_limiter:
-                    return function(*args, **kwargs)
+                return function(*args, **kwargs)
             except ccxt.RateLimitExceeded as e:
                 retries += 1
                 delay = min(base_delay * (2 ** retries) + random.uniform(0, 0.1 * (2 ** retries)), max_delay)
@@ -30,8 +30,11 @@ from ...bot_metrics import BotDatabase
 from directionalscalper.core.config_initializer import ConfigInitializer
 from directionalscalper.core.strategies.base_strategy import BaseStrategy
 from directionalscalper.core.strategies.bybit.sticky_size_calculator import StickySizeCalculator
+from directionalscalper.core.strategies.bybit.grid_reconciler import GridReconciler
+from directionalscalper.core.orderbook import BookArrays, volume_histogram
+from directionalscalper.core.level_snapping import snap_levels
 
-from rate_limit import RateLimit
+from rate_limit import get_rate_limiter
 
 logging = Logger(logger_name="BybitBaseStrategy", filename="BybitBaseStrategy.log", stream=True)
 
@@ -41,8 +44,8 @@ class BybitStrategy(BaseStrategy):
     def __init__(self, exchange, config, manager, symbols_allowed=None):
         super().__init__(exchange, config, manager, symbols_allowed)
         self.exchange = exchange
-        self.general_rate_limiter = RateLimit(100, 1)
-        self.order_rate_limiter = RateLimit(20, 1)
+        self.general_rate_limiter = get_rate_limiter("general")
+        self.order_rate_limiter = get_rate_limiter("order_create")
 
         self.previous_long_pos_qty = {}
         self.previous_short_pos_qty = {}
@@ -116,6 +119,12 @@ class BybitStrategy(BaseStrategy):
         }
         self.sticky_size_calculator = StickySizeCalculator(sticky_config)
 
+        self.grid_reconciler = GridReconciler({
+            'grid_reconcile': self.grid_reconcile,
+            'grid_reconcile_price_tolerance': self.grid_reconcile_price_tolerance,
+            'grid_reconcile_qty_tolerance': self.grid_reconcile_qty_tolerance
+        })
+
         # Attempt to load previously saved hedge positions from disk
         # Validate against current threshold only on startup
         self.load_hedge_positions(validate_threshold=True)
@@ -503,14 +512,12 @@ class BybitStrategy(BaseStrategy):
     TAKER_FEE_RATE = 0.00055
 
     def generate_l_signals(self, symbol):
-        with self.general_rate_limiter:
-            return self.exchange.generate_l_signals(symbol)
+        return self.exchange.generate_l_signals(symbol)
         
     def get_market_data_with_retry(self, symbol, max_retries=5, retry_delay=5):
         for i in range(max_retries):
             try:
-                with self.general_rate_limiter:
-                    return self.exchange.get_market_data_bybit(symbol)
+                return self.exchange.get_market_data_bybit(symbol)
             except Exception as e:
                 if i < max_retries - 1:
                     logging.info(f"Error occurred while fetching market data: {e}. Retrying in {retry_delay} seconds...")
@@ -3606,15 +3613,9 @@ class BybitStrategy(BaseStrategy):
     #     return high_low_spread
     
     def get_4h_candle_spread(self, symbol: str) -> float:
-        ohlcv_data = self.exchange.fetch_ohlcv(symbol=symbol, timeframe='4h', limit=1)
-        df = pd.DataFrame(ohlcv_data, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        
-        # Convert 'high' and 'low' columns to numeric
-        df['high'] = pd.to_numeric(df['high'])
-        df['low'] = pd.to_numeric(df['low'])
-        
-        high_low_spread = df['high'].iloc[0] - df['low'].iloc[0]
-        return high_low_spread
+        # The forming 4h bar comes from the candle store, which refreshes it at most every refresh_interval
+        _, _, high, low, _, _ = self.exchange.candles.ohlcv(symbol, '4h', 1)[-1]
+        return float(high) - float(low)
 
     def linear_grid_hardened_gridspan_orderbook_maxposqty_properdca(
         self, symbol: str, open_symbols: list, total_equity: float, long_pos_price: float,
@@ -4287,36 +4288,23 @@ class BybitStrategy(BaseStrategy):
             grid_levels_long = [current_price - i * dynamic_outer_price_distance * current_price for i in range(1, levels + 1)]
             grid_levels_short = [current_price + i * dynamic_outer_price_distance * current_price for i in range(1, levels + 1)]
 
-            # Function to find the nearest significant level
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            return sig_level
-                return level
-
-            # Adjust grid levels to align with significant levels
+            # Adjust grid levels to align with significant levels; both sides are
+            # checked against the long-side range, as the per-level scan here always did
             tolerance = 0.01  # 1% tolerance, adjust as needed
-            grid_levels_long = [
-                find_nearest_significant_level(
-                    level,
-                    significant_levels_long,
-                    tolerance,
-                    buffer_distance_long / current_price,
-                    min_outer_price_distance,
-                    current_price
-                ) for level in grid_levels_long
-            ]
-            grid_levels_short = [
-                find_nearest_significant_level(
-                    level,
-                    significant_levels_short,
-                    tolerance,
-                    buffer_distance_short / current_price,
-                    min_outer_price_distance,
-                    current_price
-                ) for level in grid_levels_short
-            ]
+            grid_levels_long = snap_levels(
+                grid_levels_long,
+                significant_levels_long,
+                tolerance,
+                current_price - min_outer_price_distance * current_price,
+                current_price - buffer_distance_long / current_price * current_price,
+            )
+            grid_levels_short = snap_levels(
+                grid_levels_short,
+                significant_levels_short,
+                tolerance,
+                current_price - min_outer_price_distance * current_price,
+                current_price - buffer_distance_short / current_price * current_price,
+            )
 
             # Ensure the grid levels are within the buffer distances and respect min/max outer price distance
             grid_levels_long = [
@@ -5102,45 +5090,18 @@ class BybitStrategy(BaseStrategy):
                     for i in range(levels)
                 ]
 
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
-                                return sig_level
-                return level
-
             tolerance = 0.01
-            adjusted_grid_levels_long = []
-            adjusted_grid_levels_short = []
-
-            for i, level in enumerate(grid_levels_long):
-                previous_level = adjusted_grid_levels_long[-1] if adjusted_grid_levels_long else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_long,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price - max_outer_price_distance * current_price <= adjusted_level <= current_price - buffer_distance_long:
-                    adjusted_grid_levels_long.append(adjusted_level)
-
-            for i, level in enumerate(grid_levels_short):
-                previous_level = adjusted_grid_levels_short[-1] if adjusted_grid_levels_short else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_short,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price + buffer_distance_short <= adjusted_level <= current_price + max_outer_price_distance * current_price:
-                    adjusted_grid_levels_short.append(adjusted_level)
+            # Both sides are checked against the long-side range, as the per-level scan here always did
+            snap_range = (current_price - max_outer_price_distance * current_price, current_price - min_outer_price_distance * current_price)
+            snap_spacing = max_outer_price_distance * current_price / levels
+            adjusted_grid_levels_long = snap_levels(
+                grid_levels_long, significant_levels_long, tolerance, *snap_range, spacing=snap_spacing,
+                keep=(current_price - max_outer_price_distance * current_price, current_price - buffer_distance_long),
+            )
+            adjusted_grid_levels_short = snap_levels(
+                grid_levels_short, significant_levels_short, tolerance, *snap_range, spacing=snap_spacing,
+                keep=(current_price + buffer_distance_short, current_price + max_outer_price_distance * current_price),
+            )
 
             grid_levels_long = adjusted_grid_levels_long
             grid_levels_short = adjusted_grid_levels_short
@@ -5658,22 +5619,17 @@ class BybitStrategy(BaseStrategy):
         Returns "long", "short" or "".
         """
         try:
-            # ── 0) Data
-            candles = self.exchange.fetch_ohlcv_data(symbol, timeframe=timeframe, limit=1500)
-            if not candles or len(candles) < max(natr_len, 120):
+            # ── 0) Data (shared candle store; indicators advance once per closed bar)
+            series = self.exchange.candles.get(symbol, timeframe, 1500)
+            if len(series) < max(natr_len, 120):
                 logging.info(f"[{symbol}] xgridt-signal: not enough candles → no signal")
                 return ""
 
-            df = (pd.DataFrame(candles,
-                            columns=["ts","open","high","low","close","volume"])
-                .astype({"high":"float64","low":"float64","close":"float64"}))
-            closes = df["close"]
-            high   = df["high"]
-            low    = df["low"]
+            closes = series.arrays(1500)["close"]
 
             # ── 1) EMA trend
-            ema11 = closes.ewm(span=11, adjust=False).mean().iat[-1]
-            ema23 = closes.ewm(span=23, adjust=False).mean().iat[-1]
+            ema11 = series.value("ema", 11)
+            ema23 = series.value("ema", 23)
             if ema11 > ema23:
                 trend = "long"
             elif ema11 < ema23:
@@ -5683,9 +5639,8 @@ class BybitStrategy(BaseStrategy):
                 return ""
 
             # ── 2) Donchian close breakout
-            donch_hi = high.rolling(donch_len).max().iat[-2]
-            donch_lo = low.rolling(donch_len).min().iat[-2]
-            last     = closes.iat[-1]
+            donch_hi, donch_lo = series.values("donchian", donch_len, limit=2)[-2]
+            last     = closes[-1]
 
             hi_band = donch_hi * (1 - breakout_tol_pct/100)
             lo_band = donch_lo * (1 + breakout_tol_pct/100)
@@ -5697,10 +5652,8 @@ class BybitStrategy(BaseStrategy):
                 return ""
 
             # ── 3) Volatility filter (NATR)
-            pc  = closes.shift()
-            tr  = np.maximum(high - low, np.maximum((high - pc).abs(), (low - pc).abs()))
-            natr= (tr.rolling(natr_len, min_periods=natr_len).mean() / closes) * 100
-            cur, base = natr.iat[-1], natr[:-1].mean()
+            natr = series.values("natr", natr_len, wilder=False, limit=1500)
+            cur, base = natr[-1], np.nanmean(natr[:-1])
             if not (cur >= min_natr_abs or cur >= natr_mult * base):
                 logging.info(
                     f"[{symbol}] xgridt-signal: NATR {cur:.3f}% < "
@@ -5709,19 +5662,19 @@ class BybitStrategy(BaseStrategy):
                 return ""
 
             # ── 4) Relaxed peak / trough confirmation
-            fast_atr = (high - low).rolling(14).mean().iat[-1]
+            fast_atr = series.value("sma", 14, source="range")
             prom     = max(prominence_pct * last, 0.8 * fast_atr)  # ← looser
 
-            peaks,  _ = find_peaks(closes.values,   prominence=prom, distance=peak_min_distance)
-            troughs,_ = find_peaks(-closes.values,  prominence=prom, distance=peak_min_distance)
+            peaks,  _ = find_peaks(closes,   prominence=prom, distance=peak_min_distance)
+            troughs,_ = find_peaks(-closes,  prominence=prom, distance=peak_min_distance)
 
             peak_ok = (
                 peaks.size == 0 or
-                last >= closes.iloc[peaks[-1]] * (1 - breakout_tol_pct/100)
+                last >= closes[peaks[-1]] * (1 - breakout_tol_pct/100)
             )
             trough_ok = (
                 troughs.size == 0 or
-                last <= closes.iloc[troughs[-1]] * (1 + breakout_tol_pct/100)
+                last <= closes[troughs[-1]] * (1 + breakout_tol_pct/100)
             )
 
             if trend == "long" and not peak_ok:
@@ -6245,7 +6198,7 @@ class BybitStrategy(BaseStrategy):
             elif grid_behavior == "dbscanalgo":
                 # DBSCAN significant‑level grid
                 ohlcv_data  = self.exchange.fetch_ohlcv_data(symbol, timeframe="5m", limit=5000)
-                zigzag      = self.exchange.calculate_zigzag(ohlcv_data)
+                zigzag      = self.exchange.calculate_zigzag(ohlcv_data, symbol=symbol)
                 sig_levels  = self.exchange.get_significant_levels_dbscan(zigzag, ohlcv_data)
                 dbscan_lvls = sorted(i["level"] for i in sig_levels)
 
@@ -7342,22 +7295,19 @@ class BybitStrategy(BaseStrategy):
             price_range_long = np.arange(min_price_long, max_price_long, (max_price_long - min_price_long) / 100)
             price_range_short = np.arange(min_price_short, max_price_short, (max_price_short - min_price_short) / 100)
 
-            volume_histogram_long = np.zeros_like(price_range_long)
-            volume_histogram_short = np.zeros_like(price_range_short)
+            book = BookArrays.from_order_book(order_book)
 
-            # Populate volume histogram for long positions
-            for order in order_book['bids']:
-                price, volume = float(order[0]), float(order[1])  # Convert price and volume to float
-                if min_price_long <= price <= current_price:
-                    index = int((price - min_price_long) / (max_price_long - min_price_long) * 100)
-                    volume_histogram_long[index] += volume
+            # Volume histogram for long positions: bids between the range low and the current price
+            volume_histogram_long = volume_histogram(
+                book.bid_prices, book.bid_sizes, min_price_long, current_price,
+                min_price_long, max_price_long, len(price_range_long)
+            )
 
-            # Populate volume histogram for short positions
-            for order in order_book['asks']:
-                price, volume = float(order[0]), float(order[1])  # Convert price and volume to float
-                if current_price <= price <= max_price_short:
-                    index = int((price - min_price_short) / (max_price_short - min_price_short) * 100)
-                    volume_histogram_short[index] += volume
+            # Volume histogram for short positions: asks between the current price and the range high
+            volume_histogram_short = volume_histogram(
+                book.ask_prices, book.ask_sizes, current_price, max_price_short,
+                min_price_short, max_price_short, len(price_range_short)
+            )
 
             return min_price_long, max_price_long, price_range_long, volume_histogram_long, min_price_short, max_price_short, price_range_short, volume_histogram_short
         except Exception as e:
@@ -7492,60 +7442,20 @@ class BybitStrategy(BaseStrategy):
                         min_outer_price_distance_long, min_outer_price_distance_short,
                         max_outer_price_distance_long, max_outer_price_distance_short,
                         current_price, levels):
-        def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
-            for sig_level in significant_levels:
-                # Check if significant level is within the tolerance of the current level
-                if abs(level - sig_level) / level < tolerance:
-                    # Determine whether we are dealing with a long side (below current price) or short side (above current price)
-                    if level <= current_price:
-                        # Long side levels (below current price)
-                        # Allowed range: current_price*(1 - max_distance) <= sig_level <= current_price*(1 - min_distance)
-                        lower_bound = current_price * (1 - max_distance)
-                        upper_bound = current_price * (1 - min_distance)
-                    else:
-                        # Short side levels (above current price)
-                        # Allowed range: current_price*(1 + min_distance) <= sig_level <= current_price*(1 + max_distance)
-                        lower_bound = current_price * (1 + min_distance)
-                        upper_bound = current_price * (1 + max_distance)
-
-                    if lower_bound <= sig_level <= upper_bound:
-                        # Check spacing from previous adjusted level
-                        if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
-                            return sig_level
-            return level
-
-        adjusted_grid_levels = []
-
-        for i, level in enumerate(grid_levels):
-            previous_level = adjusted_grid_levels[-1] if adjusted_grid_levels else None
-
-            # Choose the appropriate min/max distances based on whether this is a long or short level
-            if level <= current_price:
-                # Long grid
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels,
-                    tolerance,
-                    min_outer_price_distance_long,
-                    max_outer_price_distance_long,
-                    current_price,
-                    previous_level
-                )
-            else:
-                # Short grid
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels,
-                    tolerance,
-                    min_outer_price_distance_short,
-                    max_outer_price_distance_short,
-                    current_price,
-                    previous_level
-                )
-
-            adjusted_grid_levels.append(adjusted_level)
-
-        return adjusted_grid_levels
+        """
+        Snap grid levels onto significant levels within tolerance. A level at or
+        below the current price may only move into the long range
+        current_price*(1 - max_long) .. current_price*(1 - min_long), one above it
+        into current_price*(1 + min_short) .. current_price*(1 + max_short), and
+        not to within max_distance*current_price/levels of the previous level.
+        """
+        grid = np.asarray(grid_levels, dtype=float)
+        long_side = grid <= current_price
+        min_distance = np.where(long_side, min_outer_price_distance_long, min_outer_price_distance_short)
+        max_distance = np.where(long_side, max_outer_price_distance_long, max_outer_price_distance_short)
+        lower = np.where(long_side, current_price * (1 - max_distance), current_price * (1 + min_distance))
+        upper = np.where(long_side, current_price * (1 - min_distance), current_price * (1 + max_distance))
+        return snap_levels(grid_levels, significant_levels, tolerance, lower, upper, spacing=max_distance * current_price / levels)
 
     def finalize_grid_levels(self, symbol, adjusted_grid_levels_long, adjusted_grid_levels_short, levels, current_price, buffer_distance_long, buffer_distance_short, max_outer_price_distance_long, max_outer_price_distance_short, initial_entry_long, initial_entry_short):
         if len(adjusted_grid_levels_long) < levels:
@@ -7800,7 +7710,7 @@ class BybitStrategy(BaseStrategy):
         try:
             # ─────────────────────────────────────────────────────────────── 0  Init
             if one_symbol_optimization:
-                logging.info(f"[{symbol}] ═══ ONE-SYMBOL OPTIMIZATION ACTIVE ═══ Enhanced xgrid mode")
+                logging.info("[%s] ═══ ONE-SYMBOL OPTIMIZATION ACTIVE ═══ Enhanced xgrid mode", symbol)
             
             if not hasattr(self, "xgrid_order_times"):
                 self.xgrid_order_times = {}
@@ -7904,9 +7814,9 @@ class BybitStrategy(BaseStrategy):
                     "long": {"qty": 0.0, "entry_price": None, "adjustment_pending": False},
                     "short": {"qty": 0.0, "entry_price": None, "adjustment_pending": False},
                 }
-                logging.info(f"[AUTO-HEDGE] {symbol} initialized with empty hedge positions")
+                logging.info("[AUTO-HEDGE] %s initialized with empty hedge positions", symbol)
             else:
-                logging.info(f"[AUTO-HEDGE] {symbol} existing hedge positions: long_qty={self.hedge_positions[symbol]['long']['qty']}, short_qty={self.hedge_positions[symbol]['short']['qty']}")
+                logging.info("[AUTO-HEDGE] %s existing hedge positions: long_qty=%s, short_qty=%s", symbol, self.hedge_positions[symbol]['long']['qty'], self.hedge_positions[symbol]['short']['qty'])
             
             hedge_long  = self.hedge_positions[symbol]["long"]
             hedge_short = self.hedge_positions[symbol]["short"]
@@ -7916,12 +7826,12 @@ class BybitStrategy(BaseStrategy):
                 if hedge_short["qty"] > 0 and hedge_short["entry_price"]:
                     sl = hedge_short["entry_price"] * (1 + hedge_stop_loss / 100.0)
                     if current_price >= sl:
-                        logging.info(f"[AUTO-HEDGE] {symbol}: SHORT hedge SL triggered @ {sl:.4f}")
+                        logging.info("[AUTO-HEDGE] %s: SHORT hedge SL triggered @ %.4f", symbol, sl)
                         self.retry_close_hedge_position(symbol, "short", max_tries=3, sleep_seconds=2.0)
                 if hedge_long["qty"] > 0 and hedge_long["entry_price"]:
                     sl = hedge_long["entry_price"] * (1 - hedge_stop_loss / 100.0)
                     if current_price <= sl:
-                        logging.info(f"[AUTO-HEDGE] {symbol}: LONG hedge SL triggered @ {sl:.4f}")
+                        logging.info("[AUTO-HEDGE] %s: LONG hedge SL triggered @ %.4f", symbol, sl)
                         self.retry_close_hedge_position(symbol, "long", max_tries=3, sleep_seconds=2.0)
 
             def price_diff_satisfied(ref_price, curr_price, threshold) -> bool:
@@ -7934,16 +7844,16 @@ class BybitStrategy(BaseStrategy):
                     if has_open_long:
                         price_diff_pct = abs(current_price - long_pos_price) / long_pos_price if long_pos_price > 0 else 0
                         meets_threshold = price_diff_pct >= auto_hedge_price_diff_threshold
-                        logging.info(f"[AUTO-HEDGE] {symbol} Long position: qty={long_pos_qty}, entry={long_pos_price}, current={current_price}, diff={price_diff_pct:.4f} ({'≥' if meets_threshold else '<'} {auto_hedge_price_diff_threshold}) - {'SHOULD HEDGE' if meets_threshold else 'NO HEDGE'}")
+                        logging.info("[AUTO-HEDGE] %s Long position: qty=%s, entry=%s, current=%s, diff=%.4f (%s %s) - %s", symbol, long_pos_qty, long_pos_price, current_price, price_diff_pct, '≥' if meets_threshold else '<', auto_hedge_price_diff_threshold, 'SHOULD HEDGE' if meets_threshold else 'NO HEDGE')
                     if has_open_short:
                         price_diff_pct = abs(current_price - short_pos_price) / short_pos_price if short_pos_price > 0 else 0
                         meets_threshold = price_diff_pct >= auto_hedge_price_diff_threshold
-                        logging.info(f"[AUTO-HEDGE] {symbol} Short position: qty={short_pos_qty}, entry={short_pos_price}, current={current_price}, diff={price_diff_pct:.4f} ({'≥' if meets_threshold else '<'} {auto_hedge_price_diff_threshold}) - {'SHOULD HEDGE' if meets_threshold else 'NO HEDGE'}")
+                        logging.info("[AUTO-HEDGE] %s Short position: qty=%s, entry=%s, current=%s, diff=%.4f (%s %s) - %s", symbol, short_pos_qty, short_pos_price, current_price, price_diff_pct, '≥' if meets_threshold else '<', auto_hedge_price_diff_threshold, 'SHOULD HEDGE' if meets_threshold else 'NO HEDGE')
                     
                     # Hedge SHORT when main LONG moves
                     if has_open_long and price_diff_satisfied(long_pos_price, current_price, auto_hedge_price_diff_threshold):
                         desired_short_qty = long_pos_qty * auto_hedge_ratio
-                        logging.info(f"[AUTO-HEDGE] {symbol} TRIGGERING SHORT HEDGE: long_qty={long_pos_qty}, desired_short_qty={desired_short_qty}, min_size={auto_hedge_min_position_size}")
+                        logging.info("[AUTO-HEDGE] %s TRIGGERING SHORT HEDGE: long_qty=%s, desired_short_qty=%s, min_size=%s", symbol, long_pos_qty, desired_short_qty, auto_hedge_min_position_size)
                         if desired_short_qty >= auto_hedge_min_position_size:
                             # Use grid behavior for hedge placement if hedge_with_grid is enabled
                             if hedge_with_grid:
@@ -7970,7 +7880,7 @@ class BybitStrategy(BaseStrategy):
                     # Hedge LONG when main SHORT moves
                     if has_open_short and price_diff_satisfied(short_pos_price, current_price, auto_hedge_price_diff_threshold):
                         desired_long_qty = short_pos_qty * auto_hedge_ratio
-                        logging.info(f"[AUTO-HEDGE] {symbol} TRIGGERING LONG HEDGE: short_qty={short_pos_qty}, desired_long_qty={desired_long_qty}, min_size={auto_hedge_min_position_size}")
+                        logging.info("[AUTO-HEDGE] %s TRIGGERING LONG HEDGE: short_qty=%s, desired_long_qty=%s, min_size=%s", symbol, short_pos_qty, desired_long_qty, auto_hedge_min_position_size)
                         if desired_long_qty >= auto_hedge_min_position_size:
                             # Use grid behavior for hedge placement if hedge_with_grid is enabled
                             if hedge_with_grid:
@@ -7998,17 +7908,17 @@ class BybitStrategy(BaseStrategy):
                     if disable_grid_on_hedge_side:
                         if hedge_short["qty"] > 0:
                             skip_short_side = True
-                            logging.info(f"[AUTO-HEDGE] {symbol}: Disabling SHORT grid orders due to existing hedge position (qty={hedge_short['qty']})")
+                            logging.info("[AUTO-HEDGE] %s: Disabling SHORT grid orders due to existing hedge position (qty=%s)", symbol, hedge_short['qty'])
                             # Hedge grid orders are handled by the main auto-hedge system via open_or_adjust_hedge_multi_with_grid
-                            logging.info(f"[AUTO-HEDGE] {symbol}: Short hedge grid orders will be managed by the main auto-hedge system")
+                            logging.info("[AUTO-HEDGE] %s: Short hedge grid orders will be managed by the main auto-hedge system", symbol)
                         if hedge_long["qty"] > 0:
                             skip_long_side = True
-                            logging.info(f"[AUTO-HEDGE] {symbol}: Disabling LONG grid orders due to existing hedge position (qty={hedge_long['qty']})")
+                            logging.info("[AUTO-HEDGE] %s: Disabling LONG grid orders due to existing hedge position (qty=%s)", symbol, hedge_long['qty'])
                             # Hedge grid orders are handled by the main auto-hedge system via open_or_adjust_hedge_multi_with_grid
-                            logging.info(f"[AUTO-HEDGE] {symbol}: Long hedge grid orders will be managed by the main auto-hedge system")
+                            logging.info("[AUTO-HEDGE] %s: Long hedge grid orders will be managed by the main auto-hedge system", symbol)
 
                 except Exception as e_h:
-                    logging.error(f"[AUTO-HEDGE] {symbol} multi-hedge logic error: {e_h}")
+                    logging.error("[AUTO-HEDGE] %s multi-hedge logic error: %s", symbol, e_h)
                     skip_long_side  = False
                     skip_short_side = False
             else:
@@ -8040,7 +7950,7 @@ class BybitStrategy(BaseStrategy):
                             adj_lvls.append(p)
                             adj_qtys.append(q)
                     if not adj_lvls:
-                        logging.warning(f"No valid grid levels to place orders for {sym} on {side} side.")
+                        logging.warning("No valid grid levels to place orders for %s on %s side.", sym, side)
                         return
                     oside = "buy" if side == "long" else "sell"
                     if self.grid_cleared_status.get(sym, {}).get(side, False):
@@ -8055,16 +7965,14 @@ class BybitStrategy(BaseStrategy):
                         for order in new_orders:
                             oid = order['id']
                             self.xgrid_order_times[sym][side][oid] = now
-                            logging.info(f"Tagged new xgrid order {oid} for {sym} on {side} side.")
+                            logging.info("Tagged new xgrid order %s for %s on %s side.", oid, sym, side)
                     (self.active_long_grids if side=="long" else self.active_short_grids).add(sym)
 
             def can_cancel_xgrid_orders(sym, side):
                 now = time.time()
                 times = self.xgrid_order_times.get(sym, {}).get(side, {})
-                for oid, ts in list(times.items()):
-                    if now - ts < 7:
-                        return False
-                return True
+                # Only the newest tag matters; the dict keeps every order ever tagged
+                return not times or now - max(times.values()) >= 7
 
             def clear_grid(self, sym, side, exclude_xgrid=True):
                 live = self.retry_api_call(self.exchange.get_open_orders, sym)
@@ -8099,7 +8007,7 @@ class BybitStrategy(BaseStrategy):
                 if one_symbol_optimization and raw == "neutral" and self.xgridt_last_signal[symbol]:
                     # In single-symbol mode, allow neutral to continue with last signal but with reduced aggression
                     fresh_signal = self.xgridt_last_signal[symbol]
-                    logging.info(f"[{symbol}] ONE-SYMBOL SIGNAL: maintaining {fresh_signal} bias on neutral signal")
+                    logging.info("[%s] ONE-SYMBOL SIGNAL: maintaining %s bias on neutral signal", symbol, fresh_signal)
             else:
                 fresh_signal = (current_signal or self.generate_l_signals(symbol)).lower()
 
@@ -8158,7 +8066,7 @@ class BybitStrategy(BaseStrategy):
                         effective_drawdown_threshold = DRAWDOWN_CLOSE_THRESHOLD * 0.6  # 30% -> 18%
                         force_close = (pnl_sh >= profit_threshold or pnl_sh <= -effective_drawdown_threshold)
                         if force_close:
-                            logging.info(f"[{symbol}] ONE-SYMBOL FLIP: force closing short at {pnl_sh:.2f}% PnL (thresholds: +{profit_threshold:.2f}%/-{effective_drawdown_threshold:.2f}%)")
+                            logging.info("[%s] ONE-SYMBOL FLIP: force closing short at %.2f%% PnL (thresholds: +%.2f%%/-%.2f%%)", symbol, pnl_sh, profit_threshold, effective_drawdown_threshold)
                     else:
                         force_close = (pnl_sh >= 0.10 or pnl_sh <= -DRAWDOWN_CLOSE_THRESHOLD)
                     if force_close:
@@ -8220,7 +8128,7 @@ class BybitStrategy(BaseStrategy):
                 f"[{symbol}] fetched {len(live_orders)} total orders, "
                 f"{len(grid_open_orders)} remain after excluding reduceOnly"
             )
-            logging.info(f"[{symbol}] grid_open_orders IDs: {[o['id'] for o in grid_open_orders]}")
+            logging.info("[%s] grid_open_orders IDs: %s", symbol, [o['id'] for o in grid_open_orders])
 
             # ======================================================================
             # 5  INITIAL ENTRY
@@ -8270,7 +8178,7 @@ class BybitStrategy(BaseStrategy):
                 refresh_interval = 5 if one_symbol_optimization else 7
                 if now - last >= refresh_interval:
                     if one_symbol_optimization:
-                        logging.info(f"[{symbol}] ONE-SYMBOL XGRID: {refresh_interval}s refresh cycle (ultra-fast mode)")
+                        logging.info("[%s] ONE-SYMBOL XGRID: %ss refresh cycle (ultra-fast mode)", symbol, refresh_interval)
                     self.last_xgridt_refresh[symbol] = now
 
                     # LONG side chase every 7s once can_cancel_xgrid_orders() is True
@@ -8340,7 +8248,7 @@ class BybitStrategy(BaseStrategy):
                     )
 
         except Exception as e:
-            logging.error(f"[{symbol}] handle_grid_trades → {e}")
+            logging.error("[%s] handle_grid_trades → %s", symbol, e)
             logging.error("Traceback: %s", traceback.format_exc())
         finally:
             self.save_hedge_positions()
@@ -10330,45 +10238,18 @@ class BybitStrategy(BaseStrategy):
                     for i in range(levels)
                 ]
 
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
-                                return sig_level
-                return level
-
             tolerance = 0.01
-            adjusted_grid_levels_long = []
-            adjusted_grid_levels_short = []
-
-            for i, level in enumerate(grid_levels_long):
-                previous_level = adjusted_grid_levels_long[-1] if adjusted_grid_levels_long else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_long,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price - max_outer_price_distance * current_price <= adjusted_level <= current_price - buffer_distance_long:
-                    adjusted_grid_levels_long.append(adjusted_level)
-
-            for i, level in enumerate(grid_levels_short):
-                previous_level = adjusted_grid_levels_short[-1] if adjusted_grid_levels_short else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_short,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price + buffer_distance_short <= adjusted_level <= current_price + max_outer_price_distance * current_price:
-                    adjusted_grid_levels_short.append(adjusted_level)
+            # Both sides are checked against the long-side range, as the per-level scan here always did
+            snap_range = (current_price - max_outer_price_distance * current_price, current_price - min_outer_price_distance * current_price)
+            snap_spacing = max_outer_price_distance * current_price / levels
+            adjusted_grid_levels_long = snap_levels(
+                grid_levels_long, significant_levels_long, tolerance, *snap_range, spacing=snap_spacing,
+                keep=(current_price - max_outer_price_distance * current_price, current_price - buffer_distance_long),
+            )
+            adjusted_grid_levels_short = snap_levels(
+                grid_levels_short, significant_levels_short, tolerance, *snap_range, spacing=snap_spacing,
+                keep=(current_price + buffer_distance_short, current_price + max_outer_price_distance * current_price),
+            )
 
             grid_levels_long = adjusted_grid_levels_long
             grid_levels_short = adjusted_grid_levels_short
@@ -10856,45 +10737,18 @@ class BybitStrategy(BaseStrategy):
                     for i in range(levels)
                 ]
 
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
-                                return sig_level
-                return level
-
             tolerance = 0.01
-            adjusted_grid_levels_long = []
-            adjusted_grid_levels_short = []
-
-            for i, level in enumerate(grid_levels_long):
-                previous_level = adjusted_grid_levels_long[-1] if adjusted_grid_levels_long else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_long,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price - max_outer_price_distance * current_price <= adjusted_level <= current_price - buffer_distance_long:
-                    adjusted_grid_levels_long.append(adjusted_level)
-
-            for i, level in enumerate(grid_levels_short):
-                previous_level = adjusted_grid_levels_short[-1] if adjusted_grid_levels_short else None
-                adjusted_level = find_nearest_significant_level(
-                    level,
-                    significant_levels_short,
-                    tolerance,
-                    min_outer_price_distance,
-                    max_outer_price_distance,
-                    current_price,
-                    previous_level
-                )
-                if current_price + buffer_distance_short <= adjusted_level <= current_price + max_outer_price_distance * current_price:
-                    adjusted_grid_levels_short.append(adjusted_level)
+            # Both sides are checked against the long-side range, as the per-level scan here always did
+            snap_range = (current_price - max_outer_price_distance * current_price, current_price - min_outer_price_distance * current_price)
+            snap_spacing = max_outer_price_distance * current_price / levels
+            adjusted_grid_levels_long = snap_levels(
+                grid_levels_long, significant_levels_long, tolerance, *snap_range, spacing=snap_spacing,
+                keep=(current_price - max_outer_price_distance * current_price, current_price - buffer_distance_long),
+            )
+            adjusted_grid_levels_short = snap_levels(
+                grid_levels_short, significant_levels_short, tolerance, *snap_range, spacing=snap_spacing,
+                keep=(current_price + buffer_distance_short, current_price + max_outer_price_distance * current_price),
+            )
 
             grid_levels_long = adjusted_grid_levels_long
             grid_levels_short = adjusted_grid_levels_short
@@ -11280,36 +11134,23 @@ class BybitStrategy(BaseStrategy):
             grid_levels_long = [current_price - i * dynamic_outer_price_distance * current_price for i in range(1, levels + 1)]
             grid_levels_short = [current_price + i * dynamic_outer_price_distance * current_price for i in range(1, levels + 1)]
 
-            # Function to find the nearest significant level
-            def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price):
-                for sig_level in significant_levels:
-                    if abs(level - sig_level) / level < tolerance:
-                        if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
-                            return sig_level
-                return level
-
-            # Adjust grid levels to align with significant levels
+            # Adjust grid levels to align with significant levels; both sides are
+            # checked against the long-side range, as the per-level scan here always did
             tolerance = 0.01  # 1% tolerance, adjust as needed
-            grid_levels_long = [
-                find_nearest_significant_level(
-                    level, 
-                    significant_levels_long, 
-                    tolerance, 
-                    buffer_distance_long / current_price, 
-                    min_outer_price_distance, 
-                    current_price
-                ) for level in grid_levels_long
-            ]
-            grid_levels_short = [
-                find_nearest_significant_level(
-                    level, 
-                    significant_levels_short, 
-                    tolerance, 
-                    buffer_distance_short / current_price, 
-                    min_outer_price_distance, 
-                    current_price
-                ) for level in grid_levels_short
-            ]
+            grid_levels_long = snap_levels(
+                grid_levels_long,
+                significant_levels_long,
+                tolerance,
+                current_price - min_outer_price_distance * current_price,
+                current_price - buffer_distance_long / current_price * current_price,
+            )
+            grid_levels_short = snap_levels(
+                grid_levels_short,
+                significant_levels_short,
+                tolerance,
+                current_price - min_outer_price_distance * current_price,
+                current_price - buffer_distance_short / current_price * current_price,
+            )
 
             # Ensure the grid levels are within the buffer distances and respect min/max outer price distance
             grid_levels_long = [
@@ -16685,19 +16526,27 @@ class BybitStrategy(BaseStrategy):
             logging.exception(f"Exception caught in should_reissue_orders: {e}")
             return False
 
-    def clear_grid(self, symbol, side, max_retries=50, delay=2):
-        """Clear all orders and internal states for a specific grid side with retries, excluding reduce-only orders."""
+    def clear_grid(self, symbol, side, max_retries=50, delay=2, open_orders=None):
+        """
+        Clear all orders and internal states for a specific grid side with retries, excluding reduce-only orders.
+        Orders are cancelled in batches, starting from the caller's open orders if given. Those may predate
+        an order placed since, so the open orders are always fetched once after the cancel to verify.
+        Returns the ids of the cancelled orders.
+        """
         logging.info(f"Clearing {side} grid for {symbol}")
         logging.info(f"[{symbol}] Clearing {side} grid. Trigger: {traceback.extract_stack()[-2][2]}")
 
+        cancelled_ids = set()
         retry_counter = 0
         while retry_counter < max_retries:
             # Cancel all orders for the specified side
-            self.cancel_grid_orders(symbol, side)
+            result = self.cancel_grid_orders(symbol, side, open_orders=open_orders)
+            if result is not None:
+                cancelled_ids.update(result['cancelled'])
 
-            # Re-fetch the open orders and filter out reduce-only orders
-            open_orders_after_clear = self.retry_api_call(self.exchange.get_open_orders, symbol)
-            lingering_orders = [o for o in open_orders_after_clear if o['info']['side'].lower() == side and not o['info'].get('reduceOnly', False)]
+            # Re-fetch the open orders and filter out reduce-only orders; a retry cancels from this list
+            open_orders = self.retry_api_call(self.exchange.get_open_orders, symbol)
+            lingering_orders = [o for o in open_orders if o['info']['side'].lower() == side and not o['info'].get('reduceOnly', False)]
 
             if not lingering_orders:
                 # Clear filled levels for the side when no more lingering orders
@@ -16720,6 +16569,7 @@ class BybitStrategy(BaseStrategy):
             logging.error(f"Failed to clear all {side} grid orders for {symbol} after {max_retries} attempts.")
         else:
             logging.info(f"{side.capitalize()} grid cleared after {retry_counter} retries for {symbol}.")
+        return cancelled_ids
 
 
     # def clear_grid(self, symbol, side, max_retries=50, delay=2):
@@ -16791,20 +16641,32 @@ class BybitStrategy(BaseStrategy):
             # Get the current price to update last reissue prices
             current_price = self.exchange.get_current_price(symbol)
 
-            # Clear existing grid before placing new orders
-            if is_long:
-                logging.info(f"Clearing existing long grid for {symbol} before issuing new orders. (line: {inspect.currentframe().f_lineno})")
-                self.clear_grid(symbol, 'buy')
-                self.last_reissue_price_long[symbol] = current_price
-                logging.info(f"Updated last reissue price for long orders of {symbol} to {current_price}")
+            if self.grid_reconcile:
+                # Live orders are diffed against the new levels below instead of being cleared
+                if is_long:
+                    self.last_reissue_price_long[symbol] = current_price
+                    logging.info(f"Updated last reissue price for long orders of {symbol} to {current_price}")
+                else:
+                    self.last_reissue_price_short[symbol] = current_price
+                    logging.info(f"Updated last reissue price for short orders of {symbol} to {current_price}")
             else:
-                logging.info(f"Clearing existing short grid for {symbol} before issuing new orders. (line: {inspect.currentframe().f_lineno})")
-                self.clear_grid(symbol, 'sell')
-                self.last_reissue_price_short[symbol] = current_price
-                logging.info(f"Updated last reissue price for short orders of {symbol} to {current_price}")
+                # Clear existing grid before placing new orders
+                if is_long:
+                    logging.info(f"Clearing existing long grid for {symbol} before issuing new orders. (line: {inspect.currentframe().f_lineno})")
+                    cancelled_ids = self.clear_grid(symbol, 'buy', open_orders=open_orders)
+                    self.last_reissue_price_long[symbol] = current_price
+                    logging.info(f"Updated last reissue price for long orders of {symbol} to {current_price}")
+                else:
+                    logging.info(f"Clearing existing short grid for {symbol} before issuing new orders. (line: {inspect.currentframe().f_lineno})")
+                    cancelled_ids = self.clear_grid(symbol, 'sell', open_orders=open_orders)
+                    self.last_reissue_price_short[symbol] = current_price
+                    logging.info(f"Updated last reissue price for short orders of {symbol} to {current_price}")
+
+                # Orders cancelled by the clear no longer occupy their level
+                open_orders = [order for order in open_orders if order['id'] not in cancelled_ids]
 
-            # Clear the filled_levels set before placing new orders
-            filled_levels.clear()
+                # Clear the filled_levels set before placing new orders
+                filled_levels.clear()
 
             # Add logging to verify types before the zip operation
             logging.info(f"Inside issue_grid_orders - Type of grid_levels: {type(grid_levels)}, Value: {grid_levels}")
@@ -16879,42 +16741,136 @@ class BybitStrategy(BaseStrategy):
                     logging.error(f"Error applying sticky size calculation: {e}")
                     # Fall back to original amounts if sticky size calculation fails
 
-            # Place new grid orders for unfilled levels
+            if self.grid_reconcile:
+                self.reconcile_grid_orders(symbol, side, grid_levels, amounts, is_long, open_orders, filled_levels)
+                logging.info(f"[{symbol}] {side.capitalize()} grid orders reconciled with the new levels.")
+                return
+
+            # Place new grid orders for unfilled levels, batched into as few requests as possible
+            position_idx = 1 if is_long else 2
+            batch = []
             for level, amount in zip(grid_levels, amounts):
                 order_exists = any(order['price'] == level and order['side'].lower() == side.lower() for order in open_orders)
                 if not order_exists:
-                    order_link_id = self.generate_order_link_id(symbol, side, level)
-                    position_idx = 1 if is_long else 2
-                    try:
-                        order = self.exchange.create_tagged_limit_order_bybit(symbol, side, amount, level, positionIdx=position_idx, orderLinkId=order_link_id)
-                        if order and 'id' in order:
-                            logging.info(f"Placed {side} order at level {level} for {symbol} with amount {amount}")
-                            filled_levels.add(level)  # Add the level to filled_levels
-                        else:
-                            logging.info(f"Failed to place {side} order at level {level} for {symbol} with amount {amount}")
-                    except Exception as e:
-                        logging.error(f"Exception when placing {side} order at level {level} for {symbol}: {e}")
+                    batch.append({
+                        "side": side,
+                        "qty": amount,
+                        "price": level,
+                        "positionIdx": position_idx,
+                        "orderLinkId": self.generate_order_link_id(symbol, side, level),
+                    })
                 else:
                     logging.info(f"Skipping {side} order at level {level} for {symbol} as it already exists.")
 
+            try:
+                results = self.exchange.create_limit_orders_batch_bybit(symbol, batch)
+            except Exception as e:
+                logging.error(f"Exception when placing {side} grid orders for {symbol}: {e}")
+                results = []
+
+            # Results come back one per requested order, in order
+            for order, result in zip(batch, results):
+                level, amount = order['price'], order['qty']
+                if result['ok'] and result['id']:
+                    logging.info(f"Placed {side} order at level {level} for {symbol} with amount {amount}")
+                    filled_levels.add(level)  # Add the level to filled_levels
+                else:
+                    logging.info(f"Failed to place {side} order at level {level} for {symbol} with amount {amount}: {result['msg']}")
+
             logging.info(f"[{symbol}] {side.capitalize()} grid orders issued for unfilled levels.")
         except Exception as e:
             logging.error(f"Exception in issue_grid_orders: {e}")
 
-    def cancel_grid_orders(self, symbol: str, side: str):
+    def reconcile_grid_orders(self, symbol: str, side: str, grid_levels: list, amounts: list, is_long: bool, open_orders: list, filled_levels: set):
+        """
+        Bring the live orders of one grid side in line with grid_levels/amounts using as few requests as possible:
+        orders already within tolerance are kept, drifted ones are amended in place, and only missing/surplus
+        levels are placed/cancelled. filled_levels is rebuilt from the levels that end up with a live order.
+        """
+        tick_size = self.exchange.instruments.tick_size(symbol)
+        min_qty = self.exchange.instruments.min_qty(symbol)
+        plan = self.grid_reconciler.plan(
+            side, grid_levels, amounts, open_orders,
+            tick_size=float(tick_size) if tick_size else None,
+            min_qty=float(min_qty) if min_qty else None
+        )
+        logging.info(f"[{symbol}] Reconciling {side} grid: {plan.summary()}")
+
+        filled_levels.clear()
+        for kept in plan.keep:
+            filled_levels.add(kept['price'])
+
+        # Surplus orders go first so the margin they hold is released before anything new is placed
+        if plan.cancel:
+            self.exchange.cancel_orders_batch_bybit(symbol, order_ids=[order['id'] for order in plan.cancel])
+
+        to_place = list(plan.place)
+        if plan.amend:
+            amendments = [{"id": a['order']['id'], "price": a['new_price'], "qty": a['new_qty']} for a in plan.amend]
+            results = self.exchange.amend_orders_batch_bybit(symbol, amendments)
+            rejected = []
+            for amend, result in zip(plan.amend, results):
+                if result['ok']:
+                    logging.info(f"Amended {side} order {amend['order']['id']} for {symbol} to level {amend['price']} with amount {amend['qty']}")
+                    filled_levels.add(amend['price'])
+                else:
+                    rejected.append(amend)
+
+            # An order that filled meanwhile, or whose new price would cross the book, cannot be amended;
+            # once it is confirmed gone its level is placed fresh like any missing one
+            if rejected:
+                cancel_results = self.exchange.cancel_orders_batch_bybit(symbol, order_ids=[a['order']['id'] for a in rejected])
+                for amend, result in zip(rejected, cancel_results):
+                    if result['ok']:
+                        to_place.append({"price": amend['price'], "qty": amend['qty']})
+                    else:
+                        logging.info(f"Leaving {side} order {amend['order']['id']} for {symbol} in place, amend and cancel both failed")
+
+        position_idx = 1 if is_long else 2
+        batch = [
+            {
+                "side": side,
+                "qty": order['qty'],
+                "price": order['price'],
+                "positionIdx": position_idx,
+                "orderLinkId": self.generate_order_link_id(symbol, side, order['price']),
+            }
+            for order in to_place
+        ]
+        results = self.exchange.create_limit_orders_batch_bybit(symbol, batch) if batch else []
+        for order, result in zip(batch, results):
+            level, amount = order['price'], order['qty']
+            if result['ok'] and result['id']:
+                logging.info(f"Placed {side} order at level {level} for {symbol} with amount {amount}")
+                filled_levels.add(level)
+            else:
+                logging.info(f"Failed to place {side} order at level {level} for {symbol} with amount {amount}: {result['msg']}")
+        return plan
+
+    def cancel_grid_orders(self, symbol: str, side: str, open_orders=None):
+        """
+        Cancel the non-reduce-only orders of one grid side in batch requests.
+        Returns {"cancelled": [ids], "failed": [ids]}, or None if the orders could not be read.
+        """
         try:
-            open_orders = self.retry_api_call(self.exchange.get_open_orders, symbol)
+            if open_orders is None:
+                open_orders = self.retry_api_call(self.exchange.get_open_orders, symbol)
 
-            orders_canceled = 0
+            grid_order_ids = []
             for order in open_orders:
                 if order['side'].lower() == side.lower():
                     # Skip reduceOnly orders (take profits, stop losses)
                     if order.get('reduceOnly', False):
                         logging.info(f"Skipping reduceOnly order {order['id']} (TP/SL) for {symbol}")
                         continue
-                    self.exchange.cancel_order_by_id(order['id'], symbol)
-                    orders_canceled += 1
-                    logging.info(f"Canceled grid order {order['id']} for {symbol}")
+                    grid_order_ids.append(order['id'])
+
+            results = self.exchange.cancel_orders_batch_bybit(symbol, order_ids=grid_order_ids) if grid_order_ids else []
+            cancelled = [r['id'] for r in results if r['ok']]
+            failed = [r['id'] for r in results if not r['ok']]
+            orders_canceled = len(cancelled)
+            for order_id in cancelled:
+                logging.info(f"Canceled grid order {order_id} for {symbol}")
 
             if orders_canceled > 0:
                 logging.info(f"Canceled {orders_canceled} {side} grid orders for {symbol}")
@@ -16929,9 +16885,12 @@ class BybitStrategy(BaseStrategy):
                 self.active_short_grids.discard(symbol)
                 logging.info(f"Removed {symbol} from active short grids")
 
+            return {"cancelled": cancelled, "failed": failed}
+
         except Exception as e:
             logging.error(f"Exception in cancel_grid_orders for {symbol} - {side}: {e}")
             logging.error("Traceback: %s", traceback.format_exc())
+            return None
 
     def calculate_total_amount(self, symbol: str, total_equity: float, best_ask_price: float, best_bid_price: float, wallet_exposure_limit: float, user_defined_leverage: float, side: str, levels: int, min_qty: float, enforce_full_grid: bool) -> float:
         logging.info(f"Calculating total amount for {symbol} with total_equity: {total_equity}, best_ask_price: {best_ask_price}, best_bid_price: {best_bid_price}, wallet_exposure_limit: {wallet_exposure_limit}, user_defined_leverage: {user_defined_leverage}, side: {side}, levels: {levels}, min_qty: {min_qty}, enforce_full_grid: {enforce_full_grid}")
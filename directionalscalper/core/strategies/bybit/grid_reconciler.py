@@ -0,0 +1,111 @@
+"""
+Grid Reconciler - Diff the desired grid against the live orders of one side
+Keeps orders that are already close enough, amends the ones that drifted and
+only places / cancels what is genuinely missing / surplus
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class GridPlan:
+    """Operations needed to turn the live orders of one side into the desired grid."""
+    keep: List[dict] = field(default_factory=list)    # {"order", "price", "qty"}
+    amend: List[dict] = field(default_factory=list)   # {"order", "price", "qty", "new_price", "new_qty"}
+    place: List[dict] = field(default_factory=list)   # {"price", "qty"}
+    cancel: List[dict] = field(default_factory=list)  # ccxt orders
+
+    @property
+    def requests(self) -> int:
+        return len(self.amend) + len(self.place) + len(self.cancel)
+
+    def summary(self) -> str:
+        return f"keep={len(self.keep)} amend={len(self.amend)} place={len(self.place)} cancel={len(self.cancel)}"
+
+
+class GridReconciler:
+    """
+    Plans the minimal amend / place / cancel set for one grid side.
+
+    Live orders are the non-reduce-only orders of the side (same set
+    clear_grid would cancel). Matching is done in two passes:
+
+    1. every desired level claims the nearest live order whose price and
+       remaining qty are both within tolerance -> kept untouched
+    2. the leftovers on both sides are paired in rank order from the market
+       outwards -> amended in place (price and/or qty)
+
+    Whatever is still unpaired is placed (desired) or cancelled (live).
+    """
+
+    def __init__(self, config: Dict):
+        self.enabled = config.get('grid_reconcile', True)
+        self.price_tolerance = config.get('grid_reconcile_price_tolerance', 0.0005)  # 0.05% of the level price
+        self.qty_tolerance = config.get('grid_reconcile_qty_tolerance', 0.1)  # 10% of the level qty
+
+    @staticmethod
+    def live_grid_orders(open_orders: list, side: str) -> list:
+        return [
+            order for order in open_orders
+            if order['side'].lower() == side.lower()
+            and not order.get('reduceOnly', False)
+            and not order.get('info', {}).get('reduceOnly', False)
+        ]
+
+    @staticmethod
+    def _remaining(order: dict) -> float:
+        remaining = order.get('remaining')
+        if remaining is None:
+            remaining = (order.get('amount') or 0) - (order.get('filled') or 0)
+        return float(remaining)
+
+    def price_ok(self, live_price: float, level: float, tick_size: Optional[float] = None) -> bool:
+        tolerance = abs(level) * self.price_tolerance
+        if tick_size:
+            tolerance = max(tolerance, tick_size / 2)
+        return abs(live_price - level) <= tolerance
+
+    def qty_ok(self, live_qty: float, qty: float, min_qty: Optional[float] = None) -> bool:
+        tolerance = abs(qty) * self.qty_tolerance
+        if min_qty:
+            tolerance = max(tolerance, min_qty / 2)
+        return abs(live_qty - qty) <= tolerance
+
+    def plan(self, side: str, grid_levels: list, amounts: list, open_orders: list,
+             tick_size: Optional[float] = None, min_qty: Optional[float] = None) -> GridPlan:
+        plan = GridPlan()
+        live = self.live_grid_orders(open_orders, side)
+        desired = [(float(level), float(amount)) for level, amount in zip(grid_levels, amounts)]
+
+        # Pass 1: keep live orders that already match a level
+        unmatched_desired = []
+        for level, qty in desired:
+            candidates = [
+                order for order in live
+                if self.price_ok(float(order['price']), level, tick_size)
+                and self.qty_ok(self._remaining(order), qty, min_qty)
+            ]
+            if candidates:
+                best = min(candidates, key=lambda o: abs(float(o['price']) - level))
+                live.remove(best)
+                plan.keep.append({"order": best, "price": level, "qty": qty})
+            else:
+                unmatched_desired.append((level, qty))
+
+        # Pass 2: pair the rest from the market outwards and amend
+        nearest_first = side.lower() == 'buy'  # buys closest to market have the highest price
+        unmatched_desired.sort(key=lambda d: d[0], reverse=nearest_first)
+        live.sort(key=lambda o: float(o['price']), reverse=nearest_first)
+        for (level, qty), order in zip(unmatched_desired, live):
+            live_price = float(order['price'])
+            remaining = self._remaining(order)
+            new_price = None if self.price_ok(live_price, level, tick_size) else level
+            # Bybit's amend qty is the total order qty, so add back what already filled
+            new_qty = None if self.qty_ok(remaining, qty, min_qty) else qty + float(order.get('filled') or 0)
+            plan.amend.append({"order": order, "price": level, "qty": qty, "new_price": new_price, "new_qty": new_qty})
+
+        paired = min(len(unmatched_desired), len(live))
+        plan.place = [{"price": level, "qty": qty} for level, qty in unmatched_desired[paired:]]
+        plan.cancel = live[paired:]
+        return plan
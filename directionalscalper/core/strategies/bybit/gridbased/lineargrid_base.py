@@ -12,8 +12,11 @@ from directionalscalper.core.config_initializer import ConfigInitializer
 from directionalscalper.core.strategies.bybit.bybit_strategy import BybitStrategy
 from directionalscalper.core.exchanges.bybit import BybitExchange
 from directionalscalper.core.strategies.logger import Logger
+from directionalscalper.core.strategies.symbol_trigger import SymbolTrigger
+from directionalscalper.core.async_runtime import run_steps_blocking
 from live_table_manager import shared_symbols_data
-from rate_limit import RateLimit
+from rate_limit import get_rate_limiter
+from directionalscalper.core.tracing import IterationTimer
 logging = Logger(logger_name="LinearGridBase", filename="LinearGridBase.log", stream=True)
 
 symbol_locks = {}
@@ -21,9 +24,9 @@ symbol_locks = {}
 class LinearGridBaseFutures(BybitStrategy):
     def __init__(self, exchange, manager, config, symbols_allowed=None, rotator_symbols_standardized=None, mfirsi_signal=None):
         super().__init__(exchange, config, manager, symbols_allowed)
-        self.rate_limiter = RateLimit(25, 1)
-        self.general_rate_limiter = RateLimit(100, 1)
-        self.order_rate_limiter = RateLimit(20, 1) 
+        self.rate_limiter = get_rate_limiter("general")
+        self.general_rate_limiter = get_rate_limiter("general")
+        self.order_rate_limiter = get_rate_limiter("order_create")
         self.mfirsi_signal = mfirsi_signal
         self.is_order_history_populated = False
         self.last_health_check_time = time.time()
@@ -48,6 +51,10 @@ class LinearGridBaseFutures(BybitStrategy):
                 symbol_locks[standardized_symbol] = {'long': threading.Lock(), 'short': threading.Lock()}
 
     def run(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+        run_steps_blocking(self.run_steps(symbol, rotator_symbols_standardized, mfirsi_signal, action))
+
+    def run_steps(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+        """Step-generator form of run(), driven either by a thread or by the async runtime."""
         standardized_symbol = symbol.upper()
         logging.info(f"[{standardized_symbol}] Entering run() with action='{action}'")
 
@@ -79,10 +86,10 @@ class LinearGridBaseFutures(BybitStrategy):
         try:
             if action == "long":
                 self.running_long = True
-                self.run_single_symbol(standardized_symbol, rotator_symbols_standardized, mfirsi_signal, "long")
+                yield from self.single_symbol_steps(standardized_symbol, rotator_symbols_standardized, mfirsi_signal, "long")
             elif action == "short":
                 self.running_short = True
-                self.run_single_symbol(standardized_symbol, rotator_symbols_standardized, mfirsi_signal, "short")
+                yield from self.single_symbol_steps(standardized_symbol, rotator_symbols_standardized, mfirsi_signal, "short")
             else:
                 logging.warning(f"[{symbol}] Unknown action '{action}' passed to run()")
         finally:
@@ -98,12 +105,21 @@ class LinearGridBaseFutures(BybitStrategy):
         self.run_single_symbol(symbol, rotator_symbols_standardized, mfirsi_signal, "short")
 
     def run_single_symbol(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+        run_steps_blocking(self.single_symbol_steps(symbol, rotator_symbols_standardized, mfirsi_signal, action))
+
+    def single_symbol_steps(self, symbol, rotator_symbols_standardized=None, mfirsi_signal=None, action=None):
+        """
+        Main per-symbol loop as a step generator. Instead of sleeping it yields
+        the pause it wants (seconds, or the SymbolTrigger in event-driven mode)
+        so the caller decides how to wait.
+        """
+        trigger = None
         try:
 
             current_signal = mfirsi_signal
 
-            logging.info(f"Starting to process symbol: {symbol}")
-            logging.info(f"Initializing default values for symbol: {symbol}")
+            logging.info("Starting to process symbol: %s", symbol)
+            logging.info("Initializing default values for symbol: %s", symbol)
 
             previous_long_pos_qty = 0
             previous_short_pos_qty = 0
@@ -148,16 +164,16 @@ class LinearGridBaseFutures(BybitStrategy):
             self.current_leverage = self.exchange.get_current_max_leverage_bybit(symbol)
             self.max_leverage = self.exchange.get_current_max_leverage_bybit(symbol)
 
-            logging.info(f"Current leverage: {self.current_leverage}")
+            logging.info("Current leverage: %s", self.current_leverage)
 
-            logging.info(f"Max leverage for {symbol}: {self.max_leverage}")
+            logging.info("Max leverage for %s: %s", symbol, self.max_leverage)
 
             # self.adjust_risk_parameters(exchange_max_leverage=self.max_leverage)
 
             self.exchange.set_leverage_bybit(self.max_leverage, symbol)
             self.exchange.set_symbol_to_cross_margin(symbol, self.max_leverage)
 
-            logging.info(f"Running for symbol (inside run_single_symbol method): {symbol}")
+            logging.info("Running for symbol (inside run_single_symbol method): %s", symbol)
 
             # Definitions
             max_retries = 5
@@ -210,6 +226,9 @@ class LinearGridBaseFutures(BybitStrategy):
             grid_behavior = self.config.linear_grid.get('grid_behavior', 'infinite')
             drawdown_behavior = self.config.linear_grid.get('drawdown_behavior', 'maxqtypercent')
 
+            # Event-driven mode: wake on price/account/signal/TP triggers instead of fixed sleeps
+            event_driven = self.config.linear_grid.get('event_driven', False)
+
             hedge_stop_loss = self.config.linear_grid['hedge_stop_loss']
 
             dynamic_grid = self.config.linear_grid['dynamic_grid']
@@ -275,23 +294,40 @@ class LinearGridBaseFutures(BybitStrategy):
             #     logging.info(f"No recent trading activity for {symbol} in the last 24 hours")
 
 
+            if event_driven:
+                trigger = SymbolTrigger(
+                    self.exchange,
+                    symbol,
+                    reissue_threshold,
+                    tp_interval=self.config.linear_grid.get('event_tp_interval', 10.0),
+                    max_idle=self.config.linear_grid.get('event_max_idle', 30.0),
+                    signal_fn=None if grid_behavior in ("xgridt", "xgrid_highfrequency") else (lambda: self.generate_l_signals(symbol)),
+                    signal_interval=self.config.linear_grid.get('event_signal_interval', 15.0),
+                    coalesce_window=self.config.linear_grid.get('event_coalesce_window', 0.05),
+                    should_stop=lambda: not (self.running_long or self.running_short),
+                )
+                logging.info("[%s] Running in event-driven mode", symbol)
+
+            laps = IterationTimer(symbol)
             while self.running_long or self.running_short:
                 iteration_count += 1
-                logging.info(f"Trading {symbol} in while loop iteration {iteration_count} with long: {self.running_long}, short: {self.running_short}")
+                logging.info("Trading %s in while loop iteration %s with long: %s, short: %s", symbol, iteration_count, self.running_long, self.running_short)
 
                 # Example condition to stop the loop
                 if action == "long" and not self.running_long:
-                    logging.info(f"Killing thread for {symbol} because not running long")
+                    logging.info("Killing thread for %s because not running long", symbol)
                     break
                 if action == "short" and not self.running_short:
-                    logging.info(f"Killing thread for {symbol} because not running short")
+                    logging.info("Killing thread for %s because not running short", symbol)
                     break
 
                 current_time = time.time()
 
                 iteration_start_time = time.time()
+                laps.start()
 
                 leverage_tiers = self.exchange.fetch_leverage_tiers(symbol)
+                laps.lap("leverage_tiers")
 
                 # if leverage_tiers:
                 #     logging.info(f"Leverage tiers for {symbol}: {leverage_tiers}")
@@ -299,11 +335,11 @@ class LinearGridBaseFutures(BybitStrategy):
                 #     logging.error(f"Failed to fetch leverage tiers for {symbol}.")
 
 
-                logging.info(f"Max USD value: {self.max_usd_value}")
+                logging.info("Max USD value: %s", self.max_usd_value)
             
                 # Log which thread is running this part of the code
                 thread_id = threading.get_ident()
-                logging.info(f"[Thread ID: {thread_id}] In while true loop {symbol}")
+                logging.info("[Thread ID: %s] In while true loop %s", thread_id, symbol)
 
                 # Fetch open symbols every loop
                 open_position_data = self.retry_api_call(self.exchange.get_all_open_positions_bybit)
@@ -341,12 +377,14 @@ class LinearGridBaseFutures(BybitStrategy):
                             position_details[position_symbol]['short']['avg_price'] = avg_price
                             position_details[position_symbol]['short']['liq_price'] = liq_price
                     else:
-                        logging.warning(f"Missing required keys in position info for {position_symbol}")
+                        logging.warning("Missing required keys in position info for %s", position_symbol)
 
                 open_symbols = self.extract_symbols_from_positions_bybit(open_position_data)
                 open_symbols = [symbol.replace("/", "") for symbol in open_symbols]
-                logging.info(f"Open symbols: {open_symbols}")
+                logging.info("Open symbols: %s", open_symbols)
+                laps.lap("positions")
                 open_orders = self.retry_api_call(self.exchange.get_open_orders, symbol)
+                laps.lap("open_orders")
 
                 #logging.info(f"Open symbols: {open_symbols}")
 
@@ -354,6 +392,7 @@ class LinearGridBaseFutures(BybitStrategy):
 
                 market_data = self.get_market_data_with_retry(symbol, max_retries=100, retry_delay=5)
                 min_qty = float(market_data["min_qty"])
+                laps.lap("market_data")
 
                 # position_last_update_time = self.get_position_update_time(symbol)
 
@@ -362,13 +401,13 @@ class LinearGridBaseFutures(BybitStrategy):
                 # Fetch equity data
                 fetched_total_equity = self.retry_api_call(self.exchange.get_futures_balance_bybit)
 
-                logging.info(f"Fetched total equity: {fetched_total_equity}")
+                logging.info("Fetched total equity: %s", fetched_total_equity)
 
                 # Attempt to convert fetched_total_equity to a float
                 try:
                     fetched_total_equity = float(fetched_total_equity)
                 except (ValueError, TypeError):
-                    logging.warning(f"Fetched total equity could not be converted to float: {fetched_total_equity}. Resorting to last known equity.")
+                    logging.warning("Fetched total equity could not be converted to float: %s. Resorting to last known equity.", fetched_total_equity)
                     fetched_total_equity = None
 
                 # Refresh equity if interval passed or fetched equity is 0.0
@@ -383,25 +422,26 @@ class LinearGridBaseFutures(BybitStrategy):
                     available_equity = self.retry_api_call(self.exchange.get_available_balance_bybit)
                     last_equity_fetch_time = current_time
 
-                    logging.info(f"Total equity: {total_equity}")
-                    logging.info(f"Available equity: {available_equity}")
+                    logging.info("Total equity: %s", total_equity)
+                    logging.info("Available equity: %s", available_equity)
                     
                     # Log the type of total_equity
-                    logging.info(f"Type of total_equity: {type(total_equity)}")
+                    logging.info("Type of total_equity: %s", type(total_equity))
 
                     # If total_equity is still None (which it shouldn't be), log an error and skip the iteration
                     if total_equity is None:
                         logging.error("This should not happen as total_equity should never be None. Skipping this iteration.")
-                        time.sleep(10)  # wait for a short period before retrying
+                        yield 10  # wait for a short period before retrying
                         continue
                     
+                laps.lap("balance")
                 blacklist = self.config.blacklist
                 if symbol in blacklist:
-                    logging.info(f"Symbol {symbol} is in the blacklist. Stopping operations for this symbol.")
+                    logging.info("Symbol %s is in the blacklist. Stopping operations for this symbol.", symbol)
                     break
 
                 funding_check = self.is_funding_rate_acceptable(symbol)
-                logging.info(f"Funding check on {symbol} : {funding_check}")
+                logging.info("Funding check on %s : %s", symbol, funding_check)
 
                 current_price = self.exchange.get_current_price(symbol)
 
@@ -416,7 +456,7 @@ class LinearGridBaseFutures(BybitStrategy):
                 else:
                     best_ask_price = self.last_known_ask.get(symbol)  # Use last known ask price
                     if best_ask_price is None:
-                        logging.warning(f"Best ask price is not available for {symbol}. Defaulting to last known ask price, which is also None.")
+                        logging.warning("Best ask price is not available for %s. Defaulting to last known ask price, which is also None.", symbol)
                         best_ask_price = 0.0  # Default to 0.0 if None
 
                 # Convert best_ask_price to float to ensure no type mismatches
@@ -429,23 +469,24 @@ class LinearGridBaseFutures(BybitStrategy):
                 else:
                     best_bid_price = self.last_known_bid.get(symbol)  # Use last known bid price
                     if best_bid_price is None:
-                        logging.warning(f"Best bid price is not available for {symbol}. Defaulting to last known bid price, which is also None.")
+                        logging.warning("Best bid price is not available for %s. Defaulting to last known bid price, which is also None.", symbol)
                         best_bid_price = 0.0  # Default to 0.0 if None
 
                 # Convert best_bid_price to float to ensure no type mismatches
                 best_bid_price = float(best_bid_price)
                 best_ask_price = float(best_ask_price)
 
-                logging.info(f"Best bid price: {best_bid_price}")
-                logging.info(f"Best ask price: {best_ask_price}")
+                logging.info("Best bid price: %s", best_bid_price)
+                logging.info("Best ask price: %s", best_ask_price)
 
+                laps.lap("prices")
                 # Fetch moving averages with fallback mechanism
                 try:
                     moving_averages = self.get_all_moving_averages(symbol)
                 except ValueError as e:
-                    logging.info(f"Failed to get new moving averages for {symbol}, using last known values: {e}")
+                    logging.info("Failed to get new moving averages for %s, using last known values: %s", symbol, e)
                     moving_averages = self.last_known_mas.get(symbol, {})  # Continue using last known values if an error occurs
-
+                laps.lap("moving_averages")
 
                 # Ensure the moving averages are valid, fallback to last known if not present
                 ma_3_high = moving_averages.get("ma_3_high", self.last_known_mas.get(symbol, {}).get("ma_3_high", 0.0))
@@ -461,40 +502,40 @@ class LinearGridBaseFutures(BybitStrategy):
 
                 # Log warnings if any of the moving averages are missing
                 if None in [ma_3_high, ma_3_low, ma_6_high, ma_6_low]:
-                    logging.info(f"Missing moving averages for {symbol}. Using fallback values.")
+                    logging.info("Missing moving averages for %s. Using fallback values.", symbol)
 
 
                 # moving_averages = self.get_all_moving_averages(symbol)
 
-                logging.info(f"Open symbols: {open_symbols}")
-                logging.info(f"Current rotator symbols: {rotator_symbols_standardized}")
+                logging.info("Open symbols: %s", open_symbols)
+                logging.info("Current rotator symbols: %s", rotator_symbols_standardized)
                 symbols_to_manage = [s for s in open_symbols if s not in rotator_symbols_standardized]
-                logging.info(f"Symbols to manage {symbols_to_manage}")
+                logging.info("Symbols to manage %s", symbols_to_manage)
                 
                 #logging.info(f"Open orders for {symbol}: {open_orders}")
 
-                logging.info(f"Symbols allowed: {self.symbols_allowed}")
+                logging.info("Symbols allowed: %s", self.symbols_allowed)
 
                 trading_allowed = self.can_trade_new_symbol(open_symbols, self.symbols_allowed, symbol)
-                logging.info(f"Checking trading for symbol {symbol}. Can trade: {trading_allowed}")
-                logging.info(f"Symbol: {symbol}, In open_symbols: {symbol in open_symbols}, Trading allowed: {trading_allowed}")
+                logging.info("Checking trading for symbol %s. Can trade: %s", symbol, trading_allowed)
+                logging.info("Symbol: %s, In open_symbols: %s, Trading allowed: %s", symbol, symbol in open_symbols, trading_allowed)
 
                 # self.adjust_risk_parameters()
 
                 # self.initialize_symbol(symbol, total_equity, best_ask_price, self.max_leverage)
 
                 # Log the currently initialized symbols
-                logging.info(f"Initialized symbols: {list(self.initialized_symbols)}")
+                logging.info("Initialized symbols: %s", list(self.initialized_symbols))
 
                 # self.check_for_inactivity(long_pos_qty, short_pos_qty)
 
                 # self.print_trade_quantities_once_bybit(symbol, total_equity, best_ask_price)
 
-                logging.info(f"Rotator symbols standardized: {rotator_symbols_standardized}")
+                logging.info("Rotator symbols standardized: %s", rotator_symbols_standardized)
 
                 symbol_precision = self.exchange.get_symbol_precision_bybit(symbol)
 
-                logging.info(f"Symbol precision for {symbol} : {symbol_precision}")
+                logging.info("Symbol precision for %s : %s", symbol, symbol_precision)
 
 
                 long_pos_qty = position_details.get(symbol, {}).get('long', {}).get('qty', 0)
@@ -508,11 +549,11 @@ class LinearGridBaseFutures(BybitStrategy):
 
 
                 # Position side for symbol recently closed
-                logging.info(f"Previous long pos qty for {symbol} : {previous_long_pos_qty}")
-                logging.info(f"Previous short pos qty for {symbol} : {previous_short_pos_qty}")
+                logging.info("Previous long pos qty for %s : %s", symbol, previous_long_pos_qty)
+                logging.info("Previous short pos qty for %s : %s", symbol, previous_short_pos_qty)
 
-                logging.info(f"Current long pos qty for {symbol} {long_pos_qty}")
-                logging.info(f"Current short pos qty for {symbol} {short_pos_qty}")
+                logging.info("Current long pos qty for %s %s", symbol, long_pos_qty)
+                logging.info("Current short pos qty for %s %s", symbol, short_pos_qty)
             
                 # if previous_long_pos_qty > 0 and long_pos_qty == 0:
                 #     logging.info(f"Long position closed for {symbol}. Canceling long grid orders.")
@@ -536,30 +577,30 @@ class LinearGridBaseFutures(BybitStrategy):
 
 
                 if previous_long_pos_qty > 0 and long_pos_qty == 0:
-                    logging.info(f"Long position closed for {symbol}. Canceling long grid orders.")
+                    logging.info("Long position closed for %s. Canceling long grid orders.", symbol)
                     if grid_behavior == "xgridt" or grid_behavior == "xgrid_highfrequency":
                         # Force cancel all grid orders immediately, bypassing timing protection
                         self.force_cancel_grid_orders(symbol, "buy")
-                        logging.info(f"Force canceled {grid_behavior} orders for {symbol} long side (position closed)")
+                        logging.info("Force canceled %s orders for %s long side (position closed)", grid_behavior, symbol)
                     else:
                         self.cancel_grid_orders(symbol, "buy")
                     self.active_long_grids.discard(symbol)
                     if short_pos_qty == 0:
-                        logging.info(f"No open positions for {symbol}. Removing from shared symbols data.")
+                        logging.info("No open positions for %s. Removing from shared symbols data.", symbol)
                         shared_symbols_data.pop(symbol, None)
                     break  # Exit the while loop, thus ending the thread
 
                 elif previous_short_pos_qty > 0 and short_pos_qty == 0:
-                    logging.info(f"Short position closed for {symbol}. Canceling short grid orders.")
+                    logging.info("Short position closed for %s. Canceling short grid orders.", symbol)
                     if grid_behavior == "xgridt" or grid_behavior == "xgrid_highfrequency":
                         # Force cancel all grid orders immediately, bypassing timing protection
                         self.force_cancel_grid_orders(symbol, "sell")
-                        logging.info(f"Force canceled {grid_behavior} orders for {symbol} short side (position closed)")
+                        logging.info("Force canceled %s orders for %s short side (position closed)", grid_behavior, symbol)
                     else:
                         self.cancel_grid_orders(symbol, "sell")
                     self.active_short_grids.discard(symbol)
                     if long_pos_qty == 0:
-                        logging.info(f"No open positions for {symbol}. Removing from shared symbols data.")
+                        logging.info("No open positions for %s. Removing from shared symbols data.", symbol)
                         shared_symbols_data.pop(symbol, None)
                     break  # Exit the while loop, thus ending the thread
 
@@ -569,11 +610,11 @@ class LinearGridBaseFutures(BybitStrategy):
                     # Check for position inactivity
                     inactive_pos_time_threshold = 60 
                     if self.check_position_inactivity(symbol, inactive_pos_time_threshold, long_pos_qty, short_pos_qty, previous_long_pos_qty, previous_short_pos_qty):
-                        logging.info(f"No open positions for {symbol} in the last {inactive_pos_time_threshold} seconds. Terminating the thread.")
+                        logging.info("No open positions for %s in the last %s seconds. Terminating the thread.", symbol, inactive_pos_time_threshold)
                         shared_symbols_data.pop(symbol, None)
                         break
                 except Exception as e:
-                    logging.info(f"Exception caught in check_position_inactivity {e}")
+                    logging.info("Exception caught in check_position_inactivity %s", e)
        
                 # Optionally, break out of the loop if all trading sides are closed
                 if not self.running_long and not self.running_short:
@@ -588,13 +629,13 @@ class LinearGridBaseFutures(BybitStrategy):
                 
                 # Determine if positions have just been closed
                 if previous_long_pos_qty > 0 and long_pos_qty == 0:
-                    logging.info(f"All long positions for {symbol} were recently closed. Checking for inactivity.")
+                    logging.info("All long positions for %s were recently closed. Checking for inactivity.", symbol)
                     inactive_long = True
                 else:
                     inactive_long = False
 
                 if previous_short_pos_qty > 0 and short_pos_qty == 0:
-                    logging.info(f"All short positions for {symbol} were recently closed. Checking for inactivity.")
+                    logging.info("All short positions for %s were recently closed. Checking for inactivity.", symbol)
                     inactive_short = True
                 else:
                     inactive_short = False
@@ -608,10 +649,14 @@ class LinearGridBaseFutures(BybitStrategy):
                     shared_symbols_data.pop(symbol, None)  # Remove the symbol from shared_symbols_data
 
                 # Reduced sleep for xgrid high-frequency trading
-                if self.config.linear_grid.get("grid_behavior") == "xgridt":
-                    time.sleep(0.1)
+                laps.lap("checks")
+                if event_driven:
+                    pass
+                elif self.config.linear_grid.get("grid_behavior") == "xgridt":
+                    yield 0.1
                 else:
-                    time.sleep(2)
+                    yield 2
+                laps.resume()
 
                 # If the symbol is in rotator_symbols and either it's already being traded or trading is allowed.
                 if symbol in rotator_symbols_standardized or (symbol in open_symbols or trading_allowed): # and instead of or
@@ -642,9 +687,9 @@ class LinearGridBaseFutures(BybitStrategy):
                     hma_trend = metrics['HMA Trend']
                     eri_trend = metrics['ERI Trend']
 
-                    logging.info(f"{symbol} ERI Trend: {eri_trend}")
+                    logging.info("%s ERI Trend: %s", symbol, eri_trend)
 
-                    logging.info(f"{symbol} MFIRSI Signal: {mfirsi_signal}")
+                    logging.info("%s MFIRSI Signal: %s", symbol, mfirsi_signal)
 
                     fivemin_top_signal = metrics['Top Signal 5m']
                     fivemin_bottom_signal = metrics['Bottom Signal 5m']
@@ -657,16 +702,16 @@ class LinearGridBaseFutures(BybitStrategy):
                     long_liquidation_price = position_details.get(symbol, {}).get('long', {}).get('liq_price')
                     short_liquidation_price = position_details.get(symbol, {}).get('short', {}).get('liq_price')
 
-                    logging.info(f"Long liquidation price for {symbol}: {long_liquidation_price}")
-                    logging.info(f"Short liquidation price for {symbol}: {short_liquidation_price}")
+                    logging.info("Long liquidation price for %s: %s", symbol, long_liquidation_price)
+                    logging.info("Short liquidation price for %s: %s", symbol, short_liquidation_price)
 
-                    logging.info(f"Rotator symbol trading: {symbol}")
+                    logging.info("Rotator symbol trading: %s", symbol)
                                 
-                    logging.info(f"Rotator symbols: {rotator_symbols_standardized}")
-                    logging.info(f"Open symbols: {open_symbols}")
+                    logging.info("Rotator symbols: %s", rotator_symbols_standardized)
+                    logging.info("Open symbols: %s", open_symbols)
 
-                    logging.info(f"Long pos qty {long_pos_qty} for {symbol}")
-                    logging.info(f"Short pos qty {short_pos_qty} for {symbol}")
+                    logging.info("Long pos qty %s for %s", long_pos_qty, symbol)
+                    logging.info("Short pos qty %s for %s", short_pos_qty, symbol)
 
                     # short_liq_price = position_data["short"]["liq_price"]
                     # long_liq_price = position_data["long"]["liq_price"]
@@ -685,8 +730,8 @@ class LinearGridBaseFutures(BybitStrategy):
                         wallet_exposure_limit_short=wallet_exposure_limit_short
                     )
 
-                    logging.info(f"Long dynamic amount: {long_dynamic_amount} for {symbol}")
-                    logging.info(f"Short dynamic amount: {short_dynamic_amount} for {symbol}")
+                    logging.info("Long dynamic amount: %s for %s", long_dynamic_amount, symbol)
+                    logging.info("Short dynamic amount: %s for %s", short_dynamic_amount, symbol)
 
                     long_dynamic_amount_helper, short_dynamic_amount_helper = self.calculate_dynamic_amounts_notional_nowelimit(
                         symbol=symbol,
@@ -695,8 +740,8 @@ class LinearGridBaseFutures(BybitStrategy):
                         best_ask_price=best_ask_price
                     )
 
-                    logging.info(f"Long dynamic amount helper: {long_dynamic_amount} for {symbol}")
-                    logging.info(f"Short dynamic amount helper: {short_dynamic_amount} for {symbol}")
+                    logging.info("Long dynamic amount helper: %s for %s", long_dynamic_amount, symbol)
+                    logging.info("Short dynamic amount helper: %s for %s", short_dynamic_amount, symbol)
 
                     cum_realised_pnl_long = position_data["long"]["cum_realised"]
                     cum_realised_pnl_short = position_data["short"]["cum_realised"]
@@ -722,13 +767,13 @@ class LinearGridBaseFutures(BybitStrategy):
                     try:
                         pass  # Failsafe functionality removed
                     except Exception as e:
-                        logging.info(f"Failsafe failed: {e}")
+                        logging.info("Failsafe failed: %s", e)
 
                     # Auto-reduce logic disabled for xgrid + momentum_scalping
                     try:
                         pass  # Auto-reduce functionality removed
                     except Exception as e:
-                        logging.info(f"Auto-reduce exception caught {e}")
+                        logging.info("Auto-reduce exception caught %s", e)
 
 
                     # short_take_profit, long_take_profit = self.calculate_take_profits_based_on_spread(short_pos_price, long_pos_price, symbol, one_minute_distance, previous_one_minute_distance, short_take_profit, long_take_profit)
@@ -738,8 +783,8 @@ class LinearGridBaseFutures(BybitStrategy):
                     previous_one_minute_distance = one_minute_distance
 
 
-                    logging.info(f"Short take profit for {symbol}: {short_take_profit}")
-                    logging.info(f"Long take profit for {symbol}: {long_take_profit}")
+                    logging.info("Short take profit for %s: %s", symbol, short_take_profit)
+                    logging.info("Long take profit for %s: %s", symbol, long_take_profit)
 
                     # Handling best ask price with fallback and type conversion
                     if 'asks' in order_book and len(order_book['asks']) > 0:
@@ -748,7 +793,7 @@ class LinearGridBaseFutures(BybitStrategy):
                     else:
                         best_ask_price = self.last_known_ask.get(symbol, 0.0)  # Fallback to 0.0 if not available
                         if best_ask_price == 0.0:
-                            logging.warning(f"Best ask price is not available for {symbol}. Defaulting to 0.0.")
+                            logging.warning("Best ask price is not available for %s. Defaulting to 0.0.", symbol)
 
                     # Handling best bid price with fallback and type conversion
                     if 'bids' in order_book and len(order_book['bids']) > 0:
@@ -757,7 +802,7 @@ class LinearGridBaseFutures(BybitStrategy):
                     else:
                         best_bid_price = self.last_known_bid.get(symbol, 0.0)  # Fallback to 0.0 if not available
                         if best_bid_price == 0.0:
-                            logging.warning(f"Best bid price is not available for {symbol}. Defaulting to 0.0.")
+                            logging.warning("Best bid price is not available for %s. Defaulting to 0.0.", symbol)
 
                     # Ensure valid decisions on whether to short or long based on conditions
                     should_short = self.short_trade_condition(best_ask_price, ma_3_high)
@@ -773,7 +818,7 @@ class LinearGridBaseFutures(BybitStrategy):
                     if long_pos_price is not None:
                         should_add_to_long = long_pos_price > ma_6_high and self.long_trade_condition(best_bid_price, ma_6_low)
 
-                    logging.info(f"Five minute volume for {symbol} : {five_minute_volume}")
+                    logging.info("Five minute volume for %s : %s", symbol, five_minute_volume)
                         
                     # historical_data = self.fetch_historical_data(
                     #     symbol,
@@ -786,7 +831,7 @@ class LinearGridBaseFutures(BybitStrategy):
 
                     tp_order_counts = self.exchange.get_open_tp_order_count(open_orders)
 
-                    logging.info(f"Open TP order count {tp_order_counts}")
+                    logging.info("Open TP order count %s", tp_order_counts)
 
                     # Check for long position
                     if long_pos_qty > 0:
@@ -795,11 +840,11 @@ class LinearGridBaseFutures(BybitStrategy):
                             long_upnl = unrealized_pnl.get('long')
                             self.last_known_upnl[symbol] = self.last_known_upnl.get(symbol, {})
                             self.last_known_upnl[symbol]['long'] = long_upnl  # Store the last known long uPNL
-                            logging.info(f"Long UPNL for {symbol}: {long_upnl}")
+                            logging.info("Long UPNL for %s: %s", symbol, long_upnl)
                         except Exception as e:
                             # Fallback to last known uPNL if an exception occurs
                             long_upnl = self.last_known_upnl.get(symbol, {}).get('long', 0.0)
-                            logging.info(f"Exception fetching Long UPNL for {symbol}: {e}. Using last known UPNL: {long_upnl}")
+                            logging.info("Exception fetching Long UPNL for %s: %s. Using last known UPNL: %s", symbol, e, long_upnl)
 
                     # Check for short position
                     if short_pos_qty > 0:
@@ -808,17 +853,18 @@ class LinearGridBaseFutures(BybitStrategy):
                             short_upnl = unrealized_pnl.get('short')
                             self.last_known_upnl[symbol] = self.last_known_upnl.get(symbol, {})
                             self.last_known_upnl[symbol]['short'] = short_upnl  # Store the last known short uPNL
-                            logging.info(f"Short UPNL for {symbol}: {short_upnl}")
+                            logging.info("Short UPNL for %s: %s", symbol, short_upnl)
                         except Exception as e:
                             # Fallback to last known uPNL if an exception occurs
                             short_upnl = self.last_known_upnl.get(symbol, {}).get('short', 0.0)
-                            logging.info(f"Exception fetching Short UPNL for {symbol}: {e}. Using last known UPNL: {short_upnl}")
+                            logging.info("Exception fetching Short UPNL for %s: %s. Using last known UPNL: %s", symbol, e, short_upnl)
 
                     long_tp_counts = tp_order_counts['long_tp_count']
                     short_tp_counts = tp_order_counts['short_tp_count']
 
                     # ────────────────────────────────────────────────────────────────
                     # 1) Run one full grid pass
+                    laps.lap("trade_setup")
                     try:
                         self.lineargrid_base(
                             symbol,
@@ -887,7 +933,8 @@ class LinearGridBaseFutures(BybitStrategy):
                             sticky_size_min_volume_ratio
                         )
                     except Exception as e:
-                        logging.info(f"Something went wrong in lineargrid_base: {e}")
+                        logging.info("Something went wrong in lineargrid_base: %s", e)
+                    laps.lap("grid")
 
                     # ────────────────────────────────────────────────────────────────
                     # 2) Build and publish the table row *before* any break
@@ -918,18 +965,18 @@ class LinearGridBaseFutures(BybitStrategy):
                     if self.config.linear_grid.get("grid_behavior") in ["xgridt", "xgrid_highfrequency"]:
                         # If running specific action and that side WAS opened but is NOW closed, exit to allow fresh entry
                         if action == "long" and long_position_ever_opened and long_pos_qty == 0:
-                            logging.info(f"[{symbol}] {grid_behavior} mode: long position was opened but now closed, canceling orders and exiting long thread for fresh signal entry")
+                            logging.info("[%s] %s mode: long position was opened but now closed, canceling orders and exiting long thread for fresh signal entry", symbol, grid_behavior)
                             self.force_cancel_grid_orders(symbol, "buy")
                             self.active_long_grids.discard(symbol)
                             break
                         elif action == "short" and short_position_ever_opened and short_pos_qty == 0:
-                            logging.info(f"[{symbol}] {grid_behavior} mode: short position was opened but now closed, canceling orders and exiting short thread for fresh signal entry")
+                            logging.info("[%s] %s mode: short position was opened but now closed, canceling orders and exiting short thread for fresh signal entry", symbol, grid_behavior)
                             self.force_cancel_grid_orders(symbol, "sell")
                             self.active_short_grids.discard(symbol)
                             break
                         # If both sides were opened but are now closed, exit completely
                         elif long_position_ever_opened and short_position_ever_opened and long_pos_qty == 0 and short_pos_qty == 0:
-                            logging.info(f"[{symbol}] {grid_behavior} mode: all positions were opened but now closed, canceling all orders and exiting thread for fresh signal entry")
+                            logging.info("[%s] %s mode: all positions were opened but now closed, canceling all orders and exiting thread for fresh signal entry", symbol, grid_behavior)
                             self.force_cancel_grid_orders(symbol, "buy")
                             self.force_cancel_grid_orders(symbol, "sell")
                             self.active_long_grids.discard(symbol)
@@ -940,38 +987,38 @@ class LinearGridBaseFutures(BybitStrategy):
                         elif iteration_count > 10:  # Allow at least 10 iterations for order placement and fills
                             if action == "long" and not long_position_ever_opened and long_pos_qty == 0:
                                 # If we're running long action but no long position ever opened after sufficient iterations, exit
-                                logging.info(f"[{symbol}] {grid_behavior} mode: long action but no long position opened after {iteration_count} iterations, exiting long thread for fresh signal entry")
+                                logging.info("[%s] %s mode: long action but no long position opened after %s iterations, exiting long thread for fresh signal entry", symbol, grid_behavior, iteration_count)
                                 self.force_cancel_grid_orders(symbol, "buy")
                                 self.active_long_grids.discard(symbol)
                                 break
                             elif action == "short" and not short_position_ever_opened and short_pos_qty == 0:
                                 # If we're running short action but no short position ever opened after sufficient iterations, exit
-                                logging.info(f"[{symbol}] {grid_behavior} mode: short action but no short position opened after {iteration_count} iterations, exiting short thread for fresh signal entry")
+                                logging.info("[%s] %s mode: short action but no short position opened after %s iterations, exiting short thread for fresh signal entry", symbol, grid_behavior, iteration_count)
                                 self.force_cancel_grid_orders(symbol, "sell")
                                 self.active_short_grids.discard(symbol)
                                 break
                         else:
                             if long_pos_qty == 0 and short_pos_qty == 0:
-                                logging.info(f"[{symbol}] {grid_behavior} mode: no positions opened yet, continuing to monitor for fills (long_ever_opened: {long_position_ever_opened}, short_ever_opened: {short_position_ever_opened})")
+                                logging.info("[%s] %s mode: no positions opened yet, continuing to monitor for fills (long_ever_opened: %s, short_ever_opened: %s)", symbol, grid_behavior, long_position_ever_opened, short_position_ever_opened)
                             else:
-                                logging.info(f"[{symbol}] {grid_behavior} mode: completed one grid pass, continuing to monitor open positions (long: {long_pos_qty}, short: {short_pos_qty})")
+                                logging.info("[%s] %s mode: completed one grid pass, continuing to monitor open positions (long: %s, short: %s)", symbol, grid_behavior, long_pos_qty, short_pos_qty)
 
-                    logging.info(f"Long tp counts: {long_tp_counts}")
-                    logging.info(f"Short tp counts: {short_tp_counts}")
+                    logging.info("Long tp counts: %s", long_tp_counts)
+                    logging.info("Short tp counts: %s", short_tp_counts)
 
-                    logging.info(f"Long pos qty {long_pos_qty} for {symbol}")
-                    logging.info(f"Short pos qty {short_pos_qty} for {symbol}")
+                    logging.info("Long pos qty %s for %s", long_pos_qty, symbol)
+                    logging.info("Short pos qty %s for %s", short_pos_qty, symbol)
 
-                    logging.info(f"Long take profit {long_take_profit} for {symbol}")
-                    logging.info(f"Short take profit {short_take_profit} for {symbol}")
+                    logging.info("Long take profit %s for %s", long_take_profit, symbol)
+                    logging.info("Short take profit %s for %s", short_take_profit, symbol)
 
-                    logging.info(f"Long TP order count for {symbol} is {tp_order_counts['long_tp_count']}")
-                    logging.info(f"Short TP order count for {symbol} is {tp_order_counts['short_tp_count']}")
+                    logging.info("Long TP order count for %s is %s", symbol, tp_order_counts['long_tp_count'])
+                    logging.info("Short TP order count for %s is %s", symbol, tp_order_counts['short_tp_count'])
 
                     current_latest_time = datetime.now()
-                    logging.info(f"Current time: {current_latest_time}")
-                    logging.info(f"Next long TP update time: {self.next_long_tp_update}")
-                    logging.info(f"Next short TP update time: {self.next_short_tp_update}")
+                    logging.info("Current time: %s", current_latest_time)
+                    logging.info("Next long TP update time: %s", self.next_long_tp_update)
+                    logging.info("Next short TP update time: %s", self.next_short_tp_update)
 
                     # Calculate take profit for short and long positions using quickscalp method
                     short_take_profit = self.calculate_quickscalp_short_take_profit_dynamic_distance(short_pos_price, symbol, min_upnl_profit_pct=upnl_profit_pct, max_upnl_profit_pct=max_upnl_profit_pct)
@@ -1022,7 +1069,7 @@ class LinearGridBaseFutures(BybitStrategy):
                             self.helper_active = True
                             self.helperv2(symbol, short_dynamic_amount_helper, long_dynamic_amount_helper)
                         else:
-                            logging.info(f"Skipping test orders for {symbol} as it's not in open symbols list.")
+                            logging.info("Skipping test orders for %s as it's not in open symbols list.", symbol)
                             
                     # # Check if the symbol should terminate
                     # if self.should_terminate_full(symbol, current_time, previous_long_pos_qty, long_pos_qty, previous_short_pos_qty, short_pos_qty):
@@ -1039,10 +1086,14 @@ class LinearGridBaseFutures(BybitStrategy):
                     # self.cancel_stale_orders_bybit(symbol)
                     
                 # Reduced sleep for xgrid high-frequency trading
-                if self.config.linear_grid.get("grid_behavior") == "xgridt":
-                    time.sleep(0.5)
+                laps.lap("post_grid")
+                if event_driven:
+                    pass
+                elif self.config.linear_grid.get("grid_behavior") == "xgridt":
+                    yield 0.5
                 else:
-                    time.sleep(5)
+                    yield 5
+                laps.resume()
 
                 dashboard_path = os.path.join(self.config.shared_data_path, "shared_data.json")
                 
@@ -1075,16 +1126,16 @@ class LinearGridBaseFutures(BybitStrategy):
                             json.dump(data_to_save, f)
                         self.update_shared_data(symbol_data, open_position_data, len(open_symbols))
                     except Exception as e:
-                        logging.info(f"Dashboard saving is not working properly {e}")
+                        logging.info("Dashboard saving is not working properly %s", e)
 
                 if self.config.dashboard_enabled:
                     try:
                         dashboard_path = os.path.join(self.config.shared_data_path, "shared_data.json")
-                        logging.info(f"Dashboard path: {dashboard_path}")
+                        logging.info("Dashboard path: %s", dashboard_path)
 
                         # Ensure the directory exists
                         os.makedirs(os.path.dirname(dashboard_path), exist_ok=True)
-                        logging.info(f"Directory created: {os.path.dirname(dashboard_path)}")
+                        logging.info("Directory created: %s", os.path.dirname(dashboard_path))
 
                         if os.path.exists(dashboard_path):
                             with open(dashboard_path, "r") as file:
@@ -1101,17 +1152,18 @@ class LinearGridBaseFutures(BybitStrategy):
                             logging.info("Data saved to shared_data.json")
 
                     except FileNotFoundError:
-                        logging.info(f"File not found: {dashboard_path}")
+                        logging.info("File not found: %s", dashboard_path)
                         # Handle the absence of the file, e.g., by creating it or using default data
                     except IOError as e:
-                        logging.info(f"I/O error occurred: {e}")
+                        logging.info("I/O error occurred: %s", e)
                         # Handle other I/O errors
                     except Exception as e:
-                        logging.info(f"An unexpected error occurred in saving json: {e}")
+                        logging.info("An unexpected error occurred in saving json: %s", e)
                         
+                laps.finish("dashboard")
                 iteration_end_time = time.time()  # Record the end time of the iteration
                 iteration_duration = iteration_end_time - iteration_start_time
-                logging.info(f"Iteration for symbol {symbol} took {iteration_duration:.2f} seconds")
+                logging.info("Iteration for symbol %s took %.2f seconds", symbol, iteration_duration)
 
                 # # ────────────────────────────────────────────────────────────────
                 # # after we've updated the dashboard for this symbol,
@@ -1122,10 +1174,17 @@ class LinearGridBaseFutures(BybitStrategy):
                 # # ────────────────────────────────────────────────────────────────
 
                 # Reduced sleep for xgrid high-frequency trading
-                if self.config.linear_grid.get("grid_behavior") == "xgridt":
-                    time.sleep(0.3)
+                if event_driven:
+                    trigger.mark_processed(best_bid_price, best_ask_price, in_position=bool(long_pos_qty or short_pos_qty))
+                    reasons = yield trigger
+                    logging.info("[%s] Woken by: %s", symbol, ', '.join(sorted(reasons)))
+                elif self.config.linear_grid.get("grid_behavior") == "xgridt":
+                    yield 0.3
                 else:
-                    time.sleep(3)
+                    yield 3
         except Exception as e:
             traceback_info = traceback.format_exc()  # Get the full traceback
-            logging.info(f"Exception caught in quickscalp strategy '{symbol}': {e}\nTraceback:\n{traceback_info}")
\ No newline at end of file
+            logging.info("Exception caught in quickscalp strategy '%s': %s\nTraceback:\n%s", symbol, e, traceback_info)
+        finally:
+            if trigger is not None:
+                trigger.close()
\ No newline at end of file
@@ -1,6 +1,36 @@
 # logger.py
+"""
+Per-module loggers for the bot.
+
+Records are not written by the thread that logs them. Each logger hands its
+records to one process-wide SimpleQueue, and a single writer thread drains
+it in batches: the lines of a batch that go to the same file are formatted
+there, written with one write() and flushed once. Callers never wait on a
+file handler lock. Messages passed as `log.info("%s ...", value)` are not
+formatted until the writer gets to them (or at all, when the record is
+throttled), so hot paths should log that way rather than with f-strings.
+Arguments that are plain lists, dicts or sets are formatted before the
+record is queued, since the caller may change them afterwards; other
+mutable arguments are the caller's to copy.
+
+Structured records carry symbol/side/stage and extra fields next to the
+message, and the formatter prints them as a prefix and key=value pairs:
+
+    log_event(logging, "grid placed", symbol=symbol, side="long", stage="grid", levels=10)
+
+Repetitive INFO/DEBUG lines can be rate limited or sampled per module and
+call site with set_log_limit(); warnings and errors are never dropped.
+configure_logging(asynchronous=False) switches back to writing from the
+calling thread.
+"""
 import os
+import sys
+import atexit
+import queue
+import time
 import logging
+import threading
+from collections import deque
 import logging.handlers as handlers
 from pathlib import Path
 
@@ -8,6 +38,237 @@ def is_dumb_terminal():
     _term = os.environ.get("TERM", "")
     return _term.lower() in ("", "dumb", "unknown")
 
+
+class StructuredFormatter(logging.Formatter):
+    """Millisecond timestamps, plus the context and fields of structured records."""
+
+    def formatMessage(self, record):
+        context = [value for value in (getattr(record, "symbol", None), getattr(record, "side", None), getattr(record, "stage", None)) if value]
+        if context:
+            record.message = f"[{' '.join(map(str, context))}] {record.message}"
+        message = super().formatMessage(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            message += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            message += f" (+{suppressed} similar suppressed)"
+        return message
+
+
+class BatchRotatingFileHandler(handlers.RotatingFileHandler):
+    """RotatingFileHandler that can write a batch of records at once."""
+
+    def emit_batch(self, records):
+        lines = []
+        for record in records:
+            if record.levelno < self.level:
+                continue
+            try:
+                lines.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        text = "".join(lines)
+        self.acquire()
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.stream.tell() + len(text) >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(text)
+            self.stream.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+class LogThrottle(logging.Filter):
+    """
+    Per call site limit for INFO and below: at most max_per_interval records
+    per interval seconds, and of those only every sample_every-th. The next
+    record let through reports how many were dropped.
+    """
+
+    def __init__(self, max_per_interval=None, interval=60.0, sample_every=1):
+        super().__init__()
+        self.max_per_interval = max_per_interval
+        self.interval = interval
+        self.sample_every = max(1, int(sample_every))
+        self.sites = {}  # (pathname, lineno) -> [window start, passed, seen, suppressed]
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        site = self.sites.get(key)
+        if site is None:
+            site = self.sites[key] = [now, 0, 0, 0]
+        elif now - site[0] >= self.interval:
+            site[0], site[1] = now, 0
+        site[2] += 1
+        if (site[2] - 1) % self.sample_every or (self.max_per_interval is not None and site[1] >= self.max_per_interval):
+            site[3] += 1
+            return False
+        site[1] += 1
+        if site[3]:
+            record.suppressed, site[3] = site[3], 0
+        return True
+
+
+_MUTABLE = (list, dict, set, deque, bytearray)
+
+
+class _QueueHandler(logging.Handler):
+    """Hands records to the writer thread untouched; formatting happens there."""
+
+    def __init__(self, writer, targets):
+        super().__init__()
+        self.writer = writer
+        self.targets = targets
+
+    def handle(self, record):
+        # No handler lock or filters here: SimpleQueue.put is all the caller pays
+        args = record.args
+        if args and any(isinstance(arg, _MUTABLE) for arg in (args if isinstance(args, tuple) else (args,))):
+            # The caller may change these before the writer gets to them
+            record.msg, record.args = record.getMessage(), None
+        self.writer.queue.put((self.targets, record))
+        return True
+
+    def emit(self, record):
+        self.handle(record)
+
+
+class LogWriter:
+    """The thread that drains the shared queue and writes the batches."""
+
+    def __init__(self, max_batch: int = 512):
+        self.max_batch = max_batch
+        self.queue = queue.SimpleQueue()
+        self.batches = 0
+        self.records = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="LogWriter", daemon=True)
+                self._thread.start()
+
+    def _write(self, batch):
+        by_handler = {}
+        for targets, record in batch:
+            for handler in targets:
+                by_handler.setdefault(handler, []).append(record)
+        for handler, records in by_handler.items():
+            # One broken handler must not cost the others their records
+            try:
+                if isinstance(handler, BatchRotatingFileHandler):
+                    handler.emit_batch(records)
+                else:
+                    for record in records:
+                        if record.levelno >= handler.level:
+                            handler.handle(record)
+            except Exception:
+                handler.handleError(records[-1])
+        self.batches += 1
+        self.records += len(batch)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._write(batch)
+            except Exception as e:
+                sys.stderr.write(f"LogWriter failed to write {len(batch)} records: {e!r}\n")
+            if stop:
+                return
+
+    def stop(self, timeout: float = 10.0):
+        """Write out everything queued so far and stop the thread."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self.queue.put(None)
+                self._thread.join(timeout)
+            self._thread = None
+
+
+_writer = LogWriter()
+_asynchronous = True
+_loggers = {}  # name -> (logger, [file and console handlers])
+_loggers_lock = threading.Lock()
+atexit.register(_writer.stop)
+
+
+def _attach(log, targets):
+    for handler in list(log.handlers):
+        log.removeHandler(handler)
+    if _asynchronous:
+        _writer.start()
+        log.addHandler(_QueueHandler(_writer, targets))
+    else:
+        for handler in targets:
+            log.addHandler(handler)
+
+
+def configure_logging(asynchronous=None, limits=None):
+    """
+    Switch every logger between the writer thread and direct writes, and
+    apply limits: {logger name: {"max_per_interval": n, "interval": s,
+    "sample_every": k}} (see set_log_limit).
+    """
+    global _asynchronous
+    with _loggers_lock:
+        if asynchronous is not None and bool(asynchronous) != _asynchronous:
+            _asynchronous = bool(asynchronous)
+            for log, targets in _loggers.values():
+                _attach(log, targets)
+            if not _asynchronous:
+                _writer.stop()
+    for name, limit in (limits or {}).items():
+        set_log_limit(name, **limit)
+
+
+def set_log_limit(logger_name: str, max_per_interval=None, interval: float = 60.0, sample_every: int = 1):
+    """Throttle the INFO/DEBUG lines of one logger per call site; max_per_interval=None and sample_every=1 lifts it."""
+    log = logging.getLogger(logger_name)
+    for existing in [f for f in log.filters if isinstance(f, LogThrottle)]:
+        log.removeFilter(existing)
+    if max_per_interval is not None or sample_every > 1:
+        log.addFilter(LogThrottle(max_per_interval, interval, sample_every))
+
+
+def flush_logs(timeout: float = 10.0):
+    """Block until the records queued so far are written (restarts the writer)."""
+    if _asynchronous:
+        _writer.stop(timeout)
+        _writer.start()
+
+
+def log_event(log, message, level=logging.INFO, symbol=None, side=None, stage=None, **fields):
+    """Log a structured record; nothing is built when the level is disabled."""
+    if log.isEnabledFor(level):
+        log.log(level, message, extra={"symbol": symbol, "side": side, "stage": stage, "fields": fields}, stacklevel=2)
+
+
 def Logger(
     logger_name: str,
     filename: str,
@@ -42,7 +303,7 @@ def Logger(
     #
     # Example line: "2025-03-25 13:50:27.123 - BybitBaseStrategy - INFO - Some message"
     #
-    formatter = logging.Formatter(
+    formatter = StructuredFormatter(
         fmt="%(asctime)s.%(msecs)03d - %(name)s - %(levelname)s - %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
@@ -54,17 +315,17 @@ def Logger(
     file_path.mkdir(exist_ok=True)  # Ensure the logs/ directory exists
     log_file = file_path / filename
 
-    logHandler = handlers.RotatingFileHandler(
+    logHandler = BatchRotatingFileHandler(
         log_file, maxBytes=bytes, backupCount=backups
     )
     logHandler.setFormatter(formatter)
+    targets = [logHandler]
 
     #
     # 3) Set the logger’s file level
     #
     level = logging.getLevelName(level.upper())
     log.setLevel(level)
-    log.addHandler(logHandler)
 
     #
     # 4) Optional console stream
@@ -74,7 +335,14 @@ def Logger(
         consoleHandler.setFormatter(formatter)
         console_level = logging.getLevelName(console_level.upper())
         consoleHandler.setLevel(console_level)
-        log.addHandler(consoleHandler)
+        targets.append(consoleHandler)
+
+    #
+    # 5) Route the handlers through the writer thread
+    #
+    with _loggers_lock:
+        _loggers[logger_name] = (log, targets)
+        _attach(log, targets)
 
     log.propagate = False
     return log
@@ -0,0 +1,186 @@
+import time
+import queue
+import asyncio
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="SymbolTrigger", filename="SymbolTrigger.log", stream=True)
+
+
+class SymbolTrigger:
+    """
+    Wakes a symbol's strategy loop only when something worth acting on happened.
+
+    Triggers:
+      - "price":    best bid or ask moved more than `reissue_threshold` (as a
+                    fraction) away from the prices the last pass acted on
+      - "account":  position/order/execution event for the symbol from the
+                    private account stream
+      - "signal":   `signal_fn()` returned a different value than last time
+                    (checked every `signal_interval` seconds)
+      - "tp":       take-profit refresh timer while a position is open; each
+                    wake is a full REST pass, so it should not be shorter
+                    than the ~8s of sleeps a polling pass takes
+      - "idle":     nothing happened for `max_idle` seconds
+
+    Bursts are coalesced: once the first trigger fires, anything else arriving
+    within `coalesce_window` seconds is folded into the same wake-up.
+    """
+
+    def __init__(self, exchange, symbol, reissue_threshold, tp_interval=10.0, max_idle=30.0,
+                 signal_fn=None, signal_interval=15.0, coalesce_window=0.05, poll_interval=0.05,
+                 price_poll_interval=1.0, should_stop=None):
+        self.exchange = exchange
+        self.symbol = symbol
+        self.reissue_threshold = reissue_threshold
+        self.tp_interval = tp_interval
+        self.max_idle = max_idle
+        self.signal_fn = signal_fn
+        self.signal_interval = signal_interval
+        self.coalesce_window = coalesce_window
+        self.poll_interval = poll_interval
+        self.price_poll_interval = price_poll_interval
+        self.should_stop = should_stop
+
+        self.ref_bid = None
+        self.ref_ask = None
+        self.in_position = False
+        self.last_processed = time.time()
+        self.last_signal = None
+        self.last_signal_check = 0.0
+        self.last_price_poll = 0.0
+        self.last_reasons = set()
+
+        self.account_events = None
+        account_state = getattr(exchange, 'account_state', None)
+        if account_state is not None:
+            self.account_events = account_state.register_listener(symbol)
+
+    def close(self):
+        account_state = getattr(self.exchange, 'account_state', None)
+        if account_state is not None and self.account_events is not None:
+            account_state.unregister_listener(self.account_events)
+            self.account_events = None
+
+    def mark_processed(self, best_bid, best_ask, in_position=False, signal=None):
+        """Record the state the strategy just acted on; later moves are measured from here."""
+        self.ref_bid = best_bid or None
+        self.ref_ask = best_ask or None
+        self.in_position = in_position
+        if signal is not None:
+            self.last_signal = signal
+        self.last_processed = time.time()
+
+    # ── individual checks ────────────────────────────────────────────────
+    def _best_bid_ask(self):
+        hub = getattr(self.exchange, 'market_data', None)
+        if hub is not None:
+            best_bid, best_ask = hub.get_best_bid_ask(self.symbol)
+            if best_bid is not None and best_ask is not None:
+                return best_bid, best_ask
+        # Without a fresh stream, fall back to a throttled REST read
+        now = time.time()
+        if now - self.last_price_poll < self.price_poll_interval:
+            return None, None
+        self.last_price_poll = now
+        try:
+            order_book = self.exchange.get_orderbook(self.symbol)
+            return float(order_book['bids'][0][0]), float(order_book['asks'][0][0])
+        except Exception as e:
+            logging.info(f"[{self.symbol}] Could not read best bid/ask for trigger: {e}")
+            return None, None
+
+    def _price_moved(self):
+        if self.ref_bid is None or self.ref_ask is None:
+            return True
+        best_bid, best_ask = self._best_bid_ask()
+        if best_bid is None or best_ask is None:
+            return False
+        return (abs(best_bid - self.ref_bid) / self.ref_bid > self.reissue_threshold
+                or abs(best_ask - self.ref_ask) / self.ref_ask > self.reissue_threshold)
+
+    def _drain_account_events(self):
+        if self.account_events is None:
+            return False
+        fired = False
+        while True:
+            try:
+                self.account_events.get_nowait()
+                fired = True
+            except queue.Empty:
+                return fired
+
+    def _signal_flipped(self, now):
+        if self.signal_fn is None or now - self.last_signal_check < self.signal_interval:
+            return False
+        self.last_signal_check = now
+        try:
+            signal = self.signal_fn()
+        except Exception as e:
+            logging.info(f"[{self.symbol}] Signal check failed: {e}")
+            return False
+        flipped = self.last_signal is not None and signal != self.last_signal
+        self.last_signal = signal
+        return flipped
+
+    def _collect(self, now):
+        reasons = set()
+        if self._drain_account_events():
+            reasons.add("account")
+        if self._price_moved():
+            reasons.add("price")
+        if self._signal_flipped(now):
+            reasons.add("signal")
+        if self.in_position and now - self.last_processed >= self.tp_interval:
+            reasons.add("tp")
+        if now - self.last_processed >= self.max_idle:
+            reasons.add("idle")
+        return reasons
+
+    # ── main entry ───────────────────────────────────────────────────────
+    def wait(self, should_stop=None):
+        """Block until at least one trigger fires; returns the set of reasons."""
+        should_stop = should_stop or self.should_stop
+        while True:
+            if should_stop is not None and should_stop():
+                return {"stop"}
+            reasons = self._collect(time.time())
+            if reasons:
+                break
+            if self.account_events is not None:
+                try:
+                    self.account_events.get(timeout=self.poll_interval)
+                    reasons = {"account"}
+                    break
+                except queue.Empty:
+                    continue
+            time.sleep(self.poll_interval)
+
+        if self.coalesce_window > 0:
+            time.sleep(self.coalesce_window)
+            reasons |= self._collect(time.time())
+        self.last_reasons = reasons
+        return reasons
+
+    async def wait_async(self, executor=None):
+        """Event-loop version of `wait` for the async runtime; never blocks the loop."""
+        loop = asyncio.get_running_loop()
+
+        # The signal check and the REST bid/ask fallback block, so the checks
+        # run on the executor even when a streamed book is attached
+        async def collect():
+            return await loop.run_in_executor(executor, self._collect, time.time())
+
+        while True:
+            if self.should_stop is not None and self.should_stop():
+                return {"stop"}
+            reasons = await collect()
+            if reasons:
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        if self.coalesce_window > 0:
+            await asyncio.sleep(self.coalesce_window)
+            reasons |= await collect()
+        self.last_reasons = reasons
+        return reasons
@@ -0,0 +1,318 @@
+"""
+Latency spans for the strategy loops and an on-demand sampling profiler.
+
+`span(name, symbol)` (a context manager) and `@traced()` (a decorator) time a
+block or a call and keep the last durations per (name, symbol) in memory;
+`latency_stats()` turns them into p50/p95/p99. The per-symbol loops use an
+`IterationTimer`, which laps the stages of one iteration back to back and
+leaves out the time the loop spends paused between steps.
+
+Timing uses perf_counter bound at import, so a SimulatedClock installed for a
+backtest or replay does not distort the durations. With tracing disabled a
+span is a shared no-op and a traced call costs one flag check.
+
+The profiler samples every thread's stack with sys._current_frames() for a
+while and writes the counts as collapsed stacks ("root;...;leaf count"), the
+input format of flamegraph.pl and speedscope. It only runs when triggered by
+SIGUSR1 or by creating the control file, so it costs nothing otherwise.
+"""
+
+import functools
+import inspect
+import os
+import signal
+import sys
+import threading
+from collections import Counter, defaultdict, deque
+from datetime import datetime
+from time import perf_counter as _perf, sleep as _sleep
+
+from directionalscalper.core.strategies.logger import Logger
+
+logging = Logger(logger_name="Tracing", filename="Tracing.log", stream=True)
+
+enabled = True
+WINDOW = 1024  # durations kept per (name, symbol)
+
+_samples = defaultdict(lambda: deque(maxlen=WINDOW))
+_samples_lock = threading.Lock()
+
+
+def set_tracing(on: bool):
+    global enabled
+    enabled = bool(on)
+
+
+def record(name: str, duration: float, symbol=None):
+    """Add one duration (seconds) for name, per symbol when given."""
+    with _samples_lock:
+        _samples[(name, symbol)].append(duration)
+
+
+def reset_latency_stats():
+    with _samples_lock:
+        _samples.clear()
+
+
+class _Span:
+    __slots__ = ("name", "symbol", "started")
+
+    def __init__(self, name, symbol):
+        self.name = name
+        self.symbol = symbol
+
+    def __enter__(self):
+        self.started = _perf()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, _perf() - self.started, self.symbol)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, symbol=None):
+    """Time a with-block under name (and symbol)."""
+    if not enabled:
+        return _NO_SPAN
+    return _Span(name, symbol)
+
+
+def traced(name=None):
+    """
+    Time every call of the decorated function. The span is named after the
+    function unless name is given, and is kept per symbol when the function
+    takes a `symbol` argument.
+    """
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+        try:
+            parameters = list(inspect.signature(fn).parameters)
+        except (TypeError, ValueError):
+            parameters = []
+        symbol_index = parameters.index("symbol") if "symbol" in parameters else None
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return fn(*args, **kwargs)
+            symbol = None
+            if symbol_index is not None:
+                symbol = args[symbol_index] if len(args) > symbol_index else kwargs.get("symbol")
+            started = _perf()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(span_name, _perf() - started, symbol)
+
+        return wrapper
+
+    return decorator
+
+
+class IterationTimer:
+    """
+    Stage laps of a step-generator loop. Call start() at the top of an
+    iteration, lap(stage) at the end of each stage, resume() when the loop
+    continues after a yield (the pause is not counted) and finish() at the
+    end; finish() records the busy time of the whole iteration as
+    "<prefix>.iteration".
+    """
+
+    def __init__(self, symbol, prefix: str = "loop"):
+        self.symbol = symbol
+        self.prefix = prefix
+        self.mark = None
+        self.busy = 0.0
+
+    def start(self):
+        self.busy = 0.0
+        self.mark = _perf()
+
+    def lap(self, stage: str):
+        if not enabled or self.mark is None:
+            return
+        now = _perf()
+        elapsed = now - self.mark
+        self.busy += elapsed
+        self.mark = now
+        record(f"{self.prefix}.{stage}", elapsed, self.symbol)
+
+    def resume(self):
+        self.mark = _perf()
+
+    def finish(self, stage=None):
+        if stage is not None:
+            self.lap(stage)
+        if enabled and self.mark is not None:
+            record(f"{self.prefix}.iteration", self.busy, self.symbol)
+        self.mark = None
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _summary(durations) -> dict:
+    ordered = sorted(durations)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def latency_stats(by_symbol: bool = True) -> dict:
+    """
+    Percentiles of the recorded spans, {(name, symbol): stats} or, with
+    by_symbol=False, {name: stats} over all symbols.
+    """
+    with _samples_lock:
+        snapshot = {key: list(durations) for key, durations in _samples.items() if durations}
+    if not by_symbol:
+        merged = defaultdict(list)
+        for (name, _), durations in snapshot.items():
+            merged[name].extend(durations)
+        snapshot = merged
+    return {key: _summary(durations) for key, durations in sorted(snapshot.items(), key=lambda item: str(item[0]))}
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all threads every `interval` seconds for `duration`
+    seconds on its own thread and writes them as collapsed stacks to out_dir.
+    """
+
+    def __init__(self, duration: float = 30.0, interval: float = 0.005, out_dir: str = "logs/profiles"):
+        self.duration = duration
+        self.interval = interval
+        self.out_dir = out_dir
+        self.stacks = Counter()
+        self.samples = 0
+        self.path = None
+        self._thread = None
+
+    @staticmethod
+    def _frame_name(code) -> str:
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self, own_ident, names):
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        deadline = _perf() + self.duration
+        names = {}
+        next_names = 0.0
+        while _perf() < deadline:
+            if _perf() >= next_names:
+                names = {thread.ident: thread.name.replace(";", "_").replace(" ", "_") for thread in threading.enumerate()}
+                next_names = _perf() + 1.0
+            self._sample(own_ident, names)
+            _sleep(self.interval)
+        self.path = self.write()
+
+    def write(self) -> str:
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded")
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        logging.info(f"Wrote {self.samples} samples ({len(self.stacks)} distinct stacks) to {path}")
+        return path
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.path
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+_profiler = None
+_profiler_lock = threading.Lock()
+
+
+def start_profile(duration: float = 30.0, out_dir: str = "logs/profiles"):
+    """Start a sampling profile unless one is already running; returns it (or None)."""
+    global _profiler
+    with _profiler_lock:
+        if _profiler is not None and _profiler.running:
+            logging.info("A profile is already being taken")
+            return None
+        logging.info(f"Profiling all threads for {duration:.0f}s")
+        _profiler = SamplingProfiler(duration=duration, out_dir=out_dir).start()
+        return _profiler
+
+
+def _watch_control_file(path, duration, out_dir, poll):
+    while True:
+        _sleep(poll)
+        if not os.path.exists(path):
+            continue
+        seconds = duration
+        try:
+            with open(path) as f:
+                content = f.read().strip()
+            if content:
+                seconds = float(content)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring contents of profile trigger {path}: {e}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        start_profile(seconds, out_dir)
+
+
+def install_profile_trigger(control_path=None, duration: float = 30.0, out_dir: str = "logs/profiles", use_signal: bool = True, poll: float = 1.0):
+    """
+    Take a profile on SIGUSR1 (`kill -USR1 <pid>`, main thread and POSIX
+    only) or whenever control_path appears; the file may hold the number of
+    seconds to profile for and is removed once the profile starts.
+    """
+    if use_signal and hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+        def on_signal(signum, frame):
+            # Leave the handler at once; the main thread may hold the logging lock
+            threading.Thread(target=start_profile, args=(duration, out_dir), daemon=True).start()
+
+        signal.signal(signal.SIGUSR1, on_signal)
+        logging.info(f"Send SIGUSR1 to {os.getpid()} for a {duration:.0f}s profile")
+    if control_path:
+        threading.Thread(
+            target=_watch_control_file,
+            args=(control_path, duration, out_dir, poll),
+            name="ProfileTrigger",
+            daemon=True,
+        ).start()
+        logging.info(f"Create {control_path} for a profile")
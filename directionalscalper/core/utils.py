@@ -4,12 +4,13 @@ import hashlib
 import hmac
 import logging
 import time
-import random
 from collections import OrderedDict
 from urllib.parse import urlencode
 
 import requests  # type: ignore
 
+from directionalscalper.core.http_client import get_http_client
+
 log = logging.getLogger(__name__)
 
 
@@ -60,23 +61,26 @@ def dispatch_request(
     signature: str = "",
     timestamp: int = -1,
 ):
-    session = requests.Session()
-    session.headers.update(
-        {
-            "Content-Type": "application/json;charset=utf-8",
-            "X-MBX-APIKEY": f"{key}",
-            "X-BAPI-API-KEY": f"{key}",
-            "X-BAPI-SIGN": f"{signature}",
-            "X-BAPI-SIGN-TYPE": "2",
-            "X-BAPI-TIMESTAMP": f"{timestamp}",
-            "X-BAPI-RECV-WINDOW": "5000",
-        }
-    )
+    headers = {
+        "Content-Type": "application/json;charset=utf-8",
+        "X-MBX-APIKEY": f"{key}",
+        "X-BAPI-API-KEY": f"{key}",
+        "X-BAPI-SIGN": f"{signature}",
+        "X-BAPI-SIGN-TYPE": "2",
+        "X-BAPI-TIMESTAMP": f"{timestamp}",
+        "X-BAPI-RECV-WINDOW": "5000",
+    }
+    client = get_http_client()
+
+    def send(method):
+        # Signed requests are not retried: a resend would carry a stale timestamp
+        return lambda url, **kwargs: client.request(method, url, headers=headers, max_retries=0, **kwargs)
+
     return {
-        "GET": session.get,
-        "DELETE": session.delete,
-        "PUT": session.put,
-        "POST": session.post,
+        "GET": send("GET"),
+        "DELETE": send("DELETE"),
+        "PUT": send("PUT"),
+        "POST": send("POST"),
     }.get(http_method, "GET")
 
 def send_public_request(
@@ -86,9 +90,14 @@ def send_public_request(
     payload: dict | None = None,
     json_in: dict | None = None,
     json_out: bool = True,
-    max_retries: int = 10000,
-    base_delay: float = 0.5  # base delay for exponential backoff
+    max_retries: int | None = None,
 ):
+    """
+    Public request through the shared keep-alive pool. Connection errors,
+    timeouts, 429 and 5xx are retried with jittered backoff within the
+    client's retry budget (`max_retries` overrides its count).
+    Returns (headers, json or text), or (None, None) when no usable response came back.
+    """
     if url_path is not None:
         url += url_path
     if payload is None:
@@ -97,38 +106,31 @@ def send_public_request(
     if query_string:
         url += "?" + query_string
 
-    attempt = 0
-    while attempt < max_retries:
-        try:
-            response = requests.request(method, url, json=json_in, timeout=30)
-            if not json_out:
-                return response.headers, response.text
-
-            json_response = response.json()
-            if response.status_code != 200:
-                raise HTTPRequestError(url, response.status_code, json_response.get("msg"))
-
-            return response.headers, json_response
-        except requests.exceptions.ConnectionError as e:
-            log.warning(f"Connection error on {url}: {e}")
-        except requests.exceptions.Timeout as e:
-            log.warning(f"Request timed out for {url}: {e}")
-        except requests.exceptions.TooManyRedirects as e:
-            log.warning(f"Too many redirects for {url}: {e}")
-        except requests.exceptions.JSONDecodeError as e:
-            log.warning(f"JSON decode error at {url}: {e}")
-        except requests.exceptions.RequestException as e:
-            log.warning(f"Request exception at {url}: {e}")
-        except HTTPRequestError as e:
-            log.warning(str(e))
-
-        attempt += 1
-        # Adding increased jitter
-        sleep_time = base_delay * (2 ** min(attempt, 10)) + random.uniform(0, 1)  # Increased jitter up to 1 second
-        time.sleep(min(sleep_time, 60))  # Still capping the maximum delay to prevent extreme wait times
-
-
-    log.error(f"All retries failed for {url} after {max_retries} attempts")
+    try:
+        response = get_http_client().request(method, url, json=json_in, max_retries=max_retries)
+        if not json_out:
+            return response.headers, response.text
+
+        json_response = response.json()
+        if response.status_code != 200:
+            msg = json_response.get("msg") if isinstance(json_response, dict) else None
+            raise HTTPRequestError(url, response.status_code, msg)
+
+        return response.headers, json_response
+    except requests.exceptions.ConnectionError as e:
+        log.warning(f"Connection error on {url}: {e}")
+    except requests.exceptions.Timeout as e:
+        log.warning(f"Request timed out for {url}: {e}")
+    except requests.exceptions.TooManyRedirects as e:
+        log.warning(f"Too many redirects for {url}: {e}")
+    except requests.exceptions.JSONDecodeError as e:
+        log.warning(f"JSON decode error at {url}: {e}")
+    except requests.exceptions.RequestException as e:
+        log.warning(f"Request exception at {url}: {e}")
+    except HTTPRequestError as e:
+        log.warning(str(e))
+
+    log.error(f"Request to {url} failed")
     return None, None  # Indicating that no data could be retrieved after retries
 
 # def send_public_request(
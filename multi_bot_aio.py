@@ -25,6 +25,11 @@ from config import load_config, Config, VERSION
 from api.manager import Manager
 
 from directionalscalper.core.exchanges import *
+from directionalscalper.core.exchanges.market_data import get_market_data_hub
+from directionalscalper.core.async_runtime import AsyncStrategyRuntime, FutureWait, run_steps_blocking
+from directionalscalper.core.http_client import configure_http_client
+from directionalscalper.core.exchanges.session_capture import start_session_recording
+from directionalscalper.core.tracing import install_profile_trigger, latency_stats, set_tracing
 
 import directionalscalper.core.strategies.bybit.gridbased as gridbased
 import directionalscalper.core.strategies.bybit.hedging as bybit_hedging
@@ -33,15 +38,12 @@ from directionalscalper.core.strategies.huobi import *
 
 from live_table_manager import LiveTableManager, shared_symbols_data
 
-from directionalscalper.core.strategies.logger import Logger
+from directionalscalper.core.strategies.logger import Logger, configure_logging
 
-from rate_limit import RateLimit
+from rate_limit import rate_limit_stats
 
 from collections import deque
 
-general_rate_limiter = RateLimit(50, 1)  # Reduced from 100 to 50 req/sec
-order_rate_limiter = RateLimit(10, 1)   # Reduced from 20 to 10 req/sec 
-
 thread_management_lock = threading.Lock()
 thread_to_symbol = {}
 thread_to_symbol_lock = threading.Lock()
@@ -244,6 +246,23 @@ class DirectionalMarketMaker:
         else:
             self.exchange = exchange_class(api_key, secret_key, passphrase)
 
+        if exchange_name.lower() == 'bybit':
+            self.exchange.configure_instrument_cache(config.bot.instrument_refresh_interval, config.bot.instrument_cache_path)
+
+        if exchange_name.lower() == 'bybit' and config.bot.market_data_stream:
+            self.exchange.attach_market_data(get_market_data_hub(max_age=config.bot.market_data_max_age))
+            logging.info("Serving order books and prices from the Bybit public stream")
+
+        if exchange_name.lower() == 'bybit' and config.bot.account_stream:
+            self.exchange.start_account_stream()
+            logging.info("Serving positions, orders and balances from the Bybit private stream")
+
+        # Run every symbol/side as a task on one event loop instead of one thread each
+        self.strategy_runtime = None
+        if config.bot.async_runtime:
+            self.strategy_runtime = AsyncStrategyRuntime(max_concurrency=config.bot.async_max_concurrency)
+            logging.info(f"Async strategy runtime started with max concurrency {config.bot.async_max_concurrency}")
+
     def run_strategy(self,
                     symbol,
                     strategy_name,
@@ -272,15 +291,8 @@ class DirectionalMarketMaker:
             except Exception as e:
                 logging.error(f"Error in printing info: {e}")
 
-        strategy_classes = {
-            'qstrendobdynamictp':    gridbased.BybitQuickScalpTrendDynamicTP,
-            'qsgridob':              gridbased.LinearGridBaseFutures,
-            'qsgridob_nosignal':     gridbased.LinearGridBaseFutures,  # ← added no-signal mode
-        }
-
-        strategy_class = strategy_classes.get(strategy_name.lower())
-        if strategy_class:
-            strategy = strategy_class(self.exchange, self.manager, config.bot, symbols_allowed)
+        strategy = self.create_strategy(strategy_name, config, symbols_allowed)
+        if strategy:
             try:
                 logging.info(f"Running strategy for symbol {symbol} with action {action}")
                 if action == "long":
@@ -327,6 +339,55 @@ class DirectionalMarketMaker:
 
 
 
+    def create_strategy(self, strategy_name, config, symbols_allowed):
+        strategy_classes = {
+            'qstrendobdynamictp':    gridbased.BybitQuickScalpTrendDynamicTP,
+            'qsgridob':              gridbased.LinearGridBaseFutures,
+            'qsgridob_nosignal':     gridbased.LinearGridBaseFutures,  # ← added no-signal mode
+        }
+
+        strategy_class = strategy_classes.get(strategy_name.lower())
+        if strategy_class:
+            return strategy_class(self.exchange, self.manager, config.bot, symbols_allowed)
+        return None
+
+    def strategy_steps(self,
+                    symbol,
+                    strategy_name,
+                    config,
+                    account_name,
+                    rotator_symbols_standardized=None,
+                    mfirsi_signal=None,
+                    action=None):
+        """Step-generator counterpart of run_strategy, used by the async runtime."""
+        symbols_allowed = next(
+            (exch.symbols_allowed
+            for exch in config.exchanges
+            if exch.name == self.exchange_name and exch.account_name == account_name),
+            None
+        )
+
+        strategy = self.create_strategy(strategy_name, config, symbols_allowed)
+        if not strategy:
+            raise ValueError(f"Strategy {strategy_name} not found.")
+
+        if action not in ("long", "short"):
+            return
+
+        logging.info(f"Running strategy for symbol {symbol} with action {action}")
+        if hasattr(strategy, 'run_steps'):
+            yield from strategy.run_steps(symbol, rotator_symbols_standardized=rotator_symbols_standardized, mfirsi_signal=mfirsi_signal, action=action)
+        else:
+            # Strategies without a step form block for their whole run, so they get their own
+            # thread, as in run_strategy, instead of holding a runtime worker
+            future = Future()
+            Thread(
+                target=self.run_with_future,
+                args=(strategy, symbol, rotator_symbols_standardized, mfirsi_signal, action, future),
+                name=f"{symbol}-{action}",
+            ).start()
+            yield FutureWait(future)
+
     def run_with_future(self, strategy, symbol, rotator_symbols_standardized, mfirsi_signal, action, future):
         try:
             strategy.run(symbol, rotator_symbols_standardized=rotator_symbols_standardized, mfirsi_signal=mfirsi_signal, action=action)
@@ -358,8 +419,7 @@ class DirectionalMarketMaker:
         return self.exchange.create_order(symbol, order_type, side, amount, price)
 
     def get_symbols(self):
-        with general_rate_limiter:
-            return self.exchange._get_symbols()
+        return self.exchange._get_symbols()
 
     def format_symbol_bybit(self, symbol):
         return f"{symbol[:3]}/{symbol[3:]}:USDT"
@@ -393,8 +453,7 @@ class DirectionalMarketMaker:
         return True
 
     def fetch_open_orders(self, symbol):
-        with general_rate_limiter:
-            return self.exchange.retry_api_call(self.exchange.get_open_orders, symbol)
+        return self.exchange.retry_api_call(self.exchange.get_open_orders, symbol)
 
     def get_signal(self, symbol):
         if self.entry_signal_type == 'mfirsi_signal':
@@ -421,18 +480,15 @@ class DirectionalMarketMaker:
 
 
     def generate_l_signals(self, symbol):
-        with general_rate_limiter:
-            return self.exchange.generate_l_signals(symbol)
+        return self.exchange.generate_l_signals(symbol)
 
     def get_mfirsi_signal(self, symbol):
         # Retrieve the MFI/RSI signal
-        with general_rate_limiter:
-            return self.exchange.get_mfirsi_ema_secondary_ema(symbol, limit=100, lookback=1, ema_period=5, secondary_ema_period=3)
+        return self.exchange.get_mfirsi_ema_secondary_ema(symbol, limit=100, lookback=1, ema_period=5, secondary_ema_period=3)
 
     def generate_xgridt_signal(self, symbol):
         # Retrieve the XGrid Signal
-        with general_rate_limiter:
-            return self.exchange.generate_xgridt_signal(symbol)
+        return self.exchange.generate_xgridt_signal(symbol)
 
 
 BALANCE_REFRESH_INTERVAL = 600  # in seconds
@@ -440,8 +496,12 @@ BALANCE_REFRESH_INTERVAL = 600  # in seconds
 orders_canceled = False
 
 def run_bot(symbol, args, market_maker, manager, account_name, symbols_allowed, rotator_symbols_standardized, thread_completed, mfirsi_signal, action):
+    run_steps_blocking(run_bot_steps(symbol, args, market_maker, manager, account_name, symbols_allowed, rotator_symbols_standardized, thread_completed, mfirsi_signal, action))
+
+def run_bot_steps(symbol, args, market_maker, manager, account_name, symbols_allowed, rotator_symbols_standardized, thread_completed, mfirsi_signal, action):
     global orders_canceled, unique_active_symbols, active_long_symbols, active_short_symbols
-    current_thread = threading.current_thread()
+    # Keyed by a per-run token rather than the OS thread, since async tasks hop between workers
+    current_thread = object()
     try:
         if not args.config.startswith('configs/'):
             config_file_path = Path('configs/' + args.config)
@@ -465,8 +525,7 @@ def run_bot(symbol, args, market_maker, manager, account_name, symbols_allowed,
         market_maker.manager = manager
 
         def fetch_open_positions():
-            with general_rate_limiter:
-                return getattr(manager.exchange, f"get_all_open_positions_{args.exchange.lower()}")()
+            return getattr(manager.exchange, f"get_all_open_positions_{args.exchange.lower()}")()
 
         open_position_data = fetch_open_positions()
         open_position_symbols = {standardize_symbol(pos['symbol']) for pos in open_position_data}
@@ -503,12 +562,16 @@ def run_bot(symbol, args, market_maker, manager, account_name, symbols_allowed,
         logging.info(f"Rotator symbols in run_bot: {rotator_symbols_standardized}")
         logging.info(f"Latest rotator symbols in run bot: {latest_rotator_symbols}")
 
-        time.sleep(0.1)
+        yield 0.1
 
-        with general_rate_limiter:
-            signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
-            future = market_maker.run_strategy(symbol, args.strategy, config, account_name, symbols_to_trade=symbols_allowed, rotator_symbols_standardized=latest_rotator_symbols, mfirsi_signal=signal, action=action)
-            future.result()  # Wait for the strategy to complete
+        signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
+
+        try:
+            print_cool_trading_info(symbol, market_maker.exchange_name, args.strategy, account_name)
+        except Exception as e:
+            logging.error(f"Error in printing info: {e}")
+
+        yield from market_maker.strategy_steps(symbol, args.strategy, config, account_name, rotator_symbols_standardized=latest_rotator_symbols, mfirsi_signal=signal, action=action)
 
     except Exception as e:
         logging.info(f"An error occurred in run_bot for symbol {symbol}: {e}")
@@ -553,8 +616,7 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
     logging.info(f"Target coins mode is {'enabled' if target_coins_mode else 'disabled'}")
 
     def fetch_open_positions():
-        with general_rate_limiter:
-            return getattr(manager.exchange, f"get_all_open_positions_{args.exchange.lower()}")()
+        return getattr(manager.exchange, f"get_all_open_positions_{args.exchange.lower()}")()
 
     open_position_data = fetch_open_positions()
     current_long_positions = sum(1 for pos in open_position_data if pos['side'].lower() == 'long')
@@ -578,10 +640,17 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
                 logging.debug(traceback.format_exc())
 
     processed_symbols = set()
+    last_rate_limit_log = 0
 
     while True:
         try:
             current_time = time.time()
+            if current_time - last_rate_limit_log >= 60:
+                for group, stats in rate_limit_stats().items():
+                    logging.info(f"Rate limiter [{group}]: {stats['requests']} requests, {stats['waited_requests']} waited, avg wait {stats['avg_wait']:.3f}s, max wait {stats['max_wait']:.3f}s, 10006 backoffs {stats['penalties']}")
+                for name, stats in latency_stats(by_symbol=False).items():
+                    logging.info(f"Latency [{name}]: {stats['count']} samples, p50 {stats['p50_ms']}ms, p95 {stats['p95_ms']}ms, p99 {stats['p99_ms']}ms, max {stats['max_ms']}ms")
+                last_rate_limit_log = current_time
             open_position_data = fetch_open_positions()
             open_position_symbols = {standardize_symbol(pos['symbol']) for pos in open_position_data}
             logging.info(f"Open position symbols: {open_position_symbols}")
@@ -613,8 +682,7 @@ def bybit_auto_rotation(args, market_maker, manager, symbols_allowed):
                     logging.info(f"GS Auto Check: Current short positions: {current_short_positions}, Unique active symbols: {len(unique_active_symbols)}. Graceful stop short: {graceful_stop_short}")
 
             if not latest_rotator_symbols or current_time - last_rotator_update_time >= 60:
-                with general_rate_limiter:
-                    latest_rotator_symbols = fetch_updated_symbols(args, manager, whitelist)
+                latest_rotator_symbols = fetch_updated_symbols(args, manager, whitelist)
                 last_rotator_update_time = current_time
                 processed_symbols.clear()
                 logging.info(f"Refreshed latest rotator symbols: {latest_rotator_symbols}")
@@ -778,8 +846,7 @@ def bybit_auto_rotation_spot(args, market_maker, manager, symbols_allowed):
     logging.info(f"Short mode: {short_mode}")
 
     def fetch_open_positions():
-        with general_rate_limiter:
-            return getattr(manager.exchange, f"get_all_open_positions_{args.exchange.lower()}")()
+        return getattr(manager.exchange, f"get_all_open_positions_{args.exchange.lower()}")()
 
     def process_futures(futures):
         for future in as_completed(futures):
@@ -797,8 +864,7 @@ def bybit_auto_rotation_spot(args, market_maker, manager, symbols_allowed):
             logging.info(f"Open position symbols: {open_position_symbols}")
 
             if not latest_rotator_symbols or current_time - last_rotator_update_time >= 60:
-                with general_rate_limiter:
-                    latest_rotator_symbols = fetch_updated_symbols(args, manager)
+                latest_rotator_symbols = fetch_updated_symbols(args, manager)
                 last_rotator_update_time = current_time
                 logging.info(f"Refreshed latest rotator symbols: {latest_rotator_symbols}")
             else:
@@ -811,8 +877,7 @@ def bybit_auto_rotation_spot(args, market_maker, manager, symbols_allowed):
             with thread_management_lock:
                 open_position_futures = []
                 for symbol in open_position_symbols:
-                    with general_rate_limiter:
-                        signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
+                    signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
                     has_open_long = any(pos['side'].lower() == 'long' for pos in open_position_data if standardize_symbol(pos['symbol']) == symbol)
                     open_position_futures.append(trading_executor.submit(start_thread_for_open_symbol_spot, symbol, args, manager, signal, has_open_long, long_mode, short_mode))
                     logging.info(f"Submitted thread for symbol {symbol}. Signal: {signal}. Has open long: {has_open_long}.")
@@ -849,8 +914,7 @@ def bybit_auto_rotation_spot(args, market_maker, manager, symbols_allowed):
 def process_signal_for_open_position(symbol, args, market_maker, manager, symbols_allowed, open_position_data, long_mode, short_mode, graceful_stop_long, graceful_stop_short):
     market_maker.manager = manager
 
-    with general_rate_limiter:
-        signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
+    signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
     logging.info(f"Processing signal for open position symbol {symbol}. Signal: {signal}")
 
     action_taken = handle_signal(symbol, args, manager, signal, open_position_data, symbols_allowed, True, long_mode, short_mode, graceful_stop_long, graceful_stop_short)
@@ -1089,8 +1153,7 @@ def handle_signal_spot(symbol, args, manager, signal, open_position_data, symbol
 
 def process_signal_for_open_position_spot(symbol, args, market_maker, manager, symbols_allowed, open_position_data, long_mode, short_mode):
     market_maker.manager = manager
-    with general_rate_limiter:
-        signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
+    signal = market_maker.get_signal(symbol)  # Use the appropriate signal based on the entry_signal_type
     logging.info(f"Processing signal for open position symbol {symbol}. Signal: {signal}")
 
     action_taken = handle_signal_spot(symbol, args, manager, signal, open_position_data, symbols_allowed, True, long_mode, short_mode)
@@ -1327,7 +1390,11 @@ def start_thread_for_symbol(symbol, args, manager, mfirsi_signal, action, has_op
 
     # Initialize thread and event
     thread_completed = threading.Event()
-    thread = threading.Thread(target=run_bot, args=(symbol, args, market_maker, manager, args.account_name, symbols_allowed, latest_rotator_symbols, thread_completed, mfirsi_signal, action))
+    bot_args = (symbol, args, market_maker, manager, args.account_name, symbols_allowed, latest_rotator_symbols, thread_completed, mfirsi_signal, action)
+    if market_maker.strategy_runtime is not None:
+        thread = market_maker.strategy_runtime.create_task(f"{symbol}-{action}", run_bot_steps(*bot_args))
+    else:
+        thread = threading.Thread(target=run_bot, args=bot_args)
 
     # Add thread to the appropriate dictionary
     if action == "long":
@@ -1482,6 +1549,16 @@ if __name__ == '__main__':
         logging.error(f"There is probably an issue with your path try using --config configs/config.json")
         sys.exit(1)
 
+    configure_http_client(pool_maxsize=config.bot.http_pool_size, max_retries=config.bot.http_max_retries)
+
+    if config.bot.exchange_record_path:
+        start_session_recording(config.bot.exchange_record_path)
+        logging.info(f"Recording exchange traffic to {config.bot.exchange_record_path}")
+
+    configure_logging(asynchronous=config.bot.log_async, limits=config.bot.log_limits)
+    set_tracing(config.bot.latency_tracing)
+    install_profile_trigger(config.bot.profile_trigger_path, duration=config.bot.profile_duration)
+
     exchange_name = args.exchange
     try:
         market_maker = DirectionalMarketMaker(config, exchange_name, args.account_name)
@@ -1,26 +1,194 @@
 import time
+import asyncio
 import threading
 from pathlib import Path
 from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-class RateLimit:
-    def __init__(self, calls, period):
-        self.calls = calls
-        self.period = period
+import ccxt
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every caller of one endpoint group.
+
+    Callers reserve tokens under the lock and then sleep *outside* it, so a
+    throttled caller never blocks anyone else's bookkeeping. Reservations are
+    handed out in lock order, which makes waiting FIFO-fair. The bucket may go
+    into debt; each caller waits until its own reservation is paid off.
+    """
+
+    def __init__(self, rate, capacity=None, name="bucket"):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.name = name
         self.lock = threading.Lock()
-        self.call_times = deque()
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
 
-    def __enter__(self):
+        # Metrics
+        self.requests = 0
+        self.weight = 0.0
+        self.waited_requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.penalties = 0
+
+    def _reserve(self, weight):
         with self.lock:
-            now = time.time()
-            while self.call_times and now - self.call_times[0] > self.period:
-                self.call_times.popleft()
-            if len(self.call_times) >= self.calls:
-                time_to_wait = self.period - (now - self.call_times[0])
-                if time_to_wait > 0:
-                    time.sleep(time_to_wait)
-            self.call_times.append(now)
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= weight
+            wait = max(0.0, -self.tokens / self.rate, self.blocked_until - now)
+            self.requests += 1
+            self.weight += weight
+            if wait > 0:
+                self.waited_requests += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+            return wait
+
+    def acquire(self, weight=1):
+        """Block the calling thread until `weight` tokens are available; returns the wait."""
+        wait = self._reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, weight=1):
+        wait = self._reserve(weight)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, seconds=1.0):
+        """Hold everyone back for `seconds`, e.g. after the exchange answered 10006."""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.penalties += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "rate": self.rate,
+                "requests": self.requests,
+                "weight": self.weight,
+                "waited_requests": self.waited_requests,
+                "avg_wait": self.total_wait / self.requests if self.requests else 0.0,
+                "max_wait": self.max_wait,
+                "penalties": self.penalties,
+            }
+
+    def __enter__(self):
+        self.acquire()
 
     def __exit__(self, exc_type, exc_value, traceback):
         pass
+
+    async def __aenter__(self):
+        await self.acquire_async()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class RateLimit(TokenBucket):
+    """`calls` per `period` seconds; kept for callers that build their own limiter."""
+
+    def __init__(self, calls, period):
+        super().__init__(calls / period, capacity=calls, name=f"{calls}/{period}s")
+        self.calls = calls
+        self.period = period
+
+
+# Requests per second per endpoint group, sized under Bybit v5's per-UID
+# limits (orders 10/s per category, position/account queries 50/s) and the
+# public IP limit (600 per 5s).
+RATE_LIMIT_GROUPS = {
+    "public": 100,
+    "order_create": 10,
+    "order_amend": 10,
+    "order_cancel": 10,
+    "order_query": 50,
+    "position": 50,
+    "account": 50,
+    "general": 50,
+}
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(group="general"):
+    """Process-wide bucket for an endpoint group, created on first use."""
+    with _buckets_lock:
+        bucket = _buckets.get(group)
+        if bucket is None:
+            bucket = _buckets[group] = TokenBucket(RATE_LIMIT_GROUPS.get(group, RATE_LIMIT_GROUPS["general"]), name=group)
+        return bucket
+
+
+def configure_rate_limits(limits):
+    """Override per-group requests/second (e.g. from config) before first use."""
+    with _buckets_lock:
+        for group, rate in limits.items():
+            RATE_LIMIT_GROUPS[group] = rate
+            if group in _buckets:
+                _buckets[group].rate = float(rate)
+                _buckets[group].capacity = float(rate)
+
+
+def rate_limit_stats():
+    with _buckets_lock:
+        buckets = dict(_buckets)
+    return {group: bucket.stats() for group, bucket in buckets.items()}
+
+
+def bybit_endpoint_group(path, api="public", params=None):
+    """Map a Bybit v5 REST path to (group, weight). Batch endpoints weigh one per order."""
+    if api == "public" or (isinstance(api, (list, tuple)) and "public" in api) or path.startswith("v5/market/"):
+        return "public", 1
+    weight = 1
+    if path.endswith("-batch") and params and isinstance(params.get("request"), list):
+        weight = max(1, len(params["request"]))
+    if path.startswith("v5/order/create"):
+        return "order_create", weight
+    if path.startswith("v5/order/amend"):
+        return "order_amend", weight
+    if path.startswith("v5/order/cancel"):
+        return "order_cancel", weight
+    if path.startswith("v5/order/") or path.startswith("v5/execution/"):
+        return "order_query", weight
+    if path.startswith("v5/position/"):
+        return "position", weight
+    if path.startswith("v5/account/") or path.startswith("v5/asset/"):
+        return "account", weight
+    return "general", weight
+
+
+def install_rate_limits(ccxt_exchange, classify=bybit_endpoint_group):
+    """
+    Route every REST request of a ccxt instance through the shared buckets.
+    ccxt's own per-instance throttle is switched off since it would sleep a
+    second time and knows nothing about the other instances.
+    """
+    if getattr(ccxt_exchange, "_shared_rate_limits", False):
+        return ccxt_exchange
+    original_fetch2 = ccxt_exchange.fetch2
+
+    def fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+        group, weight = classify(path, api, params)
+        bucket = get_rate_limiter(group)
+        bucket.acquire(weight)
+        try:
+            return original_fetch2(path, api, method, params, headers, body, config)
+        except ccxt.RateLimitExceeded:
+            bucket.penalize()
+            raise
+
+    ccxt_exchange.fetch2 = fetch2
+    ccxt_exchange.enableRateLimit = False
+    ccxt_exchange._shared_rate_limits = True
+    return ccxt_exchange
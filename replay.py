@@ -0,0 +1,86 @@
+"""
+Re-run a recorded bot session offline.
+
+    python replay.py --session data/session.jsonl --config configs/config.json --account_name account_1 --strategy qsgridob
+
+Record the session first by setting `exchange_record_path` in the bot
+section of the config. Every REST call the bot makes is then answered from
+the capture (see directionalscalper/core/exchanges/session_capture.py) on
+a simulated clock that follows the recorded response times, so rotation,
+position and grid reissue logic see the same answers at the same moments
+as they did live. The websocket streams are switched off for the replay;
+the scraper data is read as config.api says, so point it at a saved file
+for an exact rerun.
+"""
+
+import argparse
+import threading
+from pathlib import Path
+
+import multi_bot_aio
+from api.manager import Manager
+from config import load_config
+from directionalscalper.core.backtest.clock import SimulatedClock
+from directionalscalper.core.exchanges.session_capture import ReplayExhausted, start_session_replay
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DirectionalScalper session replay')
+    parser.add_argument('--session', type=str, required=True, help='Capture written through exchange_record_path')
+    parser.add_argument('--config', type=str, default='configs/config.json', help='Path to the configuration file')
+    parser.add_argument('--account_name', type=str, required=True, help='The name of the account that was recorded')
+    parser.add_argument('--exchange', type=str, default='bybit', help='The name of the exchange that was recorded')
+    parser.add_argument('--strategy', type=str, required=True, help='The name of the strategy that was running')
+    parser.add_argument('--symbol', type=str, help='The trading symbol to use')
+    parser.add_argument('--amount', type=str, help='The size to use')
+    args = parser.parse_args()
+
+    config = load_config(Path(args.config), Path('configs/account.json'))
+    config.bot = config.bot.model_copy(update={
+        "market_data_stream": False,
+        "account_stream": False,
+        "exchange_record_path": None,
+    })
+
+    replay = start_session_replay(args.session)
+    clock = SimulatedClock(replay.start)
+    replay.clock = clock
+    print(f"Replaying {replay.recorded} responses recorded between {replay.start:.0f} and {replay.end:.0f}")
+
+    prefixes = ("directionalscalper.", "rate_limit", "live_table_manager", "multi_bot_aio", "api.")
+    with clock.installed(prefixes):
+        try:
+            market_maker = multi_bot_aio.DirectionalMarketMaker(config, args.exchange, args.account_name)
+            manager = Manager(
+                market_maker.exchange,
+                exchange_name=args.exchange,
+                data_source_exchange=config.api.data_source_exchange,
+                api=config.api.mode,
+                path=Path("data", config.api.filename),
+                url=f"{config.api.url}{config.api.filename}"
+            )
+            symbols_allowed = next(
+                (exch.symbols_allowed for exch in config.exchanges
+                 if exch.name == args.exchange and exch.account_name == args.account_name),
+                10,
+            )
+            while True:
+                multi_bot_aio.bybit_auto_rotation(args, market_maker, manager, symbols_allowed)
+        except ReplayExhausted as e:
+            print(f"Replay finished: {e}")
+        finally:
+            # Strategy threads stop at their next call; keep the clock installed until they have
+            for thread in threading.enumerate():
+                if thread is threading.current_thread() or thread.daemon or thread.name.startswith("ThreadPoolExecutor"):
+                    continue
+                thread.join(timeout=60)
+
+    print(f"Served {replay.served} of {replay.recorded} responses, {replay.remaining} left unused")
+    if replay.diverged:
+        print("Calls whose parameters differed from the recording:")
+        for path, count in replay.diverged.most_common():
+            print(f"  {path}: {count}")
+
+
+if __name__ == '__main__':
+    main()
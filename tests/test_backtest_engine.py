@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import Bot
+from directionalscalper.core.backtest import BacktestEngine
+from directionalscalper.core.backtest.data import MarketFeed
+
+START = 1_700_000_000_000
+
+
+def bars(n, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 2.0 * np.exp(np.cumsum(rng.normal(0, 0.0015, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        "timestamp": START + np.arange(n) * 60_000,
+        "open": open_,
+        "high": np.maximum(open_, close) * (1 + rng.uniform(0, 0.001, n)),
+        "low": np.minimum(open_, close) * (1 - rng.uniform(0, 0.001, n)),
+        "close": close,
+        "volume": rng.uniform(50, 150, n),
+    })
+
+
+def test_price_at_matches_interpolated_path():
+    feed = MarketFeed(bars(50))
+    rng = np.random.default_rng(0)
+    for t in np.r_[rng.uniform(feed.start - 30, feed.end + 30, 2000), feed.start + np.arange(0, 3000, 20)]:
+        times, prices = feed.path(feed.bar_index(t))
+        assert feed.price_at(t) == float(np.interp(t, times, prices))
+
+
+def test_first_touch_finds_the_crossing_on_the_path():
+    feed = MarketFeed(bars(10))
+    times, prices = feed.path(3)
+    low = min(prices)
+    level = (prices[0] + low) / 2
+    when = feed.first_touch(times[0], times[-1], low=level)
+    assert times[0] < when <= times[-1]
+    assert feed.price_at(when) == pytest.approx(level)
+    assert feed.first_touch(times[0], times[-1], low=low - 1.0, high=max(prices) + 1.0) is None
+    assert feed.first_touch(times[0], times[-1], high=prices[0]) == times[0]
+
+
+def test_run_rejects_data_shorter_than_the_warmup():
+    with open(Path(__file__).parents[1] / "configs" / "config_example.json") as f:
+        bot = Bot(**json.load(f)["bot"])
+    engine = BacktestEngine(bot, "DOGEUSDT", bars(120), tick_size=0.0001, qty_step=1, min_qty=1)
+    with pytest.raises(ValueError, match="warmup"):
+        engine.run()
@@ -0,0 +1,93 @@
+from directionalscalper.core.exchanges.candle_store import CandleStore
+
+MINUTE = 60_000
+START = 1_700_000_000_000
+
+
+def bar(i, closed_price=None):
+    price = 100.0 + i if closed_price is None else closed_price
+    return [START + i * MINUTE, price, price + 1, price - 1, price, 10.0 + i]
+
+
+class FakeExchange:
+    """Serves bars 0..now-1 over fetch_ohlcv; `now` is the index of the forming minute."""
+
+    id = "bybit"
+    options = {"defaultType": "swap"}
+
+    def __init__(self, now):
+        self.now = now
+        self.calls = []
+
+    def milliseconds(self):
+        return START + self.now * MINUTE + 1
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None, params=None):
+        self.calls.append((since, limit))
+        until = (params or {}).get("until", self.milliseconds())
+        bars = [bar(i) for i in range(self.now + 1) if since <= START + i * MINUTE <= until]
+        return bars[:limit]
+
+
+def kline(i, confirm=True):
+    row = bar(i)
+    return {"start": row[0], "open": row[1], "high": row[2], "low": row[3], "close": row[4], "volume": row[5], "confirm": confirm}
+
+
+def timestamps(series):
+    return [row[0] for row in series.ohlcv()]
+
+
+def test_stream_bar_past_a_hole_is_held_until_rest_fills_it():
+    exchange = FakeExchange(now=100)
+    store = CandleStore(exchange, capacity=500, refresh_interval=0.0)
+    series = store.get("BTCUSDT", "1m", limit=100)
+    assert series.last_closed_ts == START + 99 * MINUTE
+    assert series.forming[0] == START + 100 * MINUTE
+
+    # Bar 100 closes and 101-104 are lost on the stream; 105 arrives
+    exchange.now = 106
+    store.handle_kline("BTCUSDT", "1", [kline(105)])
+    assert series.gap
+    assert series.last_closed_ts == START + 99 * MINUTE  # not committed past the hole
+
+    store.get("BTCUSDT", "1m", limit=100)
+    assert not series.gap
+    assert not series.pending
+    ts = timestamps(series)
+    assert ts == sorted(ts)
+    assert all(b - a == MINUTE for a, b in zip(ts, ts[1:]))
+    assert START + 101 * MINUTE in ts and START + 105 * MINUTE in ts
+    # Catch-up asked from the last contiguous bar (the one held as forming), not from the held one
+    assert exchange.calls[-1][0] == START + 100 * MINUTE
+
+
+def test_contiguous_stream_bars_are_committed_at_once():
+    exchange = FakeExchange(now=50)
+    store = CandleStore(exchange, capacity=500, refresh_interval=0.0)
+    series = store.get("BTCUSDT", "1m", limit=40)
+    store.handle_kline("BTCUSDT", "1", [kline(50), kline(51, confirm=False)])
+    assert not series.gap
+    assert series.last_closed_ts == START + 50 * MINUTE
+    assert series.forming[0] == START + 51 * MINUTE
+
+
+def test_held_bars_are_applied_in_order_once_the_hole_closes():
+    exchange = FakeExchange(now=50)
+    store = CandleStore(exchange, capacity=500, refresh_interval=0.0)
+    series = store.get("BTCUSDT", "1m", limit=40)
+    store.handle_kline("BTCUSDT", "1", [kline(52), kline(53, confirm=False)])
+    assert series.gap and len(series.pending) == 2
+    store.handle_kline("BTCUSDT", "1", [kline(50), kline(51)])
+    assert not series.gap
+    assert series.last_closed_ts == START + 52 * MINUTE
+    assert series.forming[0] == START + 53 * MINUTE
+
+
+def test_larger_limit_grows_the_series():
+    exchange = FakeExchange(now=3000)
+    store = CandleStore(exchange, capacity=100, refresh_interval=0.0)
+    assert len(store.ohlcv("BTCUSDT", "1m", limit=100)) == 100
+    rows = store.ohlcv("BTCUSDT", "1m", limit=2000)
+    assert len(rows) == 2000
+    assert rows[-1][0] == START + 3000 * MINUTE
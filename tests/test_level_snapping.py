@@ -0,0 +1,210 @@
+import numpy as np
+import pytest
+
+from directionalscalper.core import level_snapping
+from directionalscalper.core.level_snapping import snap_levels
+from directionalscalper.core.strategies.bybit.bybit_strategy import BybitStrategy
+
+
+# The per-level scans the grid builders used before snap_levels, copied as they were
+
+def old_adjust_grid_levels(grid_levels, significant_levels, tolerance,
+                           min_outer_price_distance_long, min_outer_price_distance_short,
+                           max_outer_price_distance_long, max_outer_price_distance_short,
+                           current_price, levels):
+    def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
+        for sig_level in significant_levels:
+            if abs(level - sig_level) / level < tolerance:
+                if level <= current_price:
+                    lower_bound = current_price * (1 - max_distance)
+                    upper_bound = current_price * (1 - min_distance)
+                else:
+                    lower_bound = current_price * (1 + min_distance)
+                    upper_bound = current_price * (1 + max_distance)
+                if lower_bound <= sig_level <= upper_bound:
+                    if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
+                        return sig_level
+        return level
+
+    adjusted_grid_levels = []
+    for level in grid_levels:
+        previous_level = adjusted_grid_levels[-1] if adjusted_grid_levels else None
+        if level <= current_price:
+            adjusted_level = find_nearest_significant_level(
+                level, significant_levels, tolerance, min_outer_price_distance_long, max_outer_price_distance_long,
+                current_price, previous_level)
+        else:
+            adjusted_level = find_nearest_significant_level(
+                level, significant_levels, tolerance, min_outer_price_distance_short, max_outer_price_distance_short,
+                current_price, previous_level)
+        adjusted_grid_levels.append(adjusted_level)
+    return adjusted_grid_levels
+
+
+def old_gridspan_plain(grid_levels, significant_levels, buffer_distance, min_outer_price_distance, current_price):
+    """The gridspan builders without spacing: both sides against the long range, buffer as min distance."""
+    def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price):
+        for sig_level in significant_levels:
+            if abs(level - sig_level) / level < tolerance:
+                if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
+                    return sig_level
+        return level
+
+    return [
+        find_nearest_significant_level(level, significant_levels, 0.01, buffer_distance / current_price,
+                                       min_outer_price_distance, current_price)
+        for level in grid_levels
+    ]
+
+
+def old_gridspan_spaced(grid_levels, significant_levels, min_outer_price_distance, max_outer_price_distance,
+                        current_price, levels, keep):
+    """The orderbook/gridspan builders with spacing and the append filter."""
+    def find_nearest_significant_level(level, significant_levels, tolerance, min_distance, max_distance, current_price, previous_level=None):
+        for sig_level in significant_levels:
+            if abs(level - sig_level) / level < tolerance:
+                if current_price - max_distance * current_price <= sig_level <= current_price - min_distance * current_price:
+                    if previous_level is None or abs(sig_level - previous_level) > (max_distance * current_price / levels):
+                        return sig_level
+        return level
+
+    adjusted = []
+    for level in grid_levels:
+        previous_level = adjusted[-1] if adjusted else None
+        adjusted_level = find_nearest_significant_level(
+            level, significant_levels, 0.01, min_outer_price_distance, max_outer_price_distance, current_price, previous_level)
+        if keep[0] <= adjusted_level <= keep[1]:
+            adjusted.append(adjusted_level)
+    return adjusted
+
+
+def significant_levels(rng, current_price, distance, empty=False):
+    """Ascending high-volume bin prices, as calculate_volume_thresholds_and_significant_levels returns them."""
+    price_range = np.arange(current_price - distance * current_price, current_price + distance * current_price,
+                            (2 * distance * current_price) / 100)
+    histogram = rng.exponential(1, len(price_range)) * (rng.random(len(price_range)) < 0.5)
+    _, levels = BybitStrategy.calculate_volume_thresholds_and_significant_levels(None, histogram, price_range)
+    return levels[:0] if empty else levels
+
+
+def scenario(rng, trial, levels=None):
+    current_price = float(rng.choice([0.01, 1.0, 64000.0])) * (1 + rng.normal(0, 0.01))
+    levels = levels or int(rng.integers(2, 15))
+    distance_long, distance_short = (float(x) for x in rng.uniform(0.005, 0.08, 2))
+    step_long, step_short = (float(x) for x in rng.uniform(0.0005, 0.01, 2))
+    grid_long = [current_price * (1 - step_long * i) for i in range(1, levels + 1)]
+    grid_short = [current_price * (1 + step_short * i) for i in range(1, levels + 1)]
+    if trial % 13 == 0:
+        grid_long.append(current_price)  # a level exactly at the price
+    return {
+        "current_price": current_price, "levels": levels,
+        "distance_long": distance_long, "distance_short": distance_short,
+        "min_long": float(rng.uniform(0.0, 0.01)), "min_short": float(rng.uniform(0.0, 0.01)),
+        "buffer_long": current_price * step_long, "buffer_short": current_price * step_short,
+        "tolerance": float(rng.choice([0.001, 0.005, 0.01, 0.03])),
+        "grid_long": grid_long, "grid_short": grid_short,
+        "significant_long": significant_levels(rng, current_price, distance_long, empty=trial % 10 == 0),
+        "significant_short": significant_levels(rng, current_price, distance_short),
+    }
+
+
+def adjust_with_snap(s, grid, significant, dedupe):
+    """adjust_grid_levels' mapping onto snap_levels, with dedupe switchable."""
+    current_price = s["current_price"]
+    long_side = np.asarray(grid, dtype=float) <= current_price
+    min_distance = np.where(long_side, s["min_long"], s["min_short"])
+    max_distance = np.where(long_side, s["distance_long"], s["distance_short"])
+    return snap_levels(
+        grid, significant, s["tolerance"],
+        np.where(long_side, current_price * (1 - max_distance), current_price * (1 + min_distance)),
+        np.where(long_side, current_price * (1 - min_distance), current_price * (1 + max_distance)),
+        spacing=max_distance * current_price / s["levels"], dedupe=dedupe,
+    )
+
+
+def old_adjust(s, grid, significant):
+    return old_adjust_grid_levels(grid, significant, s["tolerance"], s["min_long"], s["min_short"],
+                                  s["distance_long"], s["distance_short"], s["current_price"], s["levels"])
+
+
+def has_duplicates(levels):
+    return len(set(map(float, levels))) != len(levels)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_adjust_grid_levels_without_dedupe_matches_the_scan(seed):
+    rng = np.random.default_rng(seed)
+    for trial in range(300):
+        s = scenario(rng, trial)
+        for grid, significant in ((s["grid_long"], s["significant_long"]), (s["grid_short"], s["significant_short"]),
+                                  (s["grid_long"] + s["grid_short"], s["significant_long"])):
+            assert adjust_with_snap(s, grid, significant, dedupe=False) == old_adjust(s, grid, significant)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_adjust_grid_levels_only_differs_where_the_scan_doubled_up(seed):
+    rng = np.random.default_rng(seed)
+    for trial in range(300):
+        s = scenario(rng, trial)
+        for grid, significant in ((s["grid_long"], s["significant_long"]), (s["grid_short"], s["significant_short"])):
+            old = old_adjust(s, grid, significant)
+            new = BybitStrategy.adjust_grid_levels(
+                None, grid, significant, s["tolerance"], s["min_long"], s["min_short"],
+                s["distance_long"], s["distance_short"], s["current_price"], s["levels"])
+            assert new == adjust_with_snap(s, grid, significant, dedupe=True)
+            assert not has_duplicates([level for level in new if level not in grid])
+            if new != old:
+                assert has_duplicates(old)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_gridspan_variants_without_dedupe_match_the_scan(seed):
+    rng = np.random.default_rng(seed)
+    for trial in range(300):
+        s = scenario(rng, trial)
+        current_price, levels = s["current_price"], s["levels"]
+        max_distance, min_distance = s["distance_long"], s["min_long"]
+        snap_range = (current_price - max_distance * current_price, current_price - min_distance * current_price)
+        for grid, significant, buffer_distance, keep in (
+            (s["grid_long"], s["significant_long"], s["buffer_long"],
+             (current_price - max_distance * current_price, current_price - s["buffer_long"])),
+            (s["grid_short"], s["significant_short"], s["buffer_short"],
+             (current_price + s["buffer_short"], current_price + max_distance * current_price)),
+        ):
+            # Spaced variants (orderbook/gridspan builders with the append filter)
+            assert snap_levels(grid, significant, 0.01, *snap_range, spacing=max_distance * current_price / levels,
+                               keep=keep, dedupe=False) == \
+                old_gridspan_spaced(grid, significant, min_distance, max_distance, current_price, levels, keep)
+            # Plain variants (dynamic outer distance, buffer as the min distance)
+            assert snap_levels(grid, significant, 0.01, current_price - max_distance * current_price,
+                               current_price - buffer_distance / current_price * current_price, dedupe=False) == \
+                old_gridspan_plain(grid, significant, buffer_distance, max_distance, current_price)
+
+
+def test_dedupe_moves_the_second_level_off_a_shared_significant_level():
+    # Both grid levels are within 1% of 99.5 only; the scan put two orders there
+    grid = [99.8, 99.2]
+    significant = np.array([95.0, 99.5])
+    assert snap_levels(grid, significant, 0.01, 90.0, 100.0, dedupe=False) == [99.5, 99.5]
+    assert snap_levels(grid, significant, 0.01, 90.0, 100.0) == [99.5, 99.2]
+    # With a second candidate in reach, the later level takes that one instead
+    significant = np.array([99.0, 99.5])
+    assert snap_levels([99.3, 99.4], significant, 0.01, 90.0, 100.0, dedupe=False) == [99.0, 99.0]
+    assert snap_levels([99.3, 99.4], significant, 0.01, 90.0, 100.0) == [99.0, 99.5]
+
+
+@pytest.mark.parametrize("levels", [level_snapping.VECTOR_CHECK_MIN - 1, level_snapping.VECTOR_CHECK_MIN,
+                                    level_snapping.VECTOR_CHECK_MIN + 1])
+def test_both_window_checks_match_the_scan_around_the_threshold(levels, monkeypatch):
+    rng = np.random.default_rng(levels)
+    for trial in range(60):
+        s = scenario(rng, trial, levels=levels)
+        grid = s["grid_long"] + s["grid_short"]
+        # Fine significant levels, so the searchsorted guesses land on window edges often
+        significant = np.sort(s["current_price"] * (1 + rng.uniform(-0.1, 0.1, 400)))
+        expected = old_adjust(s, grid, significant)
+        assert adjust_with_snap(s, grid, significant, dedupe=False) == expected
+        for forced in (0, 10 ** 6):  # every grid through the array check, then none
+            monkeypatch.setattr(level_snapping, "VECTOR_CHECK_MIN", forced)
+            assert adjust_with_snap(s, grid, significant, dedupe=False) == expected
+        monkeypatch.undo()
@@ -0,0 +1,73 @@
+from directionalscalper.core.exchanges.market_data import MarketDataHub, ReplayFeed
+
+TOPIC = "orderbook.50.BTCUSDT"
+
+
+def snapshot(u, seq, bids, asks, ts=1):
+    return {"topic": TOPIC, "type": "snapshot", "ts": ts, "data": {"s": "BTCUSDT", "b": bids, "a": asks, "u": u, "seq": seq}}
+
+
+def delta(u, seq, bids=(), asks=(), ts=1):
+    return {"topic": TOPIC, "type": "delta", "ts": ts,
+            "data": {"s": "BTCUSDT", "b": [list(row) for row in bids], "a": [list(row) for row in asks], "u": u, "seq": seq}}
+
+
+def replay(frames):
+    hub = MarketDataHub(max_age=60)
+    feed = ReplayFeed(hub, frames)
+    hub.attach_feed(feed)
+    assert feed.run() == len(frames)
+    return hub, feed
+
+
+def test_snapshot_then_deltas_in_sequence():
+    hub, feed = replay([
+        snapshot(100, 5000, [["100.0", "1"], ["99.9", "2"]], [["100.1", "3"], ["100.2", "4"]]),
+        delta(101, 5001, bids=[("100.0", "0"), ("99.95", "5")]),
+        delta(102, 5003, asks=[("100.1", "1.5")]),
+    ])
+    book = hub.get_orderbook("BTC/USDT:USDT")
+    assert book["bids"] == [[99.95, 5.0], [99.9, 2.0]]
+    assert book["asks"] == [[100.1, 1.5], [100.2, 4.0]]
+    assert hub.books["BTCUSDT"].update_id == 102
+    assert feed.resyncs == []
+
+
+def test_stale_frames_are_dropped():
+    hub, feed = replay([
+        snapshot(100, 5000, [["100.0", "1"]], [["100.1", "3"]]),
+        delta(101, 5001, bids=[("100.0", "2")]),
+        delta(101, 5001, bids=[("100.0", "7")]),  # repeated
+        delta(90, 4990, bids=[("100.0", "9")]),   # from before the snapshot
+    ])
+    assert hub.get_orderbook("BTCUSDT")["bids"] == [[100.0, 2.0]]
+    assert feed.resyncs == []
+
+
+def test_gap_drops_the_book_until_a_fresh_snapshot():
+    frames = [
+        snapshot(100, 5000, [["100.0", "1"]], [["100.1", "3"]]),
+        delta(101, 5001, bids=[("99.9", "2")]),
+        delta(103, 5004, bids=[("99.8", "4")]),  # 102 was lost
+        delta(104, 5005, bids=[("99.7", "1")]),
+    ]
+    hub, feed = replay(frames)
+    # The book is unknown, so reads fall back to REST, and one resubscribe was asked for
+    assert hub.get_orderbook("BTCUSDT") is None
+    assert hub.get_best_bid_ask("BTCUSDT") == (None, None)
+    assert feed.resyncs == ["BTCUSDT"]
+
+    ReplayFeed(hub, [
+        snapshot(200, 5100, [["101.0", "1"]], [["101.1", "2"]]),
+        delta(201, 5101, asks=[("101.2", "3")]),
+    ]).run()
+    book = hub.get_orderbook("BTCUSDT")
+    assert book["bids"] == [[101.0, 1.0]]
+    assert book["asks"] == [[101.1, 2.0], [101.2, 3.0]]
+    assert "BTCUSDT" not in hub.resyncing
+
+
+def test_delta_before_any_snapshot_is_a_gap():
+    hub, feed = replay([delta(7, 70, bids=[("100.0", "1")])])
+    assert hub.get_orderbook("BTCUSDT") is None
+    assert feed.resyncs == ["BTCUSDT"]
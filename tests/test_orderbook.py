@@ -0,0 +1,132 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from directionalscalper.core.orderbook import BookArrays, side_arrays, volume_histogram
+from directionalscalper.core.strategies.bybit.bybit_strategy import BybitStrategy
+
+
+def loop_histograms(order_book, current_price, max_outer_price_distance_long, max_outer_price_distance_short):
+    """calculate_price_range_and_volume_histograms as it was, with the per-level loops."""
+    try:
+        current_price = float(current_price)
+        min_price_long = current_price - max_outer_price_distance_long * current_price
+        max_price_long = current_price + max_outer_price_distance_long * current_price
+        min_price_short = current_price - max_outer_price_distance_short * current_price
+        max_price_short = current_price + max_outer_price_distance_short * current_price
+
+        price_range_long = np.arange(min_price_long, max_price_long, (max_price_long - min_price_long) / 100)
+        price_range_short = np.arange(min_price_short, max_price_short, (max_price_short - min_price_short) / 100)
+
+        volume_histogram_long = np.zeros_like(price_range_long)
+        volume_histogram_short = np.zeros_like(price_range_short)
+
+        for order in order_book['bids']:
+            price, volume = float(order[0]), float(order[1])
+            if min_price_long <= price <= current_price:
+                index = int((price - min_price_long) / (max_price_long - min_price_long) * 100)
+                volume_histogram_long[index] += volume
+
+        for order in order_book['asks']:
+            price, volume = float(order[0]), float(order[1])
+            if current_price <= price <= max_price_short:
+                index = int((price - min_price_short) / (max_price_short - min_price_short) * 100)
+                volume_histogram_short[index] += volume
+
+        return min_price_long, max_price_long, price_range_long, volume_histogram_long, min_price_short, max_price_short, price_range_short, volume_histogram_short
+    except Exception:
+        return None
+
+
+def histograms(order_book, current_price, distance_long, distance_short):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return BybitStrategy.calculate_price_range_and_volume_histograms(
+            None, order_book, current_price, distance_long, distance_short
+        )
+
+
+def assert_same(expected, actual):
+    if expected is None or actual is None:
+        assert expected is actual
+        return
+    assert len(expected) == len(actual)
+    for x, y in zip(expected, actual):
+        if isinstance(x, np.ndarray):
+            assert x.shape == y.shape
+            assert np.array_equal(x, y)
+        else:
+            assert x == y
+
+
+def random_book(rng, price, n, distance_long, distance_short, boundary=False):
+    spread = rng.uniform(0, 0.15, size=(2, n))
+    bids = [[price * (1 - s), float(rng.exponential(10))] for s in spread[0]]
+    asks = [[price * (1 + s), float(rng.exponential(10))] for s in spread[1]]
+    if boundary and n:
+        # Levels exactly at the current price and at the outer edges of the ranges
+        bids[0][0] = asks[0][0] = price
+        bids[-1][0] = price - distance_long * price
+        asks[-1][0] = price + distance_short * price
+    return {"bids": bids, "asks": asks}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_the_loop_on_random_books(seed):
+    rng = np.random.default_rng(seed)
+    for trial in range(200):
+        price = float(rng.choice([1e-4, 0.05, 1.0, 37.3, 64000.0])) * (1 + rng.normal(0, 0.01))
+        distance_long, distance_short = (float(x) for x in rng.uniform(0.001, 0.1, 2))
+        book = random_book(rng, price, int(rng.integers(0, 250)), distance_long, distance_short, boundary=trial % 3 == 0)
+        assert_same(loop_histograms(book, price, distance_long, distance_short),
+                    histograms(book, price, distance_long, distance_short))
+
+
+def test_boundary_levels_land_in_the_same_bins():
+    price, distance = 64000.0, 0.03
+    book = {
+        "bids": [[price, 1.0], [price - distance * price, 2.0], [price * (1 - distance / 2), 3.0]],
+        "asks": [[price, 4.0], [price + distance * price, 5.0], [price * (1 + distance / 2), 6.0]],
+    }
+    expected = loop_histograms(book, price, distance, distance)
+    assert_same(expected, histograms(book, price, distance, distance))
+
+
+def test_string_prices_and_rows_with_an_order_count():
+    rng = np.random.default_rng(7)
+    book = random_book(rng, 1.2345, 120, 0.02, 0.04, boundary=True)
+    book["bids"] = [[str(p), str(v)] for p, v in book["bids"]]
+    book["asks"] = [[p, v, 3] for p, v in book["asks"]]
+    assert_same(loop_histograms(book, "1.2345", 0.02, 0.04), histograms(book, "1.2345", 0.02, 0.04))
+
+
+@pytest.mark.parametrize("bids, asks", [([], []), ([[0.99, 1.0]], []), ([], [[1.01, 1.0]])])
+def test_empty_sides(bids, asks):
+    book = {"bids": bids, "asks": asks}
+    expected = loop_histograms(book, 1.0, 0.05, 0.05)
+    assert expected is not None
+    assert_same(expected, histograms(book, 1.0, 0.05, 0.05))
+
+
+@pytest.mark.parametrize("distance_long, distance_short", [(0.0, 0.05), (0.05, 0.0), (0.0, 0.0)])
+def test_zero_distances_fail_like_the_loop(distance_long, distance_short):
+    book = random_book(np.random.default_rng(3), 100.0, 50, 0.05, 0.05)
+    assert loop_histograms(book, 100.0, distance_long, distance_short) is None
+    assert histograms(book, 100.0, distance_long, distance_short) is None
+
+
+def test_side_arrays_flatten_and_fall_back():
+    prices, sizes = side_arrays([[1.0, 2.0], ["3", "4"]])
+    assert prices.tolist() == [1.0, 3.0] and sizes.tolist() == [2.0, 4.0]
+    prices, sizes = side_arrays([[1.0, 2.0, 7], [3.0, 4.0, 1]])
+    assert prices.tolist() == [1.0, 3.0] and sizes.tolist() == [2.0, 4.0]
+    assert len(side_arrays([])[0]) == 0 and len(side_arrays(None)[1]) == 0
+    with pytest.raises(TypeError):
+        side_arrays([[1.0, None]])
+
+
+def test_volume_histogram_raises_past_the_last_bin():
+    book = BookArrays.from_order_book({"bids": [[110.0, 1.0]], "asks": []})
+    with pytest.raises(IndexError):
+        volume_histogram(book.bid_prices, book.bid_sizes, 90.0, 120.0, 90.0, 110.0, 100)
@@ -0,0 +1,162 @@
+import sys
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from directionalscalper.core.exchanges.exchange import Exchange
+from directionalscalper.core.pivots import ZigZag, ZigZagEngine, bar_arrays, zigzag
+
+
+def loop_zigzag(ohlcv, length=4):
+    """Exchange.calculate_zigzag as it was, with the per-bar window scans."""
+    highs = [candle[2] for candle in ohlcv]
+    lows = [candle[3] for candle in ohlcv]
+
+    def highest_high(index):
+        return max(highs[max(0, index-length):index+length+1])
+
+    def lowest_low(index):
+        return min(lows[max(0, index-length):index+length+1])
+
+    direction_up = False
+    last_low = max(highs) * 100
+    last_high = 0.0
+    peaks_and_troughs = []
+
+    for i in range(length, len(ohlcv) - length):
+        h = highest_high(i)
+        l = lowest_low(i)
+
+        is_min = l == lows[i]
+        is_max = h == highs[i]
+
+        if direction_up:
+            if is_min and lows[i] < last_low:
+                last_low = lows[i]
+                peaks_and_troughs.append(last_low)
+            if is_max and highs[i] > last_low:
+                last_high = highs[i]
+                direction_up = False
+                peaks_and_troughs.append(last_high)
+        else:
+            if is_max and highs[i] > last_high:
+                last_high = highs[i]
+                peaks_and_troughs.append(last_high)
+            if is_min and lows[i] < last_high:
+                last_low = lows[i]
+                direction_up = True
+                peaks_and_troughs.append(last_low)
+
+    return peaks_and_troughs
+
+
+def random_bars(rng, n, ties=False):
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    high = close * (1 + rng.random(n) * 0.002)
+    low = close * (1 - rng.random(n) * 0.002)
+    if ties:
+        # Coarse prices, so several bars in a window share the extreme
+        high, low = np.round(high, 1), np.round(low, 1)
+    return [[1_700_000_000_000 + i * 60_000, float(close[i]), float(high[i]), float(low[i]), float(close[i]), 1.0]
+            for i in range(n)]
+
+
+def exchange():
+    """Just what calculate_zigzag reads from an Exchange."""
+    return SimpleNamespace(zigzags=ZigZagEngine())
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_whole_windows_match_the_loop(seed):
+    rng = np.random.default_rng(seed)
+    for trial in range(250):
+        length = int(rng.integers(0, 7))
+        ohlcv = random_bars(rng, int(rng.integers(1, 300)), ties=trial % 2 == 1)
+        expected = loop_zigzag(ohlcv, length)
+        assert zigzag(*bar_arrays(ohlcv), length) == expected
+        assert Exchange.calculate_zigzag(exchange(), ohlcv, length) == expected
+        assert Exchange.calculate_zigzag(exchange(), ohlcv, length, symbol="BTCUSDT") == expected
+        incremental = ZigZag(length)
+        for bar in ohlcv:
+            incremental.update(bar[2], bar[3])
+        assert incremental.pivots == expected
+
+
+@pytest.mark.parametrize("length", [0, 1, 4, 6])
+def test_growing_window_with_a_forming_bar(length):
+    rng = np.random.default_rng(length)
+    for ties in (False, True):
+        ohlcv = random_bars(rng, 200, ties)
+        ex = exchange()
+        m = 1
+        while m <= len(ohlcv):
+            window = [list(bar) for bar in ohlcv[:m]]
+            # The newest bar keeps changing before it closes
+            for _ in range(3):
+                window[-1][2] *= 1 + rng.random() * 0.003
+                window[-1][3] *= 1 - rng.random() * 0.003
+                expected = loop_zigzag(window, length)
+                assert Exchange.calculate_zigzag(ex, window, length, symbol="BTCUSDT") == expected
+                assert Exchange.calculate_zigzag(ex, window, length) == expected
+            m += int(rng.integers(1, 5))
+
+
+@pytest.mark.parametrize("length", [0, 2, 4])
+def test_sliding_window_with_a_forming_bar(length):
+    rng = np.random.default_rng(10 + length)
+    for ties in (False, True):
+        ohlcv = random_bars(rng, 200, ties)
+        ex = exchange()
+        for start in range(0, 120, 3):
+            window = [list(bar) for bar in ohlcv[start:start + 60]]
+            window[-1][2] *= 1 + rng.random() * 0.003
+            window[-1][3] *= 1 - rng.random() * 0.003
+            expected = loop_zigzag(window, length)
+            assert Exchange.calculate_zigzag(ex, window, length, symbol="BTCUSDT") == expected
+            assert Exchange.calculate_zigzag(ex, window, length) == expected
+            # Alternating with another symbol's windows leaves this one's state alone
+            assert Exchange.calculate_zigzag(ex, ohlcv[:start + 30], length, symbol="ETHUSDT") == \
+                loop_zigzag(ohlcv[:start + 30], length)
+
+
+def test_shorter_window_is_rebuilt():
+    rng = np.random.default_rng(99)
+    ohlcv = random_bars(rng, 150)
+    ex = exchange()
+    for m in (120, 80, 130, 10, 150):
+        assert Exchange.calculate_zigzag(ex, ohlcv[:m], 4, symbol="X") == loop_zigzag(ohlcv[:m], 4)
+
+
+def test_threads_sharing_a_symbol():
+    # The long and short threads of a symbol step the same cached ZigZag
+    rng = np.random.default_rng(7)
+    ohlcv = random_bars(rng, 2000, ties=True)
+    mismatches = []
+
+    def step(engine, start, seed):
+        steps = np.random.default_rng(seed)
+        start.wait()
+        m = 20
+        while m <= len(ohlcv):
+            window = ohlcv[:m]
+            if engine.zigzag("BTCUSDT", window, 2) != zigzag(*bar_arrays(window), 2):
+                mismatches.append(m)
+            m += int(steps.integers(1, 40))
+
+    # Switch threads often enough that the catch-ups interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for trial in range(5):
+            engine = ZigZagEngine()
+            start = threading.Barrier(4)
+            threads = [threading.Thread(target=step, args=(engine, start, 10 * trial + i)) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert mismatches == []
@@ -0,0 +1,147 @@
+import sys
+import threading
+import warnings
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from ta.trend import EMAIndicator
+
+from directionalscalper.core.exchanges.exchange import Exchange
+from directionalscalper.core.regime import FilterState, RegimeFilter, advance
+
+
+def pandas_regime_filter(series, high, low, threshold):
+    """Exchange.regime_filter as it was, with float zeros (pandas 3 no longer upcasts int Series)."""
+    def klmf(series, high, low):
+        value1 = pd.Series(0.0, index=series.index)
+        value2 = pd.Series(0.0, index=series.index)
+        klmf = pd.Series(0.0, index=series.index)
+        for i in range(1, len(series)):
+            value1[i] = 0.2 * (series[i] - series[i - 1]) + 0.8 * value1[i - 1]
+            value2[i] = 0.1 * (high[i] - low[i]) + 0.8 * value2[i - 1]
+        omega = abs(value1 / value2)
+        alpha = (-omega ** 2 + np.sqrt(omega ** 4 + 16 * omega ** 2)) / 8
+        for i in range(1, len(series)):
+            klmf[i] = alpha[i] * series[i] + (1 - alpha[i]) * klmf[i - 1]
+        return klmf
+
+    klmf_values = klmf(series, high, low)
+    abs_curve_slope = abs(klmf_values.diff())
+    exponential_average_abs_curve_slope = EMAIndicator(abs_curve_slope, window=200).ema_indicator()
+    normalized_slope_decline = (abs_curve_slope - exponential_average_abs_curve_slope) / exponential_average_abs_curve_slope
+    return normalized_slope_decline >= threshold, klmf_values, abs_curve_slope, exponential_average_abs_curve_slope
+
+
+def random_bars(rng, n, gaps=False):
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    high = close * (1 + rng.random(n) * 0.002)
+    low = close * (1 - rng.random(n) * 0.002)
+    if gaps:
+        # Bars with no range, some of them without a close
+        flat = rng.integers(0, n, n // 5)
+        high[flat] = low[flat]
+        close[flat[:len(flat) // 3]] = np.nan
+    return pd.Series(close), pd.Series(high), pd.Series(low)
+
+
+def exchange():
+    """Just what regime_filter reads from an Exchange."""
+    return SimpleNamespace(regime_filters=RegimeFilter())
+
+
+def reference(close, high, low, threshold):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return pandas_regime_filter(close, high, low, threshold)
+
+
+def assert_same_regime(expected, actual):
+    assert actual.index.equals(expected.index)
+    assert actual.tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_pandas_on_whole_windows(seed):
+    rng = np.random.default_rng(seed)
+    for trial in range(25):
+        close, high, low = random_bars(rng, int(rng.integers(1, 500)), gaps=trial % 2 == 1)
+        threshold = float(rng.choice([-0.1, 0.0, 0.5]))
+        expected, klmf, slope, ema = reference(close, high, low, threshold)
+        # The intermediates are the same floats, not just close to them
+        new_klmf, new_slope, new_ema = advance(FilterState(), close.values, high.values, low.values)
+        assert np.array_equal(new_klmf, klmf.values, equal_nan=True)
+        assert np.array_equal(new_slope, slope.values, equal_nan=True)
+        assert np.array_equal(new_ema, ema.values, equal_nan=True)
+        assert_same_regime(expected, Exchange.regime_filter(exchange(), close, high, low, True, threshold))
+        assert_same_regime(expected, Exchange.regime_filter(exchange(), close, high, low, True, threshold,
+                                                            symbol="BTCUSDT"))
+
+
+def test_zero_ranges_from_the_first_bar():
+    # value2 stays 0 until the first bar with a range, so omega is inf or NaN before it
+    close = pd.Series([100.0, 100.0, 100.5, 100.2, 100.2, 101.0] * 50)
+    high = close.copy()
+    low = close.copy()
+    high[40:] += 0.3
+    for threshold in (-0.1, 0.0):
+        expected = reference(close, high, low, threshold)[0]
+        assert_same_regime(expected, Exchange.regime_filter(exchange(), close, high, low, True, threshold))
+        assert_same_regime(expected, Exchange.regime_filter(exchange(), close, high, low, True, threshold,
+                                                            symbol="BTCUSDT"))
+
+
+@pytest.mark.parametrize("gaps", [False, True])
+def test_per_symbol_state_over_growing_and_sliding_windows(gaps):
+    rng = np.random.default_rng(7 + gaps)
+    close, high, low = random_bars(rng, 420, gaps)
+    ex = exchange()
+    windows = [(0, m) for m in range(1, 300, 23)] + [(start, start + 300) for start in range(0, 120, 17)]
+    for start, stop in windows:
+        # The newest bar moves between calls while it forms
+        for _ in range(2):
+            c = close[start:stop].reset_index(drop=True)
+            c.iloc[-1] *= 1 + rng.normal(0, 0.001)
+            h, l = high[start:stop].reset_index(drop=True), low[start:stop].reset_index(drop=True)
+            expected = reference(c, h, l, 0.0)[0]
+            assert_same_regime(expected, Exchange.regime_filter(ex, c, h, l, True, 0.0, symbol="BTCUSDT"))
+            assert_same_regime(expected, Exchange.regime_filter(ex, c, h, l, True, 0.0))
+
+
+def test_disabled_filter_passes_every_bar():
+    close, high, low = random_bars(np.random.default_rng(0), 10)
+    assert Exchange.regime_filter(exchange(), close, high, low, False, 0.0).tolist() == [True] * 10
+
+
+def test_threads_sharing_a_symbol():
+    # The long and short threads of a symbol step the same cached state
+    close, high, low = (series.to_numpy() for series in random_bars(np.random.default_rng(3), 1500))
+    mismatches = []
+
+    def step(regime_filter, start, seed):
+        steps = np.random.default_rng(seed)
+        start.wait()
+        m = 2
+        while m <= len(close):
+            slope, ema = regime_filter.slope("BTCUSDT", close[:m], high[:m], low[:m])
+            fresh_slope, fresh_ema = RegimeFilter().slope("BTCUSDT", close[:m], high[:m], low[:m])
+            if not (np.array_equal(slope, fresh_slope, equal_nan=True) and np.array_equal(ema, fresh_ema, equal_nan=True)):
+                mismatches.append(m)
+            m += int(steps.integers(1, 30))
+
+    # Switch threads often enough that the updates interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for trial in range(3):
+            regime_filter = RegimeFilter()
+            start = threading.Barrier(2)
+            threads = [threading.Thread(target=step, args=(regime_filter, start, 10 * trial + i)) for i in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert mismatches == []
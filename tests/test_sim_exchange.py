@@ -0,0 +1,170 @@
+import ccxt
+import pandas as pd
+import pytest
+
+from directionalscalper.core.backtest import MarketFeed, SimulatedClock, SimulatedExchange, linear_market
+
+START = 1_700_000_000_000
+SYMBOL = "BTCUSDT"
+MAKER, TAKER = 0.0002, 0.00055
+
+# Best bid 100.0 / ask 100.1 on the flat price path; 2 displayed at 99.5 and 3 at 100.5
+BOOK = {"timestamp": START, "bids": [[100.0, 5.0], [99.5, 2.0]], "asks": [[100.1, 5.0], [100.5, 3.0]]}
+
+
+def make_sim(trades=(), balance=10_000.0):
+    """A flat market at 100 with one recorded book and the given (seconds after start, price, amount) trades."""
+    n = 30
+    ohlcv = pd.DataFrame({
+        "timestamp": START + pd.RangeIndex(n) * 60_000,
+        "open": [100.0] * n, "high": [100.0] * n, "low": [100.0] * n, "close": [100.0] * n, "volume": [10.0] * n,
+    })
+    trades = pd.DataFrame(
+        [(START + int(seconds * 1000), price, amount) for seconds, price, amount in trades],
+        columns=["timestamp", "price", "amount"],
+    )
+    feed = MarketFeed(ohlcv, order_books=[BOOK], trades=trades, tick_size=0.1)
+    clock = SimulatedClock(feed.start)
+    sim = SimulatedExchange({SYMBOL: feed}, {SYMBOL: linear_market(SYMBOL, 0.1, 0.001, 0.001)}, clock,
+                            balance=balance, maker_fee=MAKER, taker_fee=TAKER, funding_rate=0.0, latency=0.0)
+    return sim, clock
+
+
+def at(sim, clock, seconds):
+    """Move to `seconds` after the start and match everything up to then."""
+    clock.set(START / 1000 + seconds)
+    sim.sync()
+
+
+def filled(sim, *orders):
+    return [sim.fetch_order(order["id"])["filled"] for order in orders]
+
+
+def buy(sim, qty, price, **params):
+    return sim.create_order(SYMBOL, "limit", "buy", qty, price, {"positionIdx": 1, **params})
+
+
+def test_resting_orders_fill_by_price_then_time_behind_the_queue():
+    sim, clock = make_sim(trades=[(10, 99.5, 2.5), (20, 99.5, 1.0), (30, 99.4, 2.0)])
+    first = buy(sim, 1, 99.5)
+    second = buy(sim, 1, 99.5)
+    better = buy(sim, 1, 99.6)
+
+    # A sale at 99.5 passes the better bid first; at 99.5 the 2 displayed there are ahead of both orders
+    at(sim, clock, 10)
+    assert filled(sim, first, second, better) == [0.0, 0.0, 1.0]
+    # The next 0.5 works off the queue, then the earlier order takes the rest
+    at(sim, clock, 20)
+    assert filled(sim, first, second, better) == [0.5, 0.0, 1.0]
+    # 99.4 sweeps through the whole level, earliest first, at the orders' own prices
+    at(sim, clock, 30)
+    assert filled(sim, first, second, better) == [1.0, 1.0, 1.0]
+    assert [(f["order_id"], f["qty"], f["price"], f["maker"]) for f in sim.fills] == [
+        (better["id"], 1.0, 99.6, True),
+        (first["id"], 0.5, 99.5, True),
+        (first["id"], 0.5, 99.5, True),
+        (second["id"], 1.0, 99.5, True),
+    ]
+
+
+def test_partial_fills_and_an_amend_losing_queue_position():
+    sim, clock = make_sim(trades=[(10, 99.5, 2.3), (20, 99.5, 2.5)])
+    first = buy(sim, 1, 99.5)
+    second = buy(sim, 1, 99.5)
+    at(sim, clock, 10)
+    order = sim.fetch_order(first["id"])
+    assert order["filled"] == pytest.approx(0.3)
+    assert order["remaining"] == pytest.approx(0.7)
+    assert order["status"] == "open"
+    assert order["info"]["orderStatus"] == "PartiallyFilled"
+
+    # The amended order goes behind the other one, with the displayed size ahead of it again
+    sim.edit_order(first["id"], SYMBOL, "limit", "buy", 2)
+    at(sim, clock, 20)
+    assert filled(sim, first, second) == pytest.approx([0.3, 0.5])
+
+
+def test_post_only_orders_that_would_take_are_cancelled():
+    sim, clock = make_sim()
+    for side, price in (("buy", 100.1), ("sell", 100.0)):
+        order = sim.create_order(SYMBOL, "limit", side, 1, price, {"timeInForce": "PostOnly"})
+        assert order["status"] == "canceled"
+        assert order["filled"] == 0
+    resting = buy(sim, 1, 100.0, timeInForce="PostOnly")
+    assert resting["status"] == "open"
+    # Amended across the spread, it is cancelled rather than taking
+    sim.edit_order(resting["id"], SYMBOL, "limit", "buy", None, 100.2)
+    assert sim.fetch_order(resting["id"])["status"] == "canceled"
+    assert sim.fills == []
+    assert sim.stats["rejected"] == 3
+
+
+def test_reduce_only_orders_are_checked_against_the_position():
+    sim, clock = make_sim()
+    with pytest.raises(ccxt.InvalidOrder, match="110017"):
+        sim.create_order(SYMBOL, "market", "sell", 1, None, {"positionIdx": 1, "reduceOnly": True})
+    with pytest.raises(ccxt.InvalidOrder, match="110017"):
+        buy(sim, 1, 99.0, reduceOnly=True)
+
+    sim.create_order(SYMBOL, "market", "buy", 1, None, {"positionIdx": 1})
+    assert sim.positions[(SYMBOL, "long")]["qty"] == 1.0
+    # Only the position's size is closed; the rest of a reduce-only market order is cancelled
+    close = sim.create_order(SYMBOL, "market", "sell", 3, None, {"positionIdx": 1, "reduceOnly": True})
+    assert close["filled"] == 1.0
+    assert close["status"] == "canceled"
+    assert sim.positions[(SYMBOL, "long")]["qty"] == 0.0
+
+
+def test_hedge_mode_pnl_and_fees():
+    sim, clock = make_sim(trades=[(10, 100.6, 1.0)])
+    sim.create_order(SYMBOL, "market", "buy", 1, None, {"positionIdx": 1})    # 1 @ 100.1, taker
+    sim.create_order(SYMBOL, "market", "sell", 2, None, {"positionIdx": 2})   # 2 @ 100.0, taker
+    positions = {p["side"]: p for p in sim.fetch_positions([SYMBOL])}
+    assert (positions["long"]["contracts"], positions["long"]["entryPrice"]) == (1.0, 100.1)
+    assert (positions["short"]["contracts"], positions["short"]["entryPrice"]) == (2.0, 100.0)
+
+    # The long closes at its resting reduce-only sell as the market trades through it
+    sim.create_order(SYMBOL, "limit", "sell", 1, 100.5, {"positionIdx": 1, "reduceOnly": True})
+    at(sim, clock, 10)
+    long_realised = (100.5 - 100.1) * 1 - 100.1 * TAKER - 100.5 * MAKER
+    assert sim.positions[(SYMBOL, "long")]["qty"] == 0.0
+    assert sim.positions[(SYMBOL, "long")]["cum_realised"] == pytest.approx(long_realised)
+
+    # The short closes at the ask
+    sim.create_order(SYMBOL, "market", "buy", 2, None, {"positionIdx": 2, "reduceOnly": True})
+    short_realised = (100.0 - 100.1) * 2 - 200.0 * TAKER - 200.2 * TAKER
+    assert sim.positions[(SYMBOL, "short")]["cum_realised"] == pytest.approx(short_realised)
+
+    assert sim.stats["fees"] == pytest.approx((100.1 + 200.0 + 200.2) * TAKER + 100.5 * MAKER)
+    assert sim.fetch_balance()["total"]["USDT"] == pytest.approx(10_000.0 + long_realised + short_realised)
+    assert sim.fetch_positions() == []
+
+
+def test_batch_create_returns_bybit_codes_per_order():
+    sim, clock = make_sim(balance=100.0)
+    response = sim.privatePostV5OrderCreateBatch({"category": "linear", "request": [
+        {"symbol": SYMBOL, "side": "Buy", "orderType": "Limit", "qty": "0.01", "price": "99", "positionIdx": 1,
+         "orderLinkId": "grid-1"},
+        {"symbol": SYMBOL, "side": "Buy", "orderType": "Limit", "qty": "0.01", "price": "98", "positionIdx": 1,
+         "orderLinkId": "grid-1"},
+        {"symbol": SYMBOL, "side": "Buy", "orderType": "Limit", "qty": "0.0005", "price": "98", "positionIdx": 1},
+        {"symbol": SYMBOL, "side": "Buy", "orderType": "Limit", "qty": "60", "price": "99", "positionIdx": 1},
+    ]})
+    assert [info["code"] for info in response["retExtInfo"]["list"]] == [0, 110072, 10001, 110007]
+    rows = response["result"]["list"]
+    assert rows[0]["orderId"] and not any(row["orderId"] for row in rows[1:])
+    assert [o["clientOrderId"] for o in sim.fetch_open_orders(SYMBOL)] == ["grid-1"]
+
+
+def test_single_orders_raise_the_same_codes():
+    sim, clock = make_sim(balance=100.0)
+    buy(sim, 0.01, 99, orderLinkId="grid-1")
+    for qty, params, error, code in (
+        (0.01, {"orderLinkId": "grid-1"}, ccxt.InvalidOrder, "110072"),
+        (0.0005, {}, ccxt.InvalidOrder, "10001"),
+        (60, {}, ccxt.InsufficientFunds, "110007"),
+    ):
+        with pytest.raises(error, match=code):
+            buy(sim, qty, 98, **params)
+    assert sim.stats["rejected"] == 3
+    assert len(sim.fetch_open_orders(SYMBOL)) == 1